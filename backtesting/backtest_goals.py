@@ -12,6 +12,7 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from training.config import TRAINING_DATA_PATHS, BACKTEST_CONFIG, BACKTESTING_RESULTS_DIR
+from training.utils import load_training_data
 from backtesting.utils import (
     walk_forward_split, calculate_roi, calculate_sharpe_ratio,
     calculate_max_drawdown, print_backtest_summary
@@ -41,7 +42,7 @@ def walk_forward_backtest_goals(
     print("=" * 60)
     
     # Load data
-    df = pd.read_csv(data_path)
+    df = load_training_data(data_path)
     df = df.dropna(subset=['y', 'odds_over25'])
     
     # Create walk-forward splits
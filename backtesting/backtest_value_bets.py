@@ -13,6 +13,7 @@ sys.path.insert(0, str(project_root))
 
 from backtesting.utils import calculate_kelly_stake, print_backtest_summary
 from training.config import BACKTESTING_RESULTS_DIR
+from training.utils import load_training_data
 
 
 def backtest_value_bets(
@@ -37,7 +38,7 @@ def backtest_value_bets(
     print("VALUE BETS BACKTEST")
     print("=" * 60)
     
-    df = pd.read_csv(data_path)
+    df = load_training_data(data_path, columns=['y', 'odds_over25'])
     df = df.dropna(subset=['y', 'odds_over25'])
     
     # Simulate predictions (in real scenario, use actual model predictions)
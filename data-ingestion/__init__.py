@@ -3,22 +3,39 @@ Data Ingestion Module
 Handles incoming match data from main application
 """
 
-from .models import Team, Match, MatchOdds, MatchResult, Prediction
+from .models import Team, Match, MatchOdds, LatestOdds, OddsMovement, MatchResult, Prediction
 from .schemas import (
     TeamStatsSchema,
     OddsSchema,
     MatchResultSchema,
     MatchSchema,
     BatchIngestRequest,
-    IngestResponse
+    IngestResponse,
+    IngestJobAccepted,
+    IngestJobStatus,
+    StreamIngestResponse
 )
-from .database import get_db, get_db_session, init_db, drop_db
+from .database import get_db, get_db_session, get_async_db_session, pool_status, init_db, drop_db
 from .ingestion import DataIngestionService
+from .team_index import TeamNameIndex, get_team_index
+from .jobs import IngestionJob, IngestionJobManager, JobQueueFullError
+from .streaming import StreamIngestor
+from .bulk_loader import BulkLoader, iter_match_records
+from .json_stream import iter_json_array
+from .odds import (
+    get_latest_odds,
+    rebuild_latest_odds,
+    replay_odds,
+    line_movement,
+    backfill_odds_movements
+)
 
 __all__ = [
     'Team',
     'Match',
     'MatchOdds',
+    'LatestOdds',
+    'OddsMovement',
     'MatchResult',
     'Prediction',
     'TeamStatsSchema',
@@ -27,9 +44,28 @@ __all__ = [
     'MatchSchema',
     'BatchIngestRequest',
     'IngestResponse',
+    'IngestJobAccepted',
+    'IngestJobStatus',
+    'StreamIngestResponse',
     'get_db',
     'get_db_session',
+    'get_async_db_session',
+    'pool_status',
     'init_db',
     'drop_db',
-    'DataIngestionService'
+    'DataIngestionService',
+    'TeamNameIndex',
+    'get_team_index',
+    'IngestionJob',
+    'IngestionJobManager',
+    'JobQueueFullError',
+    'StreamIngestor',
+    'BulkLoader',
+    'iter_match_records',
+    'iter_json_array',
+    'get_latest_odds',
+    'rebuild_latest_odds',
+    'replay_odds',
+    'line_movement',
+    'backfill_odds_movements'
 ]
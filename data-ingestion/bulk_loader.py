@@ -0,0 +1,385 @@
+"""
+Bulk loader for historical datasets
+Streams match files into temporary staging tables and merges them with set-based SQL
+"""
+
+import csv
+import io
+import json
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from pydantic import ValidationError
+from sqlalchemy import (
+    BigInteger, Boolean, Column, Integer, MetaData, String, Table,
+    and_, case, cast, func, insert, literal, select, true, union_all
+)
+from sqlalchemy.engine import Connection, Engine
+
+from .models import Team, Match, MatchOdds, LatestOdds, OddsMovement, MatchResult
+from .odds import ODDS_SELECTIONS
+from .schemas import MatchSchema
+from .json_stream import READ_BLOCK_CHARS, iter_json_array
+from .ingestion import (
+    DataIngestionService, UPSERT_DIALECTS, MATCH_UPDATE_COLUMNS, LATEST_ODDS_COLUMNS, RESULT_COLUMNS
+)
+
+
+# Rows sent per COPY / executemany call
+STAGE_CHUNK_ROWS = 50000
+
+# Errors kept in the summary (the invalid count is always exact)
+BULK_MAX_ERRORS = 100
+
+# Keys of the record array in {"metadata": ..., "matches": [...]} files
+RECORD_KEYS = ('matches', 'fixtures')
+
+# Match columns taken from the records (team ids are resolved in SQL)
+MATCH_STAGE_COLUMNS = [
+    column.name for column in Match.__table__.columns
+    if column.name not in ('home_team_id', 'away_team_id', 'created_at', 'updated_at')
+]
+ODDS_STAGE_COLUMNS = [column.name for column in MatchOdds.__table__.columns if column.name.endswith('_odds')]
+
+
+def iter_match_records(path: str) -> Iterator[Dict]:
+    """
+    Stream raw match records from a file
+    
+    NDJSON files (.ndjson, .jsonl) hold one record per line. JSON documents
+    hold them under "matches" or "fixtures" (as in test-data/), or as a
+    top-level array, and are decoded one record at a time by iter_json_array,
+    so the file is never loaded whole.
+    
+    Args:
+        path: Path to the data file
+    
+    Yields:
+        Match records as dicts
+    """
+    path = Path(path)
+    if path.suffix in ('.ndjson', '.jsonl'):
+        with open(path, 'r') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        return
+    
+    yield from iter_json_array(str(path), keys=RECORD_KEYS, block_size=READ_BLOCK_CHARS)
+
+
+def _timestamp(value: datetime) -> str:
+    """Naive UTC timestamp text accepted by COPY and stored as SQLAlchemy does on SQLite"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.strftime('%Y-%m-%d %H:%M:%S.%f')
+
+
+def _cents(column):
+    """SQL expression of a price as integer hundredths (0 when NULL)"""
+    return func.coalesce(cast(func.round(column * 100), Integer), 0)
+
+
+class BulkLoader:
+    """
+    Set-based loader for large match files
+    
+    Validated records are staged into a TEMPORARY table (COPY on PostgreSQL,
+    executemany on SQLite) and merged with a handful of INSERT ... SELECT
+    statements: missing teams are created, matches, latest odds and results
+    upserted and changed odds appended to odds_movements. Sections whose
+    content hash matches the stored one are not rewritten. When a match_id
+    repeats, its last record wins. The whole load is one transaction.
+    """
+    
+    def __init__(self, engine: Engine, chunk_rows: int = STAGE_CHUNK_ROWS):
+        """
+        Args:
+            engine: Target database engine (PostgreSQL or SQLite)
+            chunk_rows: Rows per COPY / executemany call
+        """
+        self.dialect = engine.dialect.name
+        if self.dialect not in UPSERT_DIALECTS:
+            raise ValueError(f"Bulk loading supports {sorted(UPSERT_DIALECTS)}, got {self.dialect}")
+        
+        self.engine = engine
+        self.chunk_rows = chunk_rows
+        self.upsert = UPSERT_DIALECTS[self.dialect]
+        
+        metadata = MetaData()
+        self.stage = self._stage_table(metadata, 'bulk_stage_matches')
+        self.latest = self._stage_table(metadata, 'bulk_stage_latest')
+    
+    @staticmethod
+    def _stage_table(metadata: MetaData, name: str) -> Table:
+        """Temporary table with one column per staged value"""
+        copied = [
+            Column(column.name, column.type)
+            for table, names in (
+                (Match.__table__, MATCH_STAGE_COLUMNS),
+                (MatchOdds.__table__, ODDS_STAGE_COLUMNS),
+                (MatchResult.__table__, RESULT_COLUMNS)
+            )
+            for column in table.columns
+            if column.name in names
+        ]
+        return Table(
+            name, metadata,
+            Column('seq', BigInteger),
+            Column('home_team', String(100)),
+            Column('away_team', String(100)),
+            Column('has_result', Boolean),
+            Column('odds_hash', String(32)),
+            Column('result_hash', String(32)),
+            *copied,
+            prefixes=['TEMPORARY']
+        )
+    
+    def load(self, records: Iterable[Dict]) -> Dict:
+        """
+        Stage and merge a stream of records
+        
+        Args:
+            records: Raw match records (e.g. from iter_match_records)
+        
+        Returns:
+            Summary with counts, timings and rows/second
+        """
+        summary = {
+            'dialect': self.dialect,
+            'rows_read': 0,
+            'rows_staged': 0,
+            'invalid_rows': 0,
+            'errors': []
+        }
+        start = time.perf_counter()
+        
+        with self.engine.begin() as conn:
+            for table in (self.stage, self.latest):
+                table.drop(conn, checkfirst=True)
+                table.create(conn)
+            
+            rows = []
+            for record in records:
+                summary['rows_read'] += 1
+                row = self._stage_row(summary['rows_read'], record, summary)
+                if row is None:
+                    continue
+                rows.append(row)
+                if len(rows) >= self.chunk_rows:
+                    self._copy(conn, rows)
+                    summary['rows_staged'] += len(rows)
+                    rows = []
+            if rows:
+                self._copy(conn, rows)
+                summary['rows_staged'] += len(rows)
+            
+            staged = time.perf_counter()
+            summary.update(self._merge(conn))
+            
+            for table in (self.stage, self.latest):
+                table.drop(conn)
+        
+        finished = time.perf_counter()
+        summary['stage_seconds'] = staged - start
+        summary['merge_seconds'] = finished - staged
+        summary['seconds'] = finished - start
+        summary['rows_per_second'] = summary['rows_staged'] / summary['seconds'] if summary['seconds'] > 0 else 0.0
+        return summary
+    
+    def _stage_row(self, seq: int, record: Dict, summary: Dict) -> Optional[tuple]:
+        """Staging tuple of one validated record, or None if it is invalid"""
+        try:
+            match = MatchSchema.model_validate(record)
+            values = {
+                **DataIngestionService._match_values(match, None, None),
+                **DataIngestionService._odds_values(match.match_id, match.odds, None),
+                **(DataIngestionService._result_values(match.match_id, match.result) if match.result is not None else {})
+            }
+        except ValidationError as e:
+            summary['invalid_rows'] += 1
+            if len(summary['errors']) < BULK_MAX_ERRORS:
+                match_id = record.get('match_id') if isinstance(record, dict) else None
+                summary['errors'].append(f"Record {seq} ({match_id}): {str(e).splitlines()[0]}")
+            return None
+        
+        values['match_datetime'] = _timestamp(match.match_datetime)
+        values['seq'] = seq
+        values['home_team'] = match.home_team
+        values['away_team'] = match.away_team
+        values['has_result'] = match.result is not None
+        
+        hashes = DataIngestionService._section_hashes(match)
+        values['content_hash'] = hashes['stats']
+        values['odds_hash'] = hashes['odds']
+        values['result_hash'] = hashes['results']
+        
+        return tuple(values.get(column.name) for column in self.stage.columns)
+    
+    def _copy(self, conn: Connection, rows: List[tuple]):
+        """Append rows to the staging table with the fastest path of the dialect"""
+        columns = ', '.join(column.name for column in self.stage.columns)
+        
+        if self.dialect == 'postgresql':
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(rows)
+            buffer.seek(0)
+            sql = f"COPY {self.stage.name} ({columns}) FROM STDIN WITH (FORMAT csv)"
+            
+            cursor = conn.connection.driver_connection.cursor()
+            try:
+                if hasattr(cursor, 'copy_expert'):
+                    # psycopg2
+                    cursor.copy_expert(sql, buffer)
+                else:
+                    # psycopg 3
+                    with cursor.copy(sql) as copy:
+                        copy.write(buffer.getvalue())
+            finally:
+                cursor.close()
+        else:
+            placeholders = ', '.join('?' for _ in self.stage.columns)
+            conn.exec_driver_sql(f"INSERT INTO {self.stage.name} ({columns}) VALUES ({placeholders})", rows)
+    
+    def _merge(self, conn: Connection) -> Dict:
+        """Merge the staged rows into teams, matches, odds and match_results"""
+        stage = self.stage
+        latest = self.latest
+        now = datetime.utcnow()
+        
+        # 1. Last record of every match_id
+        ranked = select(
+            *stage.columns,
+            func.row_number().over(partition_by=stage.c.match_id, order_by=stage.c.seq.desc()).label('rn')
+        ).subquery()
+        conn.execute(insert(latest).from_select(
+            [column.name for column in latest.columns],
+            select(*[ranked.c[column.name] for column in latest.columns]).where(ranked.c.rn == 1)
+        ))
+        
+        # 2. Teams (league of the first record naming the team)
+        names = select(stage.c.home_team.label('team_name'), stage.c.league, stage.c.seq).union_all(
+            select(stage.c.away_team.label('team_name'), stage.c.league, stage.c.seq)
+        ).subquery()
+        first_seen = select(
+            names.c.team_name,
+            names.c.league,
+            func.row_number().over(partition_by=names.c.team_name, order_by=names.c.seq).label('rn')
+        ).subquery()
+        
+        teams_before = conn.execute(select(func.count()).select_from(Team)).scalar()
+        conn.execute(
+            self.upsert(Team).from_select(
+                ['team_name', 'league', 'tier', 'created_at', 'updated_at'],
+                select(first_seen.c.team_name, first_seen.c.league, literal('mid'), literal(now), literal(now))
+                .where(first_seen.c.rn == 1)
+            ).on_conflict_do_nothing(index_elements=['team_name'])
+        )
+        teams_created = conn.execute(select(func.count()).select_from(Team)).scalar() - teams_before
+        
+        # Sections whose stored content hash is unchanged are not rewritten
+        skipped = {
+            'stats_skipped': self._count_unchanged(conn, Match.__table__, latest.c.content_hash),
+            'odds_skipped': self._count_unchanged(conn, LatestOdds.__table__, latest.c.odds_hash),
+            'results_skipped': self._count_unchanged(conn, MatchResult.__table__, latest.c.result_hash)
+        }
+        
+        # 3. Matches
+        existing = conn.execute(
+            select(func.count()).select_from(latest).join(Match, Match.match_id == latest.c.match_id)
+        ).scalar()
+        staged_matches = conn.execute(select(func.count()).select_from(latest)).scalar()
+        
+        home = Team.__table__.alias('home')
+        away = Team.__table__.alias('away')
+        match_columns = [name for name in MATCH_STAGE_COLUMNS if name != 'status']
+        statement = self.upsert(Match).from_select(
+            match_columns + ['status', 'home_team_id', 'away_team_id', 'created_at', 'updated_at'],
+            select(
+                *[latest.c[name] for name in match_columns],
+                case((latest.c.has_result == True, literal('completed')), else_=latest.c.status),
+                home.c.team_id,
+                away.c.team_id,
+                literal(now),
+                literal(now)
+            )
+            .join(home, home.c.team_name == latest.c.home_team)
+            .join(away, away.c.team_name == latest.c.away_team)
+            .where(true())
+        )
+        conn.execute(statement.on_conflict_do_update(
+            index_elements=['match_id'],
+            set_={column: statement.excluded[column] for column in MATCH_UPDATE_COLUMNS},
+            where=Match.__table__.c.content_hash.is_distinct_from(statement.excluded.content_hash)
+        ))
+        
+        # 4. Odds: one movement row per changed price (against the current odds), latest odds replaced
+        previous = LatestOdds.__table__.alias('previous')
+        joined = latest.outerjoin(previous, and_(
+            previous.c.match_id == latest.c.match_id,
+            previous.c.bookmaker == 'test_bookmaker'
+        ))
+        
+        changes = []
+        for code, name in enumerate(ODDS_SELECTIONS):
+            delta = _cents(latest.c[name]) - _cents(previous.c[name])
+            changes.append(
+                select(latest.c.match_id, literal('test_bookmaker'), literal(code), literal(now), delta)
+                .select_from(joined)
+                .where(delta != 0)
+            )
+        odds_movements = conn.execute(
+            insert(OddsMovement).from_select(
+                ['match_id', 'bookmaker', 'selection', 'recorded_at', 'delta_cents'],
+                union_all(*changes)
+            )
+        ).rowcount
+        
+        statement = self.upsert(LatestOdds).from_select(
+            ['match_id', 'odds_timestamp', *ODDS_STAGE_COLUMNS, 'bookmaker', 'content_hash', 'updated_at'],
+            select(
+                latest.c.match_id,
+                literal(now),
+                *[latest.c[name] for name in ODDS_STAGE_COLUMNS],
+                literal('test_bookmaker'),
+                latest.c.odds_hash,
+                literal(now)
+            ).where(true())
+        )
+        conn.execute(statement.on_conflict_do_update(
+            index_elements=['match_id'],
+            set_={column: statement.excluded[column] for column in LATEST_ODDS_COLUMNS},
+            where=LatestOdds.__table__.c.content_hash.is_distinct_from(statement.excluded.content_hash)
+        ))
+        
+        # 5. Results
+        statement = self.upsert(MatchResult).from_select(
+            ['match_id', *RESULT_COLUMNS, 'content_hash', 'created_at'],
+            select(latest.c.match_id, *[latest.c[name] for name in RESULT_COLUMNS], latest.c.result_hash, literal(now))
+            .where(latest.c.has_result == True)
+        )
+        results_upserted = conn.execute(statement.on_conflict_do_update(
+            index_elements=['match_id'],
+            set_={column: statement.excluded[column] for column in [*RESULT_COLUMNS, 'content_hash']},
+            where=MatchResult.__table__.c.content_hash.is_distinct_from(statement.excluded.content_hash)
+        )).rowcount
+        
+        return {
+            'matches_created': staged_matches - existing,
+            'matches_updated': existing,
+            'teams_created': teams_created,
+            'odds_movements': odds_movements,
+            'results_upserted': results_upserted,
+            **skipped
+        }
+    
+    def _count_unchanged(self, conn: Connection, table: Table, staged_hash) -> int:
+        """Staged rows whose content hash equals the stored row's"""
+        return conn.execute(
+            select(func.count())
+            .select_from(self.latest)
+            .join(table, table.c.match_id == self.latest.c.match_id)
+            .where(table.c.content_hash == staged_hash)
+        ).scalar()
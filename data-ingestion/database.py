@@ -1,16 +1,26 @@
 """
 Database connection and session management
+Sync engine and sessions for ingestion and batch jobs, async engine and
+sessions for the API read paths
 """
 
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import QueuePool
 from contextlib import contextmanager
-from typing import Generator
+from typing import AsyncGenerator, Dict, Generator, Optional
 
 from .models import Base
 
+try:
+    import greenlet  # noqa: F401 (required by SQLAlchemy's asyncio extension)
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+    ASYNC_DB_AVAILABLE = True
+except ImportError:
+    ASYNC_DB_AVAILABLE = False
+
 
 # Database URL from environment
 DATABASE_URL = os.getenv(
@@ -35,6 +45,64 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+# Async drivers of the API read paths, by dialect
+ASYNC_DRIVERS = {
+    'postgresql': 'postgresql+asyncpg',
+    'sqlite': 'sqlite+aiosqlite'
+}
+
+
+def _async_url(url: str) -> str:
+    """DATABASE_URL with the async driver of its dialect"""
+    parsed = make_url(url)
+    drivername = ASYNC_DRIVERS.get(parsed.get_backend_name(), parsed.drivername)
+    return parsed.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+ASYNC_DATABASE_URL = os.getenv('ASYNC_DATABASE_URL', _async_url(DATABASE_URL))
+
+# Pool events counted per engine (exposed by pool_status)
+POOL_COUNTERS: Dict[str, Dict[str, int]] = {}
+
+
+def _track_pool(name: str, sync_engine: Engine):
+    """Count connects, checkouts and invalidations of an engine's pool"""
+    counters = POOL_COUNTERS.setdefault(name, {'connects': 0, 'checkouts': 0, 'invalidated': 0})
+    
+    def count(key):
+        def listener(*args):
+            counters[key] += 1
+        return listener
+    
+    event.listen(sync_engine, 'connect', count('connects'))
+    event.listen(sync_engine, 'checkout', count('checkouts'))
+    event.listen(sync_engine, 'invalidate', count('invalidated'))
+
+
+_track_pool('sync', engine)
+
+# Async engine and session factory (None when asyncpg/aiosqlite or greenlet are missing)
+async_engine = None
+AsyncSessionLocal = None
+if ASYNC_DB_AVAILABLE:
+    try:
+        async_engine = create_async_engine(
+            ASYNC_DATABASE_URL,
+            pool_size=int(os.getenv('ASYNC_DB_POOL_SIZE', 10)),
+            max_overflow=int(os.getenv('ASYNC_DB_MAX_OVERFLOW', 20)),
+            pool_pre_ping=True,
+            echo=os.getenv('DEBUG', 'false').lower() == 'true'
+        )
+        AsyncSessionLocal = async_sessionmaker(
+            async_engine,
+            autoflush=False,
+            expire_on_commit=False
+        )
+        _track_pool('async', async_engine.sync_engine)
+    except ImportError:
+        # Async driver not installed
+        ASYNC_DB_AVAILABLE = False
+
 
 def init_db():
     """Initialize database - create all tables"""
@@ -82,3 +150,52 @@ def get_db_session() -> Session:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db_session() -> AsyncGenerator["AsyncSession", None]:
+    """
+    Get async database session for FastAPI dependency injection (read paths)
+    
+    Usage in FastAPI:
+        @app.get("/")
+        async def endpoint(db: AsyncSession = Depends(get_async_db_session)):
+            return (await db.execute(select(Team))).scalars().all()
+    
+    Raises:
+        RuntimeError: If the async driver (asyncpg/aiosqlite) is not installed
+    """
+    if AsyncSessionLocal is None:
+        raise RuntimeError(
+            f"Async database access unavailable for {make_url(ASYNC_DATABASE_URL).drivername} "
+            "(install asyncpg or aiosqlite)"
+        )
+    
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def pool_status(name: str = 'sync') -> Optional[Dict]:
+    """
+    Connection pool metrics
+    
+    Args:
+        name: 'sync' (ingestion/batch engine) or 'async' (API read engine)
+    
+    Returns:
+        Pool class, size, checked-in/checked-out/overflow connections and
+        connect/checkout/invalidation counts, or None if the engine does not exist
+    """
+    if name == 'async':
+        target = async_engine.sync_engine if async_engine is not None else None
+    else:
+        target = engine
+    if target is None:
+        return None
+    
+    pool = target.pool
+    metrics = {'pool': type(pool).__name__}
+    for method in ('size', 'checkedin', 'checkedout', 'overflow'):
+        if hasattr(pool, method):
+            metrics[method] = getattr(pool, method)()
+    metrics.update(POOL_COUNTERS.get(name, {}))
+    return metrics
@@ -3,50 +3,107 @@ Core data ingestion logic
 Processes incoming match data and stores in database
 """
 
+import hashlib
+import json
 from datetime import datetime
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from sqlalchemy.exc import IntegrityError
-from typing import List, Tuple
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.dialects import postgresql, sqlite
+from typing import Dict, List, Optional, Tuple
 
-from .models import Team, Match, MatchOdds, MatchResult
+from .models import Team, Match, LatestOdds, OddsMovement, MatchResult
+from .odds import movement_rows, latest_prices
 from .schemas import MatchSchema, BatchIngestRequest, IngestResponse
+from .team_index import TeamNameIndex, get_team_index
+
+
+# Dialects with INSERT ... ON CONFLICT support (bulk path)
+UPSERT_DIALECTS = {
+    'postgresql': postgresql.insert,
+    'sqlite': sqlite.insert
+}
+
+# Matches per bulk chunk (one savepoint, replayed row by row if it fails)
+BULK_CHUNK_SIZE = 500
+
+# Match columns refreshed when an existing match is ingested again with a changed match section
+MATCH_UPDATE_COLUMNS = [
+    column.name for column in Match.__table__.columns
+    if column.name not in ('match_id', 'home_team_id', 'away_team_id', 'created_at')
+]
+
+# Latest-odds columns replaced when a match is ingested again
+LATEST_ODDS_COLUMNS = [
+    column.name for column in LatestOdds.__table__.columns if column.name != 'match_id'
+]
+
+# Ingested sections tracked by content hash (IngestResponse.<section>_skipped)
+HASHED_SECTIONS = ('stats', 'odds', 'results')
+
+# Result columns (all of them are replaced on re-ingestion)
+RESULT_COLUMNS = [
+    'home_goals', 'away_goals', 'result', 'total_goals',
+    'home_corners', 'away_corners', 'total_corners',
+    'home_cards', 'away_cards', 'total_cards',
+    'btts', 'over_0_5', 'over_1_5', 'over_2_5', 'over_3_5', 'over_4_5',
+    'corners_over_8_5', 'corners_over_9_5', 'corners_over_10_5',
+    'cards_over_3_5', 'cards_over_4_5'
+]
+
+
+def content_hash(section: Dict) -> str:
+    """Stable hash of an ingested section (key order does not matter)"""
+    payload = json.dumps(section, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _chunks(rows: List, size: int = BULK_CHUNK_SIZE):
+    """Split a list into consecutive chunks"""
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
 
 
 class DataIngestionService:
     """Service for ingesting match data into database"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, team_index: Optional[TeamNameIndex] = None):
         self.db = db
         self.errors = []
+        self.skipped = dict.fromkeys(HASHED_SECTIONS, 0)
+        self.team_index = team_index or get_team_index(db)
+        # Teams created in the open transaction (published to the index on commit)
+        self._new_teams: Dict[str, int] = {}
     
-    def ingest_batch(self, request: BatchIngestRequest) -> IngestResponse:
+    def ingest_batch(self, request: BatchIngestRequest, bulk: bool = True) -> IngestResponse:
         """
         Ingest a batch of matches
         
+        Sections (stats, odds, result) whose content hash matches the stored
+        one are not written; they are counted in <section>_skipped.
+        
         Args:
             request: BatchIngestRequest with list of matches
-            
+            bulk: Use multi-row upserts (PostgreSQL/SQLite); other databases
+                always use the row-by-row path
+        
         Returns:
             IngestResponse with processing statistics
         """
-        matches_created = 0
-        matches_updated = 0
-        
-        for match_data in request.matches:
-            try:
-                created = self._process_match(match_data)
-                if created:
-                    matches_created += 1
-                else:
-                    matches_updated += 1
-            except Exception as e:
-                self.errors.append(f"Match {match_data.match_id}: {str(e)}")
+        if bulk and self._upsert_insert() is not None:
+            matches_created, matches_updated = self._ingest_bulk(request.matches)
+        else:
+            matches_created, matches_updated = self._ingest_rows(request.matches)
         
         # Commit all changes
         try:
             self.db.commit()
+            self.team_index.add(self._new_teams)
+            self._new_teams = {}
         except Exception as e:
             self.db.rollback()
+            self._new_teams = {}
+            self.skipped = dict.fromkeys(HASHED_SECTIONS, 0)
             return IngestResponse(
                 success=False,
                 message=f"Database commit failed: {str(e)}",
@@ -62,199 +119,479 @@ class DataIngestionService:
             matches_processed=len(request.matches),
             matches_created=matches_created,
             matches_updated=matches_updated,
+            stats_skipped=self.skipped['stats'],
+            odds_skipped=self.skipped['odds'],
+            results_skipped=self.skipped['results'],
             errors=self.errors
         )
     
-    def _process_match(self, match_data: MatchSchema) -> bool:
+    def _ingest_rows(self, matches: List[MatchSchema]) -> Tuple[int, int]:
+        """Process matches one at a time (any database)"""
+        matches_created = 0
+        matches_updated = 0
+        
+        for match_data in matches:
+            new_teams = dict(self._new_teams)
+            skipped = dict.fromkeys(HASHED_SECTIONS, 0)
+            try:
+                with self.db.begin_nested():
+                    created = self._process_match(match_data, skipped)
+                for section, count in skipped.items():
+                    self.skipped[section] += count
+                if created:
+                    matches_created += 1
+                else:
+                    matches_updated += 1
+            except Exception as e:
+                # Teams created in the rolled-back savepoint no longer exist
+                self._new_teams = new_teams
+                self.errors.append(f"Match {match_data.match_id}: {str(e)}")
+        
+        return matches_created, matches_updated
+    
+    def _upsert_insert(self):
+        """Dialect-specific insert() with on_conflict support, or None"""
+        return UPSERT_DIALECTS.get(self.db.get_bind().dialect.name)
+    
+    def _split_waves(self, matches: List[MatchSchema]) -> List[List[MatchSchema]]:
+        """
+        Split a batch so no match_id appears twice in one wave
+        
+        A multi-row upsert cannot touch the same row twice; repeated
+        fixtures go to later waves, so the last occurrence wins as it does
+        row by row.
+        """
+        waves = []
+        seen = []
+        for match_data in matches:
+            for wave, ids in zip(waves, seen):
+                if match_data.match_id not in ids:
+                    wave.append(match_data)
+                    ids.add(match_data.match_id)
+                    break
+            else:
+                waves.append([match_data])
+                seen.append({match_data.match_id})
+        return waves
+    
+    def _ingest_bulk(self, matches: List[MatchSchema]) -> Tuple[int, int]:
+        """
+        Write a batch with a few executemany statements per chunk
+        
+        Each statement is compiled once and cached; the driver batches the
+        rows (insertmanyvalues on PostgreSQL). Every match has already been
+        validated by BatchIngestRequest. A chunk whose statements fail is
+        rolled back to its savepoint and replayed row by row, so errors are
+        still reported per match.
+        """
+        new_teams = dict(self._new_teams)
+        try:
+            with self.db.begin_nested():
+                team_ids = self._resolve_teams(matches)
+        except SQLAlchemyError:
+            self._new_teams = new_teams
+            return self._ingest_rows(matches)
+        
+        matches_created = 0
+        matches_updated = 0
+        
+        for wave in self._split_waves(matches):
+            for chunk in _chunks(wave):
+                try:
+                    with self.db.begin_nested():
+                        created, skipped = self._write_chunk(chunk, team_ids)
+                    for section, count in skipped.items():
+                        self.skipped[section] += count
+                    matches_created += created
+                    matches_updated += len(chunk) - created
+                except SQLAlchemyError:
+                    created, updated = self._ingest_rows(chunk)
+                    matches_created += created
+                    matches_updated += updated
+        
+        return matches_created, matches_updated
+    
+    def _resolve_teams(self, matches: List[MatchSchema]) -> Dict[str, int]:
+        """Map every team name in the batch to its team_id"""
+        leagues = {}
+        for match_data in matches:
+            leagues.setdefault(match_data.home_team, match_data.league)
+            leagues.setdefault(match_data.away_team, match_data.league)
+        
+        return self._team_ids(leagues)
+    
+    def _team_ids(self, leagues: Dict[str, str]) -> Dict[str, int]:
+        """
+        team_name -> team_id, creating teams that do not exist yet
+        
+        Names already in the index cost no query. Misses are re-read from
+        the database (another process may have created them), and the rest
+        are inserted in batches.
+        
+        Args:
+            leagues: Dictionary of team name to league (used for new teams)
+        """
+        team_ids, missing = self.team_index.lookup(leagues)
+        
+        missing = [name for name in missing if name not in self._new_teams]
+        team_ids.update({name: self._new_teams[name] for name in leagues if name in self._new_teams})
+        
+        if missing:
+            committed = self._select_team_ids(missing)
+            self.team_index.add(committed)
+            team_ids.update(committed)
+            
+            missing = [name for name in missing if name not in committed]
+            if missing:
+                created = self._create_teams({name: leagues[name] for name in missing})
+                self._new_teams.update(created)
+                team_ids.update(created)
+        
+        return team_ids
+    
+    def _create_teams(self, leagues: Dict[str, str]) -> Dict[str, int]:
+        """
+        Insert new teams in batches and return their ids
+        
+        A team inserted concurrently by another session makes the insert a
+        no-op (ON CONFLICT DO NOTHING, or a caught IntegrityError inside a
+        savepoint); the id is read back either way.
+        """
+        insert = self._upsert_insert()
+        names = list(leagues)
+        
+        if insert is not None:
+            self.db.execute(
+                insert(Team.__table__).on_conflict_do_nothing(index_elements=['team_name']),
+                [{'team_name': name, 'league': leagues[name], 'tier': 'mid'} for name in names]
+            )
+        else:
+            for name in names:
+                try:
+                    with self.db.begin_nested():
+                        self.db.add(Team(team_name=name, league=leagues[name], tier='mid'))
+                except IntegrityError:
+                    pass
+        
+        return self._select_team_ids(names)
+    
+    def _select_team_ids(self, names: List[str]) -> Dict[str, int]:
+        """team_name -> team_id for existing teams"""
+        team_ids = {}
+        for chunk in _chunks(names):
+            rows = self.db.execute(
+                select(Team.team_name, Team.team_id).where(Team.team_name.in_(chunk))
+            )
+            team_ids.update({name: team_id for name, team_id in rows})
+        return team_ids
+    
+    def _write_chunk(self, chunk: List[MatchSchema], team_ids: Dict[str, int]) -> Tuple[int, Dict[str, int]]:
+        """
+        Upsert the changed matches, odds and results of a chunk
+        
+        Returns:
+            Tuple of (matches created, skipped sections by name)
+        """
+        insert = self._upsert_insert()
+        now = datetime.utcnow()
+        match_ids = [match_data.match_id for match_data in chunk]
+        hashes = {match_data.match_id: self._section_hashes(match_data) for match_data in chunk}
+        skipped = dict.fromkeys(HASHED_SECTIONS, 0)
+        
+        existing = dict(self.db.execute(
+            select(Match.match_id, Match.content_hash).where(Match.match_id.in_(match_ids))
+        ).all())
+        
+        # Matches
+        match_rows = []
+        for match_data in chunk:
+            stats_hash = hashes[match_data.match_id]['stats']
+            if match_data.match_id in existing and existing[match_data.match_id] == stats_hash:
+                skipped['stats'] += 1
+                continue
+            values = self._match_values(
+                match_data,
+                team_ids[match_data.home_team],
+                team_ids[match_data.away_team]
+            )
+            if match_data.result is not None:
+                values['status'] = 'completed'
+            values['content_hash'] = stats_hash
+            values['created_at'] = now
+            values['updated_at'] = now
+            match_rows.append(values)
+        
+        if match_rows:
+            statement = insert(Match.__table__)
+            self.db.execute(statement.on_conflict_do_update(
+                index_elements=['match_id'],
+                set_={column: statement.excluded[column] for column in MATCH_UPDATE_COLUMNS}
+            ), match_rows)
+        
+        # Odds: changed prices are appended to the movements, the latest row of each match is replaced
+        previous = {
+            row.match_id: row._mapping
+            for row in self.db.execute(select(LatestOdds.__table__).where(LatestOdds.match_id.in_(match_ids)))
+        }
+        odds_rows = []
+        for match_data in chunk:
+            odds_hash = hashes[match_data.match_id]['odds']
+            current = previous.get(match_data.match_id)
+            if current is not None and current['content_hash'] == odds_hash:
+                skipped['odds'] += 1
+                continue
+            odds_rows.append({
+                **self._odds_values(match_data.match_id, match_data.odds, now),
+                'content_hash': odds_hash
+            })
+        
+        movements = [
+            row
+            for values in odds_rows
+            for row in movement_rows(values, previous.get(values['match_id']), now)
+        ]
+        if movements:
+            statement = insert(OddsMovement.__table__)
+            self.db.execute(statement.on_conflict_do_update(
+                index_elements=['match_id', 'bookmaker', 'selection', 'recorded_at'],
+                set_={'delta_cents': OddsMovement.__table__.c.delta_cents + statement.excluded.delta_cents}
+            ), movements)
+        
+        if odds_rows:
+            statement = insert(LatestOdds.__table__)
+            self.db.execute(statement.on_conflict_do_update(
+                index_elements=['match_id'],
+                set_={column: statement.excluded[column] for column in LATEST_ODDS_COLUMNS}
+            ), [{**values, 'updated_at': now} for values in odds_rows])
+        
+        # Results
+        result_ids = [match_data.match_id for match_data in chunk if match_data.result is not None]
+        stored_results = dict(self.db.execute(
+            select(MatchResult.match_id, MatchResult.content_hash).where(MatchResult.match_id.in_(result_ids))
+        ).all()) if result_ids else {}
+        
+        result_rows = []
+        for match_data in chunk:
+            if match_data.result is None:
+                continue
+            result_hash = hashes[match_data.match_id]['results']
+            if match_data.match_id in stored_results and stored_results[match_data.match_id] == result_hash:
+                skipped['results'] += 1
+                continue
+            result_rows.append({
+                **self._result_values(match_data.match_id, match_data.result),
+                'content_hash': result_hash,
+                'created_at': now
+            })
+        
+        if result_rows:
+            statement = insert(MatchResult.__table__)
+            self.db.execute(statement.on_conflict_do_update(
+                index_elements=['match_id'],
+                set_={column: statement.excluded[column] for column in [*RESULT_COLUMNS, 'content_hash']}
+            ), result_rows)
+        
+        return len(set(match_ids) - set(existing)), skipped
+    
+    @staticmethod
+    def _section_hashes(match_data: MatchSchema) -> Dict[str, Optional[str]]:
+        """Content hashes of the stats (match row), odds and result sections"""
+        match_section = match_data.model_dump(mode='json', exclude={'odds', 'result'})
+        match_section['has_result'] = match_data.result is not None
+        return {
+            'stats': content_hash(match_section),
+            'odds': content_hash(match_data.odds.model_dump(mode='json')),
+            'results': content_hash(match_data.result.model_dump(mode='json')) if match_data.result is not None else None
+        }
+    
+    @staticmethod
+    def _match_values(match_data: MatchSchema, home_team_id: int, away_team_id: int) -> Dict:
+        """Column values of a new match row"""
+        stats = match_data.team_stats_at_match_time
+        return {
+            'match_id': match_data.match_id,
+            'home_team_id': home_team_id,
+            'away_team_id': away_team_id,
+            'match_datetime': match_data.match_datetime,
+            'league': match_data.league,
+            'season': match_data.season,
+            'status': match_data.status,
+            # Team stats snapshot
+            'home_goals_avg': stats.home_goals_avg,
+            'away_goals_avg': stats.away_goals_avg,
+            'home_goals_conceded_avg': stats.home_goals_conceded_avg,
+            'away_goals_conceded_avg': stats.away_goals_conceded_avg,
+            'home_corners_avg': stats.home_corners_avg,
+            'away_corners_avg': stats.away_corners_avg,
+            'home_cards_avg': stats.home_cards_avg,
+            'away_cards_avg': stats.away_cards_avg,
+            'home_btts_rate': stats.home_btts_rate,
+            'away_btts_rate': stats.away_btts_rate,
+            'home_form': stats.home_form,
+            'away_form': stats.away_form
+        }
+    
+    @staticmethod
+    def _odds_values(match_id: str, odds_data, odds_timestamp: datetime) -> Dict:
+        """Column values of an odds snapshot (latest row and movements)"""
+        return {
+            'match_id': match_id,
+            'odds_timestamp': odds_timestamp,
+            # Match Result
+            'home_win_odds': odds_data.home_win,
+            'draw_odds': odds_data.draw,
+            'away_win_odds': odds_data.away_win,
+            # Total Goals
+            'over_0_5_odds': odds_data.over_0_5,
+            'under_0_5_odds': odds_data.under_0_5,
+            'over_1_5_odds': odds_data.over_1_5,
+            'under_1_5_odds': odds_data.under_1_5,
+            'over_2_5_odds': odds_data.over_2_5,
+            'under_2_5_odds': odds_data.under_2_5,
+            'over_3_5_odds': odds_data.over_3_5,
+            'under_3_5_odds': odds_data.under_3_5,
+            'over_4_5_odds': odds_data.over_4_5,
+            'under_4_5_odds': odds_data.under_4_5,
+            # BTTS
+            'btts_yes_odds': odds_data.btts_yes,
+            'btts_no_odds': odds_data.btts_no,
+            # Double Chance
+            'home_or_draw_odds': odds_data.home_or_draw,
+            'away_or_draw_odds': odds_data.away_or_draw,
+            'home_or_away_odds': odds_data.home_or_away,
+            # Corners
+            'corners_over_8_5_odds': odds_data.corners_over_8_5,
+            'corners_under_8_5_odds': odds_data.corners_under_8_5,
+            'corners_over_9_5_odds': odds_data.corners_over_9_5,
+            'corners_under_9_5_odds': odds_data.corners_under_9_5,
+            'corners_over_10_5_odds': odds_data.corners_over_10_5,
+            'corners_under_10_5_odds': odds_data.corners_under_10_5,
+            # Cards
+            'cards_over_3_5_odds': odds_data.cards_over_3_5,
+            'cards_under_3_5_odds': odds_data.cards_under_3_5,
+            'cards_over_4_5_odds': odds_data.cards_over_4_5,
+            'cards_under_4_5_odds': odds_data.cards_under_4_5
+        }
+    
+    @staticmethod
+    def _result_values(match_id: str, result_data) -> Dict:
+        """Column values of a result row"""
+        values = {column: getattr(result_data, column) for column in RESULT_COLUMNS}
+        values['match_id'] = match_id
+        return values
+    
+    def _process_match(self, match_data: MatchSchema, skipped: Dict[str, int]) -> bool:
         """
         Process a single match
         
+        Args:
+            match_data: Validated match
+            skipped: Section counters, incremented for unchanged sections
+        
         Returns:
             True if created, False if updated
         """
-        # 1. Ensure teams exist
-        home_team = self._get_or_create_team(
-            match_data.home_team_id,
-            match_data.home_team,
-            match_data.league
-        )
-        away_team = self._get_or_create_team(
-            match_data.away_team_id,
-            match_data.away_team,
-            match_data.league
-        )
+        hashes = self._section_hashes(match_data)
+        
+        # 1. Ensure teams exist (index lookup, no query for known teams)
+        team_ids = self._team_ids({
+            match_data.home_team: match_data.league,
+            match_data.away_team: match_data.league
+        })
         
         # 2. Create or update match
         match = self.db.query(Match).filter(Match.match_id == match_data.match_id).first()
         
         if match is None:
             # Create new match
-            match = Match(
-                match_id=match_data.match_id,
-                home_team_id=home_team.team_id,
-                away_team_id=away_team.team_id,
-                match_datetime=match_data.match_datetime,
-                league=match_data.league,
-                season=match_data.season,
-                status=match_data.status,
-                # Team stats snapshot
-                home_goals_avg=match_data.team_stats_at_match_time.home_goals_avg,
-                away_goals_avg=match_data.team_stats_at_match_time.away_goals_avg,
-                home_goals_conceded_avg=match_data.team_stats_at_match_time.home_goals_conceded_avg,
-                away_goals_conceded_avg=match_data.team_stats_at_match_time.away_goals_conceded_avg,
-                home_corners_avg=match_data.team_stats_at_match_time.home_corners_avg,
-                away_corners_avg=match_data.team_stats_at_match_time.away_corners_avg,
-                home_cards_avg=match_data.team_stats_at_match_time.home_cards_avg,
-                away_cards_avg=match_data.team_stats_at_match_time.away_cards_avg,
-                home_btts_rate=match_data.team_stats_at_match_time.home_btts_rate,
-                away_btts_rate=match_data.team_stats_at_match_time.away_btts_rate,
-                home_form=match_data.team_stats_at_match_time.home_form,
-                away_form=match_data.team_stats_at_match_time.away_form
-            )
+            match = Match(**self._match_values(
+                match_data, team_ids[match_data.home_team], team_ids[match_data.away_team]
+            ), content_hash=hashes['stats'])
             self.db.add(match)
             self.db.flush()  # Get match_id
             created = True
+        elif match.content_hash == hashes['stats']:
+            # Unchanged match section: nothing to write
+            skipped['stats'] += 1
+            created = False
         else:
             # Update existing match
-            match.match_datetime = match_data.match_datetime
-            match.status = match_data.status
-            match.updated_at = datetime.utcnow()
+            values = self._match_values(
+                match_data, team_ids[match_data.home_team], team_ids[match_data.away_team]
+            )
+            if match_data.result is not None:
+                values['status'] = 'completed'
+            values['content_hash'] = hashes['stats']
+            values['updated_at'] = datetime.utcnow()
+            for column in MATCH_UPDATE_COLUMNS:
+                setattr(match, column, values[column])
             created = False
         
         # 3. Add/update odds
-        self._process_odds(match.match_id, match_data.odds)
+        if not self._process_odds(match.match_id, match_data.odds, hashes['odds']):
+            skipped['odds'] += 1
         
         # 4. Add result if match is completed
         if match_data.result is not None:
-            self._process_result(match.match_id, match_data.result)
+            if not self._process_result(match.match_id, match_data.result, hashes['results']):
+                skipped['results'] += 1
         
         return created
     
-    def _get_or_create_team(self, team_id: str, team_name: str, league: str) -> Team:
-        """Get existing team or create new one"""
-        # Try to find by team_name (unique constraint)
-        team = self.db.query(Team).filter(Team.team_name == team_name).first()
-        
-        if team is None:
-            team = Team(
-                team_name=team_name,
-                league=league,
-                tier='mid'  # Default tier
-            )
-            self.db.add(team)
-            self.db.flush()  # Get team_id
+    def _process_odds(self, match_id: str, odds_data, odds_hash: str) -> bool:
+        """
+        Process and store odds data
         
-        return team
-    
-    def _process_odds(self, match_id: str, odds_data):
-        """Process and store odds data"""
-        # Mark existing odds as not latest
-        self.db.query(MatchOdds).filter(
-            MatchOdds.match_id == match_id,
-            MatchOdds.is_latest == True
-        ).update({'is_latest': False})
-        
-        # Create new odds record
-        odds = MatchOdds(
-            match_id=match_id,
-            odds_timestamp=datetime.utcnow(),
-            # Match Result
-            home_win_odds=odds_data.home_win,
-            draw_odds=odds_data.draw,
-            away_win_odds=odds_data.away_win,
-            # Total Goals
-            over_0_5_odds=odds_data.over_0_5,
-            under_0_5_odds=odds_data.under_0_5,
-            over_1_5_odds=odds_data.over_1_5,
-            under_1_5_odds=odds_data.under_1_5,
-            over_2_5_odds=odds_data.over_2_5,
-            under_2_5_odds=odds_data.under_2_5,
-            over_3_5_odds=odds_data.over_3_5,
-            under_3_5_odds=odds_data.under_3_5,
-            over_4_5_odds=odds_data.over_4_5,
-            under_4_5_odds=odds_data.under_4_5,
-            # BTTS
-            btts_yes_odds=odds_data.btts_yes,
-            btts_no_odds=odds_data.btts_no,
-            # Double Chance
-            home_or_draw_odds=odds_data.home_or_draw,
-            away_or_draw_odds=odds_data.away_or_draw,
-            home_or_away_odds=odds_data.home_or_away,
-            # Corners
-            corners_over_8_5_odds=odds_data.corners_over_8_5,
-            corners_under_8_5_odds=odds_data.corners_under_8_5,
-            corners_over_9_5_odds=odds_data.corners_over_9_5,
-            corners_under_9_5_odds=odds_data.corners_under_9_5,
-            corners_over_10_5_odds=odds_data.corners_over_10_5,
-            corners_under_10_5_odds=odds_data.corners_under_10_5,
-            # Cards
-            cards_over_3_5_odds=odds_data.cards_over_3_5,
-            cards_under_3_5_odds=odds_data.cards_under_3_5,
-            cards_over_4_5_odds=odds_data.cards_over_4_5,
-            cards_under_4_5_odds=odds_data.cards_under_4_5,
-            is_latest=True
-        )
-        self.db.add(odds)
+        Returns:
+            False if the stored odds have the same content hash (nothing written)
+        """
+        # Current odds (primary-key lookup)
+        latest = self.db.get(LatestOdds, match_id)
+        if latest is not None and latest.content_hash == odds_hash:
+            return False
+        
+        now = datetime.utcnow()
+        values = self._odds_values(match_id, odds_data, now)
+        values['content_hash'] = odds_hash
+        
+        # Append the changed prices to the history
+        for row in movement_rows(values, latest_prices(latest), now):
+            self.db.add(OddsMovement(**row))
+        
+        # Replace the current odds
+        if latest is None:
+            self.db.add(LatestOdds(**values))
+        else:
+            for column, value in values.items():
+                setattr(latest, column, value)
+        return True
     
-    def _process_result(self, match_id: str, result_data):
-        """Process and store match result"""
+    def _process_result(self, match_id: str, result_data, result_hash: str) -> bool:
+        """
+        Process and store match result
+        
+        Returns:
+            False if the stored result has the same content hash (nothing written)
+        """
         # Check if result already exists
         existing = self.db.query(MatchResult).filter(
             MatchResult.match_id == match_id
         ).first()
+        if existing is not None and existing.content_hash == result_hash:
+            return False
         
+        values = self._result_values(match_id, result_data)
+        values['content_hash'] = result_hash
         if existing:
             # Update existing result
-            existing.home_goals = result_data.home_goals
-            existing.away_goals = result_data.away_goals
-            existing.result = result_data.result
-            existing.total_goals = result_data.total_goals
-            existing.home_corners = result_data.home_corners
-            existing.away_corners = result_data.away_corners
-            existing.total_corners = result_data.total_corners
-            existing.home_cards = result_data.home_cards
-            existing.away_cards = result_data.away_cards
-            existing.total_cards = result_data.total_cards
-            existing.btts = result_data.btts
-            existing.over_0_5 = result_data.over_0_5
-            existing.over_1_5 = result_data.over_1_5
-            existing.over_2_5 = result_data.over_2_5
-            existing.over_3_5 = result_data.over_3_5
-            existing.over_4_5 = result_data.over_4_5
-            existing.corners_over_8_5 = result_data.corners_over_8_5
-            existing.corners_over_9_5 = result_data.corners_over_9_5
-            existing.corners_over_10_5 = result_data.corners_over_10_5
-            existing.cards_over_3_5 = result_data.cards_over_3_5
-            existing.cards_over_4_5 = result_data.cards_over_4_5
+            for column in [*RESULT_COLUMNS, 'content_hash']:
+                setattr(existing, column, values[column])
         else:
             # Create new result
-            result = MatchResult(
-                match_id=match_id,
-                home_goals=result_data.home_goals,
-                away_goals=result_data.away_goals,
-                result=result_data.result,
-                total_goals=result_data.total_goals,
-                home_corners=result_data.home_corners,
-                away_corners=result_data.away_corners,
-                total_corners=result_data.total_corners,
-                home_cards=result_data.home_cards,
-                away_cards=result_data.away_cards,
-                total_cards=result_data.total_cards,
-                btts=result_data.btts,
-                over_0_5=result_data.over_0_5,
-                over_1_5=result_data.over_1_5,
-                over_2_5=result_data.over_2_5,
-                over_3_5=result_data.over_3_5,
-                over_4_5=result_data.over_4_5,
-                corners_over_8_5=result_data.corners_over_8_5,
-                corners_over_9_5=result_data.corners_over_9_5,
-                corners_over_10_5=result_data.corners_over_10_5,
-                cards_over_3_5=result_data.cards_over_3_5,
-                cards_over_4_5=result_data.cards_over_4_5
-            )
-            self.db.add(result)
+            self.db.add(MatchResult(**values))
         
         # Update match status
         match = self.db.query(Match).filter(Match.match_id == match_id).first()
         if match:
             match.status = 'completed'
+        return True
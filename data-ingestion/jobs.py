@@ -0,0 +1,227 @@
+"""
+Background ingestion jobs
+Runs large batches outside the request in committed chunks and tracks progress
+"""
+
+import os
+import time
+import uuid
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import List, Optional
+
+from .database import SessionLocal
+from .schemas import MatchSchema, BatchIngestRequest, IngestJobStatus
+from .ingestion import DataIngestionService
+
+
+# Jobs ingesting at the same time (each holds one DB connection while running)
+INGEST_JOB_WORKERS = int(os.getenv('INGEST_JOB_WORKERS', 2))
+
+# Jobs accepted but not finished; further submissions are rejected
+INGEST_JOB_MAX_PENDING = int(os.getenv('INGEST_JOB_MAX_PENDING', 20))
+
+# Matches per committed chunk
+INGEST_JOB_CHUNK_SIZE = int(os.getenv('INGEST_JOB_CHUNK_SIZE', 1000))
+
+# Finished jobs kept for status queries
+INGEST_JOB_HISTORY = 200
+
+# Errors kept per job (the error count is always exact)
+INGEST_JOB_MAX_ERRORS = 100
+
+
+class JobQueueFullError(Exception):
+    """Raised when too many ingestion jobs are pending"""
+    pass
+
+
+class IngestionJob:
+    """Progress of one background ingestion"""
+    
+    def __init__(self, matches: List[MatchSchema], chunk_size: int):
+        self.job_id = uuid.uuid4().hex
+        self.matches = matches
+        self.chunk_size = chunk_size
+        self.status = 'queued'
+        self.total_matches = len(matches)
+        self.chunks_total = -(-len(matches) // chunk_size)
+        self.chunks_completed = 0
+        self.matches_processed = 0
+        self.matches_created = 0
+        self.matches_updated = 0
+        self.skipped = {'stats': 0, 'odds': 0, 'results': 0}
+        self.error_count = 0
+        self.errors: List[str] = []
+        self.submitted_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self._started = None
+        self._elapsed = 0.0
+        self._future: Optional[Future] = None
+    
+    @property
+    def finished(self) -> bool:
+        return self.status in ('completed', 'completed_with_errors', 'failed', 'cancelled')
+    
+    def add_errors(self, errors: List[str]):
+        """Count errors, keeping the first INGEST_JOB_MAX_ERRORS messages"""
+        self.error_count += len(errors)
+        room = INGEST_JOB_MAX_ERRORS - len(self.errors)
+        if room > 0:
+            self.errors.extend(errors[:room])
+    
+    def to_status(self) -> IngestJobStatus:
+        """Snapshot for the status endpoint"""
+        elapsed = self._elapsed
+        if self._started is not None and not self.finished:
+            elapsed = time.perf_counter() - self._started
+        
+        return IngestJobStatus(
+            job_id=self.job_id,
+            status=self.status,
+            total_matches=self.total_matches,
+            chunks_total=self.chunks_total,
+            chunks_completed=self.chunks_completed,
+            matches_processed=self.matches_processed,
+            matches_created=self.matches_created,
+            matches_updated=self.matches_updated,
+            stats_skipped=self.skipped['stats'],
+            odds_skipped=self.skipped['odds'],
+            results_skipped=self.skipped['results'],
+            error_count=self.error_count,
+            errors=list(self.errors),
+            progress=self.chunks_completed / self.chunks_total if self.chunks_total else 1.0,
+            matches_per_second=self.matches_processed / elapsed if elapsed > 0 else 0.0,
+            elapsed_seconds=elapsed,
+            submitted_at=self.submitted_at,
+            started_at=self.started_at,
+            finished_at=self.finished_at
+        )
+
+
+class IngestionJobManager:
+    """
+    Bounded pool of background ingestion jobs
+    
+    Jobs run on a thread pool of INGEST_JOB_WORKERS; the rest wait in
+    'queued'. Each chunk is ingested and committed in its own session, so a
+    failure only loses the chunk in progress and the status endpoint sees
+    committed progress (matches_processed counts committed chunks only).
+    Job state lives in this process.
+    """
+    
+    def __init__(
+        self,
+        max_workers: int = INGEST_JOB_WORKERS,
+        max_pending: int = INGEST_JOB_MAX_PENDING,
+        chunk_size: int = INGEST_JOB_CHUNK_SIZE,
+        session_factory=SessionLocal
+    ):
+        self.max_pending = max_pending
+        self.chunk_size = chunk_size
+        self.session_factory = session_factory
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='ingest-job')
+        self._jobs: 'OrderedDict[str, IngestionJob]' = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def submit(self, request: BatchIngestRequest) -> IngestionJob:
+        """
+        Accept a batch for background ingestion
+        
+        Args:
+            request: Validated BatchIngestRequest
+        
+        Returns:
+            The queued IngestionJob
+        
+        Raises:
+            JobQueueFullError: If max_pending jobs are already waiting or running
+        """
+        job = IngestionJob(request.matches, self.chunk_size)
+        
+        with self._lock:
+            if self.pending() >= self.max_pending:
+                raise JobQueueFullError(
+                    f"{self.max_pending} ingestion jobs already pending, retry later"
+                )
+            self._jobs[job.job_id] = job
+            self._prune()
+        
+        job._future = self._executor.submit(self._run, job)
+        return job
+    
+    def get(self, job_id: str) -> Optional[IngestionJob]:
+        """Job by id (None if unknown or pruned)"""
+        with self._lock:
+            return self._jobs.get(job_id)
+    
+    def list(self) -> List[IngestionJob]:
+        """Known jobs, newest first"""
+        with self._lock:
+            return list(reversed(self._jobs.values()))
+    
+    def pending(self) -> int:
+        """Jobs queued or running"""
+        return sum(1 for job in self._jobs.values() if not job.finished)
+    
+    def shutdown(self, wait: bool = True):
+        """
+        Stop accepting jobs and wait for running ones
+        
+        Jobs that have not started are cancelled and reported as 'cancelled',
+        so status polling ends for them as well.
+        """
+        with self._lock:
+            for job in self._jobs.values():
+                if job.status == 'queued' and job._future is not None and job._future.cancel():
+                    job.status = 'cancelled'
+                    job.finished_at = datetime.utcnow()
+                    job.matches = []
+        
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+    
+    def _prune(self):
+        """Forget the oldest finished jobs beyond INGEST_JOB_HISTORY"""
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - INGEST_JOB_HISTORY)]:
+            del self._jobs[job_id]
+    
+    def _run(self, job: IngestionJob):
+        """Ingest a job chunk by chunk (worker thread)"""
+        job.status = 'running'
+        job.started_at = datetime.utcnow()
+        job._started = time.perf_counter()
+        
+        try:
+            for start in range(0, job.total_matches, job.chunk_size):
+                chunk = job.matches[start:start + job.chunk_size]
+                db = self.session_factory()
+                try:
+                    response = DataIngestionService(db).ingest_batch(BatchIngestRequest(matches=chunk))
+                finally:
+                    db.close()
+                
+                if response.matches_processed == 0:
+                    # Commit failed, nothing of this chunk was stored
+                    job.add_errors([f"Chunk at match {start}: {response.message}"] + response.errors)
+                else:
+                    job.add_errors(response.errors)
+                job.matches_processed += response.matches_processed
+                job.matches_created += response.matches_created
+                job.matches_updated += response.matches_updated
+                for section in job.skipped:
+                    job.skipped[section] += getattr(response, f'{section}_skipped')
+                job.chunks_completed += 1
+            
+            job.status = 'completed' if job.error_count == 0 else 'completed_with_errors'
+        except Exception as e:
+            job.add_errors([f"Job failed after {job.matches_processed} matches: {str(e)}"])
+            job.status = 'failed'
+        finally:
+            job._elapsed = time.perf_counter() - job._started
+            job.finished_at = datetime.utcnow()
+            # The payload is no longer needed once the job is done
+            job.matches = []
@@ -0,0 +1,115 @@
+"""
+Streaming JSON array reader
+Decodes the items of a large JSON array one at a time, for match files too big
+to load whole
+
+Dependency-free: the Smart Bets trainer loads this file directly, without
+importing the data_ingestion package (and its database engine).
+"""
+
+import json
+from typing import Any, Iterator, Optional, Sequence
+
+
+# Characters read per block
+READ_BLOCK_CHARS = 1024 * 1024
+
+
+def iter_json_array(
+    path: str,
+    keys: Sequence[str] = ('matches',),
+    block_size: Optional[int] = None
+) -> Iterator[Any]:
+    """
+    Incrementally decode the items of a JSON array without loading the whole file
+    
+    The file holds either a top-level array or an object with the array under
+    one of `keys`. The object is walked member by member: other members are
+    decoded and skipped, so a key inside a string or a nested object (e.g.
+    "metadata") is never mistaken for the array.
+    
+    Args:
+        path: Path to the JSON file
+        keys: Top-level object keys that may hold the array (first one found is read)
+        block_size: Characters read per block (defaults to READ_BLOCK_CHARS)
+    
+    Yields:
+        Array items one at a time
+    
+    Raises:
+        ValueError: If the document is malformed or has no array under `keys`
+    """
+    decoder = json.JSONDecoder()
+    block_size = block_size or READ_BLOCK_CHARS
+    
+    with open(path, 'r') as f:
+        buf, pos, eof = '', 0, False
+        
+        def refill():
+            nonlocal buf, pos, eof
+            more = f.read(block_size)
+            if not more:
+                eof = True
+            buf, pos = buf[pos:] + more, 0
+        
+        def peek() -> str:
+            nonlocal pos
+            while True:
+                while pos < len(buf) and buf[pos] in ' \t\r\n':
+                    pos += 1
+                if pos < len(buf):
+                    return buf[pos]
+                if eof:
+                    raise ValueError(f"Unexpected end of JSON in {path}")
+                refill()
+        
+        def decode():
+            nonlocal pos
+            while True:
+                peek()
+                try:
+                    value, end = decoder.raw_decode(buf, pos)
+                    # A value touching the end of the buffer may be truncated
+                    if end < len(buf) or eof:
+                        pos = end
+                        return value
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                refill()
+        
+        def expect(char: str):
+            nonlocal pos
+            if peek() != char:
+                raise ValueError(f"Expected '{char}' in {path}, found '{buf[pos]}'")
+            pos += 1
+        
+        def iter_array():
+            nonlocal pos
+            expect('[')
+            if peek() == ']':
+                return
+            while True:
+                yield decode()
+                if peek() == ',':
+                    pos += 1
+                    continue
+                expect(']')
+                return
+        
+        if peek() == '[':
+            yield from iter_array()
+            return
+        
+        expect('{')
+        while peek() != '}':
+            name = decode()
+            expect(':')
+            if name in keys:
+                yield from iter_array()
+                return
+            decode()
+            if peek() == ',':
+                pos += 1
+        
+        raise ValueError(f"{path} has no {' or '.join(repr(key) for key in keys)} array")
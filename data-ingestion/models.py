@@ -5,7 +5,7 @@ SQLAlchemy ORM models matching the PostgreSQL schema
 
 from datetime import datetime
 from sqlalchemy import (
-    Column, Integer, String, DateTime, Decimal, Boolean, 
+    Column, Integer, SmallInteger, String, DateTime, Decimal, Boolean, 
     ForeignKey, Text, Index
 )
 from sqlalchemy.dialects.postgresql import JSONB
@@ -29,6 +29,11 @@ class Team(Base):
     statistics = relationship("TeamStatistic", back_populates="team", cascade="all, delete-orphan")
     home_matches = relationship("Match", foreign_keys="Match.home_team_id", back_populates="home_team")
     away_matches = relationship("Match", foreign_keys="Match.away_team_id", back_populates="away_team")
+    
+    __table_args__ = (
+        # Keyset pagination by league
+        Index('idx_teams_league', 'league', 'team_id'),
+    )
 
 
 class TeamStatistic(Base):
@@ -112,6 +117,9 @@ class Match(Base):
     home_form = Column(String(5))
     away_form = Column(String(5))
     
+    # Hash of the ingested match section (unchanged resends are skipped)
+    content_hash = Column(String(32))
+    
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -120,11 +128,15 @@ class Match(Base):
     away_team = relationship("Team", foreign_keys=[away_team_id], back_populates="away_matches")
     result = relationship("MatchResult", back_populates="match", uselist=False, cascade="all, delete-orphan")
     odds = relationship("MatchOdds", back_populates="match", cascade="all, delete-orphan")
+    latest_odds = relationship("LatestOdds", back_populates="match", uselist=False, cascade="all, delete-orphan")
     predictions = relationship("Prediction", back_populates="match", cascade="all, delete-orphan")
     
     __table_args__ = (
-        Index('idx_matches_datetime', 'match_datetime'),
-        Index('idx_matches_status', 'status'),
+        # Keyset pagination on (match_datetime, match_id), optionally filtered
+        Index('idx_matches_datetime_id', 'match_datetime', 'match_id'),
+        Index('idx_matches_status_datetime', 'status', 'match_datetime', 'match_id'),
+        Index('idx_matches_league_datetime', 'league', 'match_datetime', 'match_id'),
+        Index('idx_matches_league_status_datetime', 'league', 'status', 'match_datetime', 'match_id'),
         Index('idx_matches_home_team', 'home_team_id'),
         Index('idx_matches_away_team', 'away_team_id'),
     )
@@ -163,22 +175,22 @@ class MatchResult(Base):
     cards_over_3_5 = Column(Boolean)
     cards_over_4_5 = Column(Boolean)
     
+    # Hash of the ingested result section (unchanged resends are skipped)
+    content_hash = Column(String(32))
+    
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
     match = relationship("Match", back_populates="result")
     
     __table_args__ = (
-        Index('idx_match_results_match_id', 'match_id'),
+        # One result per match (conflict target of the bulk ingestion upsert)
+        Index('idx_match_results_match_id', 'match_id', unique=True),
     )
 
 
-class MatchOdds(Base):
-    __tablename__ = 'match_odds'
-    
-    odds_id = Column(Integer, primary_key=True, autoincrement=True)
-    match_id = Column(String(50), ForeignKey('matches.match_id', ondelete='CASCADE'))
-    odds_timestamp = Column(DateTime, default=datetime.utcnow)
+class OddsPrices:
+    """Odds columns shared by the history and latest-odds tables"""
     
     # Match Result (1X2)
     home_win_odds = Column(Decimal(5, 2))
@@ -222,7 +234,15 @@ class MatchOdds(Base):
     
     # Metadata
     bookmaker = Column(String(50), default='test_bookmaker')
-    is_latest = Column(Boolean, default=True)
+
+
+class MatchOdds(OddsPrices, Base):
+    """Full odds snapshots (legacy history; new history goes to OddsMovement)"""
+    __tablename__ = 'match_odds'
+    
+    odds_id = Column(Integer, primary_key=True, autoincrement=True)
+    match_id = Column(String(50), ForeignKey('matches.match_id', ondelete='CASCADE'))
+    odds_timestamp = Column(DateTime, default=datetime.utcnow)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
@@ -230,7 +250,44 @@ class MatchOdds(Base):
     
     __table_args__ = (
         Index('idx_match_odds_match_id', 'match_id'),
-        Index('idx_match_odds_latest', 'match_id', 'is_latest'),
+    )
+
+
+class LatestOdds(OddsPrices, Base):
+    """Current odds of each match, upserted on every ingest (primary-key reads)"""
+    __tablename__ = 'match_odds_latest'
+    
+    match_id = Column(String(50), ForeignKey('matches.match_id', ondelete='CASCADE'), primary_key=True)
+    odds_timestamp = Column(DateTime, default=datetime.utcnow)
+    # Hash of the ingested odds section (unchanged resends are skipped)
+    content_hash = Column(String(32))
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Relationships
+    match = relationship("Match", back_populates="latest_odds")
+
+
+class OddsMovement(Base):
+    """
+    Compact odds history: one row per price change of one selection
+    
+    Prices are integer hundredths stored as the change since the previous
+    row of the same (match, bookmaker, selection) series (the first row
+    holds the full price), so the price at time t is the sum of deltas up
+    to t. Selections are codes into odds.ODDS_SELECTIONS. Two changes
+    recorded at the same instant are merged by adding their deltas.
+    """
+    __tablename__ = 'odds_movements'
+    
+    # The series key is the primary key (range scans and replays use it)
+    match_id = Column(String(50), ForeignKey('matches.match_id', ondelete='CASCADE'), primary_key=True)
+    bookmaker = Column(String(50), primary_key=True, default='test_bookmaker')
+    selection = Column(SmallInteger, primary_key=True)
+    recorded_at = Column(DateTime, primary_key=True)
+    delta_cents = Column(Integer, nullable=False)
+    
+    __table_args__ = (
+        {'sqlite_with_rowid': False},
     )
 
 
@@ -0,0 +1,306 @@
+"""
+Odds storage helpers
+Current-price lookups on match_odds_latest, the delta-encoded odds_movements
+history (replay and line movement) and rebuilds of both
+"""
+
+from datetime import datetime
+from typing import Dict, Iterable, List, Mapping, Optional
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from .models import MatchOdds, LatestOdds, OddsMovement
+
+
+# Odds columns (without ids, timestamps and bookmaker)
+ODDS_COLUMNS = [column.name for column in LatestOdds.__table__.columns if column.name.endswith('_odds')]
+
+# Selection codes of odds_movements (position in this tuple): append only,
+# never reorder or remove entries
+ODDS_SELECTIONS = (
+    'home_win_odds', 'draw_odds', 'away_win_odds',
+    'over_0_5_odds', 'under_0_5_odds', 'over_1_5_odds', 'under_1_5_odds',
+    'over_2_5_odds', 'under_2_5_odds', 'over_3_5_odds', 'under_3_5_odds',
+    'over_4_5_odds', 'under_4_5_odds',
+    'btts_yes_odds', 'btts_no_odds',
+    'home_or_draw_odds', 'away_or_draw_odds', 'home_or_away_odds',
+    'corners_over_8_5_odds', 'corners_under_8_5_odds', 'corners_over_9_5_odds',
+    'corners_under_9_5_odds', 'corners_over_10_5_odds', 'corners_under_10_5_odds',
+    'cards_over_3_5_odds', 'cards_under_3_5_odds', 'cards_over_4_5_odds', 'cards_under_4_5_odds'
+)
+SELECTION_CODES = {name: code for code, name in enumerate(ODDS_SELECTIONS)}
+
+# Legacy snapshots converted per backfill batch
+BACKFILL_BATCH_SIZE = 5000
+
+
+def get_latest_odds(db: Session, match_ids: Iterable[str]) -> Dict[str, LatestOdds]:
+    """
+    Current odds of the given matches (primary-key lookups)
+    
+    Args:
+        db: Database session
+        match_ids: Match ids
+    
+    Returns:
+        Dictionary of match_id to LatestOdds (matches without odds are absent)
+    """
+    match_ids = list(dict.fromkeys(match_ids))
+    if not match_ids:
+        return {}
+    
+    rows = db.execute(select(LatestOdds).where(LatestOdds.match_id.in_(match_ids))).scalars()
+    return {row.match_id: row for row in rows}
+
+
+def odds_to_dict(latest: LatestOdds) -> Dict[str, float]:
+    """Odds columns of a LatestOdds row as floats"""
+    return {
+        column: float(getattr(latest, column))
+        for column in ODDS_COLUMNS
+        if getattr(latest, column) is not None
+    }
+
+
+def to_cents(price) -> int:
+    """Price as integer hundredths (0 when there is no price)"""
+    return 0 if price is None else int(round(float(price) * 100))
+
+
+def movement_rows(values: Mapping, previous: Optional[Mapping], recorded_at: datetime) -> List[Dict]:
+    """
+    odds_movements rows of a new snapshot
+    
+    Only selections whose price changed get a row. A withdrawn price is
+    recorded as the delta back to 0.
+    
+    Args:
+        values: Snapshot columns (match_id, bookmaker and the odds columns)
+        previous: Current odds of the match (latest row or mapping), or None
+        recorded_at: Snapshot time
+    
+    Returns:
+        List of row dictionaries
+    """
+    bookmaker = values.get('bookmaker') or 'test_bookmaker'
+    if previous is not None and (previous.get('bookmaker') or 'test_bookmaker') != bookmaker:
+        # Another bookmaker's series
+        previous = None
+    
+    rows = []
+    for code, column in enumerate(ODDS_SELECTIONS):
+        delta = to_cents(values.get(column)) - (to_cents(previous.get(column)) if previous is not None else 0)
+        if delta:
+            rows.append({
+                'match_id': values['match_id'],
+                'bookmaker': bookmaker,
+                'selection': code,
+                'recorded_at': recorded_at,
+                'delta_cents': delta
+            })
+    return rows
+
+
+def latest_prices(latest: Optional[LatestOdds]) -> Optional[Dict]:
+    """Bookmaker and odds columns of a LatestOdds row (for movement_rows)"""
+    if latest is None:
+        return None
+    return {column: getattr(latest, column) for column in ('bookmaker', *ODDS_SELECTIONS)}
+
+
+def replay_odds(db: Session, match_id: str, at: datetime, bookmaker: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+    """
+    Reconstruct the odds of a match as they were at time t
+    
+    Args:
+        db: Database session
+        match_id: Match id
+        at: Snapshot time (movements recorded up to and including it)
+        bookmaker: Only this bookmaker (default: all)
+    
+    Returns:
+        Dictionary of bookmaker to {odds column: price}
+    """
+    query = (
+        select(OddsMovement.bookmaker, OddsMovement.selection, func.sum(OddsMovement.delta_cents))
+        .where(OddsMovement.match_id == match_id, OddsMovement.recorded_at <= at)
+        .group_by(OddsMovement.bookmaker, OddsMovement.selection)
+    )
+    if bookmaker is not None:
+        query = query.where(OddsMovement.bookmaker == bookmaker)
+    
+    snapshot: Dict[str, Dict[str, float]] = {}
+    for row_bookmaker, code, cents in db.execute(query):
+        if cents:
+            snapshot.setdefault(row_bookmaker, {})[ODDS_SELECTIONS[code]] = cents / 100
+    return snapshot
+
+
+def line_movement(db: Session, match_id: str, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                  selections: Optional[Iterable[str]] = None, bookmaker: Optional[str] = None) -> List[Dict]:
+    """
+    Price series of a match over a time range
+    
+    The opening price of each series is the sum of its deltas before start;
+    the range itself is one index scan per series.
+    
+    Args:
+        db: Database session
+        match_id: Match id
+        start: Range start (default: first movement)
+        end: Range end, inclusive (default: last movement)
+        selections: Odds columns to include (default: all)
+        bookmaker: Only this bookmaker (default: all)
+    
+    Returns:
+        One dictionary per (bookmaker, selection) series with its opening
+        price and movements (recorded_at, price, change), oldest first
+    """
+    filters = [OddsMovement.match_id == match_id]
+    if selections is not None:
+        filters.append(OddsMovement.selection.in_([SELECTION_CODES[name] for name in selections]))
+    if bookmaker is not None:
+        filters.append(OddsMovement.bookmaker == bookmaker)
+    
+    series: Dict[tuple, Dict] = {}
+    
+    def get_series(row_bookmaker: str, code: int) -> Dict:
+        key = (row_bookmaker, code)
+        if key not in series:
+            series[key] = {
+                'bookmaker': row_bookmaker,
+                'selection': ODDS_SELECTIONS[code],
+                'opening_price': None,
+                'movements': [],
+                '_cents': 0
+            }
+        return series[key]
+    
+    if start is not None:
+        opening = db.execute(
+            select(OddsMovement.bookmaker, OddsMovement.selection, func.sum(OddsMovement.delta_cents))
+            .where(*filters, OddsMovement.recorded_at < start)
+            .group_by(OddsMovement.bookmaker, OddsMovement.selection)
+        )
+        for row_bookmaker, code, cents in opening:
+            entry = get_series(row_bookmaker, code)
+            entry['_cents'] = cents
+            entry['opening_price'] = cents / 100 if cents else None
+    
+    query = select(
+        OddsMovement.bookmaker, OddsMovement.selection, OddsMovement.recorded_at, OddsMovement.delta_cents
+    ).where(*filters)
+    if start is not None:
+        query = query.where(OddsMovement.recorded_at >= start)
+    if end is not None:
+        query = query.where(OddsMovement.recorded_at <= end)
+    query = query.order_by(OddsMovement.bookmaker, OddsMovement.selection, OddsMovement.recorded_at)
+    
+    for row_bookmaker, code, recorded_at, delta in db.execute(query):
+        entry = get_series(row_bookmaker, code)
+        entry['_cents'] += delta
+        entry['movements'].append({
+            'recorded_at': recorded_at,
+            'price': entry['_cents'] / 100 if entry['_cents'] else None,
+            'change': delta / 100
+        })
+    
+    return [
+        {key: value for key, value in entry.items() if key != '_cents'}
+        for _, entry in sorted(series.items())
+    ]
+
+
+def backfill_odds_movements(db: Session, batch_size: int = BACKFILL_BATCH_SIZE) -> int:
+    """
+    Convert the full match_odds snapshots into odds_movements
+    
+    Used once when upgrading a database whose history is in match_odds
+    (run rebuild_latest_odds as well); the caller commits.
+    
+    Args:
+        db: Database session
+        batch_size: Movement rows per insert (approximate, whole matches)
+    
+    Returns:
+        Number of movement rows written
+    
+    Raises:
+        ValueError: If odds_movements already has rows
+    """
+    if db.execute(select(OddsMovement.match_id).limit(1)).first() is not None:
+        raise ValueError("odds_movements is not empty")
+    
+    snapshots = db.execute(
+        select(MatchOdds.match_id, MatchOdds.bookmaker, MatchOdds.odds_timestamp,
+               *[getattr(MatchOdds, column) for column in ODDS_SELECTIONS])
+        .order_by(MatchOdds.match_id, MatchOdds.odds_timestamp, MatchOdds.odds_id)
+        .execution_options(yield_per=batch_size)
+    )
+    
+    previous: Dict[str, Mapping] = {}
+    rows: Dict[tuple, Dict] = {}
+    current_match = None
+    written = 0
+    for snapshot in snapshots:
+        values = snapshot._mapping
+        if values['match_id'] != current_match:
+            # Snapshots are ordered by match: only the current match's series are kept
+            current_match = values['match_id']
+            previous.clear()
+            if len(rows) >= batch_size:
+                written += _insert_backfill(db, rows)
+                rows = {}
+        
+        for row in movement_rows(values, previous.get(values['bookmaker']), values['odds_timestamp']):
+            # Snapshots sharing a timestamp merge into one movement per selection
+            key = (row['match_id'], row['bookmaker'], row['selection'], row['recorded_at'])
+            if key in rows:
+                rows[key]['delta_cents'] += row['delta_cents']
+            else:
+                rows[key] = row
+        previous[values['bookmaker']] = values
+    
+    if rows:
+        written += _insert_backfill(db, rows)
+    return written
+
+
+def _insert_backfill(db: Session, rows: Dict[tuple, Dict]) -> int:
+    """Insert buffered backfill rows (merged rows that cancel out are dropped)"""
+    rows = [row for row in rows.values() if row['delta_cents']]
+    if rows:
+        db.execute(insert(OddsMovement.__table__), rows)
+    return len(rows)
+
+
+def rebuild_latest_odds(db: Session) -> int:
+    """
+    Repopulate match_odds_latest from the newest history row of each match
+    
+    Used once when upgrading a database that only has match_odds; the
+    caller commits.
+    
+    Args:
+        db: Database session
+    
+    Returns:
+        Number of matches with latest odds
+    """
+    columns = ['match_id', 'odds_timestamp', *ODDS_COLUMNS, 'bookmaker']
+    ranked = select(
+        *[getattr(MatchOdds, column) for column in columns],
+        func.row_number().over(
+            partition_by=MatchOdds.match_id,
+            order_by=(MatchOdds.odds_timestamp.desc(), MatchOdds.odds_id.desc())
+        ).label('rn')
+    ).subquery()
+    
+    db.execute(delete(LatestOdds))
+    return db.execute(
+        insert(LatestOdds).from_select(
+            columns,
+            select(*[ranked.c[column] for column in columns]).where(ranked.c.rn == 1)
+        )
+    ).rowcount
@@ -178,4 +178,48 @@ class IngestResponse(BaseModel):
     matches_processed: int
     matches_created: int
     matches_updated: int
+    # Sections left untouched because their content hash was unchanged
+    stats_skipped: int = 0
+    odds_skipped: int = 0
+    results_skipped: int = 0
     errors: list[str] = []
+
+
+class IngestJobAccepted(BaseModel):
+    """Response when a batch is queued for background ingestion"""
+    job_id: str
+    status: str
+    total_matches: int
+    status_url: str
+
+
+class IngestJobStatus(BaseModel):
+    """Progress of a background ingestion job"""
+    job_id: str
+    status: str
+    total_matches: int
+    chunks_total: int
+    chunks_completed: int
+    matches_processed: int
+    matches_created: int
+    matches_updated: int
+    stats_skipped: int
+    odds_skipped: int
+    results_skipped: int
+    error_count: int
+    errors: list[str] = []
+    progress: float
+    matches_per_second: float
+    elapsed_seconds: float
+    submitted_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+class StreamIngestResponse(IngestResponse):
+    """Response from streaming (NDJSON) ingestion"""
+    complete: bool
+    cursor: int
+    lines_read: int
+    invalid_lines: int
+    error_count: int
@@ -0,0 +1,211 @@
+"""
+Streaming NDJSON ingestion
+Validates newline-delimited match records one at a time and commits every N
+"""
+
+import asyncio
+import os
+from typing import AsyncIterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from .database import SessionLocal
+from .schemas import MatchSchema, BatchIngestRequest, StreamIngestResponse
+from .ingestion import DataIngestionService
+
+
+# Valid records per committed chunk
+STREAM_COMMIT_EVERY = int(os.getenv('STREAM_COMMIT_EVERY', 500))
+
+# Longest accepted line; longer lines are rejected without being buffered
+STREAM_MAX_LINE_BYTES = 1024 * 1024
+
+# Errors kept in the response (the error count is always exact)
+STREAM_MAX_ERRORS = 100
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_line_bytes: int = STREAM_MAX_LINE_BYTES) -> AsyncIterator[Tuple[int, Optional[bytes]]]:
+    """
+    Split a byte stream into numbered lines
+    
+    Only the current line is buffered. A line longer than max_line_bytes is
+    skipped up to its newline and yielded as None.
+    
+    Args:
+        chunks: Async iterator of raw body chunks
+        max_line_bytes: Longest accepted line
+    
+    Yields:
+        Tuple of (1-based line number, line bytes or None if too long)
+    """
+    buffer = bytearray()
+    too_long = False
+    line_no = 0
+    
+    async for chunk in chunks:
+        start = 0
+        while True:
+            end = chunk.find(b'\n', start)
+            if end == -1:
+                if not too_long:
+                    buffer += chunk[start:]
+                    if len(buffer) > max_line_bytes:
+                        buffer.clear()
+                        too_long = True
+                break
+            
+            line_no += 1
+            if too_long or len(buffer) + end - start > max_line_bytes:
+                yield line_no, None
+            else:
+                buffer += chunk[start:end]
+                yield line_no, bytes(buffer)
+            buffer.clear()
+            too_long = False
+            start = end + 1
+    
+    if buffer or too_long:
+        line_no += 1
+        yield line_no, None if too_long else bytes(buffer)
+
+
+class StreamIngestor:
+    """
+    Ingest an NDJSON stream of MatchSchema records in constant memory
+    
+    Records are validated as they arrive and written every commit_every
+    valid records through DataIngestionService, one session and commit per
+    chunk. The cursor is the number of lines whose records are committed
+    (or were rejected); resending the same stream with that cursor skips
+    them, so an interrupted backfill resumes where it stopped.
+    """
+    
+    def __init__(self, commit_every: int = STREAM_COMMIT_EVERY, session_factory=SessionLocal):
+        self.commit_every = commit_every
+        self.session_factory = session_factory
+    
+    async def ingest(self, chunks: AsyncIterator[bytes], cursor: int = 0) -> StreamIngestResponse:
+        """
+        Consume the stream
+        
+        Args:
+            chunks: Async iterator of raw body chunks
+            cursor: Lines to skip (cursor of a previous, interrupted call)
+        
+        Returns:
+            StreamIngestResponse with counts and the resume cursor
+        """
+        self.errors: List[str] = []
+        self.error_count = 0
+        stats = {
+            'lines_read': 0,
+            'invalid_lines': 0,
+            'matches_processed': 0,
+            'matches_created': 0,
+            'matches_updated': 0,
+            'stats_skipped': 0,
+            'odds_skipped': 0,
+            'results_skipped': 0,
+            'cursor': cursor
+        }
+        pending: List[MatchSchema] = []
+        last_line = cursor
+        
+        try:
+            async for line_no, line in iter_lines(chunks):
+                if line_no <= cursor:
+                    continue
+                stats['lines_read'] += 1
+                last_line = line_no
+                
+                if line is not None and not line.strip():
+                    record = None
+                else:
+                    record = self._parse(line_no, line)
+                    if record is None:
+                        stats['invalid_lines'] += 1
+                
+                if record is None:
+                    # Nothing to commit before this line: the cursor can move past it
+                    if not pending:
+                        stats['cursor'] = line_no
+                    continue
+                
+                pending.append(record)
+                if len(pending) >= self.commit_every:
+                    if not await self._flush(pending, line_no, stats):
+                        return self._response(stats, complete=False)
+                    pending = []
+            
+            if pending and not await self._flush(pending, last_line, stats):
+                return self._response(stats, complete=False)
+            stats['cursor'] = last_line
+        except Exception as e:
+            # Client disconnected, the body could not be read or the database is unreachable
+            self._error(f"Stream ingestion interrupted after line {stats['cursor']}: {str(e)}")
+            return self._response(stats, complete=False)
+        
+        return self._response(stats, complete=True)
+    
+    def _parse(self, line_no: int, line: Optional[bytes]) -> Optional[MatchSchema]:
+        """Validate one line, recording why it was rejected"""
+        if line is None:
+            self._error(f"Line {line_no}: longer than {STREAM_MAX_LINE_BYTES} bytes")
+            return None
+        
+        try:
+            return MatchSchema.model_validate_json(line)
+        except ValidationError as e:
+            first = e.errors()[0]
+            location = '.'.join(str(part) for part in first['loc'])
+            self._error(f"Line {line_no}: {location}: {first['msg']}" if location else f"Line {line_no}: {first['msg']}")
+            return None
+    
+    async def _flush(self, matches: List[MatchSchema], last_line: int, stats: dict) -> bool:
+        """Ingest and commit one chunk; False if the commit failed"""
+        response = await asyncio.to_thread(self._ingest_chunk, matches)
+        
+        for error in response.errors:
+            self._error(error)
+        if response.matches_processed == 0:
+            self._error(f"Chunk ending at line {last_line}: {response.message}")
+            return False
+        
+        stats['matches_processed'] += response.matches_processed
+        stats['matches_created'] += response.matches_created
+        stats['matches_updated'] += response.matches_updated
+        for section in ('stats', 'odds', 'results'):
+            stats[f'{section}_skipped'] += getattr(response, f'{section}_skipped')
+        stats['cursor'] = last_line
+        return True
+    
+    def _ingest_chunk(self, matches: List[MatchSchema]):
+        """Write one chunk in its own session (worker thread)"""
+        db = self.session_factory()
+        try:
+            return DataIngestionService(db).ingest_batch(BatchIngestRequest(matches=matches))
+        finally:
+            db.close()
+    
+    def _error(self, message: str):
+        """Count an error, keeping the first STREAM_MAX_ERRORS messages"""
+        self.error_count += 1
+        if len(self.errors) < STREAM_MAX_ERRORS:
+            self.errors.append(message)
+    
+    def _response(self, stats: dict, complete: bool) -> StreamIngestResponse:
+        if not complete:
+            message = f"Stream ingestion stopped, resume with cursor={stats['cursor']}"
+        elif self.error_count:
+            message = "Stream ingestion completed with errors"
+        else:
+            message = "Stream ingestion completed"
+        
+        return StreamIngestResponse(
+            success=complete and self.error_count == 0,
+            message=message,
+            complete=complete,
+            error_count=self.error_count,
+            errors=self.errors,
+            **stats
+        )
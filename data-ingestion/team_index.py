@@ -0,0 +1,97 @@
+"""
+Team name index
+Process-wide team_name -> team_id cache used by the ingestion service
+"""
+
+import threading
+import weakref
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from .models import Team
+
+
+class TeamNameIndex:
+    """
+    In-memory team_name -> team_id map of one database
+    
+    Loaded with a single SELECT on first use and refreshed for names it
+    does not know. Only committed teams are added, so a rolled-back
+    ingestion never leaves ids of teams that do not exist.
+    """
+    
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+    
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+    
+    def load(self, db: Session):
+        """Load every team (one query)"""
+        rows = db.execute(select(Team.team_name, Team.team_id)).all()
+        with self._lock:
+            self._ids = {name: team_id for name, team_id in rows}
+            self._loaded = True
+    
+    def lookup(self, names: Iterable[str]) -> Tuple[Dict[str, int], List[str]]:
+        """
+        Resolve names from memory only
+        
+        Returns:
+            Tuple of (known name -> team_id, unknown names)
+        """
+        found = {}
+        missing = []
+        with self._lock:
+            for name in names:
+                team_id = self._ids.get(name)
+                if team_id is None:
+                    missing.append(name)
+                else:
+                    found[name] = team_id
+        return found, missing
+    
+    def add(self, ids: Dict[str, int]):
+        """Add committed teams"""
+        with self._lock:
+            self._ids.update(ids)
+    
+    def invalidate(self):
+        """Forget everything; the next lookup reloads the table"""
+        with self._lock:
+            self._ids = {}
+            self._loaded = False
+    
+    def __len__(self) -> int:
+        return len(self._ids)
+
+
+# One index per engine (i.e. per database) in this process
+_INDEXES = weakref.WeakKeyDictionary()
+_INDEXES_LOCK = threading.Lock()
+
+
+def get_team_index(db: Session) -> TeamNameIndex:
+    """
+    Process-wide TeamNameIndex of the session's database
+    
+    Args:
+        db: Database session
+    
+    Returns:
+        Shared TeamNameIndex, loaded on first use
+    """
+    engine = db.get_bind()
+    with _INDEXES_LOCK:
+        index = _INDEXES.get(engine)
+        if index is None:
+            index = _INDEXES[engine] = TeamNameIndex()
+    
+    if not index.loaded:
+        index.load(db)
+    return index
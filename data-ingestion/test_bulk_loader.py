@@ -0,0 +1,102 @@
+"""
+Tests for the bulk loader of historical datasets
+
+Run with: pytest data-ingestion/test_bulk_loader.py
+"""
+
+import sys
+import json
+import tempfile
+from pathlib import Path
+
+from sqlalchemy import create_engine
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from data_ingestion import bulk_loader
+from data_ingestion.models import Base
+from data_ingestion.bulk_loader import BulkLoader, iter_match_records
+from data_ingestion.testing import changed_batch, run, sample_matches, snapshot
+
+
+def test_iter_match_records_streams_documents():
+    """JSON documents are decoded record by record across read blocks; NDJSON line by line"""
+    matches = sample_matches(25)
+    read_block_chars = bulk_loader.READ_BLOCK_CHARS
+    bulk_loader.READ_BLOCK_CHARS = 100
+    
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            document = Path(directory) / 'matches.json'
+            document.write_text(json.dumps({'metadata': {'source': 'test'}, 'matches': matches}, indent=2))
+            lines = Path(directory) / 'matches.ndjson'
+            lines.write_text('\n'.join(json.dumps(match) for match in matches) + '\n\n')
+            
+            assert list(iter_match_records(str(document))) == matches
+            assert list(iter_match_records(str(lines))) == matches
+            
+            # The array is found by walking the top-level object, not by searching the text
+            decoy = Path(directory) / 'decoy.json'
+            decoy.write_text(json.dumps({
+                'metadata': {'note': '"matches": [{}]', 'matches': [{'match_id': 'NESTED'}]},
+                'fixtures': matches
+            }))
+            assert list(iter_match_records(str(decoy))) == matches
+            bare = Path(directory) / 'bare.json'
+            bare.write_text(json.dumps(matches))
+            assert list(iter_match_records(str(bare))) == matches
+            
+            missing = Path(directory) / 'missing.json'
+            missing.write_text(json.dumps({'metadata': {'matches': []}}))
+            try:
+                list(iter_match_records(str(missing)))
+                raise AssertionError('document without a match array accepted')
+            except ValueError as e:
+                assert "'matches' or 'fixtures'" in str(e)
+    finally:
+        bulk_loader.READ_BLOCK_CHARS = read_block_chars
+
+
+def test_bulk_loader_matches_ingestion_service():
+    """Loading the same records leaves the same tables as the ingestion service"""
+    first = sample_matches(60)
+    second = changed_batch()
+    
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    loader = BulkLoader(engine, chunk_rows=16)
+    
+    summary = loader.load(iter(first + [{'match_id': 'broken'}]))
+    assert (summary['rows_read'], summary['rows_staged'], summary['invalid_rows']) == (61, 60, 1)
+    assert summary['errors'][0].startswith('Record 61 (broken)')
+    assert (summary['matches_created'], summary['matches_updated']) == (60, 0)
+    
+    summary = loader.load(iter(second))
+    assert (summary['matches_created'], summary['matches_updated']) == (0, 20)
+    
+    _, service_tables, _ = run([first, second], bulk=True)
+    assert snapshot(engine) == service_tables
+
+
+def test_bulk_loader_skips_unchanged_sections():
+    """Reloading an identical file rewrites nothing"""
+    matches = sample_matches(30)
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    loader = BulkLoader(engine)
+    
+    loader.load(iter(matches))
+    before = snapshot(engine)
+    summary = loader.load(iter(matches))
+    
+    assert summary['odds_movements'] == 0
+    assert (summary['stats_skipped'], summary['odds_skipped'], summary['results_skipped']) == (30, 30, 30)
+    assert snapshot(engine) == before
+
+
+if __name__ == "__main__":
+    test_iter_match_records_streams_documents()
+    test_bulk_loader_matches_ingestion_service()
+    test_bulk_loader_skips_unchanged_sections()
+    print("✅ All bulk loader tests passed")
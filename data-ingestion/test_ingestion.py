@@ -0,0 +1,114 @@
+"""
+Tests for the bulk and row-by-row ingestion paths
+
+Run with: pytest data-ingestion/test_ingestion.py
+"""
+
+import sys
+import copy
+from pathlib import Path
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from data_ingestion.models import Base
+from data_ingestion.ingestion import DataIngestionService
+from data_ingestion.schemas import BatchIngestRequest
+from data_ingestion.team_index import TeamNameIndex
+from data_ingestion.testing import changed_batch, run, sample_matches, snapshot
+
+
+def test_bulk_path_matches_row_path():
+    """Same responses and tables from both paths, with far fewer statements in bulk"""
+    batches = [sample_matches(60), changed_batch()]
+    
+    row_counts, row_tables, row_statements = run(batches, bulk=False)
+    bulk_counts, bulk_tables, bulk_statements = run(batches, bulk=True)
+    
+    assert bulk_counts == row_counts == [(True, 60, 60, 0, []), (True, 21, 0, 21, [])]
+    assert bulk_tables == row_tables
+    assert bulk_statements * 10 < row_statements
+    
+    # The last occurrence of a repeated match wins
+    latest = {row[0]: row for row in bulk_tables['latest_odds']}
+    assert latest['T00003'][2] == 9.5
+
+
+def test_unchanged_sections_are_skipped():
+    """Resending a payload writes nothing; only the changed sections are rewritten"""
+    matches = sample_matches(40)
+    changed = copy.deepcopy(matches)
+    for match in changed[:5]:
+        match['odds']['draw'] = round(match['odds']['draw'] + 0.1, 2)
+    for match in changed[5:8]:
+        match['team_stats_at_match_time']['home_form'] = 'DDDDD'
+    
+    for bulk in (True, False):
+        engine = create_engine('sqlite://')
+        Base.metadata.create_all(engine)
+        writes = []
+        
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith(('INSERT', 'UPDATE')):
+                writes.append(len(parameters) if executemany else 1)
+        
+        index = TeamNameIndex()
+        responses = []
+        for batch in (matches, matches, changed):
+            if len(responses) == 1:
+                before = snapshot(engine)
+                event.listen(engine, 'before_cursor_execute', record)
+            db = sessionmaker(bind=engine)()
+            responses.append(DataIngestionService(db, team_index=index).ingest_batch(BatchIngestRequest(matches=batch), bulk=bulk))
+            db.close()
+            if len(responses) == 2:
+                assert sum(writes) == 0
+                assert snapshot(engine) == before
+        
+        skipped = [(r.stats_skipped, r.odds_skipped, r.results_skipped) for r in responses]
+        assert skipped == [(0, 0, 0), (40, 40, 40), (37, 35, 40)], bulk
+
+
+def test_failed_chunk_is_replayed_row_by_row():
+    """A chunk that fails is rolled back and its rows are reported one by one"""
+    write_chunk = DataIngestionService._write_chunk
+    process_match = DataIngestionService._process_match
+    
+    def failing_write(self, chunk, team_ids):
+        result = write_chunk(self, chunk, team_ids)
+        if any(match.match_id == 'T00007' for match in chunk):
+            # Raised after the chunk's statements ran; they must be rolled back
+            raise IntegrityError('INSERT', {}, Exception('chunk failed'))
+        return result
+    
+    def failing_match(self, match_data, *args):
+        created = process_match(self, match_data, *args)
+        if match_data.match_id == 'T00007':
+            raise ValueError('bad row')
+        return created
+    
+    DataIngestionService._write_chunk = failing_write
+    DataIngestionService._process_match = failing_match
+    try:
+        counts, tables, _ = run([sample_matches(30)], bulk=True)
+    finally:
+        DataIngestionService._write_chunk = write_chunk
+        DataIngestionService._process_match = process_match
+    
+    success, processed, created, updated, errors = counts[0]
+    assert not success
+    assert (processed, created, updated) == (30, 29, 0)
+    assert errors == ['Match T00007: bad row']
+    assert len(tables['matches']) == 29
+    assert 'T00007' not in {row[0] for row in tables['matches']}
+
+
+if __name__ == "__main__":
+    test_bulk_path_matches_row_path()
+    test_unchanged_sections_are_skipped()
+    test_failed_chunk_is_replayed_row_by_row()
+    print("✅ All ingestion path tests passed")
@@ -0,0 +1,92 @@
+"""
+Tests for background ingestion jobs
+
+Run with: pytest data-ingestion/test_jobs.py
+"""
+
+import sys
+import time
+import threading
+from pathlib import Path
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session, sessionmaker
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from data_ingestion.jobs import IngestionJobManager
+from data_ingestion.schemas import BatchIngestRequest
+from data_ingestion.testing import memory_engine, sample_matches
+
+
+class FailingCommitSession(Session):
+    """Session whose commit fails, as on a lost connection"""
+    
+    def commit(self):
+        raise OperationalError('COMMIT', {}, Exception('connection lost'))
+
+
+def wait_for(jobs, timeout: float = 30.0):
+    """Poll until every job has finished"""
+    deadline = time.time() + timeout
+    while not all(job.finished for job in jobs):
+        assert time.time() < deadline, [job.status for job in jobs]
+        time.sleep(0.01)
+
+
+def test_failed_chunk_is_not_counted_as_processed():
+    """Only committed chunks count towards matches_processed"""
+    engine = memory_engine()
+    sessions = [sessionmaker(bind=engine), sessionmaker(bind=engine, class_=FailingCommitSession)]
+    calls = []
+    
+    def session_factory():
+        # The second of three chunks fails to commit
+        calls.append(None)
+        return sessions[len(calls) == 2]()
+    
+    manager = IngestionJobManager(max_workers=1, chunk_size=10, session_factory=session_factory)
+    job = manager.submit(BatchIngestRequest(matches=sample_matches(30)))
+    wait_for([job])
+    manager.shutdown()
+    
+    status = job.to_status()
+    assert status.status == 'completed_with_errors'
+    assert status.chunks_completed == 3
+    assert status.matches_processed == 20
+    assert status.matches_created == 20
+    assert status.progress == 1.0
+    assert 'connection lost' in status.errors[0]
+
+
+def test_shutdown_cancels_queued_jobs():
+    """Jobs that never started end as 'cancelled'; the running one completes"""
+    engine = memory_engine()
+    factory = sessionmaker(bind=engine)
+    release = threading.Event()
+    
+    def session_factory():
+        release.wait(timeout=30)
+        return factory()
+    
+    manager = IngestionJobManager(max_workers=1, chunk_size=10, session_factory=session_factory)
+    jobs = [manager.submit(BatchIngestRequest(matches=sample_matches(10))) for _ in range(3)]
+    while jobs[0].status != 'running':
+        time.sleep(0.01)
+    
+    manager.shutdown(wait=False)
+    assert [job.status for job in jobs] == ['running', 'cancelled', 'cancelled']
+    assert all(job.to_status().finished_at is not None for job in jobs[1:])
+    assert manager.pending() == 1
+    
+    release.set()
+    wait_for(jobs)
+    assert jobs[0].status == 'completed'
+    assert [job.matches_processed for job in jobs] == [10, 0, 0]
+
+
+if __name__ == "__main__":
+    test_failed_chunk_is_not_counted_as_processed()
+    test_shutdown_cancels_queued_jobs()
+    print("✅ All ingestion job tests passed")
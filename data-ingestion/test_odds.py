@@ -0,0 +1,182 @@
+"""
+Tests for the delta-encoded odds history
+
+Run with: pytest data-ingestion/test_odds.py
+"""
+
+import sys
+import copy
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import create_engine, func, inspect, select
+from sqlalchemy.orm import sessionmaker
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from data_ingestion.models import Base, MatchOdds, LatestOdds, OddsMovement
+from data_ingestion.odds import (
+    get_latest_odds, rebuild_latest_odds, replay_odds, line_movement, movement_rows, odds_to_dict, SELECTION_CODES
+)
+from data_ingestion.testing import TEST_DATA, ingest, sample_matches
+
+
+def schema_sql_engine():
+    """
+    In-memory SQLite database created from test-data/schema.sql
+    
+    Only the PostgreSQL-specific bits are translated (SERIAL keys, CASCADE
+    and COMMENT ON); keys, constraints and indexes are kept as declared.
+    """
+    ddl = (TEST_DATA / 'schema.sql').read_text()
+    ddl = ddl.replace('BIGSERIAL PRIMARY KEY', 'INTEGER PRIMARY KEY').replace('SERIAL PRIMARY KEY', 'INTEGER PRIMARY KEY')
+    ddl = ddl.replace(' CASCADE;', ';')
+    ddl = '\n'.join(line for line in ddl.splitlines() if not line.startswith('COMMENT ON'))
+    
+    engine = create_engine('sqlite://')
+    engine.raw_connection().executescript(ddl)
+    return engine
+
+
+def test_schema_sql_matches_models():
+    """Every ORM table exists in schema.sql with the same columns and primary key"""
+    inspector = inspect(schema_sql_engine())
+    
+    for table in Base.metadata.sorted_tables:
+        columns = {column['name'] for column in inspector.get_columns(table.name)}
+        assert columns == set(table.columns.keys()), table.name
+        
+        primary_key = inspector.get_pk_constraint(table.name)['constrained_columns']
+        assert primary_key == [column.name for column in table.primary_key.columns], table.name
+
+
+def test_bulk_odds_path_against_schema_sql():
+    """The odds_movements upsert has a matching conflict target in the DDL"""
+    engine = schema_sql_engine()
+    matches = sample_matches()
+    ingest(engine, matches)
+    
+    changed = copy.deepcopy(matches)
+    for match in changed:
+        match['odds']['draw'] = round(match['odds']['draw'] + 0.25, 2)
+    ingest(engine, changed)
+    
+    db = sessionmaker(bind=engine)()
+    movements = db.execute(select(func.count()).select_from(OddsMovement)).scalar()
+    assert movements == len(matches) * (len(SELECTION_CODES) + 1)
+    
+    for match in changed:
+        snapshot = replay_odds(db, match['match_id'], datetime.utcnow())['test_bookmaker']
+        assert snapshot == odds_to_dict(db.get(LatestOdds, match['match_id']))
+        assert snapshot['draw_odds'] == match['odds']['draw']
+    db.close()
+
+
+def test_replay_reconstructs_each_snapshot():
+    """Replay at any time returns the prices ingested last before it"""
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    
+    first = sample_matches(5)
+    second = copy.deepcopy(first)
+    for match in second:
+        match['odds']['home_win'] = round(match['odds']['home_win'] + 0.4, 2)
+    
+    marks = []
+    for batch, bulk in ((first, True), (second, False), (first, True)):
+        ingest(engine, batch, bulk=bulk)
+        marks.append(datetime.utcnow())
+        time.sleep(0.01)
+    
+    db = sessionmaker(bind=engine)()
+    match_id = first[0]['match_id']
+    
+    assert replay_odds(db, match_id, marks[0] - timedelta(days=1)) == {}
+    for mark, batch in zip(marks, (first, second, first)):
+        snapshot = replay_odds(db, match_id, mark)['test_bookmaker']
+        assert snapshot['home_win_odds'] == batch[0]['odds']['home_win']
+        assert snapshot['draw_odds'] == first[0]['odds']['draw']
+    
+    series = line_movement(db, match_id, start=marks[0], selections=['home_win_odds'])
+    assert len(series) == 1
+    assert series[0]['opening_price'] == first[0]['odds']['home_win']
+    assert [movement['price'] for movement in series[0]['movements']] == [
+        second[0]['odds']['home_win'], first[0]['odds']['home_win']
+    ]
+    db.close()
+
+
+def test_latest_odds_follow_the_last_ingest():
+    """match_odds_latest holds one row per match with the prices ingested last"""
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    
+    first = sample_matches(10)
+    second = copy.deepcopy(first[:4])
+    for match in second:
+        match['odds']['over_2_5'] = round(match['odds']['over_2_5'] + 0.15, 2)
+    ingest(engine, first)
+    ingest(engine, second, bulk=False)
+    
+    db = sessionmaker(bind=engine)()
+    match_ids = [match['match_id'] for match in first]
+    latest = get_latest_odds(db, match_ids + match_ids[:2] + ['UNKNOWN'])
+    
+    assert sorted(latest) == sorted(match_ids)
+    assert db.execute(select(func.count()).select_from(LatestOdds)).scalar() == 10
+    for match in second + first[4:]:
+        assert float(latest[match['match_id']].over_2_5_odds) == match['odds']['over_2_5']
+    assert get_latest_odds(db, []) == {}
+    db.close()
+
+
+def test_rebuild_latest_odds_from_history():
+    """The rebuild keeps the newest snapshot of each match (the later row on a tie)"""
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    
+    kickoff = datetime(2022, 1, 1)
+    snapshots = [
+        ('M1', kickoff, 2.0), ('M1', kickoff + timedelta(hours=2), 2.2), ('M1', kickoff + timedelta(hours=1), 2.1),
+        ('M2', kickoff, 3.0), ('M2', kickoff, 3.3)
+    ]
+    for match_id, timestamp, price in snapshots:
+        db.add(MatchOdds(match_id=match_id, odds_timestamp=timestamp, home_win_odds=price, draw_odds=3.4))
+    db.add(LatestOdds(match_id='STALE', home_win_odds=9.9))
+    db.commit()
+    
+    assert rebuild_latest_odds(db) == 2
+    db.commit()
+    
+    latest = {row.match_id: float(row.home_win_odds) for row in db.execute(select(LatestOdds)).scalars()}
+    assert latest == {'M1': 2.2, 'M2': 3.3}
+    db.close()
+
+
+def test_movement_rows_only_changed_prices():
+    """Unchanged prices get no row; a withdrawn price is a delta back to 0"""
+    now = datetime.utcnow()
+    previous = {'bookmaker': 'test_bookmaker', 'home_win_odds': 2.1, 'draw_odds': 3.4, 'away_win_odds': 3.0}
+    values = {'match_id': 'M1', 'home_win_odds': 2.1, 'draw_odds': 3.25, 'away_win_odds': None}
+    
+    rows = {row['selection']: row['delta_cents'] for row in movement_rows(values, previous, now)}
+    assert rows == {SELECTION_CODES['draw_odds']: -15, SELECTION_CODES['away_win_odds']: -300}
+    
+    # Another bookmaker starts its own series from full prices
+    rows = movement_rows({**values, 'bookmaker': 'other'}, previous, now)
+    assert {row['selection']: row['delta_cents'] for row in rows} == {
+        SELECTION_CODES['home_win_odds']: 210, SELECTION_CODES['draw_odds']: 325
+    }
+
+
+if __name__ == "__main__":
+    test_schema_sql_matches_models()
+    test_bulk_odds_path_against_schema_sql()
+    test_replay_reconstructs_each_snapshot()
+    test_latest_odds_follow_the_last_ingest()
+    test_rebuild_latest_odds_from_history()
+    test_movement_rows_only_changed_prices()
+    print("✅ All odds history tests passed")
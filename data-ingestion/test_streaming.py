@@ -0,0 +1,104 @@
+"""
+Tests for streaming NDJSON ingestion
+
+Run with: pytest data-ingestion/test_streaming.py
+"""
+
+import sys
+import json
+import asyncio
+from pathlib import Path
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import sessionmaker
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from data_ingestion.models import Match
+from data_ingestion.streaming import StreamIngestor, iter_lines
+from data_ingestion.testing import memory_engine, sample_matches
+
+
+def ndjson(matches, broken=()):
+    """NDJSON body with malformed records at the given positions"""
+    lines = []
+    for i, match in enumerate(matches):
+        lines.append(b'{"match_id": "broken"' if i in broken else json.dumps(match).encode())
+    return b'\n'.join(lines) + b'\n'
+
+
+async def chunked(body: bytes, size: int = 333):
+    """Body split at arbitrary byte offsets, as a client sends it"""
+    for start in range(0, len(body), size):
+        yield body[start:start + size]
+
+
+def stored_matches(engine) -> int:
+    """Matches committed to the database"""
+    db = sessionmaker(bind=engine)()
+    count = db.execute(select(func.count()).select_from(Match)).scalar()
+    db.close()
+    return count
+
+
+def test_iter_lines_across_chunk_boundaries():
+    """Lines are reassembled across chunks; overlong lines are skipped, not buffered"""
+    async def collect(body, max_line_bytes):
+        return [line async for line in iter_lines(chunked(body, size=4), max_line_bytes)]
+    
+    lines = asyncio.run(collect(b'first\nsecond line\n\nx' + b'y' * 20 + b'\nlast', max_line_bytes=12))
+    assert lines == [(1, b'first'), (2, b'second line'), (3, b''), (4, None), (5, b'last')]
+
+
+def test_resume_from_cursor_after_interruption():
+    """An interrupted stream reports a cursor; resending with it ingests each record once"""
+    engine = memory_engine()
+    factory = sessionmaker(bind=engine)
+    body = ndjson(sample_matches(100), broken={10})
+    calls = []
+    
+    def flaky_session():
+        # The third chunk loses its connection
+        calls.append(None)
+        if len(calls) == 3:
+            raise RuntimeError('connection lost')
+        return factory()
+    
+    first = asyncio.run(StreamIngestor(commit_every=20, session_factory=flaky_session).ingest(chunked(body)))
+    assert not first.complete
+    # Two chunks of 20 valid records end at line 41 (line 11 is malformed)
+    assert first.cursor == 41
+    assert first.matches_created == 40
+    assert stored_matches(engine) == 40
+    
+    second = asyncio.run(StreamIngestor(commit_every=20, session_factory=factory).ingest(chunked(body), cursor=first.cursor))
+    assert second.complete
+    assert second.cursor == 100
+    assert second.lines_read == 59
+    assert (second.matches_created, second.matches_updated) == (59, 0)
+    assert stored_matches(engine) == 99
+    
+    # A completed stream resent with its cursor is a no-op
+    third = asyncio.run(StreamIngestor(session_factory=factory).ingest(chunked(body), cursor=second.cursor))
+    assert third.complete and third.lines_read == 0 and third.matches_processed == 0
+
+
+def test_malformed_lines_are_reported_not_fatal():
+    """Invalid records are counted with their line numbers and the rest is ingested"""
+    engine = memory_engine()
+    body = ndjson(sample_matches(30), broken={0, 17})
+    
+    response = asyncio.run(StreamIngestor(commit_every=7, session_factory=sessionmaker(bind=engine)).ingest(chunked(body)))
+    assert response.complete and not response.success
+    assert response.invalid_lines == 2
+    assert [error.split(':')[0] for error in response.errors] == ['Line 1', 'Line 18']
+    assert response.matches_created == 28
+    assert stored_matches(engine) == 28
+
+
+if __name__ == "__main__":
+    test_iter_lines_across_chunk_boundaries()
+    test_resume_from_cursor_after_interruption()
+    test_malformed_lines_are_reported_not_fatal()
+    print("✅ All streaming ingestion tests passed")
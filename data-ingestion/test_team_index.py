@@ -0,0 +1,80 @@
+"""
+Tests for the process-wide team-name index
+
+Run with: pytest data-ingestion/test_team_index.py
+"""
+
+import sys
+from pathlib import Path
+
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from data_ingestion.models import Team
+from data_ingestion.ingestion import DataIngestionService
+from data_ingestion.schemas import BatchIngestRequest
+from data_ingestion.team_index import get_team_index
+from data_ingestion.testing import memory_engine, sample_matches
+
+
+def team_queries(engine):
+    """Statements against the teams table, recorded as they run"""
+    statements = []
+    
+    def record(conn, cursor, statement, *args):
+        if 'teams' in statement:
+            statements.append(statement.split()[0])
+    
+    event.listen(engine, 'before_cursor_execute', record)
+    return statements
+
+
+def test_known_teams_cost_no_query():
+    """After the first batch, team names resolve from memory"""
+    engine = memory_engine()
+    Session = sessionmaker(bind=engine)
+    
+    db = Session()
+    DataIngestionService(db).ingest_batch(BatchIngestRequest(matches=sample_matches(10)))
+    db.close()
+    
+    statements = team_queries(engine)
+    db = Session()
+    service = DataIngestionService(db)
+    response = service.ingest_batch(BatchIngestRequest(matches=sample_matches(10)))
+    db.close()
+    
+    assert response.success and response.matches_updated == 10
+    assert service.team_index is get_team_index(Session())
+    assert statements == []
+
+
+def test_index_refreshes_misses_and_ignores_rollbacks():
+    """Teams added elsewhere are found; teams of a rolled-back session are not cached"""
+    engine = memory_engine()
+    Session = sessionmaker(bind=engine)
+    index = get_team_index(Session())
+    
+    other = Session()
+    other.add(Team(team_name='Elsewhere FC', league='Premier League'))
+    other.commit()
+    
+    db = Session()
+    service = DataIngestionService(db)
+    team_ids = service._team_ids({'Elsewhere FC': 'Premier League', 'Rolled Back FC': 'Premier League'})
+    assert set(team_ids) == {'Elsewhere FC', 'Rolled Back FC'}
+    db.rollback()
+    db.close()
+    
+    found, missing = index.lookup(['Elsewhere FC', 'Rolled Back FC'])
+    assert found == {'Elsewhere FC': team_ids['Elsewhere FC']}
+    assert missing == ['Rolled Back FC']
+
+
+if __name__ == "__main__":
+    test_known_teams_cost_no_query()
+    test_index_refreshes_misses_and_ignores_rollbacks()
+    print("✅ All team index tests passed")
@@ -0,0 +1,112 @@
+"""
+Shared helpers for the data ingestion, API and training tests
+
+Sample fixtures from test-data/, throwaway databases and table snapshots
+"""
+
+import copy
+import json
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from .models import Base, Team, Match, LatestOdds, MatchResult, OddsMovement
+from .ingestion import DataIngestionService
+from .schemas import BatchIngestRequest
+from .team_index import TeamNameIndex
+
+TEST_DATA = Path(__file__).parent.parent / 'test-data'
+
+
+def sample_matches(count: int = 20):
+    """Fixtures cycled from the bundled historical data, one hour apart"""
+    with open(TEST_DATA / 'historical_matches_300.json') as f:
+        templates = json.load(f)['matches']
+    
+    kickoff = datetime(2022, 1, 1, 15, 0)
+    matches = []
+    for i in range(count):
+        match = copy.deepcopy(templates[i % len(templates)])
+        match['match_id'] = f'T{i:05d}'
+        match['match_datetime'] = (kickoff + timedelta(hours=i)).isoformat() + 'Z'
+        match['home_team_id'] = str(match['home_team_id'])
+        match['away_team_id'] = str(match['away_team_id'])
+        matches.append(match)
+    return matches
+
+
+def changed_batch():
+    """Re-ingest of 20 matches with new odds and scores, one of them twice"""
+    batch = copy.deepcopy(sample_matches(20))
+    for match in batch:
+        match['odds']['draw'] = round(match['odds']['draw'] + 0.2, 2)
+        if match.get('result'):
+            match['result']['home_corners'] += 1
+            match['result']['total_corners'] += 1
+    
+    repeat = copy.deepcopy(batch[3])
+    repeat['odds']['home_win'] = 9.5
+    batch.append(repeat)
+    return batch
+
+
+def memory_engine():
+    """In-memory SQLite database on one connection, shared by every session and worker thread"""
+    engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    return engine
+
+
+def ingest(engine, matches, bulk: bool = True):
+    """Ingest a batch in its own session; bulk batches must not fall back to rows"""
+    db = sessionmaker(bind=engine)()
+    service = DataIngestionService(db, team_index=TeamNameIndex())
+    if bulk:
+        def no_fallback(rows):
+            raise AssertionError('bulk chunk fell back to the row path')
+        service._ingest_rows = no_fallback
+    response = service.ingest_batch(BatchIngestRequest(matches=matches), bulk=bulk)
+    db.close()
+    assert response.success, response.errors
+    return response
+
+
+def snapshot(engine):
+    """Table contents that both paths must agree on"""
+    db = sessionmaker(bind=engine)()
+    home = Team.__table__.alias('home')
+    away = Team.__table__.alias('away')
+    tables = {
+        'teams': sorted(db.execute(select(Team.team_name, Team.league)).all()),
+        'matches': sorted(db.execute(
+            select(Match.match_id, Match.status, Match.home_form, home.c.team_name, away.c.team_name)
+            .join(home, Match.home_team_id == home.c.team_id)
+            .join(away, Match.away_team_id == away.c.team_id)
+        ).all()),
+        'latest_odds': sorted(db.execute(select(LatestOdds.match_id, LatestOdds.draw_odds, LatestOdds.home_win_odds)).all()),
+        'results': sorted(db.execute(select(MatchResult.match_id, MatchResult.home_corners, MatchResult.btts)).all()),
+        'movements': sorted(db.execute(select(OddsMovement.match_id, OddsMovement.selection, OddsMovement.delta_cents)).all())
+    }
+    db.close()
+    return tables
+
+
+def run(batches, bulk: bool):
+    """Ingest batches into a fresh database; returns responses, tables and statement count"""
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    statements = []
+    event.listen(engine, 'before_cursor_execute', lambda *args: statements.append(None))
+    
+    responses = []
+    index = TeamNameIndex()
+    for batch in batches:
+        db = sessionmaker(bind=engine)()
+        responses.append(DataIngestionService(db, team_index=index).ingest_batch(BatchIngestRequest(matches=batch), bulk=bulk))
+        db.close()
+    
+    counts = [(r.success, r.matches_processed, r.matches_created, r.matches_updated, r.errors) for r in responses]
+    return counts, snapshot(engine), len(statements)
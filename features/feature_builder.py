@@ -1,11 +1,81 @@
 """
 Centralized Feature Builder
 Ensures training and inference use identical feature engineering logic
+
+Features are computed by the groups declared below, registered in a
+FeatureRegistry. Training (build_datasets) and serving (IntegratedPredictor)
+both compile a FeaturePlan and run it through FeatureBuilder.compute, so the
+two paths share one definition of every column.
 """
 
+import sys
+import hashlib
+import inspect
 import pandas as pd
 import numpy as np
-from typing import Dict, List
+from typing import Any, Dict, List, Optional, Sequence
+
+from features.registry import FeaturePlan, FeatureRegistry, feature_group
+
+ROLLING_5_FEATURES = [
+    'home_goals_avg_5', 'away_goals_avg_5',
+    'home_goals_conceded_avg_5', 'away_goals_conceded_avg_5',
+    'home_corners_avg_5', 'away_corners_avg_5',
+    'home_cards_avg_5', 'away_cards_avg_5',
+    'home_btts_rate_5', 'away_btts_rate_5'
+]
+
+ROLLING_10_FEATURES = [
+    'home_goals_avg_10', 'away_goals_avg_10',
+    'home_goals_conceded_avg_10', 'away_goals_conceded_avg_10'
+]
+
+
+@feature_group('rolling_5', features=ROLLING_5_FEATURES, inputs=ROLLING_5_FEATURES)
+def rolling_5_features(inputs: Dict[str, Any]) -> Dict[str, Any]:
+    """Rolling averages over the last 5 matches"""
+    return {name: inputs[name] for name in ROLLING_5_FEATURES}
+
+
+@feature_group('rolling_10', features=ROLLING_10_FEATURES, inputs=ROLLING_10_FEATURES)
+def rolling_10_features(inputs: Dict[str, Any]) -> Dict[str, Any]:
+    """Rolling averages over the last 10 matches (5-match values when unavailable)"""
+    return {name: inputs[name] for name in ROLLING_10_FEATURES}
+
+
+@feature_group(
+    'combined',
+    features=['combined_goals_avg', 'combined_corners_avg', 'combined_cards_avg', 'combined_btts_rate'],
+    inputs=[
+        'home_goals_avg_5', 'away_goals_avg_5', 'home_corners_avg_5', 'away_corners_avg_5',
+        'home_cards_avg_5', 'away_cards_avg_5', 'home_btts_rate_5', 'away_btts_rate_5'
+    ]
+)
+def combined_features(inputs: Dict[str, Any]) -> Dict[str, Any]:
+    """Both teams' averages combined"""
+    return {
+        'combined_goals_avg': inputs['home_goals_avg_5'] + inputs['away_goals_avg_5'],
+        'combined_corners_avg': inputs['home_corners_avg_5'] + inputs['away_corners_avg_5'],
+        'combined_cards_avg': inputs['home_cards_avg_5'] + inputs['away_cards_avg_5'],
+        'combined_btts_rate': (inputs['home_btts_rate_5'] + inputs['away_btts_rate_5']) / 2
+    }
+
+
+@feature_group(
+    'attack_vs_defense',
+    features=['home_attack_vs_away_defense', 'away_attack_vs_home_defense'],
+    inputs=['home_goals_avg_5', 'away_goals_avg_5', 'home_goals_conceded_avg_5', 'away_goals_conceded_avg_5']
+)
+def attack_vs_defense_features(inputs: Dict[str, Any]) -> Dict[str, Any]:
+    """Each side's scoring rate against the other side's conceding rate"""
+    return {
+        'home_attack_vs_away_defense': inputs['home_goals_avg_5'] - inputs['away_goals_conceded_avg_5'],
+        'away_attack_vs_home_defense': inputs['away_goals_avg_5'] - inputs['home_goals_conceded_avg_5']
+    }
+
+
+# Registration (and column) order
+FEATURE_GROUPS = [rolling_5_features, rolling_10_features, combined_features, attack_vs_defense_features]
 
 
 class FeatureBuilder:
@@ -15,90 +85,107 @@ class FeatureBuilder:
     """
     
     def __init__(self):
-        self.feature_columns = []
+        self.registry = FeatureRegistry()
+        for compute in FEATURE_GROUPS:
+            self.registry.register_declared(compute)
+        self.plan = self.registry.compile()
+        self.feature_columns = self.plan.feature_names
     
-    def build_features(self, match_data: Dict) -> Dict:
+    def compile_plan(self, feature_names: Optional[Sequence[str]] = None) -> FeaturePlan:
         """
-        Build features from match data dictionary
+        Compile a pruned plan for the given features (all features if None)
         
         Args:
-            match_data: Dictionary with match information and team stats
-            
+            feature_names: Feature columns a model consumes, in model order
+        
         Returns:
-            Dictionary with engineered features
+            FeaturePlan
+        """
+        if feature_names is None:
+            return self.plan
+        return self.registry.compile(feature_names)
+    
+    def compute(self, plan: FeaturePlan, inputs: Dict[str, Any]) -> Dict[str, Any]:
         """
-        features = {}
+        Run a plan on resolved inputs
         
-        # Extract base stats
-        home_goals_avg = match_data.get('home_goals_avg_5', match_data.get('home_goals_avg', 0))
-        away_goals_avg = match_data.get('away_goals_avg_5', match_data.get('away_goals_avg', 0))
-        home_goals_conceded_avg = match_data.get('home_goals_conceded_avg_5', 
-                                                 match_data.get('home_goals_conceded_avg', 0))
-        away_goals_conceded_avg = match_data.get('away_goals_conceded_avg_5',
-                                                 match_data.get('away_goals_conceded_avg', 0))
-        home_corners_avg = match_data.get('home_corners_avg_5', match_data.get('home_corners_avg', 0))
-        away_corners_avg = match_data.get('away_corners_avg_5', match_data.get('away_corners_avg', 0))
-        home_cards_avg = match_data.get('home_cards_avg_5', match_data.get('home_cards_avg', 0))
-        away_cards_avg = match_data.get('away_cards_avg_5', match_data.get('away_cards_avg', 0))
-        home_btts_rate = match_data.get('home_btts_rate_5', match_data.get('home_btts_rate', 0))
-        away_btts_rate = match_data.get('away_btts_rate_5', match_data.get('away_btts_rate', 0))
+        Args:
+            plan: Compiled FeaturePlan
+            inputs: Value (scalar or array) for every key in plan.inputs
         
-        # Basic features
-        features['home_goals_avg_5'] = home_goals_avg
-        features['away_goals_avg_5'] = away_goals_avg
-        features['home_goals_conceded_avg_5'] = home_goals_conceded_avg
-        features['away_goals_conceded_avg_5'] = away_goals_conceded_avg
-        features['home_corners_avg_5'] = home_corners_avg
-        features['away_corners_avg_5'] = away_corners_avg
-        features['home_cards_avg_5'] = home_cards_avg
-        features['away_cards_avg_5'] = away_cards_avg
-        features['home_btts_rate_5'] = home_btts_rate
-        features['away_btts_rate_5'] = away_btts_rate
+        Returns:
+            Dictionary of the plan's features, in plan column order
+        """
+        missing = [key for key in plan.inputs if key not in inputs]
+        if missing:
+            raise ValueError(f"Missing feature inputs: {missing}")
+        
+        features = self.registry.execute(plan, {key: inputs[key] for key in plan.inputs})
+        return {name: features[name] for name in plan.feature_names}
+    
+    @staticmethod
+    def _resolve_input(match_data: Dict, key: str) -> float:
+        """
+        Look up an input in a match dictionary
         
-        # 10-match averages (if available)
-        features['home_goals_avg_10'] = match_data.get('home_goals_avg_10', home_goals_avg)
-        features['away_goals_avg_10'] = match_data.get('away_goals_avg_10', away_goals_avg)
-        features['home_goals_conceded_avg_10'] = match_data.get('home_goals_conceded_avg_10', 
-                                                                home_goals_conceded_avg)
-        features['away_goals_conceded_avg_10'] = match_data.get('away_goals_conceded_avg_10',
-                                                                away_goals_conceded_avg)
+        10-match values fall back to the 5-match value, 5-match values to the
+        unsuffixed average, and missing values to 0.
+        """
+        if key.endswith('_10'):
+            candidates = [key, key[:-len('_10')] + '_5', key[:-len('_10')]]
+        elif key.endswith('_5'):
+            candidates = [key, key[:-len('_5')]]
+        else:
+            candidates = [key]
         
-        # Combined features
-        features['combined_goals_avg'] = home_goals_avg + away_goals_avg
-        features['combined_corners_avg'] = home_corners_avg + away_corners_avg
-        features['combined_cards_avg'] = home_cards_avg + away_cards_avg
-        features['combined_btts_rate'] = (home_btts_rate + away_btts_rate) / 2
+        for candidate in candidates:
+            if match_data.get(candidate) is not None:
+                return float(match_data[candidate])
+        return 0.0
+    
+    def build_features(self, match_data: Dict, plan: Optional[FeaturePlan] = None) -> Dict:
+        """
+        Build features from match data dictionary
         
-        # Attack vs Defense
-        features['home_attack_vs_away_defense'] = home_goals_avg - away_goals_conceded_avg
-        features['away_attack_vs_home_defense'] = away_goals_avg - home_goals_conceded_avg
+        Args:
+            match_data: Dictionary with match information and team stats
+            plan: Compiled FeaturePlan (defaults to every feature)
         
-        return features
+        Returns:
+            Dictionary with engineered features
+        """
+        plan = plan or self.plan
+        inputs = {key: self._resolve_input(match_data, key) for key in plan.inputs}
+        return self.compute(plan, inputs)
     
-    def build_features_batch(self, matches: List[Dict]) -> pd.DataFrame:
+    def build_features_batch(self, matches: List[Dict], plan: Optional[FeaturePlan] = None) -> pd.DataFrame:
         """
         Build features for multiple matches
         
         Args:
             matches: List of match dictionaries
-            
+            plan: Compiled FeaturePlan (defaults to every feature)
+        
         Returns:
             DataFrame with features
         """
-        features_list = [self.build_features(match) for match in matches]
-        return pd.DataFrame(features_list)
+        plan = plan or self.plan
+        inputs = {
+            key: np.array([self._resolve_input(match, key) for match in matches], dtype=float)
+            for key in plan.inputs
+        }
+        return pd.DataFrame(self.compute(plan, inputs), columns=plan.feature_names)
     
     def get_feature_names(self) -> List[str]:
         """Get list of feature names"""
-        return [
-            'home_goals_avg_5', 'away_goals_avg_5',
-            'home_goals_conceded_avg_5', 'away_goals_conceded_avg_5',
-            'home_corners_avg_5', 'away_corners_avg_5',
-            'home_cards_avg_5', 'away_cards_avg_5',
-            'home_btts_rate_5', 'away_btts_rate_5',
-            'home_goals_avg_10', 'away_goals_avg_10',
-            'home_goals_conceded_avg_10', 'away_goals_conceded_avg_10',
-            'combined_goals_avg', 'combined_corners_avg',
-            'combined_cards_avg', 'combined_btts_rate',
-            'home_attack_vs_away_defense', 'away_attack_vs_home_defense'
-        ]
+        return list(self.plan.feature_names)
+    
+    def get_feature_version(self) -> str:
+        """
+        Hash of the feature definitions (group declarations and compute code)
+        
+        Changes whenever a feature is added, removed or its logic edited, so
+        stored features from an older definition are never reused.
+        """
+        payload = inspect.getsource(sys.modules[__name__])
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:12]
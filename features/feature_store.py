@@ -0,0 +1,175 @@
+"""
+Feature Store
+Persists computed match features as Parquet partitions (season/league)
+keyed by match_id and the feature-set version, so dataset rebuilds reuse
+features of completed matches instead of recomputing them
+"""
+
+import uuid
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+
+PARTITION_COLUMNS = ['season', 'league']
+KEY_COLUMN = 'match_id'
+
+
+class FeatureStore:
+    """
+    Append-only Parquet feature store
+
+    Layout:
+        <root>/v_<feature_version>/season=<season>/league=<league>/part-*.parquet
+
+    A new feature version (changed feature code or configuration) gets a fresh
+    directory, so stale features are never read back.
+    """
+
+    def __init__(self, root, feature_version: str):
+        """
+        Initialize the store
+
+        Args:
+            root: Base directory of the feature store
+            feature_version: Hash of the code producing the stored features
+                (training.build_datasets.feature_store_version())
+        """
+        if not PYARROW_AVAILABLE:
+            raise ImportError("pyarrow is required for the feature store (pip install pyarrow)")
+
+        self.root = Path(root)
+        self.feature_version = feature_version
+        self.path = self.root / f"v_{feature_version}"
+        self._match_ids: Optional[Set[str]] = None
+
+    def _dataset(self):
+        partitioning = ds.partitioning(
+            pa.schema([(column, pa.string()) for column in PARTITION_COLUMNS]),
+            flavor='hive'
+        )
+        return ds.dataset(str(self.path), format='parquet', partitioning=partitioning)
+
+    def exists(self) -> bool:
+        """Whether any features have been stored for this version"""
+        return self.path.exists() and any(self.path.rglob('*.parquet'))
+
+    def match_ids(self) -> Set[str]:
+        """Set of stored match IDs (reads only the key column)"""
+        if self._match_ids is None:
+            if self.exists():
+                table = self._dataset().to_table(columns=[KEY_COLUMN])
+                self._match_ids = set(table.column(KEY_COLUMN).to_pylist())
+            else:
+                self._match_ids = set()
+        return self._match_ids
+
+    def missing(self, match_ids: Iterable[str]) -> List[str]:
+        """Match IDs that still need features computed"""
+        stored = self.match_ids()
+        return [match_id for match_id in match_ids if match_id not in stored]
+
+    def append(self, df: pd.DataFrame) -> int:
+        """
+        Append feature rows for newly completed (or newly seen) matches
+
+        Rows whose match_id is already stored are skipped.
+
+        Args:
+            df: Feature rows with a match_id column; season and league
+                columns are used as partitions when present
+
+        Returns:
+            Number of rows written
+        """
+        if df.empty:
+            return 0
+        if KEY_COLUMN not in df.columns:
+            raise ValueError(f"Feature rows must include '{KEY_COLUMN}'")
+
+        df = df.drop_duplicates(subset=KEY_COLUMN, keep='last')
+        df = df[~df[KEY_COLUMN].isin(self.match_ids())].copy()
+        if df.empty:
+            return 0
+
+        for column in PARTITION_COLUMNS:
+            if column not in df.columns:
+                df[column] = 'unknown'
+            df[column] = df[column].fillna('unknown').astype(str)
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        pq.write_to_dataset(
+            table,
+            root_path=str(self.path),
+            partition_cols=PARTITION_COLUMNS,
+            basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet"
+        )
+
+        self.match_ids().update(df[KEY_COLUMN])
+        return len(df)
+
+    def read(
+        self,
+        columns: Optional[List[str]] = None,
+        match_ids: Optional[Iterable[str]] = None,
+        seasons: Optional[List[str]] = None,
+        leagues: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """
+        Columnar read of stored features
+
+        Args:
+            columns: Feature columns to load (match_id is always included)
+            match_ids: Restrict to these matches
+            seasons: Restrict to these season partitions
+            leagues: Restrict to these league partitions
+
+        Returns:
+            DataFrame with one row per match
+        """
+        if not self.exists():
+            return pd.DataFrame(columns=[KEY_COLUMN] + list(columns or []))
+
+        if columns is not None:
+            columns = [KEY_COLUMN] + [c for c in columns if c != KEY_COLUMN]
+
+        expression = None
+        filters = [
+            (KEY_COLUMN, match_ids),
+            ('season', seasons),
+            ('league', leagues)
+        ]
+        for column, values in filters:
+            if values is None:
+                continue
+            condition = ds.field(column).isin(list(values))
+            expression = condition if expression is None else expression & condition
+
+        table = self._dataset().to_table(columns=columns, filter=expression)
+        df = table.to_pandas().drop_duplicates(subset=KEY_COLUMN, keep='last')
+
+        # Partition keys come back dictionary-encoded
+        for column in PARTITION_COLUMNS:
+            if column in df.columns:
+                df[column] = df[column].astype(str)
+
+        return df.reset_index(drop=True)
+
+    def read_indexed(
+        self,
+        columns: Optional[List[str]] = None,
+        match_ids: Optional[Iterable[str]] = None
+    ) -> Dict[str, Dict]:
+        """Stored features as {match_id: feature_dict} for per-match lookups"""
+        df = self.read(columns=columns, match_ids=match_ids)
+        return df.set_index(KEY_COLUMN).to_dict(orient='index')
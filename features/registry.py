@@ -0,0 +1,233 @@
+"""
+Feature Registry
+Declares every feature group with the features it produces and the raw inputs it reads
+Compiles a pruned execution plan from a model's feature list, shared by training and serving
+
+Used by the FeatureBuilder feature set (training tables and IntegratedPredictor)
+and by the smart-bets batch engine.
+"""
+
+import json
+import hashlib
+from pathlib import Path
+from typing import Callable, Dict, List, Any, Optional, Sequence
+
+
+class FeatureGroup:
+    """
+    Unit of execution: a set of features computed together from raw inputs
+
+    Args:
+        name: Group name (e.g. 'core', 'h2h', 'market_goals')
+        compute: Callable producing {feature_name: values} for a batch
+        features: Feature names the group produces
+        inputs: Raw match_data keys the group reads
+    """
+
+    def __init__(
+        self,
+        name: str,
+        compute: Callable,
+        features: Sequence[str],
+        inputs: Sequence[str]
+    ):
+        self.name = name
+        self.compute = compute
+        self.features = list(features)
+        self.inputs = sorted(set(inputs))
+
+    def __repr__(self) -> str:
+        return f"FeatureGroup({self.name!r}, features={len(self.features)}, inputs={len(self.inputs)})"
+
+
+def feature_group(name: str, features: Sequence[str], inputs: Sequence[str]) -> Callable:
+    """
+    Declare a compute function as a feature group
+
+    The declaration is what plans are compiled from, so it is written next
+    to the code; FeatureRegistry.execute rejects a group whose output differs
+    from its declared features.
+
+    Args:
+        name: Group name
+        features: Feature names the function returns, in column order
+        inputs: Raw inputs the function reads
+    """
+    def decorate(compute: Callable) -> Callable:
+        compute.feature_group = (name, list(features), list(inputs))
+        return compute
+    return decorate
+
+
+class FeaturePlan:
+    """
+    Pruned execution plan for a fixed, ordered list of features
+
+    Only the groups owning at least one requested feature are executed.
+    The plan is serializable so a model can store the plan it was trained
+    with and serving can rebuild exactly the same columns.
+    """
+
+    def __init__(self, feature_names: Sequence[str], groups: Sequence[str], inputs: Sequence[str]):
+        self.feature_names = list(feature_names)
+        self.groups = list(groups)
+        self.inputs = list(inputs)
+
+    @property
+    def signature(self) -> str:
+        """Stable hash of the plan (feature order and groups)"""
+        payload = json.dumps({'features': self.feature_names, 'groups': self.groups})
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable representation (stored alongside model metadata)"""
+        return {
+            'feature_names': self.feature_names,
+            'groups': self.groups,
+            'inputs': self.inputs,
+            'signature': self.signature
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'FeaturePlan':
+        """Rebuild a plan from its serialized form"""
+        return cls(data['feature_names'], data['groups'], data.get('inputs', []))
+
+    def save(self, path) -> Path:
+        """Write the plan as JSON"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return path
+
+    @classmethod
+    def load(cls, path) -> 'FeaturePlan':
+        """Read a plan written by save()"""
+        with open(path, 'r') as f:
+            return cls.from_dict(json.load(f))
+
+    def __len__(self) -> int:
+        return len(self.feature_names)
+
+    def __repr__(self) -> str:
+        return f"FeaturePlan(features={len(self.feature_names)}, groups={self.groups})"
+
+
+class FeatureRegistry:
+    """
+    Registry of feature groups in execution order
+
+    When several groups produce the same feature name, the last registered
+    group owns it (matching the dict pipeline, where later groups overwrite
+    earlier ones).
+    """
+
+    def __init__(self):
+        self.groups: Dict[str, FeatureGroup] = {}
+        self.owner: Dict[str, str] = {}
+
+    def register(self, group: FeatureGroup) -> FeatureGroup:
+        """
+        Add a group to the registry
+
+        Args:
+            group: FeatureGroup to register
+
+        Returns:
+            The registered group
+        """
+        if group.name in self.groups:
+            raise ValueError(f"Feature group already registered: {group.name}")
+
+        self.groups[group.name] = group
+        for name in group.features:
+            self.owner[name] = group.name
+
+        return group
+
+    def register_declared(self, compute: Callable) -> FeatureGroup:
+        """
+        Register a function declared with @feature_group
+
+        Args:
+            compute: Decorated function (or bound method)
+
+        Returns:
+            The registered group
+        """
+        declaration = getattr(compute, 'feature_group', None)
+        if declaration is None:
+            raise ValueError(f"{compute.__name__} is not declared with @feature_group")
+
+        name, features, inputs = declaration
+        return self.register(FeatureGroup(name, compute, features, inputs))
+
+    def group_for(self, feature_name: str) -> FeatureGroup:
+        """Group that computes a feature"""
+        if feature_name not in self.owner:
+            raise KeyError(f"Unknown feature: {feature_name}")
+        return self.groups[self.owner[feature_name]]
+
+    def inputs_for(self, feature_name: str) -> List[str]:
+        """Raw inputs needed to compute a feature"""
+        return self.group_for(feature_name).inputs
+
+    def feature_names(self) -> List[str]:
+        """All registered features (first-seen order)"""
+        return list(self.owner)
+
+    def compile(self, feature_names: Optional[Sequence[str]] = None) -> FeaturePlan:
+        """
+        Compile a pruned execution plan
+
+        Args:
+            feature_names: Features the model consumes, in model column order
+                (None for every registered feature)
+
+        Returns:
+            FeaturePlan running only the groups those features need
+        """
+        if feature_names is None:
+            feature_names = self.feature_names()
+
+        unknown = [name for name in feature_names if name not in self.owner]
+        if unknown:
+            raise ValueError(f"Unknown features in plan: {unknown}")
+
+        needed = {self.owner[name] for name in feature_names}
+        groups = [name for name in self.groups if name in needed]
+        inputs = sorted({key for name in groups for key in self.groups[name].inputs})
+
+        return FeaturePlan(feature_names, groups, inputs)
+
+    def execute(self, plan: FeaturePlan, context: Any) -> Dict[str, Any]:
+        """
+        Run the plan's groups and collect the requested features
+
+        Args:
+            plan: Compiled FeaturePlan
+            context: Batch accessor passed to each group's compute callable
+
+        Returns:
+            Dictionary of requested feature name to values
+        """
+        wanted = set(plan.feature_names)
+        features = {}
+
+        for name in plan.groups:
+            if name not in self.groups:
+                raise ValueError(f"Plan references unknown feature group: {name}")
+            group = self.groups[name]
+            produced = group.compute(context)
+            if set(produced) != set(group.features):
+                raise ValueError(
+                    f"Feature group {name} does not match its declaration: "
+                    f"undeclared {sorted(set(produced) - set(group.features))}, "
+                    f"missing {sorted(set(group.features) - set(produced))}"
+                )
+            for feature, values in produced.items():
+                if feature in wanted and self.owner.get(feature) == name:
+                    features[feature] = values
+
+        return features
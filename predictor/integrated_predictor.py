@@ -44,6 +44,7 @@ class IntegratedPredictor:
         }
         self.calibration_models = {}
         self.metadata = {}
+        self.plans = {}
         
         # Load all models
         self._load_all_models()
@@ -72,6 +73,11 @@ class IntegratedPredictor:
             with open(ensemble_meta_path, 'r') as f:
                 self.metadata[market] = json.load(f)
         
+        # Feature plan for the columns the models were trained on
+        self.plans[market] = self.feature_builder.compile_plan(
+            self.metadata.get(market, {}).get('feature_columns')
+        )
+        
         # Load base models
         base_models = self.metadata.get(market, {}).get('base_models', ['xgboost', 'lightgbm', 'logistic'])
         
@@ -101,12 +107,10 @@ class IntegratedPredictor:
         if market not in self.models or not self.models[market]:
             raise ValueError(f"No models loaded for market: {market}")
         
-        # Build features
-        features = self.feature_builder.build_features(match_data)
-        feature_names = self.feature_builder.get_feature_names()
-        
-        # Create DataFrame with correct feature order
-        X = pd.DataFrame([features])[feature_names].fillna(0)
+        # Build only the features the models were trained on, in their order
+        plan = self.plans.get(market) or self.feature_builder.compile_plan()
+        features = self.feature_builder.build_features(match_data, plan=plan)
+        X = pd.DataFrame([features], columns=plan.feature_names)
         
         # Get predictions from all base models
         predictions = {}
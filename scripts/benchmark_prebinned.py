@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Pre-Binned Training Benchmark
+Compares per-fit sklearn training (re-binning every fit) against one
+shared pre-binned matrix reused by every market and parameter trial
+"""
+
+import sys
+import time
+import resource
+import multiprocessing
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from training.config import MARKETS, MODEL_CONFIGS
+from training.binned_matrix import SharedTrainingMatrix
+
+
+def generate_tables(n_rows: int, n_features: int, seed: int = 42) -> dict:
+    """Synthetic market tables sharing one feature matrix"""
+    rng = np.random.default_rng(seed)
+    X = rng.gamma(2.0, 0.75, size=(n_rows, n_features)).astype(np.float32)
+
+    base = pd.DataFrame(X, columns=[f'feature_{i:03d}' for i in range(n_features)])
+    base.insert(0, 'match_id', [f'BENCH_{i:08d}' for i in range(n_rows)])
+    base.insert(1, 'date', pd.Timestamp('2015-01-01') + pd.to_timedelta(np.arange(n_rows), unit='h'))
+
+    tables = {}
+    for i, market in enumerate(MARKETS):
+        logit = X[:, i] - X[:, i + 4] + rng.normal(size=n_rows)
+        df = base.copy()
+        df['y'] = (logit > np.median(logit)).astype(np.int8)
+        tables[market] = df
+    return tables
+
+
+def _trial_params(model_type: str, n_trials: int) -> list:
+    """Parameter variants standing in for hyperparameter trials"""
+    trials = []
+    for depth in [4, 6, 8][:n_trials] + [6] * max(0, n_trials - 3):
+        params = MODEL_CONFIGS[model_type]['params'].copy()
+        params['max_depth'] = depth
+        params['n_estimators'] = 50
+        params.pop('early_stopping_rounds', None)
+        trials.append(params)
+    return trials
+
+
+def _run(mode: str, n_rows: int, n_features: int, n_trials: int, queue):
+    """Train every market x trial in one process and report time and peak RSS"""
+    from xgboost import XGBClassifier
+    from lightgbm import LGBMClassifier
+
+    tables = generate_tables(n_rows, n_features)
+    start = time.perf_counter()
+
+    if mode == 'prebinned':
+        matrix = SharedTrainingMatrix(tables)
+        for model_type in ('xgboost', 'lightgbm'):
+            for params in _trial_params(model_type, n_trials):
+                for market in tables:
+                    matrix.fit(model_type, market, params=params)
+    else:
+        # Same rows and labels, but every fit bins the raw matrix again
+        matrix = SharedTrainingMatrix(tables)
+        X_train = matrix.X['train']
+        for model_type, cls in (('xgboost', XGBClassifier), ('lightgbm', LGBMClassifier)):
+            for params in _trial_params(model_type, n_trials):
+                for market in tables:
+                    y_train = matrix.labels[market]['train']
+                    cls(**params).fit(X_train, y_train)
+
+    seconds = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    queue.put((seconds, peak_mb))
+
+
+def benchmark(n_rows: int = 300000, n_features: int = 100, n_trials: int = 3):
+    """Run both modes in fresh processes so peak memory is comparable"""
+    print("=" * 60)
+    print(f"PRE-BINNED TRAINING BENCHMARK ({n_rows:,} rows, {n_features} features)")
+    print("=" * 60)
+    print(f"   {len(MARKETS)} markets x {n_trials} trials x (XGBoost + LightGBM)")
+
+    context = multiprocessing.get_context('spawn')
+    results = {}
+    for mode in ('per-fit', 'prebinned'):
+        queue = context.Queue()
+        process = context.Process(target=_run, args=(mode, n_rows, n_features, n_trials, queue))
+        process.start()
+        results[mode] = queue.get()
+        process.join()
+
+    print(f"\n{'Mode':12s} {'Time s':>9s} {'Peak RSS MB':>12s}")
+    for mode, (seconds, peak_mb) in results.items():
+        print(f"{mode:12s} {seconds:9.2f} {peak_mb:12.1f}")
+
+    per_fit, prebinned = results['per-fit'], results['prebinned']
+    print(f"\n✅ Speed-up: {per_fit[0] / prebinned[0]:.2f}x, "
+          f"peak RSS {prebinned[1] - per_fit[1]:+.1f} MB")
+
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark shared pre-binned training')
+    parser.add_argument('--rows', type=int, default=300000,
+                        help='Number of synthetic training rows')
+    parser.add_argument('--features', type=int, default=100,
+                        help='Number of feature columns')
+    parser.add_argument('--trials', type=int, default=3,
+                        help='Parameter trials per model type')
+
+    args = parser.parse_args()
+
+    benchmark(args.rows, args.features, args.trials)
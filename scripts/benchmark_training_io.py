@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Training Data I/O Benchmark
+Compares CSV against Parquet and Feather training tables (read time, disk size)
+"""
+
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from training.utils import load_training_data, save_training_data
+
+
+def generate_training_table(n: int, n_features: int = 40, seed: int = 42) -> pd.DataFrame:
+    """Generate a synthetic training table shaped like build_market_tables output"""
+    rng = np.random.default_rng(seed)
+
+    df = pd.DataFrame({
+        'match_id': [f'BENCH_{i:08d}' for i in range(n)],
+        'date': pd.Timestamp('2015-01-01') + pd.to_timedelta(np.sort(rng.integers(0, 10 * 365 * 24, n)), unit='h'),
+        'league': rng.choice(['Premier League', 'La Liga', 'Serie A', 'Bundesliga', 'Ligue 1'], n),
+        'home_team_id': rng.integers(1, 500, n),
+        'away_team_id': rng.integers(1, 500, n)
+    })
+
+    for i in range(n_features):
+        df[f'feature_{i:02d}'] = rng.gamma(2.0, 0.75, n)
+    df['y'] = rng.integers(0, 2, n)
+    df['odds_over25'] = rng.uniform(1.4, 3.2, n)
+
+    return df
+
+
+def _time_read(path: Path, repeats: int, **kwargs) -> float:
+    """Best-of-N read time in seconds"""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        load_training_data(str(path), **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def benchmark(n_rows: int = 1000000, n_features: int = 40, repeats: int = 3):
+    """Write the same table in each format and time full, projected and memory-mapped reads"""
+    print("=" * 60)
+    print(f"TRAINING DATA I/O BENCHMARK ({n_rows:,} rows, {n_features} features)")
+    print("=" * 60)
+
+    df = generate_training_table(n_rows, n_features)
+    projection = ['date', 'y', 'odds_over25']
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in ('csv', 'parquet', 'feather'):
+            path = Path(tmp) / f'training.{fmt}'
+
+            start = time.perf_counter()
+            save_training_data(df, str(path))
+            write_seconds = time.perf_counter() - start
+
+            results[fmt] = {
+                'size_mb': path.stat().st_size / 1e6,
+                'write': write_seconds,
+                'read': _time_read(path, repeats),
+                'projected': _time_read(path, repeats, columns=projection),
+                'mmap': _time_read(path, repeats, memory_map=True) if fmt != 'csv' else None
+            }
+
+    memory_mb = df.memory_usage(deep=True).sum() / 1e6
+    print(f"\n📊 Generated table in memory (64-bit dtypes): {memory_mb:.1f} MB")
+    print(f"\n{'Format':10s} {'Size MB':>9s} {'Write s':>9s} {'Read s':>9s} {'Proj s':>9s} {'Mmap s':>9s}")
+    for fmt, r in results.items():
+        mmap = f"{r['mmap']:9.3f}" if r['mmap'] is not None else f"{'-':>9s}"
+        print(f"{fmt:10s} {r['size_mb']:9.1f} {r['write']:9.3f} {r['read']:9.3f} {r['projected']:9.3f} {mmap}")
+
+    csv = results['csv']
+    for fmt in ('parquet', 'feather'):
+        r = results[fmt]
+        print(f"\n✅ {fmt}: {csv['read'] / r['read']:.1f}x faster full read, "
+              f"{csv['projected'] / r['projected']:.1f}x faster projected read, "
+              f"{csv['size_mb'] / r['size_mb']:.1f}x smaller on disk")
+
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark training data formats')
+    parser.add_argument('--rows', type=int, default=1000000,
+                        help='Number of synthetic training rows')
+    parser.add_argument('--features', type=int, default=40,
+                        help='Number of feature columns')
+    parser.add_argument('--repeats', type=int, default=3,
+                        help='Reads per measurement (best time is reported)')
+
+    args = parser.parse_args()
+
+    benchmark(args.rows, args.features, args.repeats)
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Bulk load historical match files
+Streams JSON/NDJSON match files into the database through staging tables
+(COPY on PostgreSQL, executemany on SQLite) and reports rows/second
+
+Usage:
+    python scripts/bulk_load_matches.py test-data/historical_matches_300.json
+    python scripts/bulk_load_matches.py --generate 1000000 --output data/synthetic_1m.ndjson
+    python scripts/bulk_load_matches.py data/synthetic_1m.ndjson
+"""
+
+import argparse
+import copy
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from data_ingestion.database import engine, init_db
+from data_ingestion.bulk_loader import BulkLoader, iter_match_records, STAGE_CHUNK_ROWS
+
+
+TEMPLATE_FILE = Path(__file__).parent.parent / 'test-data' / 'historical_matches_300.json'
+
+
+def generate_synthetic_file(n: int, output: str, n_teams: int = 400):
+    """
+    Write n synthetic historical matches as NDJSON
+    
+    Records reuse the stats, odds and results of the test-data matches with
+    unique match ids, a pool of n_teams teams and spread-out kickoff times.
+    
+    Args:
+        n: Number of matches
+        output: Output .ndjson path
+        n_teams: Distinct team names
+    """
+    with open(TEMPLATE_FILE, 'r') as f:
+        templates = json.load(f)['matches']
+    
+    start = datetime(2010, 8, 1, 15, 0)
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    
+    print(f"\n🧪 Generating {n:,} synthetic matches...")
+    t0 = time.perf_counter()
+    with open(output, 'w') as f:
+        for i in range(n):
+            record = copy.deepcopy(templates[i % len(templates)])
+            home = i % n_teams
+            away = (i * 7 + 1) % n_teams
+            if away == home:
+                away = (away + 1) % n_teams
+            record['match_id'] = f"SYN_{i:08d}"
+            record['match_datetime'] = (start + timedelta(minutes=30 * i)).isoformat() + 'Z'
+            record.pop('season', None)
+            record['home_team_id'] = f"syn_{home:04d}"
+            record['home_team'] = f"Synthetic FC {home:04d}"
+            record['away_team_id'] = f"syn_{away:04d}"
+            record['away_team'] = f"Synthetic FC {away:04d}"
+            f.write(json.dumps(record) + '\n')
+    
+    size_mb = output.stat().st_size / 1024 ** 2
+    print(f"✅ Wrote {output} ({size_mb:,.0f} MB) in {time.perf_counter() - t0:.1f}s")
+
+
+def load_file(filepath: str, chunk_rows: int) -> dict:
+    """Bulk load one file and print its summary"""
+    print(f"\n📊 Loading {filepath}...")
+    loader = BulkLoader(engine, chunk_rows=chunk_rows)
+    summary = loader.load(iter_match_records(filepath))
+    
+    print(f"✅ Staged {summary['rows_staged']:,} of {summary['rows_read']:,} records "
+          f"({summary['dialect']}) in {summary['stage_seconds']:.1f}s")
+    print(f"   Merged in {summary['merge_seconds']:.1f}s: "
+          f"{summary['matches_created']:,} created, {summary['matches_updated']:,} updated, "
+          f"{summary['teams_created']:,} new teams, {summary['odds_movements']:,} odds movements, "
+          f"{summary['results_upserted']:,} results")
+    print(f"   Unchanged (skipped): {summary['stats_skipped']:,} matches, "
+          f"{summary['odds_skipped']:,} odds, {summary['results_skipped']:,} results")
+    print(f"⚡ {summary['rows_per_second']:,.0f} rows/sec ({summary['seconds']:.1f}s total)")
+    
+    if summary['invalid_rows']:
+        print(f"⚠️  Invalid records skipped: {summary['invalid_rows']:,}")
+        for error in summary['errors'][:5]:  # Show first 5 errors
+            print(f"   - {error}")
+    
+    return summary
+
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description='Bulk load historical match files')
+    parser.add_argument('files', nargs='*',
+                       help='JSON (matches/fixtures array) or NDJSON files to load')
+    parser.add_argument('--chunk-rows', type=int, default=STAGE_CHUNK_ROWS,
+                       help=f'Rows per COPY/executemany call (default: {STAGE_CHUNK_ROWS})')
+    parser.add_argument('--generate', type=int, default=None, metavar='N',
+                       help='Write N synthetic matches to --output first')
+    parser.add_argument('--output', default='data/synthetic_matches.ndjson',
+                       help='Synthetic NDJSON file (default: data/synthetic_matches.ndjson)')
+    
+    args = parser.parse_args()
+    
+    files = list(args.files)
+    if args.generate:
+        generate_synthetic_file(args.generate, args.output)
+        if not files:
+            print(f"\n💡 Load it with: python scripts/bulk_load_matches.py {args.output}")
+            return
+    
+    if not files:
+        parser.error('no files to load')
+    
+    print("=" * 60)
+    print("🚀 Football Betting AI - Bulk Loader")
+    print("=" * 60)
+    
+    init_db()
+    
+    total_rows = 0
+    total_seconds = 0.0
+    for filepath in files:
+        summary = load_file(filepath, args.chunk_rows)
+        total_rows += summary['rows_staged']
+        total_seconds += summary['seconds']
+    
+    if len(files) > 1:
+        print(f"\n⚡ {total_rows:,} rows in {total_seconds:.1f}s "
+              f"({total_rows / total_seconds if total_seconds else 0:,.0f} rows/sec)")
+
+
+if __name__ == "__main__":
+    main()
@@ -49,6 +49,8 @@ def load_historical_matches():
                     print(f"✅ Processed {response.matches_processed} matches")
                     print(f"   Created: {response.matches_created}")
                     print(f"   Updated: {response.matches_updated}")
+                    print(f"   Unchanged (skipped): {response.stats_skipped} matches, "
+                          f"{response.odds_skipped} odds, {response.results_skipped} results")
                     
                     if response.errors:
                         print(f"⚠️  Errors: {len(response.errors)}")
@@ -85,6 +87,8 @@ def load_upcoming_fixtures():
                     print(f"✅ Processed {response.matches_processed} fixtures")
                     print(f"   Created: {response.matches_created}")
                     print(f"   Updated: {response.matches_updated}")
+                    print(f"   Unchanged (skipped): {response.stats_skipped} matches, "
+                          f"{response.odds_skipped} odds, {response.results_skipped} results")
                     
                     if response.errors:
                         print(f"⚠️  Errors: {len(response.errors)}")
@@ -6,16 +6,23 @@ Automated retraining workflow for all markets
 import sys
 from pathlib import Path
 from datetime import datetime
+from typing import Dict, Optional
 import json
 
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from training.build_datasets import build_all_training_datasets
+from training.build_datasets import build_all_training_datasets, update_training_datasets
 from training.train_goals import train_goals_model
 from training.train_btts import train_btts_model
 from training.train_cards import train_cards_model
 from training.train_corners import train_corners_model
+from training.orchestrator import train_markets_parallel
+from training.incremental import (
+    get_watermark, save_watermark, count_new_matches, incremental_update_market,
+    promote_staged_update, discard_staged_update
+)
+from data_ingestion.database import get_db
 from training.config import (
     RETRAIN_CONFIG, MODELS_DIR, TRAINING_DATA_PATHS
 )
@@ -29,18 +36,21 @@ def check_retraining_needed() -> bool:
     Returns:
         True if retraining should proceed
     """
-    # Check if enough new data is available
-    # This is a simplified check - in production, query database for new matches
-    
     print("🔍 Checking if retraining is needed...")
     
-    # For now, always return True (manual trigger)
-    # In production, implement logic to check:
-    # - Number of new matches since last training
-    # - Model performance degradation
-    # - Time since last training
+    watermark = get_watermark()
+    if watermark is None:
+        print("📊 No previous training run recorded")
+        return True
     
-    return True
+    with get_db() as session:
+        new_matches = count_new_matches(session, watermark)
+    
+    min_new = RETRAIN_CONFIG['min_new_matches']
+    print(f"📊 {new_matches} matches completed since {watermark} (minimum {min_new})")
+    
+    # Model degradation is checked per market by the incremental drift check
+    return new_matches >= min_new
 
 
 def validate_model_performance(market: str, metrics: Dict) -> bool:
@@ -94,12 +104,21 @@ def promote_model(market: str, new_version: str):
     print(f"✅ Promoted {market} model to version {new_version}")
 
 
-def retrain_all_models(force: bool = False):
+def retrain_all_models(
+    force: bool = False,
+    parallel: bool = False,
+    cpu_budget: Optional[int] = None,
+    incremental: bool = False
+):
     """
     Main retraining workflow
     
     Args:
         force: Force retraining even if not needed
+        parallel: Train all (market, model) fits in a process pool
+        cpu_budget: Cores available to parallel training (defaults to all)
+        incremental: Warm-start the existing models on matches after the
+            watermark; markets with drift fall back to a full retrain
     """
     print("\n" + "=" * 60)
     print("AUTOMATED MODEL RETRAINING WORKFLOW")
@@ -111,10 +130,18 @@ def retrain_all_models(force: bool = False):
         print("✅ Retraining not needed at this time")
         return
     
-    # Step 1: Build fresh training datasets
+    watermark = get_watermark() if incremental else None
+    if incremental and watermark is None:
+        print("⚠️  No watermark recorded - running a full retrain")
+        incremental = False
+    
+    # Step 1: Build fresh training datasets (only new matches when incremental)
     print("\n📊 Step 1: Building training datasets...")
     try:
-        build_all_training_datasets()
+        if incremental:
+            update_training_datasets(since=watermark)
+        else:
+            build_all_training_datasets()
     except Exception as e:
         print(f"❌ Error building datasets: {e}")
         return
@@ -129,17 +156,55 @@ def retrain_all_models(force: bool = False):
     }
     
     results = {}
+    trained = {}
+    promoted = {}
+    watermarks = {}
+    full_markets = list(markets)
+    
+    if incremental:
+        full_markets = []
+        for market in markets:
+            try:
+                update = incremental_update_market(market, get_watermark(market) or watermark)
+            except Exception as e:
+                print(f"❌ Error updating {market} model incrementally: {e}")
+                update = None
+            
+            if update is None:
+                full_markets.append(market)
+            else:
+                trained[market] = update
+    
+    if parallel and full_markets:
+        print(f"\n📊 Step 2: Training {', '.join(full_markets)} in parallel...")
+        try:
+            parallel_results, _ = train_markets_parallel(full_markets, cpu_budget=cpu_budget)
+            trained.update(parallel_results)
+        except Exception as e:
+            print(f"❌ Error in parallel training: {e}")
+            return
     
     for market in markets:
-        print(f"\n📊 Step 2.{markets.index(market)+1}: Training {market} model...")
-        
         try:
-            result = training_functions[market]()
+            if market in trained:
+                result = trained[market]
+            else:
+                print(f"\n📊 Step 2.{markets.index(market)+1}: Training {market} model...")
+                result = training_functions[market]()
             results[market] = result
             
+            if result.get('mode') == 'skipped':
+                print(f"✅ {market}: not enough new matches - current model kept")
+                promoted[market] = 'skipped'
+                continue
+            
             # Validate performance
             test_metrics = result.get('test_metrics', {})
             if validate_model_performance(market, test_metrics):
+                # Incremental updates are staged; copy them over the live models
+                if result.get('mode') == 'incremental':
+                    promote_staged_update(market)
+                
                 # Get current version and increment
                 market_dir = MODELS_DIR / market
                 ensemble_meta_path = market_dir / 'ensemble_metadata.json'
@@ -167,7 +232,11 @@ def retrain_all_models(force: bool = False):
                 
                 # Promote model
                 promote_model(market, new_version)
+                promoted[market] = result.get('mode', 'full')
+                watermarks[market] = result.get('watermark')
             else:
+                if result.get('mode') == 'incremental':
+                    discard_staged_update(market)
                 print(f"⚠️  {market} model did not meet performance thresholds - not promoted")
         
         except Exception as e:
@@ -185,10 +254,15 @@ def retrain_all_models(force: bool = False):
         if result:
             test_metrics = result.get('test_metrics', {})
             print(f"\n{market.upper()}:")
+            print(f"  Mode:        {result.get('mode', 'full')}")
             print(f"  Log Loss:    {test_metrics.get('log_loss', 'N/A')}")
             print(f"  Brier Score: {test_metrics.get('brier_score', 'N/A')}")
             print(f"  Accuracy:    {test_metrics.get('accuracy', 'N/A')}")
     
+    # Advance the watermark only of markets that were promoted or checked;
+    # matches behind a rejected or failed update are trained on next run
+    save_watermark(promoted, watermarks)
+    
     print("\n" + "=" * 60)
     print(f"✅ RETRAINING COMPLETE")
     print(f"Finished at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
@@ -201,7 +275,18 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Retrain all betting models')
     parser.add_argument('--force', action='store_true', 
                        help='Force retraining even if not needed')
+    parser.add_argument('--parallel', action='store_true',
+                       help='Train all markets and models in a process pool')
+    parser.add_argument('--cpu-budget', type=int, default=None,
+                       help='Cores available to parallel training (default: all)')
+    parser.add_argument('--incremental', action='store_true',
+                       help='Warm-start existing models on matches completed since the last run')
     
     args = parser.parse_args()
     
-    retrain_all_models(force=args.force)
+    retrain_all_models(
+        force=args.force,
+        parallel=args.parallel,
+        cpu_budget=args.cpu_budget,
+        incremental=args.incremental
+    )
@@ -0,0 +1,722 @@
+"""
+Batch Feature Engine
+Columnar NumPy implementation of the FeaturePipeline feature set
+Computes every feature group as array operations over a whole batch of matches
+"""
+
+import numpy as np
+from typing import Dict, List, Any, Optional, Sequence
+import logging
+
+from .ragged import RaggedHistory
+from .registry import FeaturePlan, FeatureRegistry, feature_group
+
+logger = logging.getLogger(__name__)
+
+# Exponential decay weights shared by weighted form and momentum (oldest first)
+FORM_WEIGHTS = np.array([0.4, 0.3, 0.2, 0.1])
+
+# W/D/L to league points
+RESULT_POINTS = {'W': 3.0, 'D': 1.0}
+
+_MISSING = object()
+
+
+class _BatchColumns:
+    """
+    Column accessor over a list of match dictionaries
+    Extracts each raw input once and caches it as an array, and records
+    which raw keys were read
+    """
+
+    def __init__(self, matches_data: Sequence[Dict[str, Any]]):
+        self.matches = matches_data
+        self.size = len(matches_data)
+        self.accessed = set()
+        self._scalars = {}
+        self._histories = {}
+        self._results = {}
+
+    def scalar(self, key: str, default: Any = 0) -> np.ndarray:
+        """
+        Extract a scalar input as float64
+
+        Args:
+            key: Input key
+            default: Scalar default, or array of per-match defaults
+
+        Returns:
+            Array with one value per match
+        """
+        self.accessed.add(key)
+        if key not in self._scalars:
+            raw = [m.get(key, _MISSING) for m in self.matches]
+            present = np.array([v is not _MISSING for v in raw], dtype=bool)
+            values = np.array([0.0 if v is _MISSING else v for v in raw], dtype=np.float64)
+            self._scalars[key] = (values, present)
+
+        values, present = self._scalars[key]
+        if present.all():
+            return values.copy()
+        return np.where(present, values, default).astype(np.float64)
+
+    def ragged(self, key: str) -> RaggedHistory:
+        """History lists for a key packed as a RaggedHistory"""
+        self.accessed.add(key)
+        if key not in self._histories:
+            self._histories[key] = RaggedHistory.from_lists([m.get(key) for m in self.matches])
+        return self._histories[key]
+
+    def results(self, key: str) -> RaggedHistory:
+        """W/D/L result lists packed as points (3/1/0)"""
+        self.accessed.add(key)
+        if key not in self._results:
+            self._results[key] = RaggedHistory.from_lists(
+                [m.get(key) for m in self.matches], encoding=RESULT_POINTS
+            )
+        return self._results[key]
+
+    def form_points(self, key: str) -> np.ndarray:
+        """Average points of a form string (WWDLW), 1.5 when empty"""
+        self.accessed.add(key)
+        out = np.full(self.size, 1.5)
+        for i, m in enumerate(self.matches):
+            form = m.get(key, '')
+            if form:
+                out[i] = (3 * form.count('W') + form.count('D')) / len(form)
+        return out
+
+    def rows(self, *keys: str) -> Sequence[Dict[str, Any]]:
+        """Raw match dictionaries, for groups that walk nested structures"""
+        self.accessed.update(keys)
+        return self.matches
+
+
+class BatchFeatureEngine:
+    """
+    Vectorized feature generation for many matches at once
+    Produces the same values as FeaturePipeline.transform, written into a
+    preallocated float32 matrix with a fixed column order
+
+    Feature groups are registered in a FeatureRegistry; a FeaturePlan
+    compiled from a model's feature list runs only the groups it needs.
+    """
+
+    def __init__(self, feature_names: List[str]):
+        self.feature_names = list(feature_names)
+        self.registry = self._build_registry()
+        self.plan = self.registry.compile(self.feature_names)
+
+    def _build_registry(self) -> FeatureRegistry:
+        """
+        Register every feature group in dict-pipeline order
+
+        Produced features and raw inputs come from each group's @feature_group
+        declaration.
+        """
+        registry = FeatureRegistry()
+
+        for compute in (
+            self._core_features,
+            self._h2h_features,
+            self._momentum_features,
+            self._market_goals_features,
+            self._market_corners_features,
+            self._market_cards_features,
+            self._market_btts_features,
+            self._legacy_features
+        ):
+            registry.register_declared(compute)
+
+        return registry
+
+    def compile_plan(self, feature_names: Optional[Sequence[str]] = None) -> FeaturePlan:
+        """
+        Compile a pruned plan for the given features (all features if None)
+
+        Args:
+            feature_names: Feature columns a model consumes, in model order
+
+        Returns:
+            FeaturePlan
+        """
+        if feature_names is None:
+            return self.plan
+        return self.registry.compile(feature_names)
+
+    def transform(
+        self,
+        matches_data: Sequence[Dict[str, Any]],
+        plan: Optional[FeaturePlan] = None
+    ) -> np.ndarray:
+        """
+        Transform a batch of raw match dictionaries into a feature matrix
+
+        Args:
+            matches_data: List of match data dictionaries
+            plan: Compiled FeaturePlan (defaults to every feature)
+
+        Returns:
+            float32 array of shape (n_matches, n_features) in plan column order
+        """
+        plan = plan or self.plan
+        cols = _BatchColumns(matches_data)
+        matrix = np.full((cols.size, len(plan.feature_names)), np.nan, dtype=np.float32)
+
+        features = self.registry.execute(plan, cols)
+        undeclared = cols.accessed - set(plan.inputs)
+        if undeclared:
+            raise ValueError(f"Feature groups read undeclared inputs: {sorted(undeclared)}")
+
+        for column, name in enumerate(plan.feature_names):
+            matrix[:, column] = features[name]
+
+        logger.info(
+            f"Generated {matrix.shape[1]} features for {matrix.shape[0]} matches "
+            f"(batch engine, groups: {', '.join(plan.groups)})"
+        )
+
+        return matrix
+
+    # ------------------------------------------------------------------
+    # Core statistics (mirrors CoreStatisticsEngine)
+    # ------------------------------------------------------------------
+
+    @feature_group(
+        'core',
+        features=[
+            'home_goals_last_5', 'home_goals_last_10', 'away_goals_last_5', 'away_goals_last_10',
+            'home_corners_last_5', 'away_corners_last_5', 'home_cards_last_5', 'away_cards_last_5',
+            'home_weighted_form', 'away_weighted_form', 'home_goals_variance',
+            'home_consistency_score', 'away_goals_variance', 'away_consistency_score',
+            'home_win_streak', 'home_unbeaten_streak', 'away_win_streak', 'away_unbeaten_streak',
+            'home_scoring_streak', 'away_scoring_streak', 'home_home_goals_avg',
+            'home_home_conceded_avg', 'away_away_goals_avg', 'away_away_conceded_avg',
+            'home_venue_advantage', 'away_venue_disadvantage', 'home_first_half_goals_avg',
+            'away_first_half_goals_avg', 'home_second_half_goals_avg', 'away_second_half_goals_avg',
+            'home_late_goals_rate', 'away_late_goals_rate'
+        ],
+        inputs=[
+            'away_away_conceded_avg', 'away_away_goals_avg', 'away_cards_avg', 'away_cards_history',
+            'away_corners_avg', 'away_corners_history', 'away_first_half_goals_avg', 'away_form',
+            'away_goals_after_75min_rate', 'away_goals_avg', 'away_goals_conceded_avg',
+            'away_goals_history', 'away_results_last_10', 'away_results_last_4',
+            'away_second_half_goals_avg', 'home_cards_avg', 'home_cards_history',
+            'home_corners_avg', 'home_corners_history', 'home_first_half_goals_avg', 'home_form',
+            'home_goals_after_75min_rate', 'home_goals_avg', 'home_goals_conceded_avg',
+            'home_goals_history', 'home_home_conceded_avg', 'home_home_goals_avg',
+            'home_results_last_10', 'home_results_last_4', 'home_second_half_goals_avg'
+        ]
+    )
+    def _core_features(self, cols: _BatchColumns) -> Dict[str, np.ndarray]:
+        features = {}
+
+        home_goals_avg = cols.scalar('home_goals_avg', 0)
+        away_goals_avg = cols.scalar('away_goals_avg', 0)
+
+        # Rolling averages
+        for side, goals_avg in (('home', home_goals_avg), ('away', away_goals_avg)):
+            history = cols.ragged(f'{side}_goals_history')
+            last_5, _ = history.tail_mean(5)
+            last_10, _ = history.tail_mean(10)
+
+            features[f'{side}_goals_last_5'] = np.where(history.lengths >= 5, last_5, goals_avg)
+            features[f'{side}_goals_last_10'] = np.where(
+                history.lengths >= 10, last_10, np.where(history.lengths >= 5, last_5, goals_avg)
+            )
+
+        for stat in ('corners', 'cards'):
+            for side in ('home', 'away'):
+                history = cols.ragged(f'{side}_{stat}_history')
+                features[f'{side}_{stat}_last_5'] = np.where(
+                    history.lengths >= 5,
+                    history.tail_mean(5)[0],
+                    cols.scalar(f'{side}_{stat}_avg', 0)
+                )
+
+        # Weighted form
+        for side in ('home', 'away'):
+            results = cols.results(f'{side}_results_last_4')
+            features[f'{side}_weighted_form'] = np.where(
+                results.lengths >= 4,
+                results.tail_weighted(FORM_WEIGHTS) / FORM_WEIGHTS.sum(),
+                cols.form_points(f'{side}_form')
+            )
+
+        # Variance and consistency
+        for side in ('home', 'away'):
+            history = cols.ragged(f'{side}_goals_history')
+            variance = history.tail_var(10)
+            features[f'{side}_goals_variance'] = np.where(history.lengths >= 5, variance, 0.5)
+            features[f'{side}_consistency_score'] = np.where(history.lengths >= 5, 1 / (1 + variance), 0.67)
+
+        # Streaks
+        for side in ('home', 'away'):
+            results = cols.results(f'{side}_results_last_10')
+            features[f'{side}_win_streak'] = results.trailing_run(results.values == 3)
+            features[f'{side}_unbeaten_streak'] = results.trailing_run(results.values > 0)
+
+        for side in ('home', 'away'):
+            history = cols.ragged(f'{side}_goals_history')
+            features[f'{side}_scoring_streak'] = history.trailing_run(history.values > 0)
+
+        # Venue splits
+        home_goals_conceded_avg = cols.scalar('home_goals_conceded_avg', 0)
+        away_goals_conceded_avg = cols.scalar('away_goals_conceded_avg', 0)
+        features['home_home_goals_avg'] = cols.scalar('home_home_goals_avg', home_goals_avg)
+        features['home_home_conceded_avg'] = cols.scalar('home_home_conceded_avg', home_goals_conceded_avg)
+        features['away_away_goals_avg'] = cols.scalar('away_away_goals_avg', away_goals_avg)
+        features['away_away_conceded_avg'] = cols.scalar('away_away_conceded_avg', away_goals_conceded_avg)
+        features['home_venue_advantage'] = features['home_home_goals_avg'] - home_goals_avg
+        features['away_venue_disadvantage'] = away_goals_avg - features['away_away_goals_avg']
+
+        # Time patterns
+        features['home_first_half_goals_avg'] = cols.scalar('home_first_half_goals_avg', home_goals_avg * 0.45)
+        features['away_first_half_goals_avg'] = cols.scalar('away_first_half_goals_avg', away_goals_avg * 0.45)
+        features['home_second_half_goals_avg'] = cols.scalar('home_second_half_goals_avg', home_goals_avg * 0.55)
+        features['away_second_half_goals_avg'] = cols.scalar('away_second_half_goals_avg', away_goals_avg * 0.55)
+        features['home_late_goals_rate'] = cols.scalar('home_goals_after_75min_rate', 0.25)
+        features['away_late_goals_rate'] = cols.scalar('away_goals_after_75min_rate', 0.25)
+
+        return features
+
+    # ------------------------------------------------------------------
+    # Head-to-head (mirrors HeadToHeadAnalyzer)
+    # ------------------------------------------------------------------
+
+    @feature_group(
+        'h2h',
+        features=[
+            'h2h_home_wins', 'h2h_away_wins', 'h2h_draws', 'h2h_home_win_rate', 'h2h_draw_rate',
+            'h2h_avg_total_goals', 'h2h_avg_total_corners', 'h2h_avg_total_cards', 'h2h_btts_rate',
+            'h2h_over_2_5_rate', 'h2h_recent_trend', 'h2h_goals_trend', 'h2h_corners_trend',
+            'h2h_home_venue_goals_avg', 'h2h_home_venue_advantage', 'h2h_avg_goal_difference',
+            'h2h_goal_diff_variance', 'h2h_dominance_score'
+        ],
+        inputs=[
+            'h2h_history', 'home_team'
+        ]
+    )
+    def _h2h_features(self, cols: _BatchColumns) -> Dict[str, np.ndarray]:
+        n = cols.size
+
+        # Flatten every h2h meeting into parallel arrays tagged with its match row
+        owner, position = [], []
+        total_goals, total_corners, total_cards = [], [], []
+        home_goals, away_goals = [], []
+        home_won, drawn, same_venue = [], [], []
+
+        for i, m in enumerate(cols.rows('home_team', 'h2h_history')):
+            home_team = m.get('home_team')
+            for j, meeting in enumerate(m.get('h2h_history') or []):
+                owner.append(i)
+                position.append(j)
+                total_goals.append(meeting.get('total_goals', 0))
+                total_corners.append(meeting.get('total_corners', 0))
+                total_cards.append(meeting.get('total_cards', 0))
+                home_goals.append(meeting.get('home_goals', 0))
+                away_goals.append(meeting.get('away_goals', 0))
+                home_won.append(meeting.get('winner') == home_team)
+                drawn.append(meeting.get('result') == 'D')
+                same_venue.append(meeting.get('home_team') == home_team)
+
+        owner = np.array(owner, dtype=np.int64)
+        position = np.array(position, dtype=np.int64)
+        total_goals = np.array(total_goals, dtype=np.float64)
+        total_corners = np.array(total_corners, dtype=np.float64)
+        total_cards = np.array(total_cards, dtype=np.float64)
+        home_goals = np.array(home_goals, dtype=np.float64)
+        away_goals = np.array(away_goals, dtype=np.float64)
+        home_won = np.array(home_won, dtype=bool)
+        drawn = np.array(drawn, dtype=bool)
+        same_venue = np.array(same_venue, dtype=bool)
+
+        def segment_sum(values, mask=None):
+            weights = values if mask is None else np.where(mask, values, 0.0)
+            return np.bincount(owner, weights=weights, minlength=n)
+
+        def safe_div(num, den, fill=0.0):
+            return np.divide(num, den, out=np.full(n, fill), where=den > 0)
+
+        count = np.bincount(owner, minlength=n).astype(np.float64)
+        has_h2h = count > 0
+
+        features = {}
+
+        # Outcomes
+        home_wins = np.bincount(owner, weights=home_won.astype(np.float64), minlength=n)
+        draws = np.bincount(owner, weights=drawn.astype(np.float64), minlength=n)
+        features['h2h_home_wins'] = home_wins
+        features['h2h_away_wins'] = count - home_wins - draws
+        features['h2h_draws'] = draws
+        features['h2h_home_win_rate'] = safe_div(home_wins, count)
+        features['h2h_draw_rate'] = safe_div(draws, count)
+
+        # Scoring patterns
+        goals_mean = safe_div(segment_sum(total_goals), count)
+        corners_mean = safe_div(segment_sum(total_corners), count)
+        features['h2h_avg_total_goals'] = goals_mean
+        features['h2h_avg_total_corners'] = corners_mean
+        features['h2h_avg_total_cards'] = safe_div(segment_sum(total_cards), count)
+        btts = ((home_goals > 0) & (away_goals > 0)).astype(np.float64)
+        features['h2h_btts_rate'] = safe_div(segment_sum(btts), count)
+        features['h2h_over_2_5_rate'] = safe_div(segment_sum((total_goals > 2.5).astype(np.float64)), count)
+
+        # Trends (first three meetings vs all); corners trend is absent below 3 meetings
+        recent = position < 3
+        recent_count = np.bincount(owner, weights=recent.astype(np.float64), minlength=n)
+        recent_goals = safe_div(segment_sum(total_goals, recent), recent_count)
+        recent_corners = safe_div(segment_sum(total_corners, recent), recent_count)
+        enough = count >= 3
+        features['h2h_recent_trend'] = np.where(enough, recent_goals - goals_mean, 0.0)
+        features['h2h_goals_trend'] = np.where(enough & (recent_goals > goals_mean), 1.0, 0.0)
+        features['h2h_corners_trend'] = np.where(enough, recent_corners - corners_mean, np.nan)
+
+        # Venue
+        venue_count = np.bincount(owner, weights=same_venue.astype(np.float64), minlength=n)
+        venue_goals = safe_div(segment_sum(total_goals, same_venue), venue_count)
+        features['h2h_home_venue_goals_avg'] = venue_goals
+        features['h2h_home_venue_advantage'] = np.where(venue_count > 0, venue_goals - goals_mean, 0.0)
+
+        # Dominance
+        goal_diff = np.where(same_venue, home_goals - away_goals, away_goals - home_goals)
+        diff_mean = safe_div(segment_sum(goal_diff), count)
+        diff_var = safe_div(segment_sum((goal_diff - diff_mean[owner]) ** 2), count)
+        dominance = np.where(goal_diff > 1, 1.0, np.where(goal_diff > 0, 0.5, 0.0))
+        features['h2h_avg_goal_difference'] = diff_mean
+        features['h2h_goal_diff_variance'] = diff_var
+        features['h2h_dominance_score'] = safe_div(segment_sum(dominance), count)
+
+        # Defaults where there is no h2h history at all
+        defaults = {
+            'h2h_home_win_rate': 0.33,
+            'h2h_draw_rate': 0.33,
+            'h2h_avg_total_goals': 2.5,
+            'h2h_avg_total_corners': 10.0,
+            'h2h_avg_total_cards': 3.5,
+            'h2h_btts_rate': 0.5,
+            'h2h_over_2_5_rate': 0.5,
+            'h2h_corners_trend': 0,
+            'h2h_home_venue_goals_avg': 2.5,
+            'h2h_goal_diff_variance': 1.0,
+            'h2h_dominance_score': 0.5
+        }
+        for name, default in defaults.items():
+            features[name] = np.where(has_h2h, features[name], default)
+
+        return features
+
+    # ------------------------------------------------------------------
+    # Momentum (mirrors MomentumAnalyzer)
+    # ------------------------------------------------------------------
+
+    @feature_group(
+        'momentum',
+        features=[
+            'home_momentum_score', 'away_momentum_score', 'momentum_differential',
+            'home_scoring_momentum', 'home_hot_streak', 'away_scoring_momentum', 'away_hot_streak',
+            'home_defensive_momentum', 'home_clean_sheets_last_3', 'away_defensive_momentum',
+            'away_clean_sheets_last_3', 'home_confidence_score', 'away_confidence_score',
+            'confidence_differential', 'home_under_pressure', 'away_under_pressure',
+            'home_bounce_back', 'away_bounce_back', 'home_overperforming', 'away_overperforming',
+            'home_matches_last_7_days', 'home_days_rest', 'away_matches_last_7_days',
+            'away_days_rest', 'away_travel_distance_km', 'home_fatigue_risk', 'away_fatigue_risk'
+        ],
+        inputs=[
+            'away_actual_vs_expected_points', 'away_conceded_last_3', 'away_conceded_prev_3',
+            'away_days_since_last_match', 'away_goals_last_3', 'away_goals_prev_3',
+            'away_last_loss_margin', 'away_matches_last_7_days', 'away_position_change_last_5',
+            'away_recent_goal_diff', 'away_results_last_4', 'away_results_last_5',
+            'away_travel_distance', 'away_winless_streak', 'home_actual_vs_expected_points',
+            'home_conceded_last_3', 'home_conceded_prev_3', 'home_days_since_last_match',
+            'home_goals_last_3', 'home_goals_prev_3', 'home_last_loss_margin',
+            'home_matches_last_7_days', 'home_position_change_last_5', 'home_recent_goal_diff',
+            'home_results_last_4', 'home_results_last_5', 'home_winless_streak'
+        ]
+    )
+    def _momentum_features(self, cols: _BatchColumns) -> Dict[str, np.ndarray]:
+        features = {}
+
+        # Form momentum
+        for side in ('home', 'away'):
+            results = cols.results(f'{side}_results_last_4')
+            features[f'{side}_momentum_score'] = np.where(
+                results.lengths >= 4, results.tail_weighted(FORM_WEIGHTS) / FORM_WEIGHTS.sum(), 1.5
+            )
+        features['momentum_differential'] = features['home_momentum_score'] - features['away_momentum_score']
+
+        # Scoring and defensive momentum
+        for side in ('home', 'away'):
+            goals_last = cols.ragged(f'{side}_goals_last_3')
+            goals_prev = cols.ragged(f'{side}_goals_prev_3')
+            last_mean, last_count = goals_last.mean()
+            prev_mean, prev_count = goals_prev.mean()
+            both = (last_count > 0) & (prev_count > 0)
+            features[f'{side}_scoring_momentum'] = np.where(both, last_mean - prev_mean, 0.0)
+            features[f'{side}_hot_streak'] = (goals_last.head_sum(2) >= 3).astype(np.float64)
+
+        for side in ('home', 'away'):
+            conceded_last = cols.ragged(f'{side}_conceded_last_3')
+            conceded_prev = cols.ragged(f'{side}_conceded_prev_3')
+            last_mean, last_count = conceded_last.mean()
+            prev_mean, prev_count = conceded_prev.mean()
+            both = (last_count > 0) & (prev_count > 0)
+            features[f'{side}_defensive_momentum'] = np.where(both, prev_mean - last_mean, 0.0)
+            features[f'{side}_clean_sheets_last_3'] = conceded_last.segment_count(conceded_last.values == 0)
+
+        # Confidence
+        for side in ('home', 'away'):
+            results = cols.results(f'{side}_results_last_5')
+            wins = results.segment_count(results.values == 3)
+            counts = results.lengths
+            win_rate = np.divide(wins, counts, out=np.zeros(cols.size), where=counts > 0)
+            goal_diff = cols.scalar(f'{side}_recent_goal_diff', 0)
+            position_change = cols.scalar(f'{side}_position_change_last_5', 0)
+            features[f'{side}_confidence_score'] = np.where(
+                counts > 0,
+                win_rate * 4 + np.minimum(goal_diff / 5, 3) + np.minimum(position_change, 3),
+                5.0
+            )
+        features['confidence_differential'] = features['home_confidence_score'] - features['away_confidence_score']
+
+        # Pressure
+        for side in ('home', 'away'):
+            features[f'{side}_under_pressure'] = (cols.scalar(f'{side}_winless_streak', 0) >= 3).astype(np.float64)
+        for side in ('home', 'away'):
+            features[f'{side}_bounce_back'] = (cols.scalar(f'{side}_last_loss_margin', 0) >= 3).astype(np.float64)
+        for side in ('home', 'away'):
+            features[f'{side}_overperforming'] = np.maximum(0, cols.scalar(f'{side}_actual_vs_expected_points', 0))
+
+        # Fatigue
+        for side in ('home', 'away'):
+            features[f'{side}_matches_last_7_days'] = cols.scalar(f'{side}_matches_last_7_days', 1)
+            features[f'{side}_days_rest'] = cols.scalar(f'{side}_days_since_last_match', 7)
+        features['away_travel_distance_km'] = cols.scalar('away_travel_distance', 0)
+        for side in ('home', 'away'):
+            features[f'{side}_fatigue_risk'] = (
+                (features[f'{side}_matches_last_7_days'] >= 2) & (features[f'{side}_days_rest'] < 4)
+            ).astype(np.float64)
+
+        return features
+
+    # ------------------------------------------------------------------
+    # Market-specific (mirrors MarketSpecificFeatures)
+    # ------------------------------------------------------------------
+
+    @feature_group(
+        'market_goals',
+        features=[
+            'home_xg_last_5', 'away_xg_last_5', 'combined_xg', 'home_xg_diff', 'away_xg_diff',
+            'home_shots_per_game', 'away_shots_per_game', 'combined_shots_per_game',
+            'home_shots_on_target_pct', 'away_shots_on_target_pct', 'home_conversion_rate',
+            'away_conversion_rate', 'home_big_chances_per_game', 'away_big_chances_per_game',
+            'home_attacking_intensity', 'away_attacking_intensity'
+        ],
+        inputs=[
+            'away_big_chances', 'away_goals_avg', 'away_shots_on_target_pct', 'away_shots_per_game',
+            'away_xg_last_5', 'home_big_chances', 'home_goals_avg', 'home_shots_on_target_pct',
+            'home_shots_per_game', 'home_xg_last_5'
+        ]
+    )
+    def _market_goals_features(self, cols: _BatchColumns) -> Dict[str, np.ndarray]:
+        features = {}
+
+        # Goals O/U 2.5
+        home_actual_goals = cols.scalar('home_goals_avg', 1.2)
+        away_actual_goals = cols.scalar('away_goals_avg', 1.0)
+        features['home_xg_last_5'] = cols.scalar('home_xg_last_5', home_actual_goals)
+        features['away_xg_last_5'] = cols.scalar('away_xg_last_5', away_actual_goals)
+        features['combined_xg'] = features['home_xg_last_5'] + features['away_xg_last_5']
+        features['home_xg_diff'] = home_actual_goals - features['home_xg_last_5']
+        features['away_xg_diff'] = away_actual_goals - features['away_xg_last_5']
+
+        home_shots = cols.scalar('home_shots_per_game', 12.0)
+        away_shots = cols.scalar('away_shots_per_game', 10.0)
+        features['home_shots_per_game'] = home_shots
+        features['away_shots_per_game'] = away_shots
+        features['combined_shots_per_game'] = home_shots + away_shots
+        features['home_shots_on_target_pct'] = cols.scalar('home_shots_on_target_pct', 0.35)
+        features['away_shots_on_target_pct'] = cols.scalar('away_shots_on_target_pct', 0.33)
+        features['home_conversion_rate'] = np.divide(
+            home_actual_goals, home_shots, out=np.full(cols.size, 0.1), where=home_shots > 0
+        )
+        features['away_conversion_rate'] = np.divide(
+            away_actual_goals, away_shots, out=np.full(cols.size, 0.1), where=away_shots > 0
+        )
+        features['home_big_chances_per_game'] = cols.scalar('home_big_chances', 2.5)
+        features['away_big_chances_per_game'] = cols.scalar('away_big_chances', 2.0)
+        features['home_attacking_intensity'] = home_shots * features['home_shots_on_target_pct']
+        features['away_attacking_intensity'] = away_shots * features['away_shots_on_target_pct']
+
+        return features
+
+    @feature_group(
+        'market_corners',
+        features=[
+            'home_corners_first_half_avg', 'home_corners_second_half_avg',
+            'away_corners_first_half_avg', 'away_corners_second_half_avg', 'home_possession_avg',
+            'away_possession_avg', 'home_attacking_style_score', 'away_attacking_style_score',
+            'home_corners_conceded_avg', 'away_corners_conceded_avg', 'expected_home_corners',
+            'expected_away_corners', 'expected_total_corners', 'home_corners_variance'
+        ],
+        inputs=[
+            'away_corners_1h_avg', 'away_corners_2h_avg', 'away_corners_against_avg',
+            'away_corners_avg', 'away_possession_pct', 'home_corners_1h_avg', 'home_corners_2h_avg',
+            'home_corners_against_avg', 'home_corners_avg', 'home_corners_history',
+            'home_possession_pct'
+        ]
+    )
+    def _market_corners_features(self, cols: _BatchColumns) -> Dict[str, np.ndarray]:
+        features = {}
+
+        # Corners O/U 9.5
+        home_corners_avg = cols.scalar('home_corners_avg', 5.0)
+        away_corners_avg = cols.scalar('away_corners_avg', 4.5)
+        features['home_corners_first_half_avg'] = cols.scalar('home_corners_1h_avg', home_corners_avg * 0.45)
+        features['home_corners_second_half_avg'] = cols.scalar('home_corners_2h_avg', home_corners_avg * 0.55)
+        features['away_corners_first_half_avg'] = cols.scalar('away_corners_1h_avg', away_corners_avg * 0.45)
+        features['away_corners_second_half_avg'] = cols.scalar('away_corners_2h_avg', away_corners_avg * 0.55)
+        features['home_possession_avg'] = cols.scalar('home_possession_pct', 50.0)
+        features['away_possession_avg'] = cols.scalar('away_possession_pct', 50.0)
+        features['home_attacking_style_score'] = features['home_possession_avg'] / 100 * home_corners_avg
+        features['away_attacking_style_score'] = features['away_possession_avg'] / 100 * away_corners_avg
+        features['home_corners_conceded_avg'] = cols.scalar('home_corners_against_avg', 4.5)
+        features['away_corners_conceded_avg'] = cols.scalar('away_corners_against_avg', 5.0)
+        features['expected_home_corners'] = (home_corners_avg + features['away_corners_conceded_avg']) / 2
+        features['expected_away_corners'] = (away_corners_avg + features['home_corners_conceded_avg']) / 2
+        features['expected_total_corners'] = features['expected_home_corners'] + features['expected_away_corners']
+        corners_history = cols.ragged('home_corners_history')
+        features['home_corners_variance'] = np.where(
+            corners_history.lengths >= 5, corners_history.tail_var(10), 2.0
+        )
+
+        return features
+
+    @feature_group(
+        'market_cards',
+        features=[
+            'home_yellow_cards_avg', 'away_yellow_cards_avg', 'home_red_cards_total',
+            'away_red_cards_total', 'expected_total_cards', 'home_fouls_per_game',
+            'away_fouls_per_game', 'combined_fouls_avg', 'home_fouls_to_cards_ratio',
+            'away_fouls_to_cards_ratio', 'match_rivalry_score', 'match_importance_score',
+            'referee_cards_per_game', 'referee_strictness', 'combined_aggression_score'
+        ],
+        inputs=[
+            'away_fouls_avg', 'away_reds_season', 'away_yellows_avg', 'home_fouls_avg',
+            'home_reds_season', 'home_yellows_avg', 'match_importance', 'referee_cards_avg',
+            'referee_strictness_rating', 'rivalry_intensity'
+        ]
+    )
+    def _market_cards_features(self, cols: _BatchColumns) -> Dict[str, np.ndarray]:
+        features = {}
+
+        # Cards O/U 3.5
+        features['home_yellow_cards_avg'] = cols.scalar('home_yellows_avg', 1.8)
+        features['away_yellow_cards_avg'] = cols.scalar('away_yellows_avg', 1.7)
+        features['home_red_cards_total'] = cols.scalar('home_reds_season', 2)
+        features['away_red_cards_total'] = cols.scalar('away_reds_season', 1)
+        features['expected_total_cards'] = (
+            features['home_yellow_cards_avg'] + features['away_yellow_cards_avg'] +
+            (features['home_red_cards_total'] + features['away_red_cards_total']) / 10
+        )
+        features['home_fouls_per_game'] = cols.scalar('home_fouls_avg', 11.0)
+        features['away_fouls_per_game'] = cols.scalar('away_fouls_avg', 10.5)
+        features['combined_fouls_avg'] = features['home_fouls_per_game'] + features['away_fouls_per_game']
+        features['home_fouls_to_cards_ratio'] = (
+            features['home_fouls_per_game'] / (features['home_yellow_cards_avg'] + 0.1)
+        )
+        features['away_fouls_to_cards_ratio'] = (
+            features['away_fouls_per_game'] / (features['away_yellow_cards_avg'] + 0.1)
+        )
+        features['match_rivalry_score'] = cols.scalar('rivalry_intensity', 0)
+        features['match_importance_score'] = cols.scalar('match_importance', 5)
+        features['referee_cards_per_game'] = cols.scalar('referee_cards_avg', 3.5)
+        features['referee_strictness'] = cols.scalar('referee_strictness_rating', 5.0)
+        features['combined_aggression_score'] = (
+            (features['combined_fouls_avg'] / 20) * 3 +
+            features['match_rivalry_score'] / 10 * 3 +
+            features['referee_strictness'] / 10 * 4
+        )
+
+        return features
+
+    @feature_group(
+        'market_btts',
+        features=[
+            'home_clean_sheets_rate', 'away_clean_sheets_rate', 'home_failed_to_score_rate',
+            'away_failed_to_score_rate', 'btts_probability_estimate', 'home_scored_in_last_5',
+            'away_scored_in_last_5', 'home_scoring_consistency', 'away_scoring_consistency',
+            'home_conceded_in_last_5', 'away_conceded_in_last_5', 'home_defensive_vulnerability',
+            'away_defensive_vulnerability', 'both_teams_score_capability',
+            'both_teams_concede_likelihood', 'btts_composite_score'
+        ],
+        inputs=[
+            'away_blanks_rate', 'away_clean_sheets_rate', 'away_conceded_last_5_count',
+            'away_scored_last_5_count', 'home_blanks_rate', 'home_clean_sheets_rate',
+            'home_conceded_last_5_count', 'home_scored_last_5_count'
+        ]
+    )
+    def _market_btts_features(self, cols: _BatchColumns) -> Dict[str, np.ndarray]:
+        features = {}
+
+        # BTTS Y/N
+        features['home_clean_sheets_rate'] = cols.scalar('home_clean_sheets_rate', 0.3)
+        features['away_clean_sheets_rate'] = cols.scalar('away_clean_sheets_rate', 0.25)
+        features['home_failed_to_score_rate'] = cols.scalar('home_blanks_rate', 0.2)
+        features['away_failed_to_score_rate'] = cols.scalar('away_blanks_rate', 0.25)
+        features['btts_probability_estimate'] = (
+            (1 - features['home_failed_to_score_rate']) *
+            (1 - features['away_failed_to_score_rate'])
+        )
+        features['home_scored_in_last_5'] = cols.scalar('home_scored_last_5_count', 4)
+        features['away_scored_in_last_5'] = cols.scalar('away_scored_last_5_count', 3)
+        features['home_scoring_consistency'] = features['home_scored_in_last_5'] / 5
+        features['away_scoring_consistency'] = features['away_scored_in_last_5'] / 5
+        features['home_conceded_in_last_5'] = cols.scalar('home_conceded_last_5_count', 3)
+        features['away_conceded_in_last_5'] = cols.scalar('away_conceded_last_5_count', 4)
+        features['home_defensive_vulnerability'] = features['home_conceded_in_last_5'] / 5
+        features['away_defensive_vulnerability'] = features['away_conceded_in_last_5'] / 5
+        features['both_teams_score_capability'] = (
+            features['home_scoring_consistency'] * features['away_scoring_consistency']
+        )
+        features['both_teams_concede_likelihood'] = (
+            features['home_defensive_vulnerability'] * features['away_defensive_vulnerability']
+        )
+        features['btts_composite_score'] = (
+            features['btts_probability_estimate'] * 0.4 +
+            features['both_teams_score_capability'] * 0.3 +
+            features['both_teams_concede_likelihood'] * 0.3
+        )
+
+        return features
+
+    # ------------------------------------------------------------------
+    # Legacy features (mirrors FeaturePipeline._add_legacy_features)
+    # ------------------------------------------------------------------
+
+    @feature_group(
+        'legacy',
+        features=[
+            'home_goals_avg', 'away_goals_avg', 'home_goals_conceded_avg',
+            'away_goals_conceded_avg', 'home_corners_avg', 'away_corners_avg', 'home_cards_avg',
+            'away_cards_avg', 'home_btts_rate', 'away_btts_rate', 'combined_goals_avg',
+            'combined_corners_avg', 'combined_cards_avg'
+        ],
+        inputs=[
+            'away_btts_rate', 'away_cards_avg', 'away_corners_avg', 'away_goals_avg',
+            'away_goals_conceded_avg', 'home_btts_rate', 'home_cards_avg', 'home_corners_avg',
+            'home_goals_avg', 'home_goals_conceded_avg'
+        ]
+    )
+    def _legacy_features(self, cols: _BatchColumns) -> Dict[str, np.ndarray]:
+        features = {}
+
+        for key in ('goals_avg', 'goals_conceded_avg', 'corners_avg', 'cards_avg', 'btts_rate'):
+            features[f'home_{key}'] = cols.scalar(f'home_{key}', 0)
+            features[f'away_{key}'] = cols.scalar(f'away_{key}', 0)
+
+        features['combined_goals_avg'] = features['home_goals_avg'] + features['away_goals_avg']
+        features['combined_corners_avg'] = features['home_corners_avg'] + features['away_corners_avg']
+        features['combined_cards_avg'] = features['home_cards_avg'] + features['away_cards_avg']
+
+        return features
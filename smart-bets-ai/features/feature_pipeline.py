@@ -12,6 +12,8 @@ from .core_stats import CoreStatisticsEngine
 from .head_to_head import HeadToHeadAnalyzer
 from .momentum import MomentumAnalyzer
 from .market_specific import MarketSpecificFeatures
+from .batch_engine import BatchFeatureEngine
+from .registry import FeaturePlan
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +32,9 @@ class FeaturePipeline:
         
         self.feature_count = 0
         self.feature_names = []
+        
+        # Columnar engine for batch transforms (fixed column order)
+        self.batch_engine = BatchFeatureEngine(self.get_feature_names())
     
     def transform(self, match_data: Dict[str, Any]) -> Dict[str, float]:
         """
@@ -72,16 +77,44 @@ class FeaturePipeline:
         
         return features
     
-    def transform_batch(self, matches_data: List[Dict[str, Any]]) -> pd.DataFrame:
+    def transform_batch(
+        self,
+        matches_data: List[Dict[str, Any]],
+        use_batch_engine: bool = True,
+        plan: Optional[FeaturePlan] = None
+    ) -> pd.DataFrame:
         """
         Transform multiple matches into feature DataFrame
         
         Args:
             matches_data: List of match data dictionaries
+            use_batch_engine: Compute features with the vectorized batch engine
+                (falls back to the per-match path if the batch cannot be processed)
+            plan: Compiled FeaturePlan restricting the output to a model's
+                features (all features if None)
             
         Returns:
             DataFrame with features for all matches
         """
+        if use_batch_engine and matches_data:
+            try:
+                matrix = self.transform_matrix(matches_data, plan=plan)
+            except (TypeError, ValueError, AttributeError) as e:
+                logger.warning(f"Batch engine failed, falling back to per-match features: {str(e)}")
+            else:
+                match_ids = [
+                    match_data.get('match_id', f'match_{i}')
+                    for i, match_data in enumerate(matches_data)
+                ]
+                df = pd.DataFrame(
+                    matrix,
+                    columns=(plan or self.batch_engine.plan).feature_names,
+                    index=pd.Index(match_ids, name='match_id')
+                )
+                self.feature_count = len(df.columns)
+                logger.info(f"Generated features for {len(df)} matches with {len(df.columns)} features each")
+                return df
+        
         features_list = []
         
         for i, match_data in enumerate(matches_data):
@@ -102,10 +135,46 @@ class FeaturePipeline:
         if 'match_id' in df.columns:
             df = df.set_index('match_id')
         
+        if plan is not None:
+            df = df.reindex(columns=plan.feature_names)
+        
         logger.info(f"Generated features for {len(df)} matches with {len(df.columns)} features each")
         
         return df
     
+    def transform_matrix(
+        self,
+        matches_data: List[Dict[str, Any]],
+        plan: Optional[FeaturePlan] = None
+    ) -> np.ndarray:
+        """
+        Transform multiple matches into a dense float32 feature matrix
+        
+        Args:
+            matches_data: List of match data dictionaries
+            plan: Compiled FeaturePlan (defaults to get_feature_names() order)
+            
+        Returns:
+            Array of shape (n_matches, n_features), columns in plan order
+        """
+        return self.batch_engine.transform(matches_data, plan=plan)
+    
+    def compile_plan(self, feature_names: Optional[List[str]] = None) -> FeaturePlan:
+        """
+        Compile a pruned execution plan for a model's feature list
+        
+        Only the feature groups producing those features run at transform
+        time. Save the plan with the model (plan.save / FeaturePlan.load) so
+        training and serving build identical columns.
+        
+        Args:
+            feature_names: Feature columns the model consumes, in model order
+            
+        Returns:
+            FeaturePlan
+        """
+        return self.batch_engine.compile_plan(feature_names)
+    
     def _add_legacy_features(self, match_data: Dict[str, Any]) -> Dict[str, float]:
         """
         Add basic features from original system for backward compatibility
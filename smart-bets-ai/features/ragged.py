@@ -0,0 +1,140 @@
+"""
+Ragged History Arrays
+Compact offsets + values (CSR-style) representation of per-match history lists
+Window means, variances, streaks and weighted forms are computed with segment
+reductions over the whole batch in one pass
+"""
+
+import numpy as np
+from itertools import chain
+from typing import Dict, Optional, Sequence
+
+
+class RaggedHistory:
+    """
+    Batch of variable-length histories packed into two flat arrays
+
+    Row i holds values[offsets[i]:offsets[i + 1]], oldest first (same order as
+    the source lists, so "last N" means the N most recent values).
+    """
+
+    def __init__(self, values: np.ndarray, offsets: np.ndarray):
+        self.values = values
+        self.offsets = offsets
+        self.lengths = np.diff(offsets)
+        self.n_rows = len(offsets) - 1
+
+        # Row owning each value and its distance from the row's start / end
+        self.row_ids = np.repeat(np.arange(self.n_rows), self.lengths)
+        flat_index = np.arange(len(values))
+        self.position = flat_index - offsets[:-1][self.row_ids]
+        self.position_from_end = offsets[1:][self.row_ids] - flat_index - 1
+
+    @classmethod
+    def from_lists(
+        cls,
+        lists: Sequence[Optional[Sequence]],
+        encoding: Optional[Dict] = None
+    ) -> 'RaggedHistory':
+        """
+        Pack a list of history lists
+
+        Args:
+            lists: One history list per match (None treated as empty)
+            encoding: Optional mapping applied to each item (e.g. W/D/L to points);
+                items missing from the mapping encode as 0
+
+        Returns:
+            RaggedHistory for the batch
+        """
+        lists = [values or () for values in lists]
+        lengths = np.fromiter(map(len, lists), dtype=np.int64, count=len(lists))
+        offsets = np.zeros(len(lists) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+
+        items = chain.from_iterable(lists)
+        if encoding is not None:
+            items = (encoding.get(item, 0.0) for item in items)
+        values = np.fromiter(items, dtype=np.float64, count=int(offsets[-1]))
+
+        return cls(values, offsets)
+
+    def segment_sum(self, weights: Optional[np.ndarray] = None, mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Per-row sum of values (or of given per-value weights)
+
+        Args:
+            weights: Per-value array to sum instead of the values
+            mask: Per-value boolean mask; only masked-in values are summed
+        """
+        weights = self.values if weights is None else weights
+        if mask is not None:
+            weights = np.where(mask, weights, 0.0)
+        return np.bincount(self.row_ids, weights=weights, minlength=self.n_rows)
+
+    def segment_count(self, mask: np.ndarray) -> np.ndarray:
+        """Per-row count of masked-in values"""
+        return np.bincount(self.row_ids, weights=mask.astype(np.float64), minlength=self.n_rows)
+
+    def tail_mask(self, n: int) -> np.ndarray:
+        """Per-value mask of the last n values of each row"""
+        return self.position_from_end < n
+
+    def head_mask(self, n: int) -> np.ndarray:
+        """Per-value mask of the first n values of each row"""
+        return self.position < n
+
+    def mean(self, mask: Optional[np.ndarray] = None) -> tuple:
+        """
+        Per-row mean over masked-in values (0 for empty rows)
+
+        Returns:
+            Tuple of (mean, count)
+        """
+        count = self.lengths.astype(np.float64) if mask is None else self.segment_count(mask)
+        total = self.segment_sum(mask=mask)
+        mean = np.divide(total, count, out=np.zeros(self.n_rows), where=count > 0)
+        return mean, count
+
+    def var(self, mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """Per-row population variance over masked-in values (two-pass)"""
+        mean, count = self.mean(mask)
+        sq_dev = (self.values - mean[self.row_ids]) ** 2
+        total = self.segment_sum(weights=sq_dev, mask=mask)
+        return np.divide(total, count, out=np.zeros(self.n_rows), where=count > 0)
+
+    def tail_mean(self, n: int) -> tuple:
+        """Mean of the last n values of each row, with the window count"""
+        return self.mean(self.tail_mask(n))
+
+    def tail_var(self, n: int) -> np.ndarray:
+        """Population variance of the last n values of each row"""
+        return self.var(self.tail_mask(n))
+
+    def head_sum(self, n: int) -> np.ndarray:
+        """Sum of the first n values of each row"""
+        return self.segment_sum(mask=self.head_mask(n))
+
+    def tail_weighted(self, weights: np.ndarray) -> np.ndarray:
+        """
+        Weighted sum of the last len(weights) values of each row
+
+        Weights are ordered oldest first and right-aligned, so the most recent
+        value always takes weights[-1].
+        """
+        k = len(weights)
+        in_window = self.tail_mask(k)
+        value_weights = np.asarray(weights, dtype=np.float64)[np.clip(k - 1 - self.position_from_end, 0, k - 1)]
+        return self.segment_sum(weights=self.values * value_weights, mask=in_window)
+
+    def trailing_run(self, flags: np.ndarray) -> np.ndarray:
+        """
+        Length of the trailing run of True flags in each row (current streak)
+
+        Args:
+            flags: Per-value boolean array
+        """
+        run = self.lengths.astype(np.float64)
+        breaks = ~flags
+        np.minimum.at(run, self.row_ids[breaks], self.position_from_end[breaks])
+        return run
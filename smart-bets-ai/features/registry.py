@@ -0,0 +1,28 @@
+"""
+Feature Registry
+Re-exports the project-level feature registry (features/registry.py), which is
+shared with the training/serving FeatureBuilder
+
+This package shadows the project-level 'features' namespace on sys.path, so the
+shared module is loaded from its file.
+"""
+
+import sys
+import importlib.util
+from pathlib import Path
+
+_SHARED_MODULE = 'football_features_registry'
+_SHARED_PATH = Path(__file__).resolve().parent.parent.parent / 'features' / 'registry.py'
+
+if _SHARED_MODULE not in sys.modules:
+    _spec = importlib.util.spec_from_file_location(_SHARED_MODULE, _SHARED_PATH)
+    _module = importlib.util.module_from_spec(_spec)
+    sys.modules[_SHARED_MODULE] = _module
+    _spec.loader.exec_module(_module)
+
+FeatureGroup = sys.modules[_SHARED_MODULE].FeatureGroup
+FeaturePlan = sys.modules[_SHARED_MODULE].FeaturePlan
+FeatureRegistry = sys.modules[_SHARED_MODULE].FeatureRegistry
+feature_group = sys.modules[_SHARED_MODULE].feature_group
+
+__all__ = ['FeatureGroup', 'FeaturePlan', 'FeatureRegistry', 'feature_group']
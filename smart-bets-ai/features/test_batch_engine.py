@@ -0,0 +1,205 @@
+"""
+Batch Feature Engine Test
+Checks the vectorized batch engine against the per-match dict pipeline
+"""
+
+import sys
+import random
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from features import FeatureGroup, FeaturePipeline, FeaturePlan, FeatureRegistry, feature_group
+from features.batch_engine import _BatchColumns
+from features.ragged import RaggedHistory
+
+
+def make_match(rng: random.Random, i: int) -> dict:
+    """Random match with variable-length histories and optional keys"""
+    teams = ['Team A', 'Team B', 'Team C', 'Team D']
+    home, away = rng.sample(teams, 2)
+
+    def goals(n):
+        return [rng.randint(0, 4) for _ in range(n)]
+
+    def results(n):
+        return [rng.choice('WDL') for _ in range(n)]
+
+    match = {
+        'match_id': f'M{i:04d}',
+        'home_team': home,
+        'away_team': away,
+        'home_goals_avg': round(rng.uniform(0.5, 2.5), 2),
+        'away_goals_avg': round(rng.uniform(0.5, 2.5), 2),
+        'home_goals_conceded_avg': round(rng.uniform(0.5, 2.0), 2),
+        'away_goals_conceded_avg': round(rng.uniform(0.5, 2.0), 2),
+        'home_corners_avg': round(rng.uniform(3, 7), 2),
+        'away_corners_avg': round(rng.uniform(3, 7), 2),
+        'home_cards_avg': round(rng.uniform(1, 3), 2),
+        'away_cards_avg': round(rng.uniform(1, 3), 2),
+        'home_btts_rate': round(rng.random(), 2),
+        'away_btts_rate': round(rng.random(), 2),
+        'home_form': ''.join(results(rng.choice([0, 5]))),
+        'away_form': ''.join(results(5)),
+        'home_goals_history': goals(rng.randint(0, 14)),
+        'away_goals_history': goals(rng.randint(0, 14)),
+        'home_corners_history': goals(rng.randint(0, 8)),
+        'home_results_last_4': results(rng.choice([0, 2, 4])),
+        'away_results_last_4': results(4),
+        'home_results_last_10': results(rng.randint(0, 10)),
+        'away_results_last_10': results(rng.randint(0, 10)),
+        'home_results_last_5': results(rng.randint(0, 5)),
+        'home_goals_last_3': goals(rng.randint(0, 3)),
+        'home_goals_prev_3': goals(rng.randint(0, 3)),
+        'away_conceded_last_3': goals(rng.randint(0, 3)),
+        'away_conceded_prev_3': goals(3),
+        'home_recent_goal_diff': rng.randint(-5, 10),
+        'home_shots_per_game': rng.choice([0, 11.5]),
+        'h2h_history': [
+            {
+                'home_team': rng.choice([home, away]),
+                'winner': rng.choice([home, away, None]),
+                'result': rng.choice(['H', 'D', 'A']),
+                'home_goals': rng.randint(0, 4),
+                'away_goals': rng.randint(0, 4),
+                'total_goals': rng.randint(0, 7),
+                'total_corners': rng.randint(4, 15),
+                'total_cards': rng.randint(0, 7)
+            }
+            for _ in range(rng.randint(0, 6))
+        ]
+    }
+
+    if rng.random() < 0.5:
+        match['home_home_goals_avg'] = round(rng.uniform(0.5, 3.0), 2)
+    if rng.random() < 0.5:
+        match['home_xg_last_5'] = round(rng.uniform(0.5, 3.0), 2)
+
+    return match
+
+
+def test_batch_engine_matches_dict_path():
+    """Batch engine output equals the per-match pipeline output"""
+    rng = random.Random(7)
+    matches = [make_match(rng, i) for i in range(300)]
+
+    pipeline = FeaturePipeline()
+    expected = pipeline.transform_batch(matches, use_batch_engine=False)
+    actual = pipeline.transform_batch(matches)
+
+    assert actual.values.dtype == np.float32
+    assert list(actual.columns) == pipeline.get_feature_names()
+    assert list(actual.index) == list(expected.index)
+    assert set(expected.columns) == set(actual.columns)
+
+    expected = expected[actual.columns].astype(np.float64)
+    np.testing.assert_allclose(actual.values, expected.values, rtol=1e-5, atol=1e-6)
+
+
+def test_batch_engine_empty_inputs_use_defaults():
+    """Matches without any optional inputs get the documented defaults"""
+    pipeline = FeaturePipeline()
+    df = pipeline.transform_batch([{'match_id': 'EMPTY'}])
+
+    assert df.loc['EMPTY', 'h2h_avg_total_goals'] == np.float32(2.5)
+    assert df.loc['EMPTY', 'home_weighted_form'] == np.float32(1.5)
+    assert df.loc['EMPTY', 'home_goals_variance'] == np.float32(0.5)
+    assert df.loc['EMPTY', 'home_conversion_rate'] == np.float32(0.1)
+
+
+def test_feature_plan_prunes_groups():
+    """A plan for a model's columns runs only the owning groups, in model order"""
+    rng = random.Random(11)
+    matches = [make_match(rng, i) for i in range(50)]
+
+    pipeline = FeaturePipeline()
+    full = pipeline.transform_batch(matches)
+
+    columns = ['combined_goals_avg', 'home_xg_last_5', 'h2h_btts_rate', 'home_goals_avg']
+    plan = pipeline.compile_plan(columns)
+
+    assert plan.groups == ['h2h', 'market_goals', 'legacy']
+    assert 'h2h_history' in plan.inputs
+    assert 'home_corners_history' not in plan.inputs
+
+    pruned = pipeline.transform_batch(matches, plan=plan)
+    assert list(pruned.columns) == columns
+    np.testing.assert_array_equal(pruned.values, full[columns].values)
+
+    restored = FeaturePlan.from_dict(plan.to_dict())
+    assert restored.signature == plan.signature
+    np.testing.assert_array_equal(pipeline.transform_matrix(matches, plan=restored), pruned.values)
+
+
+def test_group_declarations_match_compute():
+    """Every group returns exactly its declared features and reads only declared inputs"""
+    rng = random.Random(5)
+    matches = [make_match(rng, i) for i in range(50)]
+    registry = FeaturePipeline().batch_engine.registry
+
+    for group in registry.groups.values():
+        cols = _BatchColumns(matches)
+        assert list(group.compute(cols)) == group.features, group.name
+        assert cols.accessed <= set(group.inputs), group.name
+        assert cols.accessed, group.name
+
+
+def test_undeclared_outputs_and_inputs_are_rejected():
+    """A group returning or reading something it did not declare fails the transform"""
+    @feature_group('partial', features=['a'], inputs=['x'])
+    def partial(inputs):
+        return {'a': inputs['x'], 'b': inputs['x']}
+
+    registry = FeatureRegistry()
+    registry.register_declared(partial)
+    try:
+        registry.execute(registry.compile(), {'x': 1.0})
+        raise AssertionError('undeclared output accepted')
+    except ValueError as e:
+        assert "undeclared ['b']" in str(e)
+
+    def undeclared(inputs):
+        return {'a': 1.0}
+
+    try:
+        registry.register_declared(undeclared)
+        raise AssertionError('function without @feature_group registered')
+    except ValueError:
+        pass
+
+    engine = FeaturePipeline().batch_engine
+    core = engine.registry.groups['core']
+    engine.registry.groups['core'] = FeatureGroup('core', core.compute, core.features, core.inputs[1:])
+    try:
+        engine.transform([{'match_id': 'M1'}], plan=engine.registry.compile(['home_goals_last_5']))
+        raise AssertionError('undeclared input accepted')
+    except ValueError as e:
+        assert core.inputs[0] in str(e)
+
+
+def test_ragged_history_segment_reductions():
+    """Window means, variances, streaks and weighted tails per row"""
+    history = RaggedHistory.from_lists([[1, 0, 2, 3], [], None, [4, 0]])
+
+    np.testing.assert_array_equal(history.offsets, [0, 4, 4, 4, 6])
+    np.testing.assert_allclose(history.tail_mean(2)[0], [2.5, 0.0, 0.0, 2.0])
+    np.testing.assert_allclose(history.tail_var(3), [np.var([0, 2, 3]), 0.0, 0.0, np.var([4, 0])])
+    np.testing.assert_allclose(history.trailing_run(history.values > 0), [2, 0, 0, 0])
+    np.testing.assert_allclose(history.head_sum(2), [1, 0, 0, 4])
+    np.testing.assert_allclose(history.tail_weighted(np.array([0.5, 0.25, 0.25])), [1.25, 0, 0, 1.0])
+
+    results = RaggedHistory.from_lists([['W', 'D', 'L', 'W', 'W']], encoding={'W': 3.0, 'D': 1.0})
+    np.testing.assert_allclose(results.values, [3, 1, 0, 3, 3])
+    np.testing.assert_allclose(results.trailing_run(results.values > 0), [2])
+
+
+if __name__ == "__main__":
+    test_batch_engine_matches_dict_path()
+    test_batch_engine_empty_inputs_use_defaults()
+    test_feature_plan_prunes_groups()
+    test_group_declarations_match_compute()
+    test_undeclared_outputs_and_inputs_are_rejected()
+    test_ragged_history_segment_reductions()
+    print("✅ Batch engine matches the per-match pipeline")
@@ -0,0 +1,104 @@
+"""
+Training Data Export Test
+Checks that historical JSON is streamed into a training table chunk by chunk
+and read back for training
+"""
+
+import sys
+import json
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import train
+from train import MATCH_COLUMNS, TRAINING_INPUT_COLUMNS, ModelTrainer
+
+SAMPLE_PATH = Path(__file__).parent.parent / 'test-data' / 'historical_matches_sample.json'
+CHUNK_SIZE = 7
+
+
+def historical_file(directory: str) -> tuple:
+    """
+    Historical JSON with metadata before the matches; the first chunk has no
+    results, so its result columns are all null
+    """
+    with open(SAMPLE_PATH, 'r') as f:
+        sample = json.load(f)['matches']
+
+    matches = []
+    for i in range(4 * CHUNK_SIZE + 3):
+        match = dict(sample[i % len(sample)], match_id=f'EXPORT_{i:03d}')
+        if i < CHUNK_SIZE:
+            match.pop('result', None)
+        matches.append(match)
+
+    path = Path(directory) / 'historical.json'
+    path.write_text(json.dumps({'metadata': {'matches': len(matches)}, 'matches': matches}, indent=2))
+    return str(path), matches
+
+
+def expected_table(matches: list) -> pd.DataFrame:
+    """Flattened matches of an in-memory json.load"""
+    df = pd.DataFrame([ModelTrainer._flatten_match(match) for match in matches], columns=MATCH_COLUMNS)
+    df[train.FLOAT_COLUMNS] = df[train.FLOAT_COLUMNS].astype('float64')
+    return df
+
+
+def test_export_streams_multi_block_json():
+    """Parquet and CSV exports equal the flattened file, though the first chunk has all-null columns"""
+    json_stream = sys.modules[train.iter_json_array.__module__]
+    read_block_chars = json_stream.READ_BLOCK_CHARS
+    json_stream.READ_BLOCK_CHARS = 500
+
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            data_path, matches = historical_file(directory)
+            assert Path(data_path).stat().st_size > 20 * json_stream.READ_BLOCK_CHARS
+            expected = expected_table(matches)
+            assert expected['result'].iloc[:CHUNK_SIZE].isna().all()
+
+            trainer = ModelTrainer(models_dir=str(Path(directory) / 'models'))
+            for suffix in ('.parquet', '.csv'):
+                out_path = Path(directory) / f'matches{suffix}'
+                assert trainer.export_training_data(data_path, str(out_path), chunk_size=CHUNK_SIZE) == len(matches)
+
+                if suffix == '.parquet':
+                    exported = pd.read_parquet(out_path)
+                else:
+                    exported = pd.read_csv(out_path, keep_default_na=False, na_values=[''])
+                assert list(exported.columns) == MATCH_COLUMNS
+                pd.testing.assert_frame_equal(
+                    exported[train.FLOAT_COLUMNS], expected[train.FLOAT_COLUMNS], check_dtype=False
+                )
+                assert exported['match_id'].tolist() == expected['match_id'].tolist()
+                assert exported['result'].iloc[:CHUNK_SIZE].isna().all()
+                assert exported['result'].iloc[CHUNK_SIZE:].tolist() == expected['result'].iloc[CHUNK_SIZE:].tolist()
+    finally:
+        json_stream.READ_BLOCK_CHARS = read_block_chars
+
+
+def test_load_training_data_reads_training_columns():
+    """Training loads the exported table with the team stats, form and targets only"""
+    with tempfile.TemporaryDirectory() as directory:
+        data_path, matches = historical_file(directory)
+        expected = expected_table(matches)[TRAINING_INPUT_COLUMNS]
+
+        trainer = ModelTrainer(models_dir=str(Path(directory) / 'models'))
+        df = trainer.load_training_data(data_path, chunk_size=CHUNK_SIZE)
+
+        assert (Path(directory) / 'models' / 'training_matches.parquet').exists()
+        assert list(df.columns) == TRAINING_INPUT_COLUMNS
+        pd.testing.assert_frame_equal(df, expected, check_dtype=False)
+
+        empty = Path(directory) / 'empty.json'
+        empty.write_text(json.dumps({'metadata': {}, 'matches': []}))
+        assert len(trainer.load_training_data(str(empty))) == 0
+
+
+if __name__ == "__main__":
+    test_export_streams_multi_block_json()
+    test_load_training_data_reads_training_columns()
+    print("✅ All training data export tests passed")
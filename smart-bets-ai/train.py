@@ -7,8 +7,10 @@ import os
 import sys
 import json
 import pickle
+import importlib.util
 from datetime import datetime
 from pathlib import Path
+from typing import Optional
 import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split, cross_val_score
@@ -22,11 +24,68 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 sys.path.insert(0, str(Path(__file__).parent))
 
+
+def _load_module_from_file(name: str, path: Path):
+    """Import a module from its file under `name` (once per process)"""
+    if name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+    return sys.modules[name]
+
+
 # Try importing from smart_bets_ai package first, fallback to direct import
 try:
     from smart_bets_ai.features import FeatureEngineer
 except ImportError:
-    from features import FeatureEngineer
+    try:
+        from features import FeatureEngineer
+    except ImportError:
+        # The features/ package (advanced pipeline) shadows features.py on sys.path
+        FeatureEngineer = _load_module_from_file(
+            'smart_bets_feature_engineer', Path(__file__).parent / 'features.py'
+        ).FeatureEngineer
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+
+TARGET_COLUMNS = ['over_2_5', 'cards_over_3_5', 'corners_over_9_5', 'btts_yes']
+
+# Columns of a flattened match, in export order
+MATCH_INFO_COLUMNS = [
+    'match_id', 'match_datetime', 'season', 'league', 'status',
+    'home_team_id', 'home_team', 'away_team_id', 'away_team'
+]
+TEAM_STAT_COLUMNS = [
+    'home_goals_avg', 'away_goals_avg', 'home_goals_conceded_avg', 'away_goals_conceded_avg',
+    'home_corners_avg', 'away_corners_avg', 'home_cards_avg', 'away_cards_avg',
+    'home_btts_rate', 'away_btts_rate'
+]
+FORM_COLUMNS = ['home_form', 'away_form']
+RESULT_COLUMNS = [
+    'home_goals', 'away_goals', 'result', 'total_goals', 'home_corners', 'away_corners',
+    'total_corners', 'home_cards', 'away_cards', 'total_cards', 'btts'
+]
+MATCH_COLUMNS = MATCH_INFO_COLUMNS + TEAM_STAT_COLUMNS + FORM_COLUMNS + RESULT_COLUMNS + TARGET_COLUMNS
+
+# Stats, results and targets stored as floats (NaN when the result is missing),
+# so every chunk has the same column types
+FLOAT_COLUMNS = TEAM_STAT_COLUMNS + [col for col in RESULT_COLUMNS + TARGET_COLUMNS if col != 'result']
+
+# Columns read back from the exported table for training
+TRAINING_INPUT_COLUMNS = TEAM_STAT_COLUMNS + FORM_COLUMNS + TARGET_COLUMNS
+
+# Streaming JSON reader shared with the bulk loader, loaded from its file so the
+# data_ingestion package (and its database engine) is not imported
+iter_json_array = _load_module_from_file(
+    'football_json_stream', project_root / 'data-ingestion' / 'json_stream.py'
+).iter_json_array
 
 
 class ModelTrainer:
@@ -53,97 +112,209 @@ class ModelTrainer:
             'eval_metric': 'logloss'
         }
     
-    def load_training_data(self, data_path: str) -> pd.DataFrame:
+    @staticmethod
+    def _flatten_match(match: dict) -> dict:
+        """
+        Flatten one historical match record into a training row
+        
+        Args:
+            match: Match dictionary from the historical JSON file
+            
+        Returns:
+            Flat dictionary with match info, team stats and targets
+        """
+        # Extract match info
+        match_data = {
+            'match_id': match['match_id'],
+            'match_datetime': match['match_datetime'],
+            'season': match['season'],
+            'league': match['league'],
+            'status': match['status'],
+            'home_team_id': match['home_team_id'],
+            'home_team': match['home_team'],
+            'away_team_id': match['away_team_id'],
+            'away_team': match['away_team']
+        }
+        
+        # Extract team stats
+        stats = match.get('team_stats_at_match_time', {})
+        match_data.update({
+            'home_goals_avg': stats.get('home_goals_avg', 0),
+            'away_goals_avg': stats.get('away_goals_avg', 0),
+            'home_goals_conceded_avg': stats.get('home_goals_conceded_avg', 0),
+            'away_goals_conceded_avg': stats.get('away_goals_conceded_avg', 0),
+            'home_corners_avg': stats.get('home_corners_avg', 0),
+            'away_corners_avg': stats.get('away_corners_avg', 0),
+            'home_cards_avg': stats.get('home_cards_avg', 0),
+            'away_cards_avg': stats.get('away_cards_avg', 0),
+            'home_btts_rate': stats.get('home_btts_rate', 0),
+            'away_btts_rate': stats.get('away_btts_rate', 0),
+            'home_form': stats.get('home_form', ''),
+            'away_form': stats.get('away_form', '')
+        })
+        
+        # Extract results (targets)
+        result = match.get('result', {})
+        match_data.update({
+            'home_goals': result.get('home_goals'),
+            'away_goals': result.get('away_goals'),
+            'result': result.get('result'),
+            'total_goals': result.get('total_goals'),
+            'home_corners': result.get('home_corners'),
+            'away_corners': result.get('away_corners'),
+            'total_corners': result.get('total_corners'),
+            'home_cards': result.get('home_cards'),
+            'away_cards': result.get('away_cards'),
+            'total_cards': result.get('total_cards'),
+        })
+        
+        # Convert boolean targets to integers (0/1) for XGBoost
+        # This is critical - XGBoost needs integer labels, not booleans
+        btts_value = result.get('btts')
+        match_data['btts'] = int(btts_value) if btts_value is not None else None
+        match_data['btts_yes'] = match_data['btts']  # Alias for consistency
+        
+        over_2_5_value = result.get('over_2_5')
+        match_data['over_2_5'] = int(over_2_5_value) if over_2_5_value is not None else None
+        
+        corners_over_9_5_value = result.get('corners_over_9_5')
+        match_data['corners_over_9_5'] = int(corners_over_9_5_value) if corners_over_9_5_value is not None else None
+        
+        cards_over_3_5_value = result.get('cards_over_3_5')
+        match_data['cards_over_3_5'] = int(cards_over_3_5_value) if cards_over_3_5_value is not None else None
+        
+        return match_data
+    
+    def iter_training_chunks(self, data_path: str, chunk_size: int = 50000):
+        """
+        Stream historical matches as DataFrame chunks
+        
+        The JSON file is parsed incrementally, so memory stays bounded by
+        chunk_size rather than the size of the file.
+        
+        Args:
+            data_path: Path to JSON file with historical matches
+            chunk_size: Matches per chunk
+            
+        Yields:
+            DataFrame chunks of flattened matches (MATCH_COLUMNS, with
+            FLOAT_COLUMNS as floats)
+        """
+        def to_frame(rows):
+            chunk = pd.DataFrame(rows, columns=MATCH_COLUMNS)
+            chunk[FLOAT_COLUMNS] = chunk[FLOAT_COLUMNS].astype('float64')
+            return chunk
+        
+        rows = []
+        for match in iter_json_array(data_path, keys=('matches',)):
+            rows.append(self._flatten_match(match))
+            if len(rows) >= chunk_size:
+                yield to_frame(rows)
+                rows = []
+        
+        if rows:
+            yield to_frame(rows)
+    
+    def load_training_data(
+        self,
+        data_path: str,
+        chunk_size: int = 50000,
+        table_path: Optional[str] = None
+    ) -> pd.DataFrame:
         """
         Load historical match data for training
         
+        The JSON file is streamed into a columnar table chunk by chunk
+        (export_training_data) and only the columns training uses (team
+        stats, form and targets) are read back, so the parsed records and
+        the match info columns are never held in memory at once.
+        
         Args:
             data_path: Path to JSON file with historical matches
+            chunk_size: Matches parsed per chunk
+            table_path: Exported table (defaults to training_matches.parquet,
+                or .csv without pyarrow, in the models directory)
             
         Returns:
             DataFrame with match data
         """
-        with open(data_path, 'r') as f:
-            data = json.load(f)
-        
-        matches = []
-        for match in data.get('matches', []):
-            # Extract match info
-            match_data = {
-                'match_id': match['match_id'],
-                'match_datetime': match['match_datetime'],
-                'season': match['season'],
-                'league': match['league'],
-                'status': match['status'],
-                'home_team_id': match['home_team_id'],
-                'home_team': match['home_team'],
-                'away_team_id': match['away_team_id'],
-                'away_team': match['away_team']
-            }
-            
-            # Extract team stats
-            stats = match.get('team_stats_at_match_time', {})
-            match_data.update({
-                'home_goals_avg': stats.get('home_goals_avg', 0),
-                'away_goals_avg': stats.get('away_goals_avg', 0),
-                'home_goals_conceded_avg': stats.get('home_goals_conceded_avg', 0),
-                'away_goals_conceded_avg': stats.get('away_goals_conceded_avg', 0),
-                'home_corners_avg': stats.get('home_corners_avg', 0),
-                'away_corners_avg': stats.get('away_corners_avg', 0),
-                'home_cards_avg': stats.get('home_cards_avg', 0),
-                'away_cards_avg': stats.get('away_cards_avg', 0),
-                'home_btts_rate': stats.get('home_btts_rate', 0),
-                'away_btts_rate': stats.get('away_btts_rate', 0),
-                'home_form': stats.get('home_form', ''),
-                'away_form': stats.get('away_form', '')
-            })
-            
-            # Extract results (targets)
-            result = match.get('result', {})
-            match_data.update({
-                'home_goals': result.get('home_goals'),
-                'away_goals': result.get('away_goals'),
-                'result': result.get('result'),
-                'total_goals': result.get('total_goals'),
-                'home_corners': result.get('home_corners'),
-                'away_corners': result.get('away_corners'),
-                'total_corners': result.get('total_corners'),
-                'home_cards': result.get('home_cards'),
-                'away_cards': result.get('away_cards'),
-                'total_cards': result.get('total_cards'),
-            })
-            
-            # Convert boolean targets to integers (0/1) for XGBoost
-            # This is critical - XGBoost needs integer labels, not booleans
-            btts_value = result.get('btts')
-            match_data['btts'] = int(btts_value) if btts_value is not None else None
-            match_data['btts_yes'] = match_data['btts']  # Alias for consistency
-            
-            over_2_5_value = result.get('over_2_5')
-            match_data['over_2_5'] = int(over_2_5_value) if over_2_5_value is not None else None
-            
-            corners_over_9_5_value = result.get('corners_over_9_5')
-            match_data['corners_over_9_5'] = int(corners_over_9_5_value) if corners_over_9_5_value is not None else None
-            
-            cards_over_3_5_value = result.get('cards_over_3_5')
-            match_data['cards_over_3_5'] = int(cards_over_3_5_value) if cards_over_3_5_value is not None else None
-            
-            matches.append(match_data)
+        if table_path is None:
+            suffix = '.parquet' if PYARROW_AVAILABLE else '.csv'
+            table_path = self.models_dir / f"training_matches{suffix}"
         
-        df = pd.DataFrame(matches)
+        self.export_training_data(data_path, str(table_path), chunk_size)
+        
+        if Path(table_path).suffix == '.parquet':
+            df = pd.read_parquet(table_path, columns=TRAINING_INPUT_COLUMNS)
+        else:
+            df = pd.read_csv(table_path, usecols=TRAINING_INPUT_COLUMNS)[TRAINING_INPUT_COLUMNS]
         
         # Validate data quality
         print(f"✅ Loaded {len(df)} matches from {data_path}")
         
         # Check for missing targets
-        target_cols = ['over_2_5', 'cards_over_3_5', 'corners_over_9_5', 'btts_yes']
-        for col in target_cols:
+        for col in TARGET_COLUMNS:
             missing = df[col].isna().sum()
             if missing > 0:
                 print(f"⚠️  Warning: {missing} matches missing {col} target")
         
         return df
     
+    def export_training_data(self, data_path: str, out_path: str, chunk_size: int = 50000) -> int:
+        """
+        Convert historical JSON into a columnar training file chunk by chunk
+        
+        Writes Parquet when pyarrow is installed (one row group per chunk),
+        otherwise writes CSV. Every chunk has the MATCH_COLUMNS; text columns
+        that are all-null in the first chunk are typed as strings, so later
+        chunks holding values still fit the file schema.
+        
+        Args:
+            data_path: Path to JSON file with historical matches
+            out_path: Output file (.parquet or .csv)
+            chunk_size: Matches per chunk
+            
+        Returns:
+            Number of matches written
+        """
+        out_path = Path(out_path)
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        use_parquet = out_path.suffix == '.parquet'
+        if use_parquet and not PYARROW_AVAILABLE:
+            raise ImportError("pyarrow is required to write .parquet files (pip install pyarrow)")
+        
+        writer = None
+        total = 0
+        try:
+            for chunk in self.iter_training_chunks(data_path, chunk_size):
+                if use_parquet:
+                    table = pa.Table.from_pandas(chunk, preserve_index=False)
+                    if writer is None:
+                        # Text columns that are all-null in the first chunk get a concrete type
+                        schema = pa.schema([
+                            field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+                            for field in table.schema
+                        ])
+                        writer = pq.ParquetWriter(str(out_path), schema)
+                    writer.write_table(table.cast(writer.schema))
+                else:
+                    chunk.to_csv(out_path, mode='w' if total == 0 else 'a', header=(total == 0), index=False)
+                total += len(chunk)
+        finally:
+            if writer is not None:
+                writer.close()
+        
+        if total == 0:
+            # No matches: an empty table with the match columns
+            empty = pd.DataFrame(columns=MATCH_COLUMNS)
+            if use_parquet:
+                empty.to_parquet(out_path, index=False)
+            else:
+                empty.to_csv(out_path, index=False)
+        
+        print(f"💾 Exported {total} matches to {out_path}")
+        return total
+    
     def train_model(
         self, 
         X_train: pd.DataFrame, 
@@ -3,6 +3,8 @@
 
 -- Drop existing tables if they exist
 DROP TABLE IF EXISTS predictions CASCADE;
+DROP TABLE IF EXISTS odds_movements CASCADE;
+DROP TABLE IF EXISTS match_odds_latest CASCADE;
 DROP TABLE IF EXISTS match_odds CASCADE;
 DROP TABLE IF EXISTS match_results CASCADE;
 DROP TABLE IF EXISTS matches CASCADE;
@@ -95,6 +97,9 @@ CREATE TABLE matches (
     home_form VARCHAR(5),
     away_form VARCHAR(5),
     
+    -- Hash of the ingested match section (unchanged resends are skipped)
+    content_hash VARCHAR(32),
+    
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
@@ -133,10 +138,13 @@ CREATE TABLE match_results (
     cards_over_3_5 BOOLEAN,
     cards_over_4_5 BOOLEAN,
     
+    -- Hash of the ingested result section (unchanged resends are skipped)
+    content_hash VARCHAR(32),
+    
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
--- Match Odds table (current and historical odds)
+-- Match Odds table (full odds snapshots, legacy history)
 CREATE TABLE match_odds (
     odds_id SERIAL PRIMARY KEY,
     match_id VARCHAR(50) REFERENCES matches(match_id) ON DELETE CASCADE,
@@ -186,11 +194,79 @@ CREATE TABLE match_odds (
     
     -- Metadata
     bookmaker VARCHAR(50) DEFAULT 'test_bookmaker',
-    is_latest BOOLEAN DEFAULT true,
     
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Latest Odds table (current odds per match, upserted on every ingest)
+CREATE TABLE match_odds_latest (
+    match_id VARCHAR(50) PRIMARY KEY REFERENCES matches(match_id) ON DELETE CASCADE,
+    odds_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    
+    -- Match Result (1X2)
+    home_win_odds DECIMAL(5,2),
+    draw_odds DECIMAL(5,2),
+    away_win_odds DECIMAL(5,2),
+    
+    -- Total Goals Over/Under
+    over_0_5_odds DECIMAL(5,2),
+    under_0_5_odds DECIMAL(5,2),
+    over_1_5_odds DECIMAL(5,2),
+    under_1_5_odds DECIMAL(5,2),
+    over_2_5_odds DECIMAL(5,2),
+    under_2_5_odds DECIMAL(5,2),
+    over_3_5_odds DECIMAL(5,2),
+    under_3_5_odds DECIMAL(5,2),
+    over_4_5_odds DECIMAL(5,2),
+    under_4_5_odds DECIMAL(5,2),
+    
+    -- Both Teams To Score
+    btts_yes_odds DECIMAL(5,2),
+    btts_no_odds DECIMAL(5,2),
+    
+    -- Double Chance
+    home_or_draw_odds DECIMAL(5,2),
+    away_or_draw_odds DECIMAL(5,2),
+    home_or_away_odds DECIMAL(5,2),
+    
+    -- Corners
+    corners_over_8_5_odds DECIMAL(5,2),
+    corners_under_8_5_odds DECIMAL(5,2),
+    corners_over_9_5_odds DECIMAL(5,2),
+    corners_under_9_5_odds DECIMAL(5,2),
+    corners_over_10_5_odds DECIMAL(5,2),
+    corners_under_10_5_odds DECIMAL(5,2),
+    
+    -- Cards
+    cards_over_3_5_odds DECIMAL(5,2),
+    cards_under_3_5_odds DECIMAL(5,2),
+    cards_over_4_5_odds DECIMAL(5,2),
+    cards_under_4_5_odds DECIMAL(5,2),
+    
+    -- Metadata
+    bookmaker VARCHAR(50) DEFAULT 'test_bookmaker',
+    -- Hash of the ingested odds section (unchanged resends are skipped)
+    content_hash VARCHAR(32),
+    
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Odds Movements table (delta-encoded odds history)
+-- One row per changed price of a (match, bookmaker, selection) series;
+-- delta_cents is the change in hundredths (the first row holds the full
+-- price), so the price at time t is SUM(delta_cents) up to t.
+-- selection is a code into data_ingestion.odds.ODDS_SELECTIONS.
+CREATE TABLE odds_movements (
+    match_id VARCHAR(50) NOT NULL REFERENCES matches(match_id) ON DELETE CASCADE,
+    bookmaker VARCHAR(50) NOT NULL DEFAULT 'test_bookmaker',
+    selection SMALLINT NOT NULL,
+    recorded_at TIMESTAMP NOT NULL,
+    delta_cents INTEGER NOT NULL,
+    
+    -- Series key; also the ON CONFLICT target of the bulk ingestion path
+    PRIMARY KEY (match_id, bookmaker, selection, recorded_at)
+);
+
 -- Predictions table (AI model outputs)
 CREATE TABLE predictions (
     prediction_id SERIAL PRIMARY KEY,
@@ -231,13 +307,15 @@ CREATE TABLE predictions (
 );
 
 -- Indexes for performance
-CREATE INDEX idx_matches_datetime ON matches(match_datetime);
-CREATE INDEX idx_matches_status ON matches(status);
+CREATE INDEX idx_matches_datetime_id ON matches(match_datetime, match_id);
+CREATE INDEX idx_matches_status_datetime ON matches(status, match_datetime, match_id);
+CREATE INDEX idx_matches_league_datetime ON matches(league, match_datetime, match_id);
+CREATE INDEX idx_matches_league_status_datetime ON matches(league, status, match_datetime, match_id);
+CREATE INDEX idx_teams_league ON teams(league, team_id);
 CREATE INDEX idx_matches_home_team ON matches(home_team_id);
 CREATE INDEX idx_matches_away_team ON matches(away_team_id);
 CREATE INDEX idx_match_odds_match_id ON match_odds(match_id);
-CREATE INDEX idx_match_odds_latest ON match_odds(match_id, is_latest);
-CREATE INDEX idx_match_results_match_id ON match_results(match_id);
+CREATE UNIQUE INDEX idx_match_results_match_id ON match_results(match_id);
 CREATE INDEX idx_predictions_match_id ON predictions(match_id);
 CREATE INDEX idx_team_stats_team_season ON team_statistics(team_id, season);
 
@@ -259,7 +337,7 @@ SELECT
 FROM matches m
 JOIN teams ht ON m.home_team_id = ht.team_id
 JOIN teams at ON m.away_team_id = at.team_id
-LEFT JOIN match_odds o ON m.match_id = o.match_id AND o.is_latest = true
+LEFT JOIN match_odds_latest o ON m.match_id = o.match_id
 WHERE m.status = 'scheduled'
 ORDER BY m.match_datetime;
 
@@ -281,7 +359,7 @@ FROM matches m
 JOIN teams ht ON m.home_team_id = ht.team_id
 JOIN teams at ON m.away_team_id = at.team_id
 JOIN match_results r ON m.match_id = r.match_id
-LEFT JOIN match_odds o ON m.match_id = o.match_id AND o.is_latest = true
+LEFT JOIN match_odds_latest o ON m.match_id = o.match_id
 WHERE m.status = 'completed'
 ORDER BY m.match_datetime DESC;
 
@@ -290,5 +368,7 @@ COMMENT ON TABLE teams IS 'Football teams in the system';
 COMMENT ON TABLE team_statistics IS 'Aggregated team performance statistics per season';
 COMMENT ON TABLE matches IS 'All matches (past and upcoming) with team stats snapshot';
 COMMENT ON TABLE match_results IS 'Results for completed matches';
-COMMENT ON TABLE match_odds IS 'Bookmaker odds (current and historical)';
+COMMENT ON TABLE match_odds IS 'Full bookmaker odds snapshots (legacy history)';
+COMMENT ON TABLE odds_movements IS 'Delta-encoded bookmaker odds history (changed prices only)';
+COMMENT ON TABLE match_odds_latest IS 'Current bookmaker odds per match';
 COMMENT ON TABLE predictions IS 'AI model predictions for matches';
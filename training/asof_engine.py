@@ -0,0 +1,226 @@
+"""
+As-Of Rolling Statistics Engine
+Point-in-time team statistics for every match in a single pass
+
+Each team's completed matches are loaded once and sorted into a per-venue
+timeline. Rolling window sums come from prefix sums over the timeline and
+the cut-off for each target match is found by binary search, so a match
+only ever sees results strictly before its kick-off (no leakage).
+"""
+
+import sys
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, Optional
+from sqlalchemy.orm import Session
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from data_ingestion.models import Match, MatchResult
+from training.config import LOOKBACK_WINDOWS, MIN_MATCHES_FOR_STATS
+
+
+# Per-venue stat columns: (home timeline source, away timeline source)
+STAT_SOURCES = {
+    'goals': ('home_goals', 'away_goals'),
+    'goals_conceded': ('away_goals', 'home_goals'),
+    'corners': ('home_corners', 'away_corners'),
+    'cards': ('home_cards', 'away_cards'),
+    'btts': ('btts', 'btts')
+}
+
+TIMELINE_COLUMNS = [
+    'match_id', 'home_team_id', 'away_team_id', 'match_datetime',
+    'home_goals', 'away_goals', 'home_corners', 'away_corners',
+    'home_cards', 'away_cards', 'btts'
+]
+
+
+class _VenueTimeline:
+    """
+    All completed matches of every team at one venue, sorted by (team, kick-off)
+
+    Rows are addressed with a composite integer key so a single
+    np.searchsorted locates the as-of cut-off for many (team, time) pairs.
+    """
+
+    def __init__(self, team_ids: np.ndarray, times: np.ndarray, stats: Dict[str, np.ndarray]):
+        order = np.lexsort((times, team_ids))
+        self.team_ids = team_ids[order]
+        self.times = times[order]
+
+        self.teams, self.team_start = np.unique(self.team_ids, return_index=True)
+        self.time_origin = int(times.min()) if len(times) else 0
+        self.time_span = int(times.max()) - self.time_origin + 2 if len(times) else 2
+
+        team_codes = np.searchsorted(self.teams, self.team_ids)
+        self.keys = team_codes * self.time_span + (self.times - self.time_origin)
+
+        # Prefix sums with a leading zero: window sum = csum[end] - csum[start]
+        self.csums = {}
+        for name, values in stats.items():
+            csum = np.zeros(len(order) + 1)
+            np.cumsum(values[order], out=csum[1:])
+            self.csums[name] = csum
+
+    def locate(self, team_ids: np.ndarray, times: np.ndarray):
+        """
+        Index of the first timeline row at or after each (team, time)
+
+        Returns:
+            Tuple of (cut-off index, number of earlier matches for that team)
+        """
+        n = len(team_ids)
+        end = np.zeros(n, dtype=np.int64)
+        prior = np.zeros(n, dtype=np.int64)
+
+        if len(self.teams) == 0:
+            return end, prior
+
+        code = np.searchsorted(self.teams, team_ids)
+        code = np.minimum(code, len(self.teams) - 1)
+        known = self.teams[code] == team_ids
+
+        # Clip query times into the timeline span so keys never spill into a neighbour team
+        offset = np.clip(times - self.time_origin, 0, self.time_span - 1)
+        keys = code * self.time_span + offset
+        end[known] = np.searchsorted(self.keys, keys[known], side='left')
+        prior[known] = end[known] - self.team_start[code[known]]
+
+        return end, prior
+
+
+class AsOfStatsEngine:
+    """
+    Vectorized point-in-time rolling statistics for home and away teams
+
+    Matches the semantics of DatasetBuilder._calculate_rolling_stats: a
+    team's last `window` completed matches at the same venue strictly before
+    kick-off, and no stats when fewer than MIN_MATCHES_FOR_STATS are available.
+    """
+
+    def __init__(self, timeline: pd.DataFrame, min_matches: int = MIN_MATCHES_FOR_STATS):
+        """
+        Initialize the engine from completed matches
+
+        Args:
+            timeline: DataFrame with TIMELINE_COLUMNS (one row per completed match)
+            min_matches: Minimum prior matches for a window to be valid
+        """
+        self.min_matches = min_matches
+        self.n_matches = len(timeline)
+
+        times = self._to_seconds(timeline['match_datetime'])
+        frame = {
+            col: timeline[col].fillna(0).astype(np.float64).to_numpy()
+            for col in ('home_goals', 'away_goals', 'home_corners', 'away_corners', 'home_cards', 'away_cards')
+        }
+        frame['btts'] = timeline['btts'].fillna(False).astype(bool).astype(np.float64).to_numpy()
+
+        self.venues = {}
+        for venue, side in (('home', 0), ('away', 1)):
+            team_ids = timeline[f'{venue}_team_id'].to_numpy(dtype=np.int64)
+            stats = {name: frame[sources[side]] for name, sources in STAT_SOURCES.items()}
+            self.venues[venue] = _VenueTimeline(team_ids, times, stats)
+
+    @staticmethod
+    def _to_seconds(values: Iterable) -> np.ndarray:
+        """Datetimes as int64 seconds since epoch"""
+        return pd.to_datetime(pd.Series(values)).to_numpy(dtype='datetime64[s]').astype(np.int64)
+
+    @classmethod
+    def from_session(cls, session: Session, **kwargs) -> 'AsOfStatsEngine':
+        """
+        Load every completed match with its result in one query
+
+        Args:
+            session: Database session
+
+        Returns:
+            AsOfStatsEngine
+        """
+        rows = session.query(
+            Match.match_id, Match.home_team_id, Match.away_team_id, Match.match_datetime,
+            MatchResult.home_goals, MatchResult.away_goals,
+            MatchResult.home_corners, MatchResult.away_corners,
+            MatchResult.home_cards, MatchResult.away_cards,
+            MatchResult.btts
+        ).join(
+            MatchResult, Match.match_id == MatchResult.match_id
+        ).filter(
+            Match.status == 'completed'
+        ).all()
+
+        return cls(pd.DataFrame(rows, columns=TIMELINE_COLUMNS), **kwargs)
+
+    def rolling_stats(
+        self,
+        team_ids: Iterable[int],
+        match_datetimes: Iterable,
+        is_home: bool,
+        window: int = LOOKBACK_WINDOWS['short']
+    ) -> Dict[str, np.ndarray]:
+        """
+        Rolling statistics for many (team, kick-off) pairs at once
+
+        Args:
+            team_ids: Team ID per target match
+            match_datetimes: Kick-off per target match (stats use earlier matches only)
+            is_home: Home-venue timeline for home teams, away-venue otherwise
+            window: Number of recent matches to consider
+
+        Returns:
+            Dictionary of arrays: goals_avg, goals_conceded_avg, corners_avg,
+            cards_avg, btts_rate, matches_count and a boolean 'valid' mask
+            (False where fewer than min_matches were available; averages are NaN there)
+        """
+        timeline = self.venues['home' if is_home else 'away']
+        team_ids = np.asarray(list(team_ids), dtype=np.int64)
+        times = self._to_seconds(match_datetimes)
+
+        end, prior = timeline.locate(team_ids, times)
+        count = np.minimum(prior, window)
+        start = end - count
+        valid = count >= self.min_matches
+
+        stats = {}
+        for name, csum in timeline.csums.items():
+            total = csum[end] - csum[start]
+            mean = np.divide(total, count, out=np.full(len(count), np.nan), where=valid)
+            key = 'btts_rate' if name == 'btts' else f'{name}_avg'
+            stats[key] = mean
+
+        stats['matches_count'] = count
+        stats['valid'] = valid
+        return stats
+
+    def all_windows(
+        self,
+        team_ids: Iterable[int],
+        match_datetimes: Iterable,
+        is_home: bool,
+        windows: Optional[Dict[str, int]] = None
+    ) -> Dict[int, Dict[str, np.ndarray]]:
+        """
+        Rolling statistics for every lookback window
+
+        Args:
+            team_ids: Team ID per target match
+            match_datetimes: Kick-off per target match
+            is_home: Venue of the team in the target matches
+            windows: Window sizes (defaults to LOOKBACK_WINDOWS)
+
+        Returns:
+            Dictionary of window size to rolling_stats() output
+        """
+        team_ids = list(team_ids)
+        match_datetimes = list(match_datetimes)
+        windows = windows or LOOKBACK_WINDOWS
+
+        return {
+            size: self.rolling_stats(team_ids, match_datetimes, is_home, size)
+            for size in sorted(set(windows.values()))
+        }
@@ -0,0 +1,337 @@
+"""
+Shared Pre-Binned Training Matrix
+Quantizes the feature matrix shared by all markets once per dataset version
+
+The market tables hold the same matches and feature columns and differ only
+in label and odds. The feature matrix is binned once into an XGBoost
+QuantileDMatrix and a LightGBM Dataset (raw data freed after construction).
+Every market and every hyperparameter trial swaps in its labels with
+set_label and trains on the same bins.
+"""
+
+import sys
+import hashlib
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import xgboost as xgb
+    XGBOOST_AVAILABLE = True
+except ImportError:
+    XGBOOST_AVAILABLE = False
+
+try:
+    import lightgbm as lgb
+    LIGHTGBM_AVAILABLE = True
+except ImportError:
+    LIGHTGBM_AVAILABLE = False
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from training.config import (
+    BINNING_CONFIG, MARKETS, MODEL_CONFIGS, TRAINING_DATA_PATHS, TRAIN_SPLIT, VAL_SPLIT
+)
+from training.utils import (
+    calculate_metrics, get_feature_columns, load_training_data, time_based_split
+)
+
+
+# Models that train on the shared bins; others use the raw matrix
+PREBINNED_MODELS = ['xgboost', 'lightgbm']
+
+SPLITS = ['train', 'val', 'test']
+
+
+class PrebinnedBooster:
+    """
+    Binary classifier around a booster trained on the shared bins
+
+    Exposes the parts of the XGBClassifier / LGBMClassifier interface the
+    training, incremental and serving code use (predict_proba, predict,
+    feature_importances_, get_booster / booster_).
+    """
+
+    def __init__(self, booster, library: str, feature_names: List[str], best_iteration: Optional[int] = None):
+        """
+        Initialize the wrapper
+
+        Args:
+            booster: Trained xgboost.Booster or lightgbm.Booster
+            library: 'xgboost' or 'lightgbm'
+            feature_names: Feature columns in training order
+            best_iteration: Last iteration to predict with (early stopping)
+        """
+        self.booster = booster
+        self.library = library
+        self.feature_names = list(feature_names)
+        self.best_iteration = best_iteration
+        self.classes_ = np.array([0, 1])
+
+    def _frame(self, X):
+        if isinstance(X, pd.DataFrame):
+            return X[self.feature_names]
+        return pd.DataFrame(np.asarray(X), columns=self.feature_names)
+
+    def predict_proba(self, X) -> np.ndarray:
+        X = self._frame(X)
+        if self.library == 'xgboost':
+            iteration_range = (0, self.best_iteration + 1) if self.best_iteration is not None else (0, 0)
+            proba = self.booster.inplace_predict(X, iteration_range=iteration_range)
+        else:
+            proba = self.booster.predict(X, num_iteration=self.best_iteration)
+        proba = np.asarray(proba, dtype=np.float64)
+        return np.column_stack([1 - proba, proba])
+
+    def predict(self, X) -> np.ndarray:
+        return (self.predict_proba(X)[:, 1] >= 0.5).astype(int)
+
+    @property
+    def feature_importances_(self) -> np.ndarray:
+        if self.library == 'xgboost':
+            scores = self.booster.get_score(importance_type='gain')
+            importance = np.array([scores.get(name, 0.0) for name in self.feature_names])
+            total = importance.sum()
+            return importance / total if total > 0 else importance
+        return self.booster.feature_importance(importance_type='split').astype(np.float64)
+
+    def get_booster(self):
+        """XGBoost booster (for continued training with xgb_model=)"""
+        return self.booster
+
+    @property
+    def booster_(self):
+        """LightGBM booster (for continued training with init_model=)"""
+        return self.booster
+
+
+def train_booster(
+    model_type: str,
+    dtrain,
+    dval,
+    params: Optional[Dict] = None,
+    n_threads: Optional[int] = None,
+    max_bin: int = BINNING_CONFIG['max_bin']
+) -> tuple:
+    """
+    Train an XGBoost / LightGBM booster on already-binned data
+
+    Args:
+        model_type: 'xgboost' or 'lightgbm'
+        dtrain, dval: XGBoost DMatrix / QuantileDMatrix or LightGBM Dataset pair
+        params: Model parameters in MODEL_CONFIGS (sklearn) naming
+            (defaults to MODEL_CONFIGS[model_type]['params'])
+        n_threads: Library thread count
+        max_bin: Histogram bins the data was quantized with
+
+    Returns:
+        Tuple of (booster, best_iteration or None without early stopping)
+    """
+    params = dict(params if params is not None else MODEL_CONFIGS[model_type]['params'])
+    rounds = params.pop('n_estimators', 100)
+    early_stopping = params.pop('early_stopping_rounds', None)
+
+    if model_type == 'xgboost':
+        params.update(objective='binary:logistic', tree_method='hist', max_bin=max_bin)
+        if n_threads is not None:
+            params['nthread'] = n_threads
+
+        booster = xgb.train(
+            params, dtrain, num_boost_round=rounds,
+            evals=[(dval, 'validation')],
+            early_stopping_rounds=early_stopping,
+            verbose_eval=False
+        )
+    elif model_type == 'lightgbm':
+        params['objective'] = 'binary'
+        if n_threads is not None:
+            params['num_threads'] = n_threads
+
+        callbacks = [lgb.early_stopping(early_stopping, verbose=False)] if early_stopping else []
+        booster = lgb.train(
+            params, dtrain, num_boost_round=rounds,
+            valid_sets=[dval], callbacks=callbacks
+        )
+    else:
+        raise ValueError(f"Model type {model_type} does not train on pre-binned data")
+
+    return booster, (booster.best_iteration if early_stopping else None)
+
+
+class SharedTrainingMatrix:
+    """
+    Feature matrix of all markets, split by time and binned once
+
+    Rows are the matches present in every market table, ordered and split
+    exactly like prepare_data() (time-based split). Labels are kept per
+    market; the XGBoost and LightGBM bins are built on first use and reused
+    by every market and hyperparameter trial.
+    """
+
+    def __init__(self, tables: Dict[str, pd.DataFrame], max_bin: int = BINNING_CONFIG['max_bin']):
+        """
+        Initialize from market training tables
+
+        Args:
+            tables: Dictionary of market to training DataFrame
+            max_bin: Histogram bins per feature
+        """
+        self.markets = list(tables.keys())
+        self.max_bin = max_bin
+
+        base = next(iter(tables.values()))
+        shared_ids = set(base['match_id'])
+        for table in tables.values():
+            shared_ids &= set(table['match_id'])
+        base = base[base['match_id'].isin(shared_ids)]
+
+        self.feature_columns = get_feature_columns(base)
+        split_frames = dict(zip(SPLITS, time_based_split(base, TRAIN_SPLIT, VAL_SPLIT, 'date')))
+
+        self.match_ids = {split: frame['match_id'].to_numpy() for split, frame in split_frames.items()}
+        self.X = {
+            split: frame[self.feature_columns].fillna(0).astype(np.float32).reset_index(drop=True)
+            for split, frame in split_frames.items()
+        }
+
+        self.labels = {}
+        for market, table in tables.items():
+            y = table.drop_duplicates('match_id').set_index('match_id')['y']
+            self.labels[market] = {
+                split: y.reindex(ids).fillna(0).astype(int).reset_index(drop=True)
+                for split, ids in self.match_ids.items()
+            }
+
+        digest = hashlib.sha1()
+        digest.update(','.join(self.feature_columns).encode())
+        for split in SPLITS:
+            digest.update(','.join(map(str, self.match_ids[split])).encode())
+        digest.update(str(max_bin).encode())
+        self.version = digest.hexdigest()[:12]
+
+        self._xgb = None
+        self._lgb = None
+
+    @classmethod
+    def from_training_tables(
+        cls,
+        markets: Optional[List[str]] = None,
+        data_paths: Optional[Dict[str, str]] = None,
+        **kwargs
+    ) -> 'SharedTrainingMatrix':
+        """
+        Load the market training tables and build the shared matrix
+
+        Args:
+            markets: Markets to include (defaults to all of MARKETS)
+            data_paths: Mapping of market to training data (defaults to TRAINING_DATA_PATHS)
+
+        Returns:
+            SharedTrainingMatrix
+        """
+        markets = markets or list(MARKETS.keys())
+        data_paths = data_paths or {market: str(TRAINING_DATA_PATHS[market]) for market in markets}
+
+        tables = {}
+        for market in markets:
+            df = load_training_data(data_paths[market])
+            tables[market] = df.dropna(subset=['y'])
+
+        return cls(tables, **kwargs)
+
+    def data_tuple(self, market: str) -> tuple:
+        """Split data of a market in the prepare_data() layout"""
+        labels = self.labels[market]
+        return (
+            self.X['train'], labels['train'],
+            self.X['val'], labels['val'],
+            self.X['test'], labels['test'],
+            self.feature_columns
+        )
+
+    def xgb_matrices(self, market: str) -> Tuple:
+        """
+        QuantileDMatrix pair (train, validation) labelled for a market
+
+        The quantile sketch is computed on the first call only.
+        """
+        if not XGBOOST_AVAILABLE:
+            raise ImportError("xgboost is required for pre-binned training (pip install xgboost)")
+
+        if self._xgb is None:
+            dtrain = xgb.QuantileDMatrix(self.X['train'], label=self.labels[market]['train'], max_bin=self.max_bin)
+            dval = xgb.QuantileDMatrix(self.X['val'], label=self.labels[market]['val'], ref=dtrain)
+            self._xgb = (dtrain, dval)
+
+        dtrain, dval = self._xgb
+        dtrain.set_label(self.labels[market]['train'].to_numpy())
+        dval.set_label(self.labels[market]['val'].to_numpy())
+        return dtrain, dval
+
+    def lgb_datasets(self, market: str) -> Tuple:
+        """
+        Constructed LightGBM Dataset pair (train, validation) labelled for a market
+
+        Bins are built on the first call only and the raw data is freed.
+        Binning parameters (max_bin, ...) are fixed for the lifetime of the matrix.
+        """
+        if not LIGHTGBM_AVAILABLE:
+            raise ImportError("lightgbm is required for pre-binned training (pip install lightgbm)")
+
+        if self._lgb is None:
+            params = {'max_bin': self.max_bin, 'feature_pre_filter': False, 'verbose': -1}
+            dtrain = lgb.Dataset(
+                self.X['train'], label=self.labels[market]['train'],
+                params=params, free_raw_data=True
+            ).construct()
+            dval = lgb.Dataset(
+                self.X['val'], label=self.labels[market]['val'],
+                reference=dtrain, params=params, free_raw_data=True
+            ).construct()
+            self._lgb = (dtrain, dval)
+
+        dtrain, dval = self._lgb
+        dtrain.set_label(self.labels[market]['train'].to_numpy())
+        dval.set_label(self.labels[market]['val'].to_numpy())
+        return dtrain, dval
+
+    def fit(
+        self,
+        model_type: str,
+        market: str,
+        params: Optional[Dict] = None,
+        n_threads: Optional[int] = None
+    ) -> tuple:
+        """
+        Train one booster for a market on the shared bins
+
+        Args:
+            model_type: 'xgboost' or 'lightgbm'
+            market: Market whose labels to train on
+            params: Model parameters in MODEL_CONFIGS (sklearn) naming
+                (defaults to MODEL_CONFIGS[model_type]['params'])
+            n_threads: Library thread count
+
+        Returns:
+            Tuple of (model, val_predictions, metrics) like train_single_model()
+        """
+        if model_type == 'xgboost':
+            dtrain, dval = self.xgb_matrices(market)
+        elif model_type == 'lightgbm':
+            dtrain, dval = self.lgb_datasets(market)
+        else:
+            raise ValueError(f"Model type {model_type} does not train on pre-binned data")
+
+        booster, best_iteration = train_booster(
+            model_type, dtrain, dval, params=params, n_threads=n_threads, max_bin=self.max_bin
+        )
+
+        model = PrebinnedBooster(booster, model_type, self.feature_columns, best_iteration)
+        val_proba = model.predict_proba(self.X['val'])[:, 1]
+        metrics = calculate_metrics(self.labels[market]['val'], val_proba, (val_proba >= 0.5).astype(int))
+
+        return model, val_proba, metrics
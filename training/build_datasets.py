@@ -3,33 +3,103 @@ Dataset Builder for Training
 Prepares clean training datasets for each market from historical match data
 """
 
+import os
 import sys
+import json
+import time
+import hashlib
+import inspect
+from contextlib import contextmanager
+from itertools import islice
 from pathlib import Path
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from typing import Optional, Dict, List
+from typing import Optional, Dict, Iterator, List
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, func
+from sqlalchemy import func, event
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
 
 # Add project root to path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from data_ingestion.database import get_db
-from data_ingestion.models import Match, MatchResult, MatchOdds, Team, TeamStatistic
+from data_ingestion.models import Match, MatchResult, LatestOdds, Team, TeamStatistic
 from training.config import (
     TRAINING_DATA_PATHS, LOOKBACK_WINDOWS, MIN_MATCHES_FOR_STATS,
-    MARKETS, DATA_PROCESSED_DIR
+    MARKETS, DATA_PROCESSED_DIR, FEATURE_STORE_DIR, TRAINING_DATA_CSV_PATHS
 )
+from training.utils import optimize_training_dtypes, save_training_data
+from features.feature_builder import FeatureBuilder
+from features.registry import FeaturePlan
+from features.feature_store import FeatureStore
+from training.asof_engine import AsOfStatsEngine
+from training.sql_rolling import stream_training_rows, window_stats, LABEL_COLUMNS, ODDS_COLUMNS
+
+
+# Result attribute (label) and latest-odds attribute per market
+MARKET_SOURCES = {
+    'goals': ('over_2_5', 'over_2_5_odds'),
+    'btts': ('btts', 'btts_yes_odds'),
+    'cards': ('cards_over_3_5', 'cards_over_3_5_odds'),
+    'corners': ('corners_over_9_5', 'corners_over_9_5_odds')
+}
+
+# Leading columns of the shared feature frame (the feature columns follow)
+MATCH_INFO_COLUMNS = ['match_id', 'date', 'league', 'home_team_id', 'away_team_id']
 
 
 class DatasetBuilder:
     """Builds training datasets from database or raw files"""
     
-    def __init__(self, session: Optional[Session] = None):
+    def __init__(
+        self,
+        session: Optional[Session] = None,
+        feature_store: Optional[FeatureStore] = None,
+        rolling_backend: str = 'asof',
+        feature_plan: Optional[FeaturePlan] = None
+    ):
+        """
+        Initialize the builder
+        
+        Args:
+            session: Database session
+            feature_store: Optional FeatureStore for reusing computed features
+            rolling_backend: 'asof' (in-memory as-of engine) or 'sql'
+                (window functions evaluated by the database)
+            feature_plan: FeaturePlan of the feature columns to build
+                (defaults to every FeatureBuilder feature)
+        """
+        if rolling_backend not in ('asof', 'sql'):
+            raise ValueError(f"Unknown rolling_backend: {rolling_backend}. Must be 'asof' or 'sql'")
+        
+        self.feature_builder = FeatureBuilder()
+        self.feature_plan = feature_plan or self.feature_builder.compile_plan()
+        if feature_store is not None and self.feature_plan.feature_names != self.feature_builder.get_feature_names():
+            raise ValueError("A feature store holds every feature; it cannot be used with a pruned feature plan")
+        
         self.session = session
         self.lookback = LOOKBACK_WINDOWS
+        self.rolling_backend = rolling_backend
+        self.asof_engine = None
+        
+        # Feature store and newly computed rows awaiting append
+        self.feature_store = feature_store
+        self._pending_features = []
+    
+    def _get_asof_engine(self) -> AsOfStatsEngine:
+        """Load every team's completed-match timeline once (single query)"""
+        if self.asof_engine is None:
+            self.asof_engine = AsOfStatsEngine.from_session(self.session)
+            print(f"📈 Loaded {self.asof_engine.n_matches} completed matches into as-of engine")
+        return self.asof_engine
     
     def _calculate_rolling_stats(
         self, 
@@ -53,60 +123,12 @@ class DatasetBuilder:
         if not self.session:
             return {}
         
-        # Query recent matches before this date
-        if is_home:
-            matches = self.session.query(Match, MatchResult).join(
-                MatchResult, Match.match_id == MatchResult.match_id
-            ).filter(
-                and_(
-                    Match.home_team_id == team_id,
-                    Match.match_datetime < match_date,
-                    Match.status == 'completed'
-                )
-            ).order_by(Match.match_datetime.desc()).limit(window).all()
-        else:
-            matches = self.session.query(Match, MatchResult).join(
-                MatchResult, Match.match_id == MatchResult.match_id
-            ).filter(
-                and_(
-                    Match.away_team_id == team_id,
-                    Match.match_datetime < match_date,
-                    Match.status == 'completed'
-                )
-            ).order_by(Match.match_datetime.desc()).limit(window).all()
-        
-        if len(matches) < MIN_MATCHES_FOR_STATS:
+        stats = self._get_asof_engine().rolling_stats([team_id], [match_date], is_home, window)
+        if not stats['valid'][0]:
             return {}
         
-        # Calculate statistics
-        goals_scored = []
-        goals_conceded = []
-        corners = []
-        cards = []
-        btts_count = 0
-        
-        for match, result in matches:
-            if is_home:
-                goals_scored.append(result.home_goals)
-                goals_conceded.append(result.away_goals)
-                corners.append(result.home_corners or 0)
-                cards.append(result.home_cards or 0)
-            else:
-                goals_scored.append(result.away_goals)
-                goals_conceded.append(result.home_goals)
-                corners.append(result.away_corners or 0)
-                cards.append(result.away_cards or 0)
-            
-            if result.btts:
-                btts_count += 1
-        
         return {
-            'goals_avg': np.mean(goals_scored) if goals_scored else 0,
-            'goals_conceded_avg': np.mean(goals_conceded) if goals_conceded else 0,
-            'corners_avg': np.mean(corners) if corners else 0,
-            'cards_avg': np.mean(cards) if cards else 0,
-            'btts_rate': btts_count / len(matches) if matches else 0,
-            'matches_count': len(matches)
+            key: values[0] for key, values in stats.items() if key != 'valid'
         }
     
     def _get_match_features(self, match: Match, result: MatchResult) -> Dict:
@@ -118,268 +140,594 @@ class DatasetBuilder:
             result: MatchResult object
             
         Returns:
-            Dictionary with match features
+            Dictionary with match features (None where rolling stats are insufficient)
         """
-        # Get rolling stats for both teams
-        home_stats_5 = self._calculate_rolling_stats(
-            match.home_team_id, match.match_datetime, is_home=True, window=5
-        )
-        away_stats_5 = self._calculate_rolling_stats(
-            match.away_team_id, match.match_datetime, is_home=False, window=5
-        )
-        
-        home_stats_10 = self._calculate_rolling_stats(
-            match.home_team_id, match.match_datetime, is_home=True, window=10
-        )
-        away_stats_10 = self._calculate_rolling_stats(
-            match.away_team_id, match.match_datetime, is_home=False, window=10
-        )
-        
-        # Skip if insufficient data
-        if not home_stats_5 or not away_stats_5:
+        if not self.session:
             return None
         
-        features = {
-            # Match info
-            'match_id': match.match_id,
-            'date': match.match_datetime,
-            'league': match.league,
-            'home_team_id': match.home_team_id,
-            'away_team_id': match.away_team_id,
-            
-            # Rolling averages (5 matches)
-            'home_goals_avg_5': home_stats_5['goals_avg'],
-            'away_goals_avg_5': away_stats_5['goals_avg'],
-            'home_goals_conceded_avg_5': home_stats_5['goals_conceded_avg'],
-            'away_goals_conceded_avg_5': away_stats_5['goals_conceded_avg'],
-            'home_corners_avg_5': home_stats_5['corners_avg'],
-            'away_corners_avg_5': away_stats_5['corners_avg'],
-            'home_cards_avg_5': home_stats_5['cards_avg'],
-            'away_cards_avg_5': away_stats_5['cards_avg'],
-            'home_btts_rate_5': home_stats_5['btts_rate'],
-            'away_btts_rate_5': away_stats_5['btts_rate'],
-            
-            # Rolling averages (10 matches) if available
-            'home_goals_avg_10': home_stats_10.get('goals_avg', home_stats_5['goals_avg']),
-            'away_goals_avg_10': away_stats_10.get('goals_avg', away_stats_5['goals_avg']),
-            'home_goals_conceded_avg_10': home_stats_10.get('goals_conceded_avg', home_stats_5['goals_conceded_avg']),
-            'away_goals_conceded_avg_10': away_stats_10.get('goals_conceded_avg', away_stats_5['goals_conceded_avg']),
-            
-            # Derived features
-            'combined_goals_avg': home_stats_5['goals_avg'] + away_stats_5['goals_avg'],
-            'combined_corners_avg': home_stats_5['corners_avg'] + away_stats_5['corners_avg'],
-            'combined_cards_avg': home_stats_5['cards_avg'] + away_stats_5['cards_avg'],
-            'combined_btts_rate': (home_stats_5['btts_rate'] + away_stats_5['btts_rate']) / 2,
+        return self._build_match_features([match])[0]
+    
+    def _build_match_features(self, matches: List[Match]) -> List[Optional[Dict]]:
+        """
+        Extract features for many matches at once (vectorized _get_match_features)
+        
+        Args:
+            matches: Match objects
             
-            # Attack vs Defense
-            'home_attack_vs_away_defense': home_stats_5['goals_avg'] - away_stats_5['goals_conceded_avg'],
-            'away_attack_vs_home_defense': away_stats_5['goals_avg'] - home_stats_5['goals_conceded_avg'],
+        Returns:
+            Feature dictionary per match (None where rolling stats are insufficient)
+        """
+        if not matches:
+            return []
+        
+        engine = self._get_asof_engine()
+        info = {
+            'match_id': [m.match_id for m in matches],
+            'date': [m.match_datetime for m in matches],
+            'league': [m.league for m in matches],
+            'home_team_id': [m.home_team_id for m in matches],
+            'away_team_id': [m.away_team_id for m in matches]
         }
         
-        return features
+        short, medium = self.lookback['short'], self.lookback['medium']
+        home_5 = engine.rolling_stats(info['home_team_id'], info['date'], is_home=True, window=short)
+        away_5 = engine.rolling_stats(info['away_team_id'], info['date'], is_home=False, window=short)
+        home_10 = engine.rolling_stats(info['home_team_id'], info['date'], is_home=True, window=medium)
+        away_10 = engine.rolling_stats(info['away_team_id'], info['date'], is_home=False, window=medium)
+        
+        frame, valid = self._assemble_feature_frame(info, home_5, away_5, home_10, away_10)
+        records = frame.to_dict(orient='records')
+        return [record if ok else None for record, ok in zip(records, valid)]
     
-    def build_training_table_for_goals(
-        self, 
-        out_path: Optional[str] = None
-    ) -> pd.DataFrame:
+    def _assemble_feature_frame(
+        self,
+        info: Dict[str, List],
+        home_5: Dict[str, np.ndarray],
+        away_5: Dict[str, np.ndarray],
+        home_10: Dict[str, np.ndarray],
+        away_10: Dict[str, np.ndarray]
+    ) -> tuple:
         """
-        Build training dataset for Goals Over 2.5 market
+        Assemble the training feature frame from rolling stats
+        
+        The rolling stats are mapped to the inputs of the feature plan
+        ('{side}_{stat}_5' and '{side}_{stat}_10', the latter falling back to
+        the 5-match value where the 10-match window lacks history) and the
+        plan is run by FeatureBuilder, as at serving time.
         
         Args:
-            out_path: Path to save CSV (optional)
+            info: Match info columns (match_id, date, league, home_team_id, away_team_id)
+            home_5, away_5, home_10, away_10: Rolling stats per side and window
+                (AsOfStatsEngine.rolling_stats layout)
             
         Returns:
-            DataFrame with training data
+            Tuple of (feature DataFrame, boolean mask of matches with enough history)
         """
-        if not self.session:
-            raise ValueError("Database session required")
+        windows = {
+            ('home', '5'): home_5, ('away', '5'): away_5,
+            ('home', '10'): home_10, ('away', '10'): away_10
+        }
+        
+        inputs = {}
+        for key in self.feature_plan.inputs:
+            side, rest = key.split('_', 1)
+            stat, window = rest.rsplit('_', 1)
+            short_stats = windows[(side, '5')]
+            if window == '10':
+                medium_stats = windows[(side, '10')]
+                inputs[key] = np.where(medium_stats['valid'], medium_stats[stat], short_stats[stat])
+            else:
+                inputs[key] = short_stats[stat]
         
-        print("🔄 Building Goals Over 2.5 training dataset...")
+        features = self.feature_builder.compute(self.feature_plan, inputs)
+        frame = pd.DataFrame({
+            **{column: info[column] for column in MATCH_INFO_COLUMNS},
+            **features
+        })
         
-        # Query completed matches with results and odds
-        matches = self.session.query(Match, MatchResult, MatchOdds).join(
+        # Skip if insufficient data
+        valid = home_5['valid'] & away_5['valid']
+        return frame, valid
+    
+    def _get_features_for_matches(self, matches: List[Match]) -> List[Optional[Dict]]:
+        """
+        Get match features from the feature store, computing misses in one batch
+        
+        Only the rows of these matches are read from the store. Newly computed
+        rows are queued and written by flush_feature_store().
+        """
+        if self.feature_store is None:
+            return self._build_match_features(matches)
+        
+        known = self.feature_store.match_ids()
+        stored_ids = [m.match_id for m in matches if m.match_id in known]
+        stored_features = self.feature_store.read_indexed(match_ids=stored_ids) if stored_ids else {}
+        
+        misses = [m for m in matches if m.match_id not in stored_features]
+        for match, features in zip(misses, self._build_match_features(misses)):
+            if features:
+                stored_features[match.match_id] = dict(features, season=match.season)
+                self._pending_features.append(stored_features[match.match_id])
+        
+        # Stored rows come back in file order (partition columns last)
+        columns = MATCH_INFO_COLUMNS[1:] + self.feature_plan.feature_names
+        
+        results = []
+        for match in matches:
+            stored = stored_features.get(match.match_id)
+            if stored is None:
+                results.append(None)
+                continue
+            features = {'match_id': match.match_id}
+            features.update((column, stored[column]) for column in columns)
+            results.append(features)
+        
+        return results
+    
+    def flush_feature_store(self) -> int:
+        """Append newly computed features to the feature store"""
+        if self.feature_store is None or not self._pending_features:
+            return 0
+        
+        written = self.feature_store.append(pd.DataFrame(self._pending_features))
+        self._pending_features = []
+        print(f"📦 Appended {written} matches to feature store")
+        return written
+    
+    def _query_completed_matches(self, since: Optional[datetime] = None):
+        """Completed matches joined with results and latest odds (one query)"""
+        query = self.session.query(Match, MatchResult, LatestOdds).join(
             MatchResult, Match.match_id == MatchResult.match_id
         ).join(
-            MatchOdds, and_(
-                Match.match_id == MatchOdds.match_id,
-                MatchOdds.is_latest == True
-            )
+            LatestOdds, Match.match_id == LatestOdds.match_id
         ).filter(
             Match.status == 'completed'
-        ).order_by(Match.match_datetime).all()
+        )
+        if since is not None:
+            query = query.filter(Match.match_datetime > since)
+        return query.order_by(Match.match_datetime)
+    
+    def _iter_shared_chunks(
+        self,
+        chunk_size: int = 10000,
+        since: Optional[datetime] = None
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Stream the shared feature frame in chunks
         
-        rows = []
-        for match, result, odds in matches:
-            features = self._get_match_features(match, result)
-            if not features:
-                continue
+        Rows are fetched with yield_per (server-side cursor on PostgreSQL),
+        so only one chunk of ORM rows is held at a time. Each chunk carries
+        the result labels and latest odds as '_<column>' helper columns.
+        
+        Args:
+            chunk_size: Matches per chunk
+            since: Only matches kicking off after this time (rolling stats
+                still use the full history)
+            
+        Yields:
+            DataFrame chunks of matches with enough history
+        """
+        short, medium = self.lookback['short'], self.lookback['medium']
+        
+        if self.rolling_backend == 'sql':
+            for chunk in stream_training_rows(
+                self.session, windows=[short, medium], chunk_size=chunk_size, since=since
+            ):
+                info = {col: chunk[col].tolist() for col in MATCH_INFO_COLUMNS}
+                frame, valid = self._assemble_feature_frame(
+                    info,
+                    window_stats(chunk, 'home', short, MIN_MATCHES_FOR_STATS),
+                    window_stats(chunk, 'away', short, MIN_MATCHES_FOR_STATS),
+                    window_stats(chunk, 'home', medium, MIN_MATCHES_FOR_STATS),
+                    window_stats(chunk, 'away', medium, MIN_MATCHES_FOR_STATS)
+                )
+                
+                # Keep result labels and odds alongside the features
+                extra = chunk[LABEL_COLUMNS + ODDS_COLUMNS].add_prefix('_')
+                yield pd.concat([frame, extra], axis=1)[valid].reset_index(drop=True)
+            return
+        
+        # Load the team timelines before opening the streaming cursor
+        self._get_asof_engine()
+        
+        rows = iter(self._query_completed_matches(since).yield_per(chunk_size))
+        while True:
+            batch = list(islice(rows, chunk_size))
+            if not batch:
+                break
             
-            # Add target and odds
-            features['y'] = 1 if result.over_2_5 else 0
-            features['odds_over25'] = float(odds.over_2_5_odds) if odds.over_2_5_odds else None
+            features_list = self._get_features_for_matches([match for match, _, _ in batch])
+            kept = [i for i, features in enumerate(features_list) if features]
+            frame = pd.DataFrame([features_list[i] for i in kept])
             
-            rows.append(features)
-        
-        df = pd.DataFrame(rows)
-        
-        # Save if path provided
-        if out_path:
-            df.to_csv(out_path, index=False)
-            print(f"✅ Saved {len(df)} matches to {out_path}")
+            for column in LABEL_COLUMNS:
+                frame[f'_{column}'] = [getattr(batch[i][1], column) for i in kept]
+            for column in ODDS_COLUMNS:
+                frame[f'_{column}'] = [
+                    float(getattr(batch[i][2], column)) if getattr(batch[i][2], column) else None
+                    for i in kept
+                ]
+            
+            self.flush_feature_store()
+            yield frame
+    
+    @staticmethod
+    def _market_table(shared: pd.DataFrame, market: str) -> pd.DataFrame:
+        """Select the feature columns and attach one market's label and odds"""
+        result_attr, odds_attr = MARKET_SOURCES[market]
+        feature_columns = [c for c in shared.columns if not c.startswith('_')]
+        
+        df = shared[feature_columns].copy()
+        if not shared.empty:
+            df['y'] = shared[f'_{result_attr}'].fillna(False).astype(bool).astype(int)
+            odds = pd.to_numeric(shared[f'_{odds_attr}'], errors='coerce').astype(float)
+            df[MARKETS[market]['odds_column']] = odds.where(odds > 0)
         
-        print(f"✅ Built Goals dataset: {len(df)} matches")
         return df
     
-    def build_training_table_for_btts(
-        self, 
-        out_path: Optional[str] = None
-    ) -> pd.DataFrame:
-        """Build training dataset for BTTS market"""
+    def build_market_tables(
+        self,
+        markets: Optional[List[str]] = None,
+        out_paths: Optional[Dict[str, str]] = None,
+        chunk_size: int = 10000,
+        csv_paths: Optional[Dict[str, str]] = None,
+        since: Optional[datetime] = None
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Build training tables for several markets in a single pass
+        
+        The joined match query and the shared feature frame are computed once;
+        each market table adds its own label and odds columns.
+        
+        Args:
+            markets: Markets to build (defaults to all of MARKETS)
+            out_paths: Optional mapping of market to output path
+                (.parquet, .feather or .csv)
+            chunk_size: Matches fetched and featurized per chunk
+            csv_paths: Optional mapping of market to an additional CSV export
+            since: Only build rows for matches kicking off after this time
+            
+        Returns:
+            Dictionary of market to training DataFrame
+        """
         if not self.session:
             raise ValueError("Database session required")
         
-        print("🔄 Building BTTS training dataset...")
+        markets = markets or list(MARKETS.keys())
+        out_paths = out_paths or {}
+        csv_paths = csv_paths or {}
         
-        matches = self.session.query(Match, MatchResult, MatchOdds).join(
-            MatchResult, Match.match_id == MatchResult.match_id
-        ).join(
-            MatchOdds, and_(
-                Match.match_id == MatchOdds.match_id,
-                MatchOdds.is_latest == True
-            )
-        ).filter(
-            Match.status == 'completed'
-        ).order_by(Match.match_datetime).all()
+        for market in markets:
+            print(f"🔄 Building {MARKETS[market]['name']} training dataset...")
         
-        rows = []
-        for match, result, odds in matches:
-            features = self._get_match_features(match, result)
-            if not features:
-                continue
+        chunks = list(self._iter_shared_chunks(chunk_size, since))
+        shared = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+        
+        tables = {}
+        for market in markets:
+            df = optimize_training_dtypes(self._market_table(shared, market))
             
-            features['y'] = 1 if result.btts else 0
-            features['odds_btts_yes'] = float(odds.btts_yes_odds) if odds.btts_yes_odds else None
+            # Save if path provided
+            out_path = out_paths.get(market)
+            if out_path:
+                save_training_data(df, out_path, csv_path=csv_paths.get(market))
+                print(f"✅ Saved {len(df)} matches to {out_path}")
             
-            rows.append(features)
+            print(f"✅ Built {MARKETS[market]['name']} dataset: {len(df)} matches")
+            tables[market] = df
         
-        df = pd.DataFrame(rows)
+        return tables
+    
+    def stream_market_tables(
+        self,
+        out_paths: Dict[str, str],
+        chunk_size: int = 10000,
+        csv_paths: Optional[Dict[str, str]] = None,
+        since: Optional[datetime] = None
+    ) -> Dict[str, int]:
+        """
+        Build market tables chunk by chunk straight to disk
         
-        if out_path:
-            df.to_csv(out_path, index=False)
-            print(f"✅ Saved {len(df)} matches to {out_path}")
+        Peak memory is bounded by chunk_size regardless of history length.
+        Paths ending in .parquet are written as Parquet (one row group per
+        chunk) and .feather as uncompressed Arrow IPC (one record batch per
+        chunk), both requiring pyarrow; other paths are appended as CSV.
         
-        print(f"✅ Built BTTS dataset: {len(df)} matches")
-        return df
+        Args:
+            out_paths: Mapping of market to output path
+            chunk_size: Matches fetched and featurized per chunk
+            csv_paths: Optional mapping of market to an additional CSV export
+            since: Only build rows for matches kicking off after this time
+            
+        Returns:
+            Dictionary of market to rows written
+        """
+        if not self.session:
+            raise ValueError("Database session required")
+        
+        for market in out_paths:
+            print(f"🔄 Building {MARKETS[market]['name']} training dataset...")
+        
+        writers = {market: [_ChunkWriter(path)] for market, path in out_paths.items()}
+        for market, csv_path in (csv_paths or {}).items():
+            writers[market].append(_ChunkWriter(csv_path))
+        try:
+            for shared in self._iter_shared_chunks(chunk_size, since):
+                for market, market_writers in writers.items():
+                    table = self._market_table(shared, market)
+                    for writer in market_writers:
+                        writer.write(table)
+        finally:
+            for market_writers in writers.values():
+                for writer in market_writers:
+                    writer.close()
+        
+        for market, (writer, *exports) in writers.items():
+            print(f"✅ Streamed {MARKETS[market]['name']} dataset: {writer.rows} matches to {writer.path}")
+            for export in exports:
+                print(f"📄 Exported CSV copy to {export.path}")
+        
+        return {market: market_writers[0].rows for market, market_writers in writers.items()}
     
-    def build_training_table_for_cards(
+    def build_training_table_for_goals(
         self, 
         out_path: Optional[str] = None
     ) -> pd.DataFrame:
-        """Build training dataset for Cards Over 3.5 market"""
-        if not self.session:
-            raise ValueError("Database session required")
-        
-        print("🔄 Building Cards Over 3.5 training dataset...")
-        
-        matches = self.session.query(Match, MatchResult, MatchOdds).join(
-            MatchResult, Match.match_id == MatchResult.match_id
-        ).join(
-            MatchOdds, and_(
-                Match.match_id == MatchOdds.match_id,
-                MatchOdds.is_latest == True
-            )
-        ).filter(
-            Match.status == 'completed'
-        ).order_by(Match.match_datetime).all()
+        """
+        Build training dataset for Goals Over 2.5 market
         
-        rows = []
-        for match, result, odds in matches:
-            features = self._get_match_features(match, result)
-            if not features:
-                continue
-            
-            features['y'] = 1 if result.cards_over_3_5 else 0
-            features['odds_cards_over35'] = float(odds.cards_over_3_5_odds) if odds.cards_over_3_5_odds else None
+        Args:
+            out_path: Path to save the table (optional, .parquet, .feather or .csv)
             
-            rows.append(features)
-        
-        df = pd.DataFrame(rows)
-        
-        if out_path:
-            df.to_csv(out_path, index=False)
-            print(f"✅ Saved {len(df)} matches to {out_path}")
-        
-        print(f"✅ Built Cards dataset: {len(df)} matches")
-        return df
+        Returns:
+            DataFrame with training data
+        """
+        return self.build_market_tables(['goals'], {'goals': out_path})['goals']
+    
+    def build_training_table_for_btts(
+        self, 
+        out_path: Optional[str] = None
+    ) -> pd.DataFrame:
+        """Build training dataset for BTTS market"""
+        return self.build_market_tables(['btts'], {'btts': out_path})['btts']
+    
+    def build_training_table_for_cards(
+        self, 
+        out_path: Optional[str] = None
+    ) -> pd.DataFrame:
+        """Build training dataset for Cards Over 3.5 market"""
+        return self.build_market_tables(['cards'], {'cards': out_path})['cards']
     
     def build_training_table_for_corners(
         self, 
         out_path: Optional[str] = None
     ) -> pd.DataFrame:
         """Build training dataset for Corners Over 9.5 market"""
-        if not self.session:
-            raise ValueError("Database session required")
-        
-        print("🔄 Building Corners Over 9.5 training dataset...")
-        
-        matches = self.session.query(Match, MatchResult, MatchOdds).join(
-            MatchResult, Match.match_id == MatchResult.match_id
-        ).join(
-            MatchOdds, and_(
-                Match.match_id == MatchOdds.match_id,
-                MatchOdds.is_latest == True
-            )
-        ).filter(
-            Match.status == 'completed'
-        ).order_by(Match.match_datetime).all()
-        
-        rows = []
-        for match, result, odds in matches:
-            features = self._get_match_features(match, result)
-            if not features:
-                continue
-            
-            features['y'] = 1 if result.corners_over_9_5 else 0
-            features['odds_corners_over95'] = float(odds.corners_over_9_5_odds) if odds.corners_over_9_5_odds else None
-            
-            rows.append(features)
-        
-        df = pd.DataFrame(rows)
-        
-        if out_path:
-            df.to_csv(out_path, index=False)
-            print(f"✅ Saved {len(df)} matches to {out_path}")
+        return self.build_market_tables(['corners'], {'corners': out_path})['corners']
+
+
+class _ChunkWriter:
+    """Append DataFrame chunks to a Parquet, Feather or CSV file"""
+    
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.columnar = self.path.suffix in ('.parquet', '.feather')
+        if self.columnar and not PYARROW_AVAILABLE:
+            raise ImportError(f"pyarrow is required to write {self.path.suffix} files (pip install pyarrow)")
+        self.writer = None
+        self.schema = None
+        self.rows = 0
+    
+    def write(self, df: pd.DataFrame):
+        if df.empty:
+            return
+        
+        df = optimize_training_dtypes(df)
+        
+        if self.columnar:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self.writer is None:
+                # Columns that are all-null in the first chunk get a concrete type
+                self.schema = pa.schema([
+                    field.with_type(pa.float32() if df[field.name].dtype.kind == 'f' else pa.string())
+                    if pa.types.is_null(field.type) else field
+                    for field in table.schema
+                ])
+                if self.path.suffix == '.parquet':
+                    self.writer = pq.ParquetWriter(str(self.path), self.schema)
+                else:
+                    self.writer = pa.ipc.new_file(str(self.path), self.schema)
+            self.writer.write_table(table.cast(self.schema))
+        else:
+            df.to_csv(self.path, mode='w' if self.rows == 0 else 'a', header=(self.rows == 0), index=False)
         
-        print(f"✅ Built Corners dataset: {len(df)} matches")
-        return df
+        self.rows += len(df)
+    
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+def _iter_table_chunks(path: Path, chunk_size: int = 10000) -> Iterator[pd.DataFrame]:
+    """Read a Parquet, Feather or CSV training table back in chunks"""
+    if path.suffix == '.parquet':
+        for batch in pq.ParquetFile(str(path)).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    elif path.suffix == '.feather':
+        with pa.memory_map(str(path)) as source:
+            reader = pa.ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                yield reader.get_batch(i).to_pandas()
+    else:
+        for chunk in pd.read_csv(path, chunksize=chunk_size):
+            yield optimize_training_dtypes(chunk)
+
+
+def _merge_new_rows(path: Path, new_path: Path, chunk_size: int = 10000) -> int:
+    """
+    Replace a training table with its rows plus the rows of new_path
+    
+    Existing rows with a match_id present in new_path are dropped. Both
+    tables are read and written chunk by chunk; the result replaces path
+    only once it is complete.
+    
+    Returns:
+        Rows in the merged table
+    """
+    new_ids = set()
+    for chunk in _iter_table_chunks(new_path, chunk_size):
+        new_ids.update(chunk['match_id'])
+    
+    merged_path = path.with_name(f".{path.stem}.merge{path.suffix}")
+    writer = _ChunkWriter(str(merged_path))
+    try:
+        if path.exists():
+            for chunk in _iter_table_chunks(path, chunk_size):
+                writer.write(chunk[~chunk['match_id'].isin(new_ids)])
+        for chunk in _iter_table_chunks(new_path, chunk_size):
+            writer.write(chunk)
+    finally:
+        writer.close()
+    
+    if writer.rows:
+        os.replace(merged_path, path)
+    new_path.unlink()
+    return writer.rows
+
+
+@contextmanager
+def count_queries(session: Session):
+    """
+    Count SQL statements executed on the session's engine
+    
+    Yields:
+        Dictionary whose 'count' key is updated as statements run
+    """
+    engine = session.get_bind()
+    counter = {'count': 0}
+    
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        counter['count'] += 1
+    
+    event.listen(engine, 'before_cursor_execute', on_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, 'before_cursor_execute', on_execute)
+
+
+def feature_store_version() -> str:
+    """
+    Version of the feature rows written to the feature store
+    
+    Hashes everything that determines the stored values: the feature
+    definitions (FeatureBuilder), the frame assembly in DatasetBuilder, the
+    rolling-stat producers (as-of engine and SQL window functions) and the
+    lookback configuration. Editing any of them starts a fresh store
+    directory, so rows computed by older code are never read back.
+    """
+    sources = [
+        inspect.getsource(DatasetBuilder._build_match_features),
+        inspect.getsource(DatasetBuilder._assemble_feature_frame),
+        inspect.getsource(inspect.getmodule(AsOfStatsEngine)),
+        inspect.getsource(inspect.getmodule(window_stats))
+    ]
+    payload = json.dumps({
+        'feature_builder': FeatureBuilder().get_feature_version(),
+        'lookback_windows': LOOKBACK_WINDOWS,
+        'min_matches_for_stats': MIN_MATCHES_FOR_STATS
+    }, sort_keys=True) + ''.join(sources)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:12]
 
 
-def build_all_training_datasets():
-    """Build all training datasets from database"""
+def build_all_training_datasets(rolling_backend: str = 'asof', export_csv: bool = False) -> Dict[str, int]:
+    """
+    Build all training datasets from database in a single streaming pass
+    
+    Args:
+        rolling_backend: 'asof' (in-memory as-of engine) or 'sql' (database window functions)
+        export_csv: Also write a CSV copy of each table (TRAINING_DATA_CSV_PATHS)
+        
+    Returns:
+        Dictionary of market to rows written
+    """
     print("=" * 60)
     print("BUILDING ALL TRAINING DATASETS")
     print("=" * 60)
     
+    feature_store = None
+    if PYARROW_AVAILABLE:
+        feature_store = FeatureStore(FEATURE_STORE_DIR, feature_store_version())
+    
+    start_time = time.perf_counter()
+    
     with get_db() as session:
-        builder = DatasetBuilder(session)
+        builder = DatasetBuilder(session, feature_store=feature_store, rolling_backend=rolling_backend)
         
-        # Build each market dataset
-        builder.build_training_table_for_goals(
-            str(TRAINING_DATA_PATHS['goals'])
-        )
-        builder.build_training_table_for_btts(
-            str(TRAINING_DATA_PATHS['btts'])
-        )
-        builder.build_training_table_for_cards(
-            str(TRAINING_DATA_PATHS['cards'])
-        )
-        builder.build_training_table_for_corners(
-            str(TRAINING_DATA_PATHS['corners'])
-        )
+        with count_queries(session) as queries:
+            rows = builder.stream_market_tables(
+                out_paths={market: str(path) for market, path in TRAINING_DATA_PATHS.items()},
+                csv_paths={market: str(path) for market, path in TRAINING_DATA_CSV_PATHS.items()} if export_csv else None
+            )
+    
+    elapsed = time.perf_counter() - start_time
     
     print("\n" + "=" * 60)
     print("✅ ALL DATASETS BUILT SUCCESSFULLY")
+    print(f"   Markets:     {', '.join(f'{m} ({n})' for m, n in rows.items())}")
+    print(f"   Wall time:   {elapsed:.2f}s")
+    print(f"   SQL queries: {queries['count']}")
     print("=" * 60)
+    
+    return rows
+
+
+def update_training_datasets(since: datetime, rolling_backend: str = 'asof') -> Dict[str, int]:
+    """
+    Append matches completed after a watermark to the existing training tables
+    
+    Only the new matches are featurized; their rolling stats still see
+    the full history. Rows already in a table (same match_id) are replaced.
+    The new rows are streamed to a side file and merged chunk by chunk.
+    
+    Args:
+        since: Kick-off watermark of the previous training run
+        rolling_backend: 'asof' (in-memory as-of engine) or 'sql' (database window functions)
+        
+    Returns:
+        Dictionary of market to the number of new rows
+    """
+    print("=" * 60)
+    print(f"UPDATING TRAINING DATASETS (matches after {since})")
+    print("=" * 60)
+    
+    feature_store = None
+    if PYARROW_AVAILABLE:
+        feature_store = FeatureStore(FEATURE_STORE_DIR, feature_store_version())
+    
+    new_paths = {
+        market: path.with_name(f".{path.stem}.new{path.suffix}")
+        for market, path in TRAINING_DATA_PATHS.items()
+    }
+    
+    with get_db() as session:
+        builder = DatasetBuilder(session, feature_store=feature_store, rolling_backend=rolling_backend)
+        new_rows = builder.stream_market_tables(
+            out_paths={market: str(path) for market, path in new_paths.items()},
+            since=since
+        )
+    
+    for market, added in new_rows.items():
+        if not added:
+            new_paths[market].unlink(missing_ok=True)
+            print(f"✅ {MARKETS[market]['name']}: no new matches")
+            continue
+        total = _merge_new_rows(TRAINING_DATA_PATHS[market], new_paths[market])
+        print(f"✅ {MARKETS[market]['name']}: +{added} matches ({total} total)")
+    
+    return new_rows
 
 
 # Standalone functions for compatibility
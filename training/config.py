@@ -12,6 +12,7 @@ PROJECT_ROOT = Path(__file__).parent.parent
 DATA_DIR = PROJECT_ROOT / "data"
 DATA_PROCESSED_DIR = DATA_DIR / "processed"
 DATA_RAW_DIR = DATA_DIR / "raw"
+FEATURE_STORE_DIR = DATA_DIR / "feature_store"
 MODELS_DIR = PROJECT_ROOT / "models"
 BACKTESTING_DIR = PROJECT_ROOT / "backtesting"
 BACKTESTING_RESULTS_DIR = BACKTESTING_DIR / "results"
@@ -39,11 +40,23 @@ LOOKBACK_WINDOWS = {
 MIN_MATCHES_FOR_STATS = 5
 
 # Training Data Configuration
+# Parquet is the canonical format (.feather is also supported); CSV is export-only
 TRAINING_DATA_PATHS = {
-    'goals': DATA_PROCESSED_DIR / "training_goals_over25.csv",
-    'btts': DATA_PROCESSED_DIR / "training_btts.csv",
-    'cards': DATA_PROCESSED_DIR / "training_cards.csv",
-    'corners': DATA_PROCESSED_DIR / "training_corners.csv"
+    'goals': DATA_PROCESSED_DIR / "training_goals_over25.parquet",
+    'btts': DATA_PROCESSED_DIR / "training_btts.parquet",
+    'cards': DATA_PROCESSED_DIR / "training_cards.parquet",
+    'corners': DATA_PROCESSED_DIR / "training_corners.parquet"
+}
+
+TRAINING_DATA_CSV_PATHS = {
+    market: path.with_suffix('.csv') for market, path in TRAINING_DATA_PATHS.items()
+}
+
+# Column dtypes of the training tables
+TRAINING_DTYPES = {
+    'features': 'float32',  # Features and odds
+    'target': 'int8',       # Binary label 'y'
+    'ids': 'int32'          # home_team_id / away_team_id
 }
 
 # Market Definitions
@@ -123,6 +136,53 @@ MODEL_CONFIGS = {
     }
 }
 
+# Histogram binning shared by XGBoost (hist) and LightGBM when the
+# feature matrix is pre-binned once for all markets and trials
+BINNING_CONFIG = {
+    'max_bin': 256
+}
+
+# Hyperparameter search (successive halving on boosting rounds)
+SEARCH_CONFIG = {
+    'n_trials': 27,          # Configurations sampled per (market, model)
+    'min_rounds': 50,        # Boosting rounds in the first rung
+    'max_rounds': 1350,      # Boosting rounds in the final rung
+    'eta': 3,                # Keep the best 1/eta configurations per rung
+    'early_stopping_rounds': 20,
+    'seed': 42,
+    'search_space': {
+        'xgboost': {
+            'max_depth': [3, 4, 5, 6, 8],
+            'learning_rate': (0.01, 0.2, 'log'),
+            'subsample': (0.6, 1.0, 'uniform'),
+            'colsample_bytree': (0.5, 1.0, 'uniform'),
+            'min_child_weight': (1, 20, 'log'),
+            'reg_lambda': (0.1, 10.0, 'log')
+        },
+        'lightgbm': {
+            'num_leaves': [15, 31, 63, 127],
+            'max_depth': [-1, 4, 6, 8],
+            'learning_rate': (0.01, 0.2, 'log'),
+            'subsample': (0.6, 1.0, 'uniform'),
+            'subsample_freq': [1],
+            'colsample_bytree': (0.5, 1.0, 'uniform'),
+            'min_child_samples': [10, 20, 50, 100],
+            'reg_lambda': (0.1, 10.0, 'log')
+        }
+    }
+}
+
+# Trial logs and best parameters of each search
+SEARCH_RESULTS_DIR = MODELS_DIR / "search"
+
+# Chunked / external-memory training (training tables streamed from Parquet)
+EXTERNAL_MEMORY_CONFIG = {
+    'row_group_rows': 100000,    # Parquet row group size; the unit decoded at a time
+    'batch_rows': 50000,         # Rows handed to XGBoost / LightGBM per batch
+    'memory_ceiling_mb': 2048,   # Peak budget for decoded batches, labels and bins
+    'cache_dir': DATA_DIR / "cache" / "external_memory"  # XGBoost pages, LightGBM .bin files
+}
+
 # Default models to train for each market
 DEFAULT_MODELS = ['logistic', 'xgboost', 'lightgbm']
 
@@ -136,6 +196,13 @@ ENSEMBLE_WEIGHTS = {
 # Calibration Configuration
 CALIBRATION_METHOD = 'isotonic'  # 'isotonic' or 'sigmoid' (Platt scaling)
 
+# Expanding-window time-series cross-validation (train + validation period)
+CV_CONFIG = {
+    'n_folds': 5,                    # Validation windows after the first training window
+    'min_train_fraction': 0.5,       # Share of the period in the first training window
+    'early_stopping_fraction': 0.1   # Newest share of each training window used for early stopping
+}
+
 # Train/Validation/Test Split Configuration
 TRAIN_SPLIT = 0.7  # 70% for training
 VAL_SPLIT = 0.15   # 15% for validation
@@ -159,9 +226,26 @@ RETRAIN_CONFIG = {
         'log_loss': 0.65,        # Don't promote if log_loss > 0.65
         'brier_score': 0.25      # Don't promote if brier_score > 0.25
     },
-    'version_increment': 'minor' # 'major', 'minor', or 'patch'
+    'version_increment': 'minor', # 'major', 'minor', or 'patch'
+    'incremental': {
+        'extra_rounds': 50,           # Boosting rounds added per incremental run
+        'calibration_fraction': 0.2,  # Share of new matches held out from the added rounds to refit the calibrator
+        'test_fraction': 0.15,        # Newest share of new matches held out for evaluation
+        'reference_window': 2000      # Most recent pre-watermark matches used as the drift reference
+    },
+    'drift_thresholds': {
+        'log_loss_increase': 0.03,   # Full retrain if log loss on new matches rises more than this
+        'brier_increase': 0.015,     # ... or the Brier score rises more than this
+        'max_psi': 0.25              # ... or any feature's population stability index exceeds this
+    }
 }
 
+# Watermark and mode of the last training run
+RETRAIN_STATE_PATH = MODELS_DIR / "retrain_state.json"
+
+# Incremental updates are written here and copied over the live models once validated
+RETRAIN_STAGING_DIR = MODELS_DIR / "staging"
+
 # Feature Groups (for feature importance analysis)
 FEATURE_GROUPS = {
     'goals': [
@@ -0,0 +1,388 @@
+"""
+Time-Series Cross-Validation
+Expanding-window CV whose out-of-fold predictions fit the ensemble weights
+and the calibrator
+
+The train + validation period of a market is sorted by date and written
+once as a float32 .npy matrix. Worker processes memory-map it, so every
+fold trains on a slice of the same pages instead of a per-fold copy. Fold
+k trains on all matches before its validation window; the newest slice of
+that training window is held out for early stopping, so out-of-fold
+predictions never influence the models that produced them. The test split
+is left untouched for the final evaluation.
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import minimize
+
+try:
+    from threadpoolctl import threadpool_limits
+    THREADPOOLCTL_AVAILABLE = True
+except ImportError:
+    THREADPOOLCTL_AVAILABLE = False
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from training.config import (
+    CALIBRATION_METHOD, CV_CONFIG, DEFAULT_MODELS, MARKETS, MODELS_DIR,
+    TRAINING_DATA_PATHS, TRAIN_SPLIT, VAL_SPLIT
+)
+from training.utils import (
+    calculate_metrics, ensemble_predictions, fit_calibration_model,
+    get_feature_columns, load_training_data
+)
+from training.train_goals import (
+    prepare_data, train_single_model, finalize_market_models, THREADED_MODELS
+)
+
+
+def expanding_window_folds(
+    n_rows: int,
+    n_folds: int = CV_CONFIG['n_folds'],
+    min_train_fraction: float = CV_CONFIG['min_train_fraction']
+) -> List[Tuple[int, int]]:
+    """
+    Row boundaries of expanding-window folds over time-sorted data
+
+    Args:
+        n_rows: Rows in the cross-validation period
+        n_folds: Number of validation windows
+        min_train_fraction: Share of rows in the first training window
+
+    Returns:
+        List of (train_end, val_end); fold k trains on [0, train_end) and
+        validates on [train_end, val_end)
+    """
+    first = int(n_rows * min_train_fraction)
+    window = (n_rows - first) // n_folds
+    if first < 1 or window < 1:
+        raise ValueError(f"{n_rows} rows are too few for {n_folds} folds")
+
+    folds = []
+    for k in range(n_folds):
+        train_end = first + k * window
+        val_end = n_rows if k == n_folds - 1 else train_end + window
+        folds.append((train_end, val_end))
+    return folds
+
+
+def _write_cv_matrix(data_path: str, directory: str) -> Dict:
+    """Sort the train + validation period by date and write X / y as .npy once"""
+    df = load_training_data(data_path)
+    df = df.dropna(subset=['y'])
+    if 'date' in df.columns:
+        df = df.sort_values('date').reset_index(drop=True)
+
+    # Same period prepare_data() trains and validates on
+    df = df.iloc[:int(len(df) * (TRAIN_SPLIT + VAL_SPLIT))]
+    feature_cols = get_feature_columns(df)
+
+    matrix_path = os.path.join(directory, 'X.npy')
+    labels_path = os.path.join(directory, 'y.npy')
+    np.save(matrix_path, df[feature_cols].fillna(0).to_numpy(dtype=np.float32))
+    np.save(labels_path, df['y'].to_numpy(dtype=np.int8))
+
+    return {
+        'matrix_path': matrix_path,
+        'labels_path': labels_path,
+        'feature_columns': feature_cols,
+        'n_rows': len(df)
+    }
+
+
+def _run_fold(job: Dict, matrix: Dict) -> Dict:
+    """Fit one (fold, model) inside a worker on slices of the memory-mapped matrix"""
+    start = time.perf_counter()
+    limits = threadpool_limits(limits=job['n_threads']) if THREADPOOLCTL_AVAILABLE else None
+
+    try:
+        X = np.load(matrix['matrix_path'], mmap_mode='r')
+        y = np.load(matrix['labels_path'], mmap_mode='r')
+        columns = matrix['feature_columns']
+
+        def frame(lo, hi):
+            return pd.DataFrame(X[lo:hi], columns=columns, copy=False)
+
+        train_end, val_end = job['train_end'], job['val_end']
+        stop_start = int(train_end * (1 - CV_CONFIG['early_stopping_fraction']))
+
+        model, _, _ = train_single_model(
+            job['model_type'],
+            frame(0, stop_start), pd.Series(y[:stop_start].astype(int)),
+            frame(stop_start, train_end), pd.Series(y[stop_start:train_end].astype(int)),
+            n_threads=job['n_threads']
+        )
+        oof_proba = model.predict_proba(frame(train_end, val_end))[:, 1]
+    finally:
+        if limits is not None:
+            limits.restore_original_limits()
+
+    return {
+        **job,
+        'oof_proba': oof_proba,
+        'metrics': calculate_metrics(y[train_end:val_end].astype(int), oof_proba),
+        'seconds': time.perf_counter() - start,
+        'pid': os.getpid()
+    }
+
+
+def fit_ensemble_weights(oof_predictions: Dict[str, np.ndarray], y_true: np.ndarray) -> Dict[str, float]:
+    """
+    Ensemble weights minimizing out-of-fold log loss
+
+    Weights are a softmax of free parameters, so they stay non-negative
+    and sum to one.
+
+    Args:
+        oof_predictions: Dictionary of model_type to out-of-fold probabilities
+        y_true: Out-of-fold labels
+
+    Returns:
+        Dictionary of model_type to weight
+    """
+    names = list(oof_predictions.keys())
+    P = np.clip(np.column_stack([oof_predictions[name] for name in names]), 1e-6, 1 - 1e-6)
+    y_true = np.asarray(y_true, dtype=np.float64)
+
+    def loss(theta):
+        w = np.exp(theta - theta.max())
+        p = P @ (w / w.sum())
+        return -np.mean(y_true * np.log(p) + (1 - y_true) * np.log(1 - p))
+
+    result = minimize(loss, np.zeros(len(names)), method='L-BFGS-B')
+    w = np.exp(result.x - result.x.max())
+    w /= w.sum()
+
+    return {name: round(float(weight), 4) for name, weight in zip(names, w)}
+
+
+def cross_validate_market(
+    market: str,
+    model_types: Optional[List[str]] = None,
+    n_folds: Optional[int] = None,
+    cpu_budget: Optional[int] = None,
+    max_workers: Optional[int] = None,
+    data_path: Optional[str] = None
+) -> Dict:
+    """
+    Expanding-window CV of a market with folds fitted in parallel
+
+    Args:
+        market: Market name
+        model_types: Base models (defaults to DEFAULT_MODELS)
+        n_folds: Number of folds (defaults to CV_CONFIG)
+        cpu_budget: Total cores (defaults to os.cpu_count())
+        max_workers: Cap on concurrent fold fits
+        data_path: Training data (defaults to TRAINING_DATA_PATHS[market])
+
+    Returns:
+        Dictionary with out-of-fold predictions and labels, fold metrics,
+        fitted ensemble weights, calibration model and timings
+    """
+    model_types = model_types or DEFAULT_MODELS
+    n_folds = n_folds or CV_CONFIG['n_folds']
+    cpu_budget = cpu_budget or os.cpu_count() or 1
+    data_path = str(data_path or TRAINING_DATA_PATHS[market])
+
+    print("\n" + "=" * 60)
+    print(f"TIME-SERIES CROSS-VALIDATION: {market.upper()} ({n_folds} folds)")
+    print("=" * 60)
+
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix='cv_matrix_') as directory:
+        matrix = _write_cv_matrix(data_path, directory)
+        folds = expanding_window_folds(matrix['n_rows'], n_folds)
+        y = np.load(matrix['labels_path']).astype(int)
+
+        jobs = [
+            {'fold': k, 'model_type': model_type, 'train_end': train_end, 'val_end': val_end}
+            for k, (train_end, val_end) in enumerate(folds)
+            for model_type in model_types
+        ]
+        # Largest training windows first
+        jobs.sort(key=lambda job: -job['train_end'])
+
+        workers = max(1, min(len(jobs), cpu_budget, max_workers or len(jobs)))
+        threads = max(1, cpu_budget // workers)
+        for job in jobs:
+            job['n_threads'] = threads if job['model_type'] in THREADED_MODELS else 1
+
+        print(f"📦 {matrix['n_rows']:,} rows x {len(matrix['feature_columns'])} features, "
+              f"{len(jobs)} fits, {workers} workers x {threads} threads")
+
+        finished = []
+        # Spawned workers avoid forking a parent whose OpenMP runtime is already initialized
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            futures = {pool.submit(_run_fold, job, matrix): job for job in jobs}
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"❌ Error in fold {job['fold']}/{job['model_type']}: {e}")
+                    continue
+
+                finished.append(result)
+                print(f"✅ Fold {job['fold']}/{job['model_type']}: log loss "
+                      f"{result['metrics']['log_loss']:.4f} in {result['seconds']:.2f}s")
+
+    fit_wall = time.perf_counter() - start
+
+    # A model counts only if every fold finished, so OOF rows line up
+    oof_predictions = {}
+    for model_type in model_types:
+        model_folds = sorted([r for r in finished if r['model_type'] == model_type], key=lambda r: r['fold'])
+        if len(model_folds) == n_folds:
+            oof_predictions[model_type] = np.concatenate([r['oof_proba'] for r in model_folds])
+
+    if not oof_predictions:
+        raise RuntimeError(f"No model finished all {n_folds} folds for {market}")
+
+    oof_start = folds[0][0]
+    oof_labels = y[oof_start:]
+
+    weights = fit_ensemble_weights(oof_predictions, oof_labels)
+    oof_ensemble = ensemble_predictions(oof_predictions, weights)
+    calibration_model = fit_calibration_model(oof_ensemble, oof_labels, method=CALIBRATION_METHOD)
+
+    oof_metrics = {model_type: calculate_metrics(oof_labels, proba) for model_type, proba in oof_predictions.items()}
+    oof_metrics['ensemble'] = calculate_metrics(oof_labels, oof_ensemble)
+
+    print(f"\n📊 Out-of-fold log loss ({len(oof_labels):,} matches):")
+    for name, metrics in oof_metrics.items():
+        print(f"   {name:14s}: {metrics['log_loss']:.4f}")
+    print(f"⚖️  Fitted ensemble weights: {weights}")
+
+    job_seconds = sum(r['seconds'] for r in finished)
+    print(f"⏱️  {len(finished)} fits, {job_seconds:.1f}s compute, {fit_wall:.1f}s wall")
+
+    return {
+        'market': market,
+        'folds': folds,
+        'oof_predictions': oof_predictions,
+        'oof_labels': oof_labels,
+        'oof_metrics': oof_metrics,
+        'fold_metrics': [
+            {k: r[k] for k in ('fold', 'model_type', 'train_end', 'val_end', 'n_threads', 'metrics', 'seconds')}
+            for r in sorted(finished, key=lambda r: (r['fold'], r['model_type']))
+        ],
+        'weights': weights,
+        'calibration_model': calibration_model,
+        'workers': workers,
+        'job_seconds': job_seconds,
+        'wall_seconds': fit_wall
+    }
+
+
+def train_market_cv(
+    market: str,
+    model_types: Optional[List[str]] = None,
+    n_folds: Optional[int] = None,
+    cpu_budget: Optional[int] = None,
+    data_path: Optional[str] = None,
+    save: bool = True
+) -> Dict:
+    """
+    Train a market with CV-fitted ensemble weights and calibration
+
+    Final base models are trained on the usual train split; the ensemble
+    weights and calibrator come from the out-of-fold predictions instead
+    of ENSEMBLE_WEIGHTS and the single validation split.
+
+    Args:
+        market: Market name
+        model_types: Base models (defaults to DEFAULT_MODELS)
+        n_folds: Number of folds (defaults to CV_CONFIG)
+        cpu_budget: Total cores (defaults to os.cpu_count())
+        data_path: Training data (defaults to TRAINING_DATA_PATHS[market])
+        save: Save models, ensemble metadata, calibration and the CV report
+
+    Returns:
+        Dictionary with training results in train_goals_model() format plus 'cv'
+    """
+    model_types = model_types or DEFAULT_MODELS
+    cpu_budget = cpu_budget or os.cpu_count() or 1
+    data_path = str(data_path or TRAINING_DATA_PATHS[market])
+
+    cv = cross_validate_market(market, model_types, n_folds, cpu_budget, data_path=data_path)
+
+    data = prepare_data(data_path)
+    X_train, y_train, X_val, y_val = data[:4]
+
+    models, val_predictions, all_metrics = {}, {}, {}
+    for model_type in cv['oof_predictions']:
+        try:
+            model, val_proba, metrics = train_single_model(
+                model_type, X_train, y_train, X_val, y_val, n_threads=cpu_budget
+            )
+        except Exception as e:
+            print(f"❌ Error training {model_type}: {e}")
+            continue
+        models[model_type] = model
+        val_predictions[model_type] = val_proba
+        all_metrics[model_type] = metrics
+
+    if not models:
+        print("❌ No models were successfully trained!")
+        return {}
+
+    weights = {model_type: cv['weights'][model_type] for model_type in models}
+    results = finalize_market_models(
+        market, models, val_predictions, all_metrics, data,
+        save=save, weights=weights, calibration_model=cv['calibration_model']
+    )
+    results['cv'] = cv
+
+    if save:
+        report = {
+            'market': market,
+            'created_at': datetime.now().isoformat(),
+            'folds': cv['folds'],
+            'weights': cv['weights'],
+            'oof_metrics': cv['oof_metrics'],
+            'fold_metrics': cv['fold_metrics'],
+            'workers': cv['workers'],
+            'job_seconds': cv['job_seconds'],
+            'wall_seconds': cv['wall_seconds']
+        }
+        report_path = MODELS_DIR / market / 'cv_report.json'
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(report_path, 'w') as f:
+            json.dump(report, f, indent=2, default=float)
+        print(f"💾 Saved CV report to {report_path}")
+
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Train markets with time-series cross-validation')
+    parser.add_argument('--markets', nargs='+', choices=list(MARKETS.keys()), default=list(MARKETS.keys()),
+                       help='Markets to train (default: all)')
+    parser.add_argument('--folds', type=int, default=None,
+                       help='Number of expanding-window folds')
+    parser.add_argument('--cpu-budget', type=int, default=None,
+                       help='Total cores for training (default: all cores)')
+    parser.add_argument('--no-save', action='store_true',
+                       help='Run the CV without saving models')
+
+    args = parser.parse_args()
+
+    for market in args.markets:
+        train_market_cv(market, n_folds=args.folds, cpu_budget=args.cpu_budget, save=not args.no_save)
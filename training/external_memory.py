@@ -0,0 +1,498 @@
+"""
+Chunked / External-Memory Training
+Trains XGBoost and LightGBM on training tables streamed from Parquet
+
+prepare_data() loads a whole table and copies it per split. This path
+never materializes the feature matrix:
+
+- Splits are index ranges over the (kick-off ordered) rows of the file.
+- Features are decoded one Parquet row group at a time.
+- XGBoost consumes them through a DataIter, either into an in-core
+  QuantileDMatrix (only the uint8 bins are kept) or, above the memory
+  ceiling, into an external-memory matrix paged to disk.
+- LightGBM builds its Dataset from a Sequence and saves it as a binary
+  file, which later runs load directly.
+
+Memory ceiling (EXTERNAL_MEMORY_CONFIG['memory_ceiling_mb']), per table
+of N usable rows and F features:
+
+- Streaming: 2 x row_group_rows x F x 4 B for a decoded row group,
+  plus batch_rows x F x 4 B for the batch.
+- Labels and row positions: N x 9 B.
+- Bins: N x F x 1 B per library, trained one library at a time
+  (max_bin <= 256). XGBoost external memory keeps only one page of bins
+  resident.
+
+See estimate_memory_mb().
+"""
+
+import sys
+import hashlib
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+try:
+    import xgboost as xgb
+    XGBOOST_AVAILABLE = True
+except ImportError:
+    XGBOOST_AVAILABLE = False
+
+try:
+    import lightgbm as lgb
+    LIGHTGBM_AVAILABLE = True
+except ImportError:
+    LIGHTGBM_AVAILABLE = False
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from training.config import (
+    BINNING_CONFIG, ENSEMBLE_WEIGHTS, EXTERNAL_MEMORY_CONFIG, MARKETS,
+    TRAINING_DATA_PATHS, TRAIN_SPLIT, VAL_SPLIT
+)
+from training.utils import (
+    calculate_metrics, get_feature_columns, TRAINING_DATE_COLUMN, TRAINING_TARGET_COLUMN
+)
+from training.binned_matrix import PrebinnedBooster, PREBINNED_MODELS, train_booster
+from training.train_goals import finalize_market_models
+
+
+_DataIterBase = xgb.DataIter if XGBOOST_AVAILABLE else object
+_SequenceBase = lgb.Sequence if LIGHTGBM_AVAILABLE else object
+
+
+def estimate_memory_mb(
+    n_rows: int,
+    n_features: int,
+    row_group_rows: int = EXTERNAL_MEMORY_CONFIG['row_group_rows'],
+    batch_rows: int = EXTERNAL_MEMORY_CONFIG['batch_rows']
+) -> Dict[str, float]:
+    """
+    Peak memory of the chunked path by component
+
+    Args:
+        n_rows: Usable rows in the table
+        n_features: Feature columns
+        row_group_rows: Rows per Parquet row group
+        batch_rows: Rows per batch
+
+    Returns:
+        Dictionary with streaming_mb, labels_mb and bins_mb (one library)
+    """
+    mb = 1024 * 1024
+    return {
+        'streaming_mb': (2 * row_group_rows + batch_rows) * n_features * 4 / mb,
+        'labels_mb': n_rows * 9 / mb,
+        'bins_mb': n_rows * n_features / mb
+    }
+
+
+class ParquetTrainingReader:
+    """
+    Row-group reader for a Parquet training table
+
+    Only the label and date columns are read up front; features are
+    decoded one row group at a time (the last one is cached, so ascending
+    access decodes every group once).
+    """
+
+    def __init__(self, path: str):
+        """
+        Open a training table
+
+        Args:
+            path: Parquet training table (rows in kick-off order)
+        """
+        if not PYARROW_AVAILABLE:
+            raise ImportError("pyarrow is required for chunked training (pip install pyarrow)")
+
+        self.path = Path(path)
+        self.file = pq.ParquetFile(str(self.path))
+        self.feature_columns = get_feature_columns(self.file.schema_arrow.empty_table().to_pandas())
+
+        metadata = self.file.metadata
+        self.group_offsets = np.concatenate([
+            [0], np.cumsum([metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)])
+        ])
+
+        meta = self.file.read(columns=[TRAINING_TARGET_COLUMN, TRAINING_DATE_COLUMN]).to_pandas()
+        y = pd.to_numeric(meta[TRAINING_TARGET_COLUMN], errors='coerce').to_numpy(dtype=np.float64)
+        usable = ~np.isnan(y)
+
+        dates = pd.to_datetime(meta[TRAINING_DATE_COLUMN])[usable]
+        if not dates.is_monotonic_increasing:
+            raise ValueError(
+                f"{self.path.name} is not in kick-off order; rebuild it with build_datasets "
+                f"before chunked training (splits are row ranges)"
+            )
+
+        # File positions of rows with a label, and their labels
+        self.rows = np.flatnonzero(usable)
+        self.labels = y[usable].astype(np.int8)
+
+        stat = self.path.stat()
+        self.version = hashlib.sha1(
+            f"{self.path.resolve()}:{stat.st_size}:{stat.st_mtime_ns}".encode()
+        ).hexdigest()[:12]
+
+        self._cached_group = None
+        self._cached_values = None
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def split_ranges(
+        self,
+        train_ratio: float = TRAIN_SPLIT,
+        val_ratio: float = VAL_SPLIT
+    ) -> Dict[str, Tuple[int, int]]:
+        """
+        Time-based split as (start, stop) ranges over the usable rows
+
+        Args:
+            train_ratio: Proportion for training
+            val_ratio: Proportion for validation
+
+        Returns:
+            Dictionary of split name to (start, stop)
+        """
+        n = len(self.rows)
+        train_end = int(n * train_ratio)
+        val_end = int(n * (train_ratio + val_ratio))
+        return {'train': (0, train_end), 'val': (train_end, val_end), 'test': (val_end, n)}
+
+    def _group(self, group: int) -> np.ndarray:
+        """Feature values of one row group as float32 (nulls -> 0)"""
+        if group != self._cached_group:
+            table = self.file.read_row_group(group, columns=self.feature_columns)
+            values = np.empty((table.num_rows, len(self.feature_columns)), dtype=np.float32)
+            for j, column in enumerate(table.columns):
+                values[:, j] = column.to_numpy(zero_copy_only=False)
+            np.nan_to_num(values, copy=False, nan=0.0)
+            self._cached_group, self._cached_values = group, values
+        return self._cached_values
+
+    def row(self, index: int) -> np.ndarray:
+        """Features of one usable row"""
+        position = self.rows[index]
+        group = int(np.searchsorted(self.group_offsets, position, side='right')) - 1
+        return self._group(group)[position - self.group_offsets[group]]
+
+    def take(self, start: int, stop: int) -> np.ndarray:
+        """Features of usable rows [start, stop) as a float32 array"""
+        positions = self.rows[start:stop]
+        groups = np.searchsorted(self.group_offsets, positions, side='right') - 1
+
+        parts = []
+        for group in np.unique(groups):
+            local = positions[groups == group] - self.group_offsets[group]
+            parts.append(self._group(int(group))[local])
+        if not parts:
+            return np.empty((0, len(self.feature_columns)), dtype=np.float32)
+        return parts[0] if len(parts) == 1 else np.vstack(parts)
+
+    def iter_batches(
+        self,
+        start: int,
+        stop: int,
+        batch_rows: int = EXTERNAL_MEMORY_CONFIG['batch_rows']
+    ) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Yield (features, labels) batches of usable rows [start, stop)
+
+        Args:
+            start, stop: Range over the usable rows
+            batch_rows: Rows per batch
+        """
+        for lo in range(start, stop, batch_rows):
+            hi = min(lo + batch_rows, stop)
+            yield self.take(lo, hi), self.labels[lo:hi]
+
+
+class ParquetBatchIter(_DataIterBase):
+    """XGBoost DataIter over a row range of a ParquetTrainingReader"""
+
+    def __init__(
+        self,
+        reader: ParquetTrainingReader,
+        start: int,
+        stop: int,
+        batch_rows: int,
+        cache_prefix: Optional[str] = None
+    ):
+        self.reader = reader
+        self.start = start
+        self.stop = stop
+        self.batch_rows = batch_rows
+        self._batches = None
+        super().__init__(cache_prefix=cache_prefix)
+
+    def next(self, input_data) -> bool:
+        if self._batches is None:
+            self._batches = self.reader.iter_batches(self.start, self.stop, self.batch_rows)
+        try:
+            X, y = next(self._batches)
+        except StopIteration:
+            return False
+        input_data(data=X, label=y, feature_names=self.reader.feature_columns)
+        return True
+
+    def reset(self):
+        self._batches = None
+
+
+class ParquetSequence(_SequenceBase):
+    """LightGBM Sequence over a row range of a ParquetTrainingReader"""
+
+    def __init__(self, reader: ParquetTrainingReader, start: int, stop: int, batch_rows: int):
+        self.reader = reader
+        self.start = start
+        self.stop = stop
+        self.batch_size = batch_rows
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            lo, hi, _ = idx.indices(len(self))
+            return self.reader.take(self.start + lo, self.start + hi)
+        # LightGBM samples bin boundaries from single rows as float64
+        return self.reader.row(self.start + idx).astype(np.float64)
+
+
+class ChunkedTrainingData:
+    """
+    XGBoost / LightGBM training data for one Parquet table, built in chunks
+    """
+
+    def __init__(
+        self,
+        data_path: str,
+        memory_ceiling_mb: Optional[float] = None,
+        cache_dir: Optional[str] = None,
+        max_bin: int = BINNING_CONFIG['max_bin']
+    ):
+        """
+        Open a table and plan the build under the memory ceiling
+
+        Args:
+            data_path: Parquet training table
+            memory_ceiling_mb: Peak memory budget (defaults to EXTERNAL_MEMORY_CONFIG)
+            cache_dir: XGBoost page / LightGBM binary cache (defaults to EXTERNAL_MEMORY_CONFIG)
+            max_bin: Histogram bins per feature
+
+        Raises:
+            MemoryError: If decoding a single row group already exceeds the ceiling
+        """
+        self.reader = ParquetTrainingReader(data_path)
+        self.ranges = self.reader.split_ranges()
+        self.max_bin = max_bin
+        self.memory_ceiling_mb = memory_ceiling_mb or EXTERNAL_MEMORY_CONFIG['memory_ceiling_mb']
+        self.cache_dir = Path(cache_dir or EXTERNAL_MEMORY_CONFIG['cache_dir'])
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        n_features = len(self.reader.feature_columns)
+        row_group_rows = int(np.diff(self.reader.group_offsets).max(initial=0))
+        self.batch_rows = min(EXTERNAL_MEMORY_CONFIG['batch_rows'], max(row_group_rows, 1))
+        self.memory = estimate_memory_mb(len(self.reader), n_features, row_group_rows, self.batch_rows)
+
+        resident = self.memory['streaming_mb'] + self.memory['labels_mb']
+        if resident > self.memory_ceiling_mb:
+            raise MemoryError(
+                f"Decoding one row group needs {resident:.0f} MB, above the "
+                f"{self.memory_ceiling_mb:.0f} MB ceiling; rewrite the table with smaller row groups"
+            )
+
+        # XGBoost pages its bins to disk when they do not fit next to the stream
+        self.xgb_external = resident + self.memory['bins_mb'] > self.memory_ceiling_mb
+        self.lgb_fits = resident + self.memory['bins_mb'] <= self.memory_ceiling_mb
+
+    def _cache_path(self, name: str) -> Path:
+        return self.cache_dir / f"{self.reader.path.stem}_{self.reader.version}_{self.max_bin}_{name}"
+
+    def xgb_matrices(self) -> Tuple:
+        """Train and validation matrices for XGBoost (QuantileDMatrix or external memory)"""
+        if not XGBOOST_AVAILABLE:
+            raise ImportError("xgboost is required for chunked training (pip install xgboost)")
+
+        iters = {
+            split: ParquetBatchIter(
+                self.reader, *self.ranges[split], self.batch_rows,
+                cache_prefix=str(self._cache_path(f"xgb_{split}")) if self.xgb_external else None
+            )
+            for split in ('train', 'val')
+        }
+
+        if not self.xgb_external:
+            dtrain = xgb.QuantileDMatrix(iters['train'], max_bin=self.max_bin)
+            dval = xgb.QuantileDMatrix(iters['val'], ref=dtrain)
+        elif hasattr(xgb, 'ExtMemQuantileDMatrix'):
+            dtrain = xgb.ExtMemQuantileDMatrix(iters['train'], max_bin=self.max_bin)
+            dval = xgb.ExtMemQuantileDMatrix(iters['val'], ref=dtrain)
+        else:
+            dtrain = xgb.DMatrix(iters['train'])
+            dval = xgb.DMatrix(iters['val'])
+        return dtrain, dval
+
+    def lgb_datasets(self) -> Tuple:
+        """
+        Train and validation Datasets for LightGBM
+
+        Built from Parquet Sequences on the first run and saved as binary
+        files; later runs on the same table version load those files.
+        """
+        if not LIGHTGBM_AVAILABLE:
+            raise ImportError("lightgbm is required for chunked training (pip install lightgbm)")
+
+        params = {'max_bin': self.max_bin, 'feature_pre_filter': False, 'verbose': -1}
+        train_bin = self._cache_path('lgb_train.bin')
+        val_bin = self._cache_path('lgb_val.bin')
+
+        if train_bin.exists() and val_bin.exists():
+            dtrain = lgb.Dataset(str(train_bin), params=params).construct()
+            dval = lgb.Dataset(str(val_bin), reference=dtrain, params=params).construct()
+            return dtrain, dval
+
+        datasets = {}
+        for split in ('train', 'val'):
+            start, stop = self.ranges[split]
+            datasets[split] = lgb.Dataset(
+                ParquetSequence(self.reader, start, stop, self.batch_rows),
+                label=self.reader.labels[start:stop],
+                feature_name=self.reader.feature_columns,
+                reference=datasets.get('train'),
+                params=params
+            ).construct()
+
+        # Drop binaries of earlier versions of this table
+        for stale in self.cache_dir.glob(f"{self.reader.path.stem}_*_lgb_*.bin"):
+            stale.unlink()
+
+        datasets['train'].save_binary(str(train_bin))
+        datasets['val'].save_binary(str(val_bin))
+        return datasets['train'], datasets['val']
+
+    def predict(self, model: PrebinnedBooster, split: str) -> np.ndarray:
+        """Positive-class probabilities for a split, predicted batch by batch"""
+        start, stop = self.ranges[split]
+        parts = [model.predict_proba(X)[:, 1] for X, _ in self.reader.iter_batches(start, stop, self.batch_rows)]
+        return np.concatenate(parts) if parts else np.empty(0)
+
+    def split_labels(self, split: str) -> pd.Series:
+        start, stop = self.ranges[split]
+        return pd.Series(self.reader.labels[start:stop].astype(int))
+
+
+def train_market_chunked(
+    market: str,
+    model_types: Optional[List[str]] = None,
+    data_path: Optional[str] = None,
+    memory_ceiling_mb: Optional[float] = None,
+    n_threads: Optional[int] = None,
+    save: bool = True
+) -> Dict:
+    """
+    Train a market's boosted models without loading the table into memory
+
+    Args:
+        market: Market name
+        model_types: Models to train (xgboost / lightgbm; defaults to both)
+        data_path: Parquet training table (defaults to TRAINING_DATA_PATHS[market])
+        memory_ceiling_mb: Peak memory budget (defaults to EXTERNAL_MEMORY_CONFIG)
+        n_threads: Library thread count
+        save: Save models, ensemble metadata and calibration
+
+    Returns:
+        Dictionary with training results in train_goals_model() format
+    """
+    model_types = [m for m in (model_types or PREBINNED_MODELS) if m in PREBINNED_MODELS]
+    data = ChunkedTrainingData(str(data_path or TRAINING_DATA_PATHS[market]), memory_ceiling_mb)
+    reader = data.reader
+
+    print("\n" + "=" * 60)
+    print(f"CHUNKED TRAINING: {market.upper()}")
+    print("=" * 60)
+    print(f"📂 {reader.path.name}: {len(reader):,} rows, {len(reader.feature_columns)} features, "
+          f"{len(reader.group_offsets) - 1} row groups")
+    for split, (start, stop) in data.ranges.items():
+        print(f"   {split:5s} rows [{start:,}, {stop:,})")
+    print(f"🧮 Memory ceiling {data.memory_ceiling_mb:.0f} MB: streaming {data.memory['streaming_mb']:.1f} MB, "
+          f"labels {data.memory['labels_mb']:.1f} MB, bins {data.memory['bins_mb']:.1f} MB per library")
+    print(f"   XGBoost: {'external memory' if data.xgb_external else 'in-core quantized'}")
+
+    models, val_predictions, test_predictions, all_metrics = {}, {}, {}, {}
+    y_val = data.split_labels('val')
+
+    for model_type in model_types:
+        if model_type == 'lightgbm' and not data.lgb_fits:
+            print(f"⚠️  Skipping LightGBM: {data.memory['bins_mb']:.0f} MB of bins exceed the memory ceiling")
+            continue
+
+        print(f"\n🔄 Training {model_type.upper()} model (chunked)...")
+        try:
+            dtrain, dval = data.xgb_matrices() if model_type == 'xgboost' else data.lgb_datasets()
+            booster, best_iteration = train_booster(model_type, dtrain, dval, n_threads=n_threads, max_bin=data.max_bin)
+            del dtrain, dval
+        except Exception as e:
+            print(f"❌ Error training {model_type}: {e}")
+            continue
+
+        model = PrebinnedBooster(booster, model_type, reader.feature_columns, best_iteration)
+        val_proba = data.predict(model, 'val')
+        metrics = calculate_metrics(y_val, val_proba, (val_proba >= 0.5).astype(int))
+
+        models[model_type] = model
+        val_predictions[model_type] = val_proba
+        test_predictions[model_type] = data.predict(model, 'test')
+        all_metrics[model_type] = metrics
+
+        print(f"✅ {model_type.upper()} trained:")
+        print(f"   Log Loss:    {metrics['log_loss']:.4f}")
+        print(f"   Brier Score: {metrics['brier_score']:.4f}")
+        print(f"   AUC-ROC:     {metrics['auc_roc']:.4f}")
+
+    if not models:
+        print("❌ No models were successfully trained!")
+        return {}
+
+    # Splits are ranges; finalize only needs labels and the streamed predictions
+    split_data = (
+        None, data.split_labels('train'),
+        None, y_val,
+        None, data.split_labels('test'),
+        reader.feature_columns
+    )
+    return finalize_market_models(
+        market, models, val_predictions, all_metrics, split_data,
+        save=save,
+        weights={model_type: ENSEMBLE_WEIGHTS[model_type] for model_type in models},
+        test_predictions=test_predictions
+    )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Train markets from Parquet in chunks')
+    parser.add_argument('--markets', nargs='+', choices=list(MARKETS.keys()), default=list(MARKETS.keys()),
+                       help='Markets to train (default: all)')
+    parser.add_argument('--memory-ceiling-mb', type=float, default=None,
+                       help='Peak memory budget in MB')
+    parser.add_argument('--threads', type=int, default=None,
+                       help='Library threads per fit')
+
+    args = parser.parse_args()
+
+    for market in args.markets:
+        train_market_chunked(market, memory_ceiling_mb=args.memory_ceiling_mb, n_threads=args.threads)
@@ -0,0 +1,464 @@
+"""
+Incremental Retraining
+Warm-start updates of the trained market models on newly completed matches
+
+Per-market watermarks (latest kick-off seen by training) are kept in
+RETRAIN_STATE_PATH.
+An incremental run featurizes only matches after the watermark, adds boosting
+rounds to the XGBoost/LightGBM models on the older part of those matches,
+keeps the logistic model as is and refits the ensemble calibrator on the
+following slice, which the added rounds never saw. The update is written to
+RETRAIN_STAGING_DIR; the caller validates it and then copies it over the live
+models with promote_staged_update (or drops it with discard_staged_update).
+When drift metrics on the new matches exceed RETRAIN_CONFIG['drift_thresholds']
+the caller falls back to a full retrain.
+
+Only the boosted slice counts as trained: an incremental update reports the
+last kick-off of that slice as the market's watermark, so the calibration and
+evaluation matches are featurized again on the next run and boosted on once
+newer matches take their place as the held-out slices.
+"""
+
+import os
+import sys
+import json
+import pickle
+import shutil
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from data_ingestion.models import Match
+from training.config import (
+    MODELS_DIR, MODEL_CONFIGS, RETRAIN_CONFIG, RETRAIN_STAGING_DIR, RETRAIN_STATE_PATH,
+    TRAINING_DATA_PATHS
+)
+from training.utils import (
+    apply_calibration, calculate_metrics, ensemble_predictions,
+    fit_calibration_model, load_model_with_metadata, load_training_data,
+    save_model_with_metadata
+)
+
+
+# Models updated by adding boosting rounds; other base models are kept as is
+BOOSTED_MODELS = ['xgboost', 'lightgbm']
+
+
+def load_retrain_state() -> Dict:
+    """Watermarks of the last training run ({} before the first run)"""
+    if not RETRAIN_STATE_PATH.exists():
+        return {}
+    with open(RETRAIN_STATE_PATH, 'r') as f:
+        return json.load(f)
+
+
+def get_watermark(market: Optional[str] = None) -> Optional[datetime]:
+    """
+    Latest kick-off included in the trained models
+
+    Args:
+        market: Market name (None returns the oldest watermark of all markets)
+
+    Returns:
+        Watermark, or None before the first run
+    """
+    state = load_retrain_state()
+    if market is not None:
+        watermark = state.get('markets', {}).get(market, {}).get('watermark')
+    else:
+        watermark = state.get('watermark')
+    return datetime.fromisoformat(watermark) if watermark else None
+
+
+def save_watermark(modes: Dict[str, str], watermarks: Optional[Dict[str, datetime]] = None):
+    """
+    Record the watermarks of a finished training run
+
+    Markets that were trained (fully or incrementally) move their watermark
+    to the newest date in their training table, or to the date given in
+    `watermarks`; skipped markets keep theirs.
+
+    Args:
+        modes: Mode used per market ('full', 'incremental' or 'skipped')
+        watermarks: Last kick-off trained on per market, where it is not the
+            newest date in the table (the 'watermark' of an incremental update)
+    """
+    state = load_retrain_state()
+    markets = state.get('markets', {})
+    watermarks = watermarks or {}
+
+    for market, mode in modes.items():
+        if mode == 'skipped' and market in markets:
+            continue
+        if watermarks.get(market) is not None:
+            latest = watermarks[market]
+        else:
+            latest = load_training_data(str(TRAINING_DATA_PATHS[market]), columns=['date'])['date'].max()
+        if pd.isna(latest):
+            continue
+        markets[market] = {
+            'watermark': pd.Timestamp(latest).isoformat(),
+            'mode': mode,
+            'updated_at': datetime.now().isoformat()
+        }
+
+    if not markets:
+        return
+
+    state = {
+        'watermark': min(entry['watermark'] for entry in markets.values()),
+        'markets': markets,
+        'updated_at': datetime.now().isoformat()
+    }
+
+    RETRAIN_STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with open(RETRAIN_STATE_PATH, 'w') as f:
+        json.dump(state, f, indent=2)
+
+    print(f"💾 Saved training watermarks (oldest {state['watermark']})")
+
+
+def count_new_matches(session: Session, since: Optional[datetime]) -> int:
+    """
+    Number of completed matches kicking off after the watermark
+
+    Args:
+        session: Database session
+        since: Watermark (None counts every completed match)
+
+    Returns:
+        Match count
+    """
+    query = session.query(func.count(Match.match_id)).filter(Match.status == 'completed')
+    if since is not None:
+        query = query.filter(Match.match_datetime > since)
+    return query.scalar() or 0
+
+
+def population_stability_index(
+    expected: np.ndarray,
+    actual: np.ndarray,
+    bins: int = 10
+) -> float:
+    """
+    Population stability index of one feature
+
+    Bins are deciles of the reference (expected) distribution.
+
+    Args:
+        expected: Reference values (training data)
+        actual: New values
+
+    Returns:
+        PSI (0.1-0.25 moderate shift, > 0.25 significant shift)
+    """
+    expected = expected[np.isfinite(expected)]
+    actual = actual[np.isfinite(actual)]
+    if len(expected) == 0 or len(actual) == 0:
+        return 0.0
+
+    edges = np.unique(np.quantile(expected, np.linspace(0, 1, bins + 1)))
+    if len(edges) < 2:
+        return 0.0
+    edges[0], edges[-1] = -np.inf, np.inf
+
+    expected_pct = np.histogram(expected, edges)[0] / len(expected)
+    actual_pct = np.histogram(actual, edges)[0] / len(actual)
+    expected_pct = np.clip(expected_pct, 1e-4, None)
+    actual_pct = np.clip(actual_pct, 1e-4, None)
+
+    return float(np.sum((actual_pct - expected_pct) * np.log(actual_pct / expected_pct)))
+
+
+def _predict_ensemble(models: Dict, weights: Dict, calibration_model, method: str, X: pd.DataFrame):
+    """Calibrated ensemble probability (and raw ensemble) for a feature frame"""
+    raw = ensemble_predictions(
+        {model_type: model.predict_proba(X)[:, 1] for model_type, model in models.items()},
+        weights
+    )
+    return apply_calibration(calibration_model, raw, method), raw
+
+
+def detect_drift(
+    metadata: Dict,
+    models: Dict,
+    calibration_model,
+    reference_df: pd.DataFrame,
+    new_df: pd.DataFrame
+) -> Dict:
+    """
+    Compare the deployed ensemble on new matches with its training-time metrics
+
+    Args:
+        metadata: Ensemble metadata (feature_columns, weights, metrics)
+        models: Deployed base models
+        calibration_model: Deployed ensemble calibrator
+        reference_df: Matches the deployed models were trained on
+        new_df: Matches completed after the watermark
+
+    Returns:
+        Dictionary with the new-match metrics, per-metric increases, the
+        largest feature PSI and a boolean 'drift'
+    """
+    thresholds = RETRAIN_CONFIG['drift_thresholds']
+    feature_cols = metadata['feature_columns']
+
+    proba, _ = _predict_ensemble(
+        models, metadata['weights'], calibration_model,
+        metadata['calibration_method'], new_df[feature_cols].fillna(0)
+    )
+    new_metrics = calculate_metrics(new_df['y'].astype(int), proba)
+    baseline = metadata.get('metrics', {}).get('test') or metadata.get('metrics', {}).get('validation', {})
+
+    psi = {
+        col: population_stability_index(
+            reference_df[col].to_numpy(dtype=np.float64),
+            new_df[col].to_numpy(dtype=np.float64)
+        )
+        for col in feature_cols
+    }
+    worst_feature = max(psi, key=psi.get) if psi else None
+
+    drift = {
+        'new_metrics': new_metrics,
+        'log_loss_increase': new_metrics['log_loss'] - baseline.get('log_loss', new_metrics['log_loss']),
+        'brier_increase': new_metrics['brier_score'] - baseline.get('brier_score', new_metrics['brier_score']),
+        'max_psi': psi[worst_feature] if worst_feature else 0.0,
+        'max_psi_feature': worst_feature
+    }
+    drift['drift'] = bool(
+        drift['log_loss_increase'] > thresholds['log_loss_increase']
+        or drift['brier_increase'] > thresholds['brier_increase']
+        or drift['max_psi'] > thresholds['max_psi']
+    )
+
+    return drift
+
+
+def continue_boosting(model, model_type: str, X: pd.DataFrame, y: pd.Series, extra_rounds: int):
+    """
+    Add boosting rounds to a fitted XGBoost or LightGBM classifier
+
+    Args:
+        model: Fitted XGBClassifier or LGBMClassifier
+        model_type: 'xgboost' or 'lightgbm'
+        X, y: New matches
+        extra_rounds: Trees to add
+
+    Returns:
+        New classifier containing the original trees plus extra_rounds more
+    """
+    params = MODEL_CONFIGS[model_type]['params'].copy()
+    params['n_estimators'] = extra_rounds
+    # No held-out set to stop on; the number of added rounds is fixed
+    params.pop('early_stopping_rounds', None)
+
+    if model_type == 'xgboost':
+        from xgboost import XGBClassifier
+        updated = XGBClassifier(**params)
+        updated.fit(X, y, xgb_model=model.get_booster(), verbose=False)
+    elif model_type == 'lightgbm':
+        from lightgbm import LGBMClassifier
+        updated = LGBMClassifier(**params)
+        updated.fit(X, y, init_model=model.booster_)
+    else:
+        raise ValueError(f"Cannot continue boosting model type: {model_type}")
+
+    return updated
+
+
+def promote_staged_update(market: str):
+    """
+    Copy a validated incremental update over the live models of a market
+
+    Each file is copied next to its target and renamed over it, so readers
+    never see a partially written model; the ensemble metadata goes last.
+
+    Args:
+        market: Market name
+    """
+    staging_dir = RETRAIN_STAGING_DIR / market
+    market_dir = MODELS_DIR / market
+    files = sorted(staging_dir.iterdir(), key=lambda path: path.name == 'ensemble_metadata.json')
+
+    for path in files:
+        partial = market_dir / f".{path.name}.partial"
+        shutil.copy2(path, partial)
+        os.replace(partial, market_dir / path.name)
+
+    shutil.rmtree(staging_dir)
+    print(f"💾 Promoted staged update of {market} to {market_dir}")
+
+
+def discard_staged_update(market: str):
+    """Drop an incremental update that failed validation"""
+    shutil.rmtree(RETRAIN_STAGING_DIR / market, ignore_errors=True)
+
+
+def incremental_update_market(market: str, since: datetime) -> Optional[Dict]:
+    """
+    Warm-start update of one market's ensemble on matches after the watermark
+
+    The updated models are written to RETRAIN_STAGING_DIR; the live models are
+    untouched until promote_staged_update(). The returned 'watermark' is the
+    last kick-off of the boosted slice, so the held-out matches after it are
+    trained on by a later run rather than dropped.
+
+    Args:
+        market: Market name (goals, btts, cards, corners)
+        since: Watermark of the previous training run
+
+    Returns:
+        Dictionary with training results (train_goals_model() format plus
+        'mode', 'drift', 'staging_dir' and 'watermark'; only mode 'skipped' when there are
+        too few new matches), or None when a full retrain is required
+    """
+    print("\n" + "=" * 60)
+    print(f"INCREMENTAL UPDATE: {market.upper()}")
+    print("=" * 60)
+
+    config = RETRAIN_CONFIG['incremental']
+    market_dir = MODELS_DIR / market
+    staging_dir = RETRAIN_STAGING_DIR / market
+    ensemble_path = market_dir / 'ensemble_metadata.json'
+    calib_path = market_dir / 'ensemble_calibration.pkl'
+
+    if not ensemble_path.exists() or not calib_path.exists():
+        print(f"⚠️  No trained ensemble for {market} - full retrain required")
+        return None
+
+    with open(ensemble_path, 'r') as f:
+        metadata = json.load(f)
+    with open(calib_path, 'rb') as f:
+        calibration_model = pickle.load(f)
+
+    models = {
+        model_type: load_model_with_metadata(market, model_type)[0]
+        for model_type in metadata['base_models']
+    }
+
+    df = load_training_data(str(TRAINING_DATA_PATHS[market]))
+    df = df.dropna(subset=['y']).sort_values('date').reset_index(drop=True)
+    feature_cols = metadata['feature_columns']
+
+    missing = [col for col in feature_cols if col not in df.columns]
+    if missing:
+        print(f"⚠️  Feature columns changed ({len(missing)} missing) - full retrain required")
+        return None
+
+    is_new = df['date'] > pd.Timestamp(since)
+    new_df = df[is_new]
+    reference_df = df[~is_new].tail(config['reference_window'])
+
+    if len(new_df) < RETRAIN_CONFIG['min_new_matches']:
+        print(f"✅ Only {len(new_df)} new matches - keeping current models")
+        return {'mode': 'skipped', 'new_matches': len(new_df)}
+
+    # Drift check with the deployed models before touching them
+    drift = detect_drift(metadata, models, calibration_model, reference_df, new_df)
+    print(f"📊 Drift on {len(new_df):,} new matches:")
+    print(f"   Log loss increase:  {drift['log_loss_increase']:+.4f}")
+    print(f"   Brier increase:     {drift['brier_increase']:+.4f}")
+    print(f"   Max PSI:            {drift['max_psi']:.3f} ({drift['max_psi_feature']})")
+
+    if drift['drift']:
+        print(f"⚠️  Drift thresholds exceeded - full retrain required")
+        return None
+
+    # Newest matches are held out for evaluation, the slice before them for calibration
+    n_test = max(1, int(len(new_df) * config['test_fraction']))
+    n_calib = max(1, int(len(new_df) * config['calibration_fraction']))
+    fit_df = new_df.iloc[:-(n_calib + n_test)]
+    calib_df = new_df.iloc[-(n_calib + n_test):-n_test]
+    test_df = new_df.iloc[-n_test:]
+
+    X_fit = fit_df[feature_cols].fillna(0)
+    y_fit = fit_df['y'].astype(int)
+
+    for model_type in BOOSTED_MODELS:
+        if model_type in models:
+            print(f"🔄 Adding {config['extra_rounds']} rounds to {model_type.upper()}...")
+            models[model_type] = continue_boosting(
+                models[model_type], model_type, X_fit, y_fit, config['extra_rounds']
+            )
+
+    # Refit the calibrator on out-of-sample predictions of the updated models
+    X_calib = calib_df[feature_cols].fillna(0)
+    y_calib = calib_df['y'].astype(int)
+
+    calib_raw = ensemble_predictions(
+        {model_type: model.predict_proba(X_calib)[:, 1] for model_type, model in models.items()},
+        metadata['weights']
+    )
+    calibration_model = fit_calibration_model(calib_raw, y_calib.values, metadata['calibration_method'])
+    calib_metrics = calculate_metrics(
+        y_calib, apply_calibration(calibration_model, calib_raw, metadata['calibration_method'])
+    )
+
+    test_proba, _ = _predict_ensemble(
+        models, metadata['weights'], calibration_model,
+        metadata['calibration_method'], test_df[feature_cols].fillna(0)
+    )
+    test_metrics = calculate_metrics(test_df['y'].astype(int), test_proba)
+
+    print(f"✅ Updated ensemble on {len(test_df):,} held-out new matches:")
+    print(f"   Log Loss:    {test_metrics['log_loss']:.4f}")
+    print(f"   Brier Score: {test_metrics['brier_score']:.4f}")
+
+    # Stage updated base models, calibrator and metadata
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    staging_dir.mkdir(parents=True)
+    for model_type in BOOSTED_MODELS:
+        if model_type in models:
+            save_model_with_metadata(
+                model=models[model_type],
+                market=market,
+                metrics=calculate_metrics(y_calib, models[model_type].predict_proba(X_calib)[:, 1]),
+                feature_columns=feature_cols,
+                model_type=model_type,
+                train_start_date=None,
+                train_end_date=str(fit_df['date'].max()),
+                additional_info={
+                    'incremental': True,
+                    'extra_rounds': config['extra_rounds'],
+                    'new_samples': len(fit_df)
+                },
+                models_dir=RETRAIN_STAGING_DIR
+            )
+
+    with open(staging_dir / calib_path.name, 'wb') as f:
+        pickle.dump(calibration_model, f)
+
+    metadata['metrics'] = {'validation': calib_metrics, 'test': test_metrics}
+    metadata['incremental_updates'] = metadata.get('incremental_updates', []) + [{
+        'updated_at': datetime.now().isoformat(),
+        'since': pd.Timestamp(since).isoformat(),
+        'new_matches': len(new_df),
+        'calibration_samples': len(calib_df),
+        'drift': {k: v for k, v in drift.items() if k != 'new_metrics'}
+    }]
+    with open(staging_dir / ensemble_path.name, 'w') as f:
+        json.dump(metadata, f, indent=2)
+
+    print(f"💾 Staged incremental update for {market} in {staging_dir}")
+
+    return {
+        'models': models,
+        'ensemble_metrics': calib_metrics,
+        'test_metrics': test_metrics,
+        'calibration_model': calibration_model,
+        'feature_columns': feature_cols,
+        'mode': 'incremental',
+        'drift': drift,
+        'staging_dir': str(staging_dir),
+        'watermark': fit_df['date'].max()
+    }
@@ -0,0 +1,420 @@
+"""
+Parallel Training Orchestrator
+Runs every (market, model) fit in a process pool under a global CPU budget
+
+Each job gets a fixed number of library threads (n_jobs for XGBoost,
+LightGBM and Random Forest, BLAS/OpenMP pools via threadpoolctl), so the
+threads of all running jobs never exceed the budget. Fitted base models
+come back to the parent, which builds each market's ensemble and calibration.
+"""
+
+import os
+import sys
+import json
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from threadpoolctl import threadpool_limits
+    THREADPOOLCTL_AVAILABLE = True
+except ImportError:
+    THREADPOOLCTL_AVAILABLE = False
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from training.config import DEFAULT_MODELS, MARKETS, MODELS_DIR, TRAINING_DATA_PATHS
+from training.train_goals import (
+    prepare_data, train_single_model, finalize_market_models, THREADED_MODELS
+)
+from training.binned_matrix import SharedTrainingMatrix, PREBINNED_MODELS
+
+
+# Relative cost of a fit; the slowest jobs are started first
+JOB_COST = {
+    'xgboost': 3,
+    'lightgbm': 2,
+    'random_forest': 2,
+    'logistic': 1
+}
+
+
+def plan_jobs(
+    markets: List[str],
+    model_types: List[str],
+    cpu_budget: int,
+    max_workers: Optional[int] = None
+) -> Tuple[List[Dict], int]:
+    """
+    Split the CPU budget between (market, model) jobs
+
+    Args:
+        markets: Markets to train
+        model_types: Model types per market
+        cpu_budget: Total cores available to training
+        max_workers: Cap on concurrent processes (defaults to one per job)
+
+    Returns:
+        Tuple of (jobs, number of worker processes). Each job is a dict with
+        market, model_type and n_threads; workers * n_threads <= cpu_budget.
+    """
+    jobs = [
+        {'market': market, 'model_type': model_type}
+        for market in markets
+        for model_type in model_types
+    ]
+    jobs.sort(key=lambda job: -JOB_COST.get(job['model_type'], 1))
+
+    workers = max(1, min(len(jobs), cpu_budget, max_workers or len(jobs)))
+    threads = max(1, cpu_budget // workers)
+
+    for job in jobs:
+        job['n_threads'] = threads if job['model_type'] in THREADED_MODELS else 1
+
+    return jobs, workers
+
+
+@lru_cache(maxsize=4)
+def _load_market_data(data_path: str) -> tuple:
+    """prepare_data() cached per worker process (one load per market)"""
+    return prepare_data(data_path)
+
+
+def _run_job(job: Dict, data_path: str) -> Dict:
+    """Fit one base model inside a worker process"""
+    start = time.perf_counter()
+    limits = threadpool_limits(limits=job['n_threads']) if THREADPOOLCTL_AVAILABLE else None
+
+    try:
+        data = _load_market_data(data_path)
+        load_seconds = time.perf_counter() - start
+
+        X_train, y_train, X_val, y_val = data[:4]
+        model, val_proba, metrics = train_single_model(
+            job['model_type'], X_train, y_train, X_val, y_val,
+            n_threads=job['n_threads']
+        )
+    finally:
+        if limits is not None:
+            limits.restore_original_limits()
+
+    return {
+        **job,
+        'model': model,
+        'val_proba': val_proba,
+        'metrics': metrics,
+        'load_seconds': load_seconds,
+        'seconds': time.perf_counter() - start,
+        'pid': os.getpid()
+    }
+
+
+def print_timing_report(report: Dict):
+    """
+    Print the combined timing report of a training run
+
+    Args:
+        report: Timing report from train_markets_parallel()
+    """
+    print("\n" + "=" * 60)
+    print("TRAINING TIMING REPORT")
+    print("=" * 60)
+    print(f"CPU budget: {report['cpu_budget']} cores, {report['workers']} workers")
+    print(f"\n{'Market':10s} {'Model':14s} {'Threads':>7s} {'Load s':>8s} {'Fit s':>8s}")
+    for job in report['jobs']:
+        print(f"{job['market']:10s} {job['model_type']:14s} {job['n_threads']:7d} "
+              f"{job['load_seconds']:8.2f} {job['seconds'] - job['load_seconds']:8.2f}")
+
+    print(f"\n⏱️  Sum of job times:    {report['job_seconds']:8.2f}s")
+    print(f"⏱️  Parallel fit wall:   {report['fit_wall_seconds']:8.2f}s")
+    print(f"⏱️  Ensemble/calibrate:  {report['finalize_seconds']:8.2f}s")
+    print(f"⏱️  Total wall time:     {report['wall_seconds']:8.2f}s")
+    print(f"🚀 Speed-up vs serial:  {report['speedup']:8.2f}x")
+    print("=" * 60)
+
+
+def train_markets_parallel(
+    markets: Optional[List[str]] = None,
+    model_types: Optional[List[str]] = None,
+    cpu_budget: Optional[int] = None,
+    max_workers: Optional[int] = None,
+    data_paths: Optional[Dict[str, str]] = None,
+    save: bool = True
+) -> Tuple[Dict, Dict]:
+    """
+    Train all markets and models in a process pool
+
+    Args:
+        markets: Markets to train (defaults to all of MARKETS)
+        model_types: Base models per market (defaults to DEFAULT_MODELS)
+        cpu_budget: Total cores for training (defaults to os.cpu_count())
+        max_workers: Cap on concurrent processes (1 reproduces a sequential
+            run with every fit using the whole budget)
+        data_paths: Mapping of market to training data (defaults to TRAINING_DATA_PATHS)
+        save: Save models, ensembles and the timing report
+
+    Returns:
+        Tuple of (results per market in train_goals_model() format, timing report)
+    """
+    markets = markets or list(MARKETS.keys())
+    model_types = model_types or DEFAULT_MODELS
+    cpu_budget = cpu_budget or os.cpu_count() or 1
+    data_paths = data_paths or {market: str(TRAINING_DATA_PATHS[market]) for market in markets}
+
+    jobs, workers = plan_jobs(markets, model_types, cpu_budget, max_workers)
+
+    print("\n" + "=" * 60)
+    print(f"PARALLEL TRAINING: {len(jobs)} jobs, {workers} workers, {cpu_budget} cores")
+    print("=" * 60)
+
+    started_at = datetime.now().isoformat()
+    start = time.perf_counter()
+    finished = []
+
+    # Spawned workers avoid forking a parent whose OpenMP runtime is already initialized
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        futures = {
+            pool.submit(_run_job, job, data_paths[job['market']]): job
+            for job in jobs
+        }
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"❌ Error training {job['market']}/{job['model_type']}: {e}")
+                continue
+
+            finished.append(result)
+            print(f"✅ {job['market']}/{job['model_type']} done in {result['seconds']:.2f}s "
+                  f"({job['n_threads']} threads, pid {result['pid']})")
+
+    fit_wall = time.perf_counter() - start
+
+    # Ensemble, calibration and test evaluation per market in the parent
+    results = {}
+    for market in markets:
+        market_jobs = sorted(
+            [r for r in finished if r['market'] == market],
+            key=lambda r: model_types.index(r['model_type'])
+        )
+        if not market_jobs:
+            print(f"❌ No models were successfully trained for {market}!")
+            results[market] = {}
+            continue
+
+        results[market] = finalize_market_models(
+            market,
+            {r['model_type']: r['model'] for r in market_jobs},
+            {r['model_type']: r['val_proba'] for r in market_jobs},
+            {r['model_type']: r['metrics'] for r in market_jobs},
+            prepare_data(data_paths[market]),
+            save=save
+        )
+
+    wall = time.perf_counter() - start
+    job_seconds = sum(r['seconds'] for r in finished)
+
+    report = {
+        'started_at': started_at,
+        'cpu_budget': cpu_budget,
+        'workers': workers,
+        'jobs': [
+            {k: r[k] for k in ('market', 'model_type', 'n_threads', 'load_seconds', 'seconds')}
+            for r in sorted(finished, key=lambda r: (r['market'], r['model_type']))
+        ],
+        'job_seconds': job_seconds,
+        'fit_wall_seconds': fit_wall,
+        'finalize_seconds': wall - fit_wall,
+        'wall_seconds': wall,
+        'speedup': job_seconds / fit_wall if fit_wall > 0 else 0.0
+    }
+
+    print_timing_report(report)
+
+    if save:
+        report_path = MODELS_DIR / 'training_timing.json'
+        with open(report_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Saved timing report to {report_path}")
+
+    return results, report
+
+
+def train_markets_prebinned(
+    markets: Optional[List[str]] = None,
+    model_types: Optional[List[str]] = None,
+    n_threads: Optional[int] = None,
+    data_paths: Optional[Dict[str, str]] = None,
+    save: bool = True
+) -> Tuple[Dict, Dict]:
+    """
+    Train all markets in-process on one shared pre-binned matrix
+
+    The feature matrix is binned once for XGBoost and once for LightGBM
+    and reused by every market; each fit uses all n_threads.
+
+    Args:
+        markets: Markets to train (defaults to all of MARKETS)
+        model_types: Base models per market (defaults to DEFAULT_MODELS)
+        n_threads: Library threads per fit (defaults to os.cpu_count())
+        data_paths: Mapping of market to training data (defaults to TRAINING_DATA_PATHS)
+        save: Save models, ensembles and the timing report
+
+    Returns:
+        Tuple of (results per market in train_goals_model() format, timing report)
+    """
+    markets = markets or list(MARKETS.keys())
+    model_types = model_types or DEFAULT_MODELS
+    n_threads = n_threads or os.cpu_count() or 1
+
+    print("\n" + "=" * 60)
+    print(f"PRE-BINNED TRAINING: {len(markets)} markets x {len(model_types)} models, {n_threads} threads")
+    print("=" * 60)
+
+    started_at = datetime.now().isoformat()
+    start = time.perf_counter()
+
+    matrix = SharedTrainingMatrix.from_training_tables(markets, data_paths)
+    load_seconds = time.perf_counter() - start
+    print(f"📦 Shared matrix {matrix.version}: {len(matrix.X['train']):,} training rows, "
+          f"{len(matrix.feature_columns)} features")
+
+    finished = []
+    for model_type in model_types:
+        for market in markets:
+            job_start = time.perf_counter()
+            try:
+                if model_type in PREBINNED_MODELS:
+                    model, val_proba, metrics = matrix.fit(model_type, market, n_threads=n_threads)
+                else:
+                    X_train, y_train, X_val, y_val = matrix.data_tuple(market)[:4]
+                    model, val_proba, metrics = train_single_model(
+                        model_type, X_train, y_train, X_val, y_val, n_threads=n_threads
+                    )
+            except Exception as e:
+                print(f"❌ Error training {market}/{model_type}: {e}")
+                continue
+
+            finished.append({
+                'market': market, 'model_type': model_type, 'n_threads': n_threads,
+                'model': model, 'val_proba': val_proba, 'metrics': metrics,
+                'load_seconds': 0.0, 'seconds': time.perf_counter() - job_start
+            })
+            print(f"✅ {market}/{model_type} done in {finished[-1]['seconds']:.2f}s")
+
+    fit_wall = time.perf_counter() - start
+
+    results = {}
+    for market in markets:
+        market_jobs = [r for r in finished if r['market'] == market]
+        if not market_jobs:
+            print(f"❌ No models were successfully trained for {market}!")
+            results[market] = {}
+            continue
+
+        results[market] = finalize_market_models(
+            market,
+            {r['model_type']: r['model'] for r in market_jobs},
+            {r['model_type']: r['val_proba'] for r in market_jobs},
+            {r['model_type']: r['metrics'] for r in market_jobs},
+            matrix.data_tuple(market),
+            save=save
+        )
+
+    wall = time.perf_counter() - start
+    job_seconds = sum(r['seconds'] for r in finished)
+
+    report = {
+        'started_at': started_at,
+        'cpu_budget': n_threads,
+        'workers': 1,
+        'matrix_version': matrix.version,
+        'matrix_load_seconds': load_seconds,
+        'jobs': [
+            {k: r[k] for k in ('market', 'model_type', 'n_threads', 'load_seconds', 'seconds')}
+            for r in finished
+        ],
+        'job_seconds': job_seconds,
+        'fit_wall_seconds': fit_wall,
+        'finalize_seconds': wall - fit_wall,
+        'wall_seconds': wall,
+        'speedup': job_seconds / fit_wall if fit_wall > 0 else 0.0
+    }
+
+    print_timing_report(report)
+
+    if save:
+        report_path = MODELS_DIR / 'training_timing.json'
+        with open(report_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Saved timing report to {report_path}")
+
+    return results, report
+
+
+def compare_with_sequential(
+    markets: Optional[List[str]] = None,
+    cpu_budget: Optional[int] = None
+) -> Dict:
+    """
+    Time a sequential run (one job at a time, all cores per fit) against
+    the parallel orchestrator; models are not saved
+
+    Args:
+        markets: Markets to train (defaults to all of MARKETS)
+        cpu_budget: Total cores for training (defaults to os.cpu_count())
+
+    Returns:
+        Dictionary with both wall times and the speed-up
+    """
+    _, sequential = train_markets_parallel(markets, cpu_budget=cpu_budget, max_workers=1, save=False)
+    _, parallel = train_markets_parallel(markets, cpu_budget=cpu_budget, save=False)
+
+    comparison = {
+        'sequential_wall_seconds': sequential['wall_seconds'],
+        'parallel_wall_seconds': parallel['wall_seconds'],
+        'speedup': sequential['wall_seconds'] / parallel['wall_seconds']
+    }
+
+    print("\n" + "=" * 60)
+    print("SEQUENTIAL VS PARALLEL")
+    print("=" * 60)
+    print(f"Sequential wall time: {comparison['sequential_wall_seconds']:8.2f}s (1 worker)")
+    print(f"Parallel wall time:   {comparison['parallel_wall_seconds']:8.2f}s ({parallel['workers']} workers)")
+    print(f"🚀 Speed-up: {comparison['speedup']:.2f}x")
+    print("=" * 60)
+
+    return comparison
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Train all markets in parallel')
+    parser.add_argument('--markets', nargs='+', choices=list(MARKETS.keys()),
+                       help='Markets to train (default: all)')
+    parser.add_argument('--cpu-budget', type=int, default=None,
+                       help='Total cores for training (default: all cores)')
+    parser.add_argument('--workers', type=int, default=None,
+                       help='Maximum concurrent training processes')
+    parser.add_argument('--compare-sequential', action='store_true',
+                       help='Benchmark against a sequential run (models are not saved)')
+    parser.add_argument('--shared-matrix', action='store_true',
+                       help='Train in-process on one pre-binned matrix shared by all markets')
+
+    args = parser.parse_args()
+
+    if args.compare_sequential:
+        compare_with_sequential(args.markets, args.cpu_budget)
+    elif args.shared_matrix:
+        train_markets_prebinned(args.markets, n_threads=args.cpu_budget)
+    else:
+        train_markets_parallel(args.markets, cpu_budget=args.cpu_budget, max_workers=args.workers)
@@ -0,0 +1,196 @@
+"""
+SQL Window-Function Rolling Statistics
+Pushes the dataset builder's rolling team aggregates into the database
+
+A team-match view (one row per team per completed match, home and away
+unioned) is aggregated with window functions partitioned by team and
+venue, ordered by kick-off, over ROWS BETWEEN N PRECEDING AND 1 PRECEDING.
+The whole training table then comes back as one streamed query.
+Works on PostgreSQL and SQLite (3.25+).
+"""
+
+import sys
+from pathlib import Path
+import pandas as pd
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+from sqlalchemy import Float, and_, case, cast, func, literal, select, union_all
+from sqlalchemy.orm import Session
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from data_ingestion.models import Match, MatchResult, LatestOdds
+from training.config import LOOKBACK_WINDOWS
+
+
+ROLLING_STATS = ['goals', 'goals_conceded', 'corners', 'cards', 'btts']
+
+# Result label columns and latest-odds columns returned with every row
+LABEL_COLUMNS = ['over_2_5', 'btts', 'cards_over_3_5', 'corners_over_9_5']
+ODDS_COLUMNS = ['over_2_5_odds', 'btts_yes_odds', 'cards_over_3_5_odds', 'corners_over_9_5_odds']
+
+
+def _team_match_view(venue: str):
+    """One row per (team, completed match) for a venue"""
+    team_id, goals, conceded, corners, cards = {
+        'home': (Match.home_team_id, MatchResult.home_goals, MatchResult.away_goals,
+                 MatchResult.home_corners, MatchResult.home_cards),
+        'away': (Match.away_team_id, MatchResult.away_goals, MatchResult.home_goals,
+                 MatchResult.away_corners, MatchResult.away_cards)
+    }[venue]
+
+    return select(
+        Match.match_id.label('match_id'),
+        Match.match_datetime.label('match_datetime'),
+        team_id.label('team_id'),
+        literal(venue).label('venue'),
+        cast(func.coalesce(goals, 0), Float).label('goals'),
+        cast(func.coalesce(conceded, 0), Float).label('goals_conceded'),
+        cast(func.coalesce(corners, 0), Float).label('corners'),
+        cast(func.coalesce(cards, 0), Float).label('cards'),
+        case((MatchResult.btts == True, 1.0), else_=0.0).label('btts')
+    ).join_from(
+        Match, MatchResult, Match.match_id == MatchResult.match_id
+    ).where(
+        Match.status == 'completed'
+    )
+
+
+def build_rolling_stats_cte(windows: Optional[List[int]] = None):
+    """
+    Rolling aggregates for every team-match row
+
+    Args:
+        windows: Window sizes (defaults to LOOKBACK_WINDOWS values)
+
+    Returns:
+        CTE with match_id, venue, <stat>_avg_<n> and matches_count_<n> columns.
+        Rows are ordered by (match_datetime, match_id) inside each partition,
+        so matches sharing an exact kick-off are ordered by match_id.
+    """
+    windows = windows or sorted(set(LOOKBACK_WINDOWS.values()))
+    team_matches = union_all(_team_match_view('home'), _team_match_view('away')).subquery('team_matches')
+
+    partition = (team_matches.c.team_id, team_matches.c.venue)
+    order = (team_matches.c.match_datetime, team_matches.c.match_id)
+
+    columns = [team_matches.c.match_id, team_matches.c.venue]
+    for n in windows:
+        for stat in ROLLING_STATS:
+            columns.append(
+                func.avg(team_matches.c[stat]).over(
+                    partition_by=partition, order_by=order, rows=(-n, -1)
+                ).label(f'{stat}_avg_{n}')
+            )
+        columns.append(
+            func.count(team_matches.c.match_id).over(
+                partition_by=partition, order_by=order, rows=(-n, -1)
+            ).label(f'matches_count_{n}')
+        )
+
+    return select(*columns).cte('rolling_stats')
+
+
+def build_training_query(windows: Optional[List[int]] = None, since: Optional[datetime] = None):
+    """
+    Single query returning match info, home/away rolling stats, labels and latest odds
+
+    Args:
+        windows: Window sizes (defaults to LOOKBACK_WINDOWS values)
+        since: Only return matches kicking off after this time (the window
+            functions still see the full history)
+
+    Returns:
+        SQLAlchemy select ordered by kick-off
+    """
+    windows = windows or sorted(set(LOOKBACK_WINDOWS.values()))
+    rolling = build_rolling_stats_cte(windows)
+    home_stats = rolling.alias('home_stats')
+    away_stats = rolling.alias('away_stats')
+
+    stat_columns = []
+    for side, stats in (('home', home_stats), ('away', away_stats)):
+        for n in windows:
+            for stat in ROLLING_STATS:
+                stat_columns.append(stats.c[f'{stat}_avg_{n}'].label(f'{side}_{stat}_avg_{n}'))
+            stat_columns.append(stats.c[f'matches_count_{n}'].label(f'{side}_matches_count_{n}'))
+
+    query = select(
+        Match.match_id,
+        Match.match_datetime.label('date'),
+        Match.league,
+        Match.season,
+        Match.home_team_id,
+        Match.away_team_id,
+        *stat_columns,
+        *[getattr(MatchResult, column) for column in LABEL_COLUMNS],
+        *[cast(getattr(LatestOdds, column), Float).label(column) for column in ODDS_COLUMNS]
+    ).join_from(
+        Match, MatchResult, Match.match_id == MatchResult.match_id
+    ).join(
+        LatestOdds, Match.match_id == LatestOdds.match_id
+    ).join(
+        home_stats, and_(home_stats.c.match_id == Match.match_id, home_stats.c.venue == 'home')
+    ).join(
+        away_stats, and_(away_stats.c.match_id == Match.match_id, away_stats.c.venue == 'away')
+    ).where(
+        Match.status == 'completed'
+    )
+    if since is not None:
+        query = query.where(Match.match_datetime > since)
+
+    return query.order_by(Match.match_datetime, Match.match_id)
+
+
+def stream_training_rows(
+    session: Session,
+    windows: Optional[List[int]] = None,
+    chunk_size: int = 10000,
+    since: Optional[datetime] = None
+) -> Iterator[pd.DataFrame]:
+    """
+    Execute the training query with a server-side cursor and yield DataFrame chunks
+
+    Args:
+        session: Database session
+        windows: Window sizes (defaults to LOOKBACK_WINDOWS values)
+        chunk_size: Rows fetched per chunk
+        since: Only matches kicking off after this time
+
+    Yields:
+        DataFrame chunks in kick-off order
+    """
+    result = session.execute(
+        build_training_query(windows, since),
+        execution_options={'yield_per': chunk_size}
+    )
+    columns = list(result.keys())
+
+    for rows in result.partitions():
+        yield pd.DataFrame(rows, columns=columns)
+
+
+def window_stats(chunk: pd.DataFrame, side: str, window: int, min_matches: int) -> Dict[str, object]:
+    """
+    Rolling stats of one side/window in the AsOfStatsEngine.rolling_stats layout
+
+    Args:
+        chunk: DataFrame from stream_training_rows
+        side: 'home' or 'away'
+        window: Window size
+        min_matches: Minimum matches for the window to be valid
+
+    Returns:
+        Dictionary of arrays (goals_avg, ..., btts_rate, matches_count, valid)
+    """
+    count = chunk[f'{side}_matches_count_{window}'].fillna(0).to_numpy()
+    stats = {
+        'btts_rate' if stat == 'btts' else f'{stat}_avg':
+            chunk[f'{side}_{stat}_avg_{window}'].astype(float).to_numpy()
+        for stat in ROLLING_STATS
+    }
+    stats['matches_count'] = count
+    stats['valid'] = count >= min_matches
+    return stats
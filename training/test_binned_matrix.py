@@ -0,0 +1,104 @@
+"""
+Pre-Binned Matrix Test
+Checks that the shared matrix is split like prepare_data, binned once and
+relabelled per market without leaking labels between markets
+"""
+
+import sys
+import pickle
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from training.binned_matrix import SharedTrainingMatrix
+from training.config import MODEL_CONFIGS
+from training.train_goals import prepare_data
+from training.test_tuning import make_training_table
+from training.utils import load_training_data, save_training_data
+
+
+def market_tables(directory: str) -> dict:
+    """Goals and BTTS tables sharing matches and features, with different labels"""
+    goals_path = make_training_table(str(Path(directory) / 'goals.parquet'), n_rows=800)
+    goals = load_training_data(goals_path)
+    btts = goals.copy()
+    btts['y'] = (btts['f2'] - btts['f3'] > 0).astype(int)
+    save_training_data(btts, str(Path(directory) / 'btts.parquet'))
+    return {'goals': goals, 'btts': btts}
+
+
+def small_params(model_type: str) -> dict:
+    params = MODEL_CONFIGS[model_type]['params'].copy()
+    params['n_estimators'] = 20
+    params.pop('early_stopping_rounds', None)
+    return params
+
+
+def test_splits_match_prepare_data():
+    """Every market gets the rows, columns and labels prepare_data would give it"""
+    with tempfile.TemporaryDirectory() as directory:
+        tables = market_tables(directory)
+        matrix = SharedTrainingMatrix.from_training_tables(
+            ['goals', 'btts'],
+            {market: str(Path(directory) / f'{market}.parquet') for market in tables}
+        )
+
+        for market in tables:
+            expected = prepare_data(str(Path(directory) / f'{market}.parquet'))
+            actual = matrix.data_tuple(market)
+            assert actual[-1] == expected[-1]
+            for got, want in zip(actual[:-1], expected[:-1]):
+                np.testing.assert_array_equal(np.asarray(got, dtype=np.float64), np.asarray(want, dtype=np.float64))
+
+
+def test_bins_built_once_and_relabelled():
+    """Both markets train on the same bins; each result equals a matrix built for that market alone"""
+    with tempfile.TemporaryDirectory() as directory:
+        tables = market_tables(directory)
+
+    shared = SharedTrainingMatrix(tables)
+    for model_type, datasets in (('xgboost', shared.xgb_matrices), ('lightgbm', shared.lgb_datasets)):
+        goals_bins = datasets('goals')
+        btts_bins = datasets('btts')
+        assert all(a is b for a, b in zip(goals_bins, btts_bins))
+        np.testing.assert_array_equal(btts_bins[0].get_label(), shared.labels['btts']['train'])
+
+        # Train goals first so the btts fit runs on bins that carried other labels
+        shared.fit(model_type, 'goals', params=small_params(model_type), n_threads=1)
+        _, proba, metrics = shared.fit(model_type, 'btts', params=small_params(model_type), n_threads=1)
+        _, alone, _ = SharedTrainingMatrix({'btts': tables['btts']}).fit(
+            model_type, 'btts', params=small_params(model_type), n_threads=1
+        )
+        np.testing.assert_allclose(proba, alone, rtol=1e-6)
+        assert metrics['auc_roc'] > 0.7
+
+
+def test_prebinned_model_pickles_and_versions():
+    """A fitted model survives pickling; the version follows features, rows and bins"""
+    with tempfile.TemporaryDirectory() as directory:
+        tables = market_tables(directory)
+
+    matrix = SharedTrainingMatrix(tables)
+    model, proba, _ = matrix.fit('xgboost', 'goals', params=small_params('xgboost'), n_threads=1)
+
+    restored = pickle.loads(pickle.dumps(model))
+    shuffled = matrix.X['val'][matrix.feature_columns[::-1]].assign(extra=1.0)
+    np.testing.assert_allclose(restored.predict_proba(shuffled)[:, 1], proba, rtol=1e-6)
+    assert restored.feature_importances_.shape == (len(matrix.feature_columns),)
+
+    assert SharedTrainingMatrix(tables).version == matrix.version
+    assert SharedTrainingMatrix(tables, max_bin=64).version != matrix.version
+    fewer = {market: table.drop(columns=['f5']) for market, table in tables.items()}
+    assert SharedTrainingMatrix(fewer).version != matrix.version
+    shorter = {market: table.iloc[:-10] for market, table in tables.items()}
+    assert SharedTrainingMatrix(shorter).version != matrix.version
+
+
+if __name__ == "__main__":
+    test_splits_match_prepare_data()
+    test_bins_built_once_and_relabelled()
+    test_prebinned_model_pickles_and_versions()
+    print("✅ All pre-binned matrix tests passed")
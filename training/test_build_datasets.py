@@ -0,0 +1,188 @@
+"""
+Dataset Build Test
+Checks the single-pass multi-market build, that streamed builds match the
+in-memory build and that the feature store is read one chunk at a time
+"""
+
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+import pandas as pd
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from data_ingestion.models import Base, MatchResult
+from data_ingestion.testing import ingest, sample_matches
+from features.feature_store import FeatureStore
+from training import build_datasets
+from training.build_datasets import DatasetBuilder, MARKET_SOURCES, count_queries
+from training.config import MARKETS, TRAINING_DATA_PATHS
+from training.utils import load_training_data
+
+N_MATCHES = 120
+
+
+def match_database(count: int = N_MATCHES):
+    """SQLite database with `count` completed matches, results and odds"""
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    ingest(engine, sample_matches(count))
+    return engine
+
+
+@contextmanager
+def training_paths(engine, directory: str):
+    """Point the module-level build functions at a database and a scratch directory"""
+    saved = (build_datasets.get_db, build_datasets.FEATURE_STORE_DIR, dict(TRAINING_DATA_PATHS))
+
+    @contextmanager
+    def get_db():
+        session = sessionmaker(bind=engine)()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    build_datasets.get_db = get_db
+    build_datasets.FEATURE_STORE_DIR = Path(directory) / 'feature_store'
+    TRAINING_DATA_PATHS.update({market: Path(directory) / f'{market}.parquet' for market in MARKETS})
+    try:
+        yield
+    finally:
+        build_datasets.get_db, build_datasets.FEATURE_STORE_DIR, paths = saved
+        TRAINING_DATA_PATHS.update(paths)
+
+
+def in_memory_tables(engine) -> dict:
+    """Reference tables from build_market_tables"""
+    session = sessionmaker(bind=engine)()
+    tables = DatasetBuilder(session).build_market_tables()
+    session.close()
+    return tables
+
+
+def assert_same_table(actual: pd.DataFrame, expected: pd.DataFrame):
+    pd.testing.assert_frame_equal(
+        actual.reset_index(drop=True), expected.reset_index(drop=True), check_dtype=False
+    )
+
+
+def test_all_markets_built_in_one_pass():
+    """Every market comes from the same few queries, whatever the number of markets or matches"""
+    query_counts = []
+    for count in (40, N_MATCHES):
+        engine = match_database(count)
+        session = sessionmaker(bind=engine)()
+        with count_queries(session) as queries:
+            tables = DatasetBuilder(session).build_market_tables()
+        query_counts.append(queries['count'])
+
+        # Each market attaches its own label to the shared feature rows
+        results = {result.match_id: result for result in session.query(MatchResult)}
+        for market, table in tables.items():
+            with count_queries(session) as queries:
+                single = getattr(DatasetBuilder(session), f'build_training_table_for_{market}')()
+            assert queries['count'] == query_counts[-1]
+            assert_same_table(single, table)
+
+            result_attr, _ = MARKET_SOURCES[market]
+            assert MARKETS[market]['odds_column'] in table.columns
+            assert list(table['y']) == [int(bool(getattr(results[m], result_attr))) for m in table['match_id']]
+        session.close()
+
+    assert query_counts[0] == query_counts[1] <= 2
+    assert list(tables) == list(MARKETS)
+
+
+def test_streamed_tables_match_in_memory_build():
+    """Chunked writes produce the same tables as the in-memory build"""
+    engine = match_database()
+    expected = in_memory_tables(engine)
+    assert len(expected['goals']) > 50
+
+    with tempfile.TemporaryDirectory() as directory:
+        session = sessionmaker(bind=engine)()
+        out_paths = {
+            'goals': str(Path(directory) / 'goals.parquet'),
+            'btts': str(Path(directory) / 'btts.feather'),
+            'cards': str(Path(directory) / 'cards.csv')
+        }
+        rows = DatasetBuilder(session).stream_market_tables(out_paths, chunk_size=7)
+        session.close()
+
+        assert rows == {market: len(expected[market]) for market in out_paths}
+        for market, path in out_paths.items():
+            assert_same_table(load_training_data(path), expected[market])
+
+
+def test_feature_store_is_read_per_chunk():
+    """Each chunk reads only its own matches from the store and reuses them on rebuild"""
+    engine = match_database()
+    expected = in_memory_tables(engine)
+    reads = []
+    read_indexed = FeatureStore.read_indexed
+
+    def record_read(self, columns=None, match_ids=None):
+        reads.append(list(match_ids))
+        return read_indexed(self, columns=columns, match_ids=match_ids)
+
+    FeatureStore.read_indexed = record_read
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            store = FeatureStore(Path(directory) / 'store', 'test')
+            for _ in range(2):
+                session = sessionmaker(bind=engine)()
+                builder = DatasetBuilder(session, feature_store=store)
+                rows = builder.stream_market_tables({'goals': str(Path(directory) / 'goals.parquet')}, chunk_size=25)
+                session.close()
+                assert rows['goals'] == len(expected['goals'])
+                assert_same_table(load_training_data(str(Path(directory) / 'goals.parquet')), expected['goals'])
+    finally:
+        FeatureStore.read_indexed = read_indexed
+
+    # First build: nothing stored yet; rebuild: one read of at most 25 matches per chunk
+    assert len(reads) == N_MATCHES // 25 + 1
+    assert all(0 < len(match_ids) <= 25 for match_ids in reads)
+    assert sum(len(match_ids) for match_ids in reads) == len(store.match_ids())
+    assert not hasattr(builder, '_stored_features')
+
+
+def test_update_merges_new_rows_into_tables():
+    """An update after a full build leaves the tables a full build would produce"""
+    engine = match_database()
+    expected = in_memory_tables(engine)
+    since = expected['goals']['date'].iloc[len(expected['goals']) // 2]
+
+    def no_in_memory_build(self, *args, **kwargs):
+        raise AssertionError('build_market_tables used by a module-level build')
+
+    build_market_tables = DatasetBuilder.build_market_tables
+    DatasetBuilder.build_market_tables = no_in_memory_build
+    try:
+        with tempfile.TemporaryDirectory() as directory, training_paths(engine, directory):
+            assert build_datasets.build_all_training_datasets() == {
+                market: len(table) for market, table in expected.items()
+            }
+            # Rows after the watermark are rebuilt and replace the stored ones
+            added = build_datasets.update_training_datasets(since=since)
+            assert added['goals'] == (expected['goals']['date'] > since).sum()
+
+            for market, table in expected.items():
+                assert_same_table(load_training_data(str(TRAINING_DATA_PATHS[market])), table)
+            assert sorted(path.name for path in Path(directory).iterdir()) == sorted(
+                ['feature_store'] + [f'{market}.parquet' for market in MARKETS]
+            )
+    finally:
+        DatasetBuilder.build_market_tables = build_market_tables
+
+
+if __name__ == "__main__":
+    test_all_markets_built_in_one_pass()
+    test_streamed_tables_match_in_memory_build()
+    test_feature_store_is_read_per_chunk()
+    test_update_merges_new_rows_into_tables()
+    print("✅ All dataset build tests passed")
@@ -0,0 +1,75 @@
+"""
+Time-Series Cross-Validation Test
+Checks expanding-window fold boundaries and the out-of-fold ensemble fit
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from training.cross_validation import expanding_window_folds, fit_ensemble_weights, cross_validate_market
+from training.test_tuning import make_training_table
+
+
+def test_expanding_window_folds_boundaries():
+    """Validation windows are contiguous, follow their training window and end at the last row"""
+    assert expanding_window_folds(100, 4, 0.5) == [(50, 62), (62, 74), (74, 86), (86, 100)]
+
+    for n_rows, n_folds, fraction in [(1000, 5, 0.4), (97, 3, 0.3), (10, 2, 0.5)]:
+        folds = expanding_window_folds(n_rows, n_folds, fraction)
+        assert len(folds) == n_folds
+        assert folds[0][0] == int(n_rows * fraction)
+        assert folds[-1][1] == n_rows
+        for (train_end, val_end), (next_train_end, _) in zip(folds, folds[1:]):
+            # Fold k + 1 trains on everything fold k trained and validated on
+            assert train_end < val_end == next_train_end
+
+
+def test_expanding_window_folds_too_few_rows():
+    """Periods without room for a training row or a validation window are rejected"""
+    with pytest.raises(ValueError):
+        expanding_window_folds(5, 10, 0.5)
+    with pytest.raises(ValueError):
+        expanding_window_folds(1, 1, 0.5)
+
+
+def test_fit_ensemble_weights_prefers_informative_model():
+    """Weights sum to one and favour the model that predicts the labels"""
+    rng = np.random.default_rng(0)
+    y = rng.integers(0, 2, size=2000)
+    informative = np.clip(0.5 + (y - 0.5) * 0.6 + rng.normal(0, 0.05, size=y.size), 0.01, 0.99)
+    noise = rng.uniform(0.01, 0.99, size=y.size)
+
+    weights = fit_ensemble_weights({'xgboost': informative, 'lightgbm': noise}, y)
+    assert abs(sum(weights.values()) - 1) < 1e-3
+    assert weights['xgboost'] > 0.9
+
+
+def test_cross_validate_market_out_of_fold_rows():
+    """Out-of-fold predictions cover every row after the first training window, in date order"""
+    with tempfile.TemporaryDirectory() as directory:
+        data_path = make_training_table(str(Path(directory) / 'goals.parquet'), n_rows=500)
+        result = cross_validate_market('goals', model_types=['xgboost', 'lightgbm'], n_folds=3,
+                                       cpu_budget=1, data_path=data_path)
+        labels = pd.read_parquet(data_path).sort_values('date')['y'].to_numpy()
+
+    first_train_end = result['folds'][0][0]
+    assert result['folds'][-1][1] == len(result['oof_labels']) + first_train_end
+    np.testing.assert_array_equal(result['oof_labels'], labels[first_train_end:result['folds'][-1][1]])
+    for proba in result['oof_predictions'].values():
+        assert proba.shape == result['oof_labels'].shape
+    assert len(result['fold_metrics']) == 6
+
+
+if __name__ == "__main__":
+    test_expanding_window_folds_boundaries()
+    test_expanding_window_folds_too_few_rows()
+    test_fit_ensemble_weights_prefers_informative_model()
+    test_cross_validate_market_out_of_fold_rows()
+    print("✅ All cross-validation tests passed")
@@ -0,0 +1,130 @@
+"""
+External-Memory Training Test
+Checks the row-group reader against prepare_data, the memory-ceiling plan
+and chunked training of both boosters
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from training import external_memory
+from training.external_memory import ChunkedTrainingData, ParquetTrainingReader, train_market_chunked
+from training.train_goals import prepare_data
+from training.test_tuning import make_training_table
+from training.utils import load_training_data
+
+N_ROWS = 1200
+ROW_GROUP_ROWS = 100
+
+
+def chunked_table(directory: str, unordered: bool = False) -> str:
+    """Parquet table in small row groups, with some unlabelled rows"""
+    path = make_training_table(str(Path(directory) / 'goals.parquet'), n_rows=N_ROWS)
+    df = load_training_data(path)
+    df['y'] = df['y'].astype('float32')
+    df.loc[df.index % 37 == 5, 'y'] = np.nan
+    df.loc[df.index % 11 == 3, 'f4'] = np.nan
+    if unordered:
+        df = df.iloc[::-1]
+    df.to_parquet(path, index=False, row_group_size=ROW_GROUP_ROWS)
+    return path
+
+
+def test_reader_matches_prepare_data():
+    """Split ranges, streamed features and labels equal prepare_data's frames"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = chunked_table(directory)
+        reader = ParquetTrainingReader(path)
+        X_train, y_train, X_val, y_val, X_test, y_test, feature_cols = prepare_data(path)
+
+        assert reader.feature_columns == feature_cols
+        assert len(reader.group_offsets) - 1 == N_ROWS // ROW_GROUP_ROWS
+        ranges = reader.split_ranges()
+
+        for split, X, y in (('train', X_train, y_train), ('val', X_val, y_val), ('test', X_test, y_test)):
+            start, stop = ranges[split]
+            assert stop - start == len(X)
+
+            batches = list(reader.iter_batches(start, stop, batch_rows=70))
+            features = np.vstack([batch for batch, _ in batches])
+            labels = np.concatenate([batch for _, batch in batches])
+            np.testing.assert_array_equal(features, X.to_numpy(dtype=np.float32))
+            np.testing.assert_array_equal(labels, y.to_numpy())
+            np.testing.assert_array_equal(reader.row(start + 3), features[3])
+
+        try:
+            ParquetTrainingReader(chunked_table(directory, unordered=True))
+            raise AssertionError('unordered table accepted')
+        except ValueError as e:
+            assert 'kick-off order' in str(e)
+
+
+def test_memory_ceiling_plan():
+    """The ceiling decides between in-core bins, paged XGBoost bins and refusing the table"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = chunked_table(directory)
+        cache = str(Path(directory) / 'cache')
+
+        data = ChunkedTrainingData(path, memory_ceiling_mb=1024, cache_dir=cache)
+        assert not data.xgb_external and data.lgb_fits
+
+        resident = data.memory['streaming_mb'] + data.memory['labels_mb']
+        tight = ChunkedTrainingData(path, memory_ceiling_mb=resident + data.memory['bins_mb'] / 2, cache_dir=cache)
+        assert tight.xgb_external and not tight.lgb_fits
+
+        try:
+            ChunkedTrainingData(path, memory_ceiling_mb=resident / 2, cache_dir=cache)
+            raise AssertionError('row group above the ceiling accepted')
+        except MemoryError:
+            pass
+
+
+def test_chunked_training_in_core_and_external():
+    """Both boosters train from chunks; paged XGBoost bins and cached LightGBM bins give the same models"""
+    saved = dict(external_memory.EXTERNAL_MEMORY_CONFIG)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = chunked_table(directory)
+        external_memory.EXTERNAL_MEMORY_CONFIG['cache_dir'] = Path(directory) / 'cache'
+        try:
+            result = train_market_chunked('goals', data_path=path, n_threads=1, save=False)
+            assert set(result['models']) == {'xgboost', 'lightgbm'}
+            assert result['test_metrics']['auc_roc'] > 0.7
+
+            # Second run loads the LightGBM binaries written by the first
+            cached = list((Path(directory) / 'cache').glob('*_lgb_*.bin'))
+            assert len(cached) == 2
+            data = ChunkedTrainingData(path)
+            rerun = train_market_chunked('goals', model_types=['lightgbm'], data_path=path, n_threads=1, save=False)
+            np.testing.assert_allclose(
+                data.predict(rerun['models']['lightgbm'], 'test'),
+                data.predict(result['models']['lightgbm'], 'test')
+            )
+
+            # Paged XGBoost bins under a ceiling that leaves no room for them in memory
+            resident = data.memory['streaming_mb'] + data.memory['labels_mb']
+            paged = train_market_chunked(
+                'goals', model_types=['xgboost', 'lightgbm'], data_path=path,
+                memory_ceiling_mb=resident + data.memory['bins_mb'] / 2, n_threads=1, save=False
+            )
+            assert set(paged['models']) == {'xgboost'}
+            np.testing.assert_allclose(
+                data.predict(paged['models']['xgboost'], 'test'),
+                data.predict(result['models']['xgboost'], 'test'),
+                rtol=1e-5
+            )
+        finally:
+            external_memory.EXTERNAL_MEMORY_CONFIG.clear()
+            external_memory.EXTERNAL_MEMORY_CONFIG.update(saved)
+
+
+if __name__ == "__main__":
+    test_reader_matches_prepare_data()
+    test_memory_ceiling_plan()
+    test_chunked_training_in_core_and_external()
+    print("✅ All external-memory training tests passed")
@@ -0,0 +1,167 @@
+"""
+Feature Plan Test
+Checks that training tables and serving build their columns from the same
+FeatureBuilder plan
+"""
+
+import sys
+import json
+import pickle
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from features.feature_builder import FeatureBuilder
+from features.feature_store import FeatureStore
+from predictor.integrated_predictor import IntegratedPredictor
+from training.build_datasets import DatasetBuilder, MATCH_INFO_COLUMNS
+
+STATS = ['goals_avg', 'goals_conceded_avg', 'corners_avg', 'cards_avg', 'btts_rate']
+
+
+def reference_features(match_data: dict) -> dict:
+    """Feature dictionary as built before the registry (one hand-written dict)"""
+    def base(side, stat):
+        return match_data.get(f'{side}_{stat}_5', match_data.get(f'{side}_{stat}', 0))
+
+    features = {f'{side}_{stat}_5': base(side, stat) for stat in STATS for side in ('home', 'away')}
+    for stat in ('goals_avg', 'goals_conceded_avg'):
+        for side in ('home', 'away'):
+            features[f'{side}_{stat}_10'] = match_data.get(f'{side}_{stat}_10', base(side, stat))
+
+    features['combined_goals_avg'] = base('home', 'goals_avg') + base('away', 'goals_avg')
+    features['combined_corners_avg'] = base('home', 'corners_avg') + base('away', 'corners_avg')
+    features['combined_cards_avg'] = base('home', 'cards_avg') + base('away', 'cards_avg')
+    features['combined_btts_rate'] = (base('home', 'btts_rate') + base('away', 'btts_rate')) / 2
+    features['home_attack_vs_away_defense'] = base('home', 'goals_avg') - base('away', 'goals_conceded_avg')
+    features['away_attack_vs_home_defense'] = base('away', 'goals_avg') - base('home', 'goals_conceded_avg')
+    return features
+
+
+def random_match_data(rng: np.random.Generator) -> dict:
+    """Match dictionary mixing suffixed, unsuffixed and missing stats"""
+    match_data = {}
+    for side in ('home', 'away'):
+        for stat in STATS:
+            key = rng.choice([f'{side}_{stat}_5', f'{side}_{stat}', None])
+            if key is not None:
+                match_data[key] = round(float(rng.uniform(0, 6)), 2)
+        if rng.random() < 0.5:
+            match_data[f'{side}_goals_avg_10'] = round(float(rng.uniform(0, 3)), 2)
+    return match_data
+
+
+def rolling_stats(rng: np.random.Generator, n: int) -> dict:
+    """AsOfStatsEngine.rolling_stats layout with some matches lacking history"""
+    stats = {stat: rng.uniform(0, 6, size=n) for stat in STATS}
+    stats['valid'] = rng.random(n) < 0.7
+    return stats
+
+
+def test_declarations_match_compute():
+    """Every FeatureBuilder group returns its declared features from its declared inputs only"""
+    builder = FeatureBuilder()
+    assert builder.plan.groups == ['rolling_5', 'rolling_10', 'combined', 'attack_vs_defense']
+
+    for group in builder.registry.groups.values():
+        produced = group.compute({key: 1.0 for key in group.inputs})
+        assert list(produced) == group.features, group.name
+
+    plan = builder.compile_plan(['combined_goals_avg'])
+    try:
+        builder.compute(plan, {'home_goals_avg_5': 1.0})
+        raise AssertionError('missing input accepted')
+    except ValueError as e:
+        assert 'away_goals_avg_5' in str(e)
+
+
+def test_builder_matches_reference_dict():
+    """Registry-built features equal the hand-written dictionary, one match or a batch"""
+    rng = np.random.default_rng(3)
+    matches = [random_match_data(rng) for _ in range(200)]
+    builder = FeatureBuilder()
+
+    expected = pd.DataFrame([reference_features(match) for match in matches])
+    assert list(expected.columns) == builder.get_feature_names()
+
+    single = pd.DataFrame([builder.build_features(match) for match in matches])
+    pd.testing.assert_frame_equal(single, expected, check_dtype=False)
+    pd.testing.assert_frame_equal(builder.build_features_batch(matches), expected, check_dtype=False)
+
+
+def test_training_frame_matches_serving_features():
+    """A training row equals FeatureBuilder output for the same rolling stats"""
+    rng = np.random.default_rng(4)
+    n = 100
+    info = {column: list(range(n)) for column in MATCH_INFO_COLUMNS}
+    home_5, away_5, home_10, away_10 = (rolling_stats(rng, n) for _ in range(4))
+
+    frame, valid = DatasetBuilder()._assemble_feature_frame(info, home_5, away_5, home_10, away_10)
+    assert list(frame.columns) == MATCH_INFO_COLUMNS + FeatureBuilder().get_feature_names()
+    np.testing.assert_array_equal(valid, home_5['valid'] & away_5['valid'])
+
+    # Serving receives the 10-match averages only where that window has history
+    match_data = []
+    for i in range(n):
+        match = {}
+        for side, short_stats, medium_stats in (('home', home_5, home_10), ('away', away_5, away_10)):
+            match.update({f'{side}_{stat}_5': short_stats[stat][i] for stat in STATS})
+            if medium_stats['valid'][i]:
+                match.update({f'{side}_{stat}_10': medium_stats[stat][i] for stat in STATS})
+        match_data.append(match)
+
+    expected = FeatureBuilder().build_features_batch(match_data)
+    pd.testing.assert_frame_equal(frame[expected.columns], expected)
+
+
+def test_pruned_plan_in_training_and_serving():
+    """A model's feature columns compile to a plan both paths run, skipping unneeded groups"""
+    columns = ['home_attack_vs_away_defense', 'home_goals_avg_10']
+    builder = FeatureBuilder()
+    plan = builder.compile_plan(columns)
+    assert plan.groups == ['rolling_10', 'attack_vs_defense']
+    assert 'home_corners_avg_5' not in plan.inputs
+
+    rng = np.random.default_rng(5)
+    info = {column: list(range(10)) for column in MATCH_INFO_COLUMNS}
+    stats = [rolling_stats(rng, 10) for _ in range(4)]
+    frame, _ = DatasetBuilder(feature_plan=plan)._assemble_feature_frame(info, *stats)
+    assert list(frame.columns) == MATCH_INFO_COLUMNS + columns
+
+    with tempfile.TemporaryDirectory() as directory:
+        try:
+            DatasetBuilder(feature_store=FeatureStore(directory, 'v1'), feature_plan=plan)
+            raise AssertionError('pruned plan accepted with a feature store')
+        except ValueError:
+            pass
+
+        # Serving: a goals model trained on the two columns only
+        match_data = [random_match_data(rng) for _ in range(50)]
+        X = builder.build_features_batch(match_data, plan=plan)
+        y = (X['home_attack_vs_away_defense'] > X['home_attack_vs_away_defense'].median()).astype(int)
+        market_dir = Path(directory) / 'goals'
+        market_dir.mkdir()
+        with open(market_dir / 'logistic_model.pkl', 'wb') as f:
+            pickle.dump(LogisticRegression().fit(X, y), f)
+        with open(market_dir / 'ensemble_metadata.json', 'w') as f:
+            json.dump({'base_models': ['logistic'], 'weights': {'logistic': 1.0}, 'feature_columns': columns}, f)
+
+        predictor = IntegratedPredictor(models_dir=directory)
+        assert predictor.plans['goals'].groups == ['rolling_10', 'attack_vs_defense']
+
+        probability = predictor.predict_for_match('goals', match_data[0])
+        expected = predictor.models['goals']['logistic'].predict_proba(X.iloc[[0]])[0, 1]
+        assert abs(probability - expected) < 1e-12
+
+
+if __name__ == "__main__":
+    test_declarations_match_compute()
+    test_builder_matches_reference_dict()
+    test_training_frame_matches_serving_features()
+    test_pruned_plan_in_training_and_serving()
+    print("✅ All feature plan tests passed")
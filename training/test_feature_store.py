@@ -0,0 +1,91 @@
+"""
+Feature Store Test
+Checks the Parquet round trip and that code or config changes start a new store version
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from features.feature_store import FeatureStore
+from training import build_datasets
+from training.build_datasets import DatasetBuilder, feature_store_version
+
+
+def feature_rows(match_ids, value: float = 1.0) -> pd.DataFrame:
+    return pd.DataFrame({
+        'match_id': match_ids,
+        'season': ['2023-2024'] * len(match_ids),
+        'league': ['Premier League' if i % 2 else 'La Liga' for i in range(len(match_ids))],
+        'home_goals_avg_5': [value + i for i in range(len(match_ids))],
+        'away_goals_avg_5': [value] * len(match_ids)
+    })
+
+
+def test_round_trip_and_filters():
+    """Rows are read back by match, league and column; stored matches are not appended twice"""
+    with tempfile.TemporaryDirectory() as directory:
+        store = FeatureStore(directory, 'v1')
+        assert not store.exists() and store.read_indexed() == {}
+
+        assert store.append(feature_rows(['A', 'B', 'C', 'D'])) == 4
+        assert store.append(feature_rows(['C', 'D', 'E'], value=9.0)) == 1
+        assert store.missing(['A', 'E', 'F']) == ['F']
+
+        # A fresh instance sees what was written
+        store = FeatureStore(directory, 'v1')
+        df = store.read()
+        assert sorted(df['match_id']) == ['A', 'B', 'C', 'D', 'E']
+        assert df.set_index('match_id').loc['C', 'home_goals_avg_5'] == 3.0
+
+        indexed = store.read_indexed(columns=['home_goals_avg_5'], match_ids=['B', 'E'])
+        assert indexed == {'B': {'home_goals_avg_5': 2.0}, 'E': {'home_goals_avg_5': 11.0}}
+        assert sorted(store.read(leagues=['La Liga'])['match_id']) == ['A', 'C', 'E']
+
+
+def test_version_covers_producing_code_and_config():
+    """Changing the frame assembly or the lookback windows changes the store version"""
+    version = feature_store_version()
+    assert feature_store_version() == version
+
+    assemble = DatasetBuilder._assemble_feature_frame
+
+    def edited_assembly(self, info, home_5, away_5, home_10, away_10):
+        return assemble(self, info, home_5, away_5, home_10, away_10)
+
+    DatasetBuilder._assemble_feature_frame = edited_assembly
+    try:
+        assert feature_store_version() != version
+    finally:
+        DatasetBuilder._assemble_feature_frame = assemble
+
+    lookback = dict(build_datasets.LOOKBACK_WINDOWS)
+    build_datasets.LOOKBACK_WINDOWS['short'] = 6
+    try:
+        assert feature_store_version() != version
+    finally:
+        build_datasets.LOOKBACK_WINDOWS.update(lookback)
+
+    assert feature_store_version() == version
+
+
+def test_new_version_does_not_read_old_rows():
+    """Rows stored under one version are invisible to another"""
+    with tempfile.TemporaryDirectory() as directory:
+        FeatureStore(directory, 'old').append(feature_rows(['A', 'B']))
+
+        store = FeatureStore(directory, 'new')
+        assert not store.exists()
+        assert store.missing(['A', 'B']) == ['A', 'B']
+        assert store.read().empty
+
+
+if __name__ == "__main__":
+    test_round_trip_and_filters()
+    test_version_covers_producing_code_and_config()
+    test_new_version_does_not_read_old_rows()
+    print("✅ All feature store tests passed")
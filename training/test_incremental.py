@@ -0,0 +1,224 @@
+"""
+Incremental Retraining Test
+Checks the drift metrics, the held-out calibration slice and the staging of updates
+"""
+
+import sys
+import json
+import pickle
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from training import incremental, utils
+from training.config import CALIBRATION_METHOD, MODEL_CONFIGS, TRAINING_DATA_PATHS
+from training.utils import (
+    calculate_metrics, ensemble_predictions, fit_calibration_model,
+    load_training_data, save_model_with_metadata, save_training_data
+)
+from training.test_tuning import make_training_table
+
+N_OLD = 2000
+N_NEW = 600
+WEIGHTS = {'xgboost': 0.5, 'lightgbm': 0.5}
+
+
+@contextmanager
+def deployed_goals_models(shift: float = 0.0):
+    """
+    Temporary models directory with a goals ensemble trained on the first
+    N_OLD matches; the N_NEW matches after them get f2 shifted by `shift`
+    """
+    saved = (
+        utils.MODELS_DIR, incremental.MODELS_DIR, incremental.RETRAIN_STAGING_DIR,
+        incremental.RETRAIN_STATE_PATH, TRAINING_DATA_PATHS['goals']
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        models_dir = Path(directory) / 'models'
+        utils.MODELS_DIR = incremental.MODELS_DIR = models_dir
+        incremental.RETRAIN_STAGING_DIR = models_dir / 'staging'
+        incremental.RETRAIN_STATE_PATH = models_dir / 'retrain_state.json'
+        TRAINING_DATA_PATHS['goals'] = Path(directory) / 'goals.parquet'
+        try:
+            path = make_training_table(str(TRAINING_DATA_PATHS['goals']), n_rows=N_OLD + N_NEW)
+            df = load_training_data(path)
+            df.loc[N_OLD:, 'f2'] += shift
+            save_training_data(df, path)
+
+            old = df.iloc[:N_OLD]
+            feature_cols = [f'f{i}' for i in range(6)]
+            fit, calib = old.iloc[:1500], old.iloc[1500:]
+            models = {}
+            for model_type in WEIGHTS:
+                params = MODEL_CONFIGS[model_type]['params'].copy()
+                params['n_estimators'] = 20
+                params.pop('early_stopping_rounds', None)
+                if model_type == 'xgboost':
+                    from xgboost import XGBClassifier
+                    models[model_type] = XGBClassifier(**params).fit(fit[feature_cols], fit['y'])
+                else:
+                    from lightgbm import LGBMClassifier
+                    models[model_type] = LGBMClassifier(**params).fit(fit[feature_cols], fit['y'])
+                save_model_with_metadata(models[model_type], 'goals', {}, feature_cols, model_type)
+
+            raw = ensemble_predictions(
+                {model_type: model.predict_proba(calib[feature_cols])[:, 1] for model_type, model in models.items()},
+                WEIGHTS
+            )
+            calibration_model = fit_calibration_model(raw, calib['y'].values, CALIBRATION_METHOD)
+            metadata = {
+                'base_models': list(WEIGHTS),
+                'weights': WEIGHTS,
+                'calibration_method': CALIBRATION_METHOD,
+                'metrics': {'test': calculate_metrics(calib['y'], raw)},
+                'feature_columns': feature_cols
+            }
+            with open(models_dir / 'goals' / 'ensemble_metadata.json', 'w') as f:
+                json.dump(metadata, f)
+            with open(models_dir / 'goals' / 'ensemble_calibration.pkl', 'wb') as f:
+                pickle.dump(calibration_model, f)
+
+            yield models_dir, df
+        finally:
+            (
+                utils.MODELS_DIR, incremental.MODELS_DIR, incremental.RETRAIN_STAGING_DIR,
+                incremental.RETRAIN_STATE_PATH, TRAINING_DATA_PATHS['goals']
+            ) = saved
+
+
+def file_contents(directory: Path) -> dict:
+    """Bytes of every file in a directory"""
+    return {path.name: path.read_bytes() for path in directory.iterdir() if path.is_file()}
+
+
+def test_population_stability_index():
+    """PSI is near zero for the same distribution and large for a shifted one"""
+    rng = np.random.default_rng(0)
+    reference = rng.normal(size=5000)
+
+    assert incremental.population_stability_index(reference, rng.normal(size=5000)) < 0.02
+    assert incremental.population_stability_index(reference, rng.normal(loc=1.0, size=5000)) > 0.25
+    # Missing values are ignored; a constant reference has no bins
+    assert incremental.population_stability_index(np.append(reference, np.nan), reference) < 1e-9
+    assert incremental.population_stability_index(np.zeros(100), rng.normal(size=100)) == 0.0
+
+
+def test_shifted_feature_triggers_full_retrain():
+    """A shifted feature is reported as drift and no update is staged"""
+    with deployed_goals_models() as (models_dir, df):
+        update = incremental.incremental_update_market('goals', df['date'].iloc[N_OLD - 1])
+        assert update['drift']['max_psi'] < incremental.RETRAIN_CONFIG['drift_thresholds']['max_psi']
+        assert not update['drift']['drift']
+
+    with deployed_goals_models(shift=3.0) as (models_dir, df):
+        assert incremental.incremental_update_market('goals', df['date'].iloc[N_OLD - 1]) is None
+        assert not (models_dir / 'staging').exists()
+
+
+def test_calibrator_fit_on_matches_unseen_by_new_rounds():
+    """Added rounds, calibrator and evaluation use disjoint, time-ordered slices of the new matches"""
+    boosted, calibrated = [], []
+    continue_boosting = incremental.continue_boosting
+    fit_calibration = incremental.fit_calibration_model
+
+    def record_boosting(model, model_type, X, y, extra_rounds):
+        boosted.append(set(X.index))
+        return continue_boosting(model, model_type, X, y, extra_rounds)
+
+    def record_calibration(raw, y, method):
+        calibrated.append(len(y))
+        return fit_calibration(raw, y, method)
+
+    incremental.continue_boosting = record_boosting
+    incremental.fit_calibration_model = record_calibration
+    try:
+        with deployed_goals_models() as (models_dir, df):
+            update = incremental.incremental_update_market('goals', df['date'].iloc[N_OLD - 1])
+            with open(models_dir / 'staging' / 'goals' / 'ensemble_metadata.json') as f:
+                staged = json.load(f)
+    finally:
+        incremental.continue_boosting = continue_boosting
+        incremental.fit_calibration_model = fit_calibration
+
+    n_test = int(N_NEW * 0.15)
+    n_calib = int(N_NEW * 0.2)
+    assert boosted == [set(range(N_OLD, N_OLD + N_NEW - n_calib - n_test))] * 2
+    assert calibrated == [n_calib]
+    assert staged['incremental_updates'][-1]['calibration_samples'] == n_calib
+    assert update['mode'] == 'incremental'
+
+
+def test_update_is_staged_until_promoted():
+    """Live models change only on promote; a discarded update leaves them as they were"""
+    with deployed_goals_models() as (models_dir, df):
+        live_dir = models_dir / 'goals'
+        staging_dir = models_dir / 'staging' / 'goals'
+        since = df['date'].iloc[N_OLD - 1]
+        before = file_contents(live_dir)
+
+        update = incremental.incremental_update_market('goals', since)
+        assert update['staging_dir'] == str(staging_dir)
+        assert file_contents(live_dir) == before
+        staged = file_contents(staging_dir)
+        assert set(staged) == {
+            'xgboost_model.pkl', 'xgboost_metadata.json', 'lightgbm_model.pkl', 'lightgbm_metadata.json',
+            'ensemble_calibration.pkl', 'ensemble_metadata.json'
+        }
+
+        incremental.discard_staged_update('goals')
+        assert not staging_dir.exists()
+        assert file_contents(live_dir) == before
+
+        incremental.incremental_update_market('goals', since)
+        staged = file_contents(staging_dir)
+        incremental.promote_staged_update('goals')
+        assert not staging_dir.exists()
+        assert file_contents(live_dir) == {**before, **staged}
+
+        model, _, _ = utils.load_model_with_metadata('goals', 'xgboost')
+        assert model.get_booster().num_boosted_rounds() == 20 + incremental.RETRAIN_CONFIG['incremental']['extra_rounds']
+
+
+def test_held_out_matches_stay_behind_watermark():
+    """The watermark stops at the boosted slice; the next run sees the held-out matches again"""
+    with deployed_goals_models() as (models_dir, df):
+        update = incremental.incremental_update_market('goals', df['date'].iloc[N_OLD - 1])
+        n_fit = N_NEW - int(N_NEW * 0.2) - int(N_NEW * 0.15)
+        assert update['watermark'] == df['date'].iloc[N_OLD + n_fit - 1]
+        incremental.promote_staged_update('goals')
+
+        incremental.save_watermark({'goals': 'incremental'}, {'goals': update['watermark']})
+        assert incremental.get_watermark('goals') == update['watermark']
+
+        # The next run boosts on the matches held out by this one
+        boosted = []
+        continue_boosting = incremental.continue_boosting
+
+        def record_boosting(model, model_type, X, y, extra_rounds):
+            boosted.append(set(X.index))
+            return continue_boosting(model, model_type, X, y, extra_rounds)
+
+        incremental.continue_boosting = record_boosting
+        try:
+            incremental.incremental_update_market('goals', incremental.get_watermark('goals'))
+        finally:
+            incremental.continue_boosting = continue_boosting
+        assert N_OLD + n_fit in boosted[0]
+
+        # Full retrains still move the watermark to the newest match in the table
+        incremental.save_watermark({'goals': 'full'})
+        assert incremental.get_watermark('goals') == df['date'].iloc[-1]
+
+
+if __name__ == "__main__":
+    test_population_stability_index()
+    test_shifted_feature_triggers_full_retrain()
+    test_calibrator_fit_on_matches_unseen_by_new_rounds()
+    test_update_is_staged_until_promoted()
+    test_held_out_matches_stay_behind_watermark()
+    print("✅ All incremental retraining tests passed")
@@ -0,0 +1,86 @@
+"""
+Training Orchestrator Test
+Checks the CPU budget split between jobs, the per-job thread count and a
+full parallel run
+"""
+
+import sys
+import tempfile
+from itertools import product
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from training import orchestrator
+from training.train_goals import THREADED_MODELS, prepare_data, train_single_model
+from training.test_tuning import make_training_table
+
+MODEL_TYPES = ['logistic', 'xgboost', 'lightgbm', 'random_forest']
+
+
+def test_plan_jobs_stays_within_budget():
+    """Every (market, model) runs once and workers x threads never exceed the budget"""
+    markets = ['goals', 'btts', 'cards', 'corners']
+
+    for cpu_budget, max_workers in product([1, 2, 3, 8, 64], [None, 1, 3]):
+        jobs, workers = orchestrator.plan_jobs(markets, MODEL_TYPES, cpu_budget, max_workers)
+
+        assert sorted((job['market'], job['model_type']) for job in jobs) == sorted(product(markets, MODEL_TYPES))
+        assert 1 <= workers <= min(cpu_budget, max_workers or len(jobs))
+        assert workers * max(job['n_threads'] for job in jobs) <= max(cpu_budget, 1)
+        for job in jobs:
+            assert job['n_threads'] >= 1
+            if job['model_type'] not in THREADED_MODELS:
+                assert job['n_threads'] == 1
+
+        # Slowest jobs are started first
+        costs = [orchestrator.JOB_COST[job['model_type']] for job in jobs]
+        assert costs == sorted(costs, reverse=True)
+
+    # A single worker gets the whole budget
+    jobs, workers = orchestrator.plan_jobs(markets, ['xgboost'], 8, max_workers=1)
+    assert workers == 1 and {job['n_threads'] for job in jobs} == {8}
+
+
+def test_run_job_uses_planned_threads():
+    """A job fits with its planned thread count and the result of a direct fit"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = make_training_table(str(Path(directory) / 'goals.parquet'))
+        result = orchestrator._run_job({'market': 'goals', 'model_type': 'xgboost', 'n_threads': 2}, path)
+
+        assert result['model'].get_params()['n_jobs'] == 2
+        assert 0 <= result['load_seconds'] <= result['seconds']
+
+        X_train, y_train, X_val, y_val = prepare_data(path)[:4]
+        _, val_proba, _ = train_single_model('xgboost', X_train, y_train, X_val, y_val, n_threads=1)
+        np.testing.assert_allclose(result['val_proba'], val_proba, rtol=1e-6)
+
+
+def test_parallel_run_trains_every_market():
+    """The process pool returns an ensemble per market and a timing row per job"""
+    with tempfile.TemporaryDirectory() as directory:
+        data_paths = {
+            market: make_training_table(str(Path(directory) / f'{market}.parquet'), seed=seed)
+            for seed, market in enumerate(['goals', 'btts'])
+        }
+        results, report = orchestrator.train_markets_parallel(
+            markets=['goals', 'btts'], model_types=['logistic', 'lightgbm'],
+            cpu_budget=2, data_paths=data_paths, save=False
+        )
+
+    assert report['workers'] == 2
+    assert sorted((job['market'], job['model_type']) for job in report['jobs']) == sorted(
+        product(['goals', 'btts'], ['logistic', 'lightgbm'])
+    )
+    for market in ('goals', 'btts'):
+        assert set(results[market]['models']) == {'logistic', 'lightgbm'}
+        assert 0.5 < results[market]['test_metrics']['auc_roc'] <= 1.0
+
+
+if __name__ == "__main__":
+    test_plan_jobs_stays_within_budget()
+    test_run_job_uses_planned_threads()
+    test_parallel_run_trains_every_market()
+    print("✅ All training orchestrator tests passed")
@@ -0,0 +1,124 @@
+"""
+Rolling Statistics Test
+Checks the as-of engine against the per-team query loop it replaced, and the
+SQL window-function backend against the as-of engine
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from data_ingestion.models import Match, MatchResult
+from training.asof_engine import AsOfStatsEngine
+from training.build_datasets import DatasetBuilder
+from training.config import MIN_MATCHES_FOR_STATS
+from training.test_build_datasets import match_database
+
+STATS = ['goals_avg', 'goals_conceded_avg', 'corners_avg', 'cards_avg', 'btts_rate']
+
+
+def query_rolling_stats(session, team_id: int, match_date, is_home: bool, window: int) -> dict:
+    """Rolling stats from one query per team and date (the loop the engine replaced)"""
+    team_column = Match.home_team_id if is_home else Match.away_team_id
+    rows = session.query(Match, MatchResult).join(
+        MatchResult, Match.match_id == MatchResult.match_id
+    ).filter(
+        team_column == team_id,
+        Match.match_datetime < match_date,
+        Match.status == 'completed'
+    ).order_by(Match.match_datetime.desc()).limit(window).all()
+
+    if len(rows) < MIN_MATCHES_FOR_STATS:
+        return {}
+
+    side, other = ('home', 'away') if is_home else ('away', 'home')
+    results = [result for _, result in rows]
+    return {
+        'goals_avg': np.mean([getattr(r, f'{side}_goals') for r in results]),
+        'goals_conceded_avg': np.mean([getattr(r, f'{other}_goals') for r in results]),
+        'corners_avg': np.mean([getattr(r, f'{side}_corners') or 0 for r in results]),
+        'cards_avg': np.mean([getattr(r, f'{side}_cards') or 0 for r in results]),
+        'btts_rate': sum(1 for r in results if r.btts) / len(results),
+        'matches_count': len(results)
+    }
+
+
+def test_asof_engine_matches_query_loop():
+    """Every match, venue and window gets the stats of the per-team query loop"""
+    session = sessionmaker(bind=match_database())()
+    matches = session.query(Match).filter(Match.status == 'completed').all()
+    engine = AsOfStatsEngine.from_session(session)
+    assert engine.n_matches == len(matches)
+
+    checked = 0
+    for is_home in (True, False):
+        team_ids = [m.home_team_id if is_home else m.away_team_id for m in matches]
+        for window in (5, 10):
+            stats = engine.rolling_stats(team_ids, [m.match_datetime for m in matches], is_home, window)
+            for i, match in enumerate(matches):
+                expected = query_rolling_stats(session, team_ids[i], match.match_datetime, is_home, window)
+                assert bool(stats['valid'][i]) == bool(expected), match.match_id
+                if expected:
+                    assert stats['matches_count'][i] == expected['matches_count']
+                    for stat in STATS:
+                        assert np.isclose(stats[stat][i], expected[stat]), (match.match_id, stat)
+                    checked += 1
+    session.close()
+
+    assert checked > len(matches)
+
+
+def test_asof_engine_excludes_kickoff_and_unknown_teams():
+    """A match never sees itself or later results; unseen teams have no stats"""
+    session = sessionmaker(bind=match_database(40))()
+    engine = AsOfStatsEngine.from_session(session)
+    last = session.query(Match).order_by(Match.match_datetime.desc()).first()
+    session.close()
+
+    at_kickoff = engine.rolling_stats([last.home_team_id], [last.match_datetime], True, 50)
+    after = engine.rolling_stats([last.home_team_id], [last.match_datetime.replace(year=2100)], True, 50)
+    assert after['matches_count'][0] == at_kickoff['matches_count'][0] + 1
+
+    unknown = engine.rolling_stats([-1], [last.match_datetime], True, 5)
+    assert not unknown['valid'][0] and np.isnan(unknown['goals_avg'][0])
+
+
+def test_sql_backend_matches_asof_engine():
+    """Window functions evaluated by the database build the same tables"""
+    # Scores are declared NOT NULL, but tables created without the constraint
+    # can hold matches with a missing score; both backends count them as zero
+    score_columns = [MatchResult.__table__.c.home_goals, MatchResult.__table__.c.away_goals]
+    for column in score_columns:
+        column.nullable = True
+    try:
+        session = sessionmaker(bind=match_database())()
+    finally:
+        for column in score_columns:
+            column.nullable = False
+
+    for result in session.query(MatchResult).order_by(MatchResult.match_id).all()[::13]:
+        result.home_goals = None
+        result.away_goals = None
+    session.commit()
+
+    asof = DatasetBuilder(session).build_market_tables()
+    sql = DatasetBuilder(session, rolling_backend='sql').build_market_tables(chunk_size=17)
+    session.close()
+
+    for market, table in asof.items():
+        assert len(table) > 50
+        pd.testing.assert_frame_equal(
+            sql[market].reset_index(drop=True), table.reset_index(drop=True), check_dtype=False
+        )
+
+
+if __name__ == "__main__":
+    test_asof_engine_matches_query_loop()
+    test_asof_engine_excludes_kickoff_and_unknown_teams()
+    test_sql_backend_matches_asof_engine()
+    print("✅ All rolling statistics tests passed")
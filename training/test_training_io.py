@@ -0,0 +1,105 @@
+"""
+Training Table IO Test
+Checks typed round trips in every format, column projection and the CSV fallback
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from training.utils import load_training_data, optimize_training_dtypes, save_training_data
+
+EXPECTED_DTYPES = {
+    'home_team_id': np.dtype('int32'),
+    'away_team_id': np.dtype('int32'),
+    'home_goals_avg_5': np.dtype('float32'),
+    'combined_btts_rate': np.dtype('float32'),
+    'y': np.dtype('int8'),
+    'odds_over25': np.dtype('float32')
+}
+
+
+def training_table(n_rows: int = 50) -> pd.DataFrame:
+    """Training table with the loose dtypes the builders produce"""
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'match_id': [f'M{i:03d}' for i in range(n_rows)],
+        'date': pd.date_range('2023-08-01', periods=n_rows, freq='D').astype(str),
+        'league': ['Premier League'] * n_rows,
+        'home_team_id': rng.integers(1, 20, n_rows),
+        'away_team_id': rng.integers(1, 20, n_rows).astype(object),
+        'home_goals_avg_5': rng.uniform(0, 3, n_rows),
+        'combined_btts_rate': rng.uniform(0, 1, n_rows),
+        'y': rng.integers(0, 2, n_rows),
+        'odds_over25': np.where(rng.random(n_rows) < 0.2, np.nan, rng.uniform(1.2, 3, n_rows))
+    })
+
+
+def test_optimize_training_dtypes():
+    """Features and odds are float32, the target int8, team IDs int32 and text untouched"""
+    df = optimize_training_dtypes(training_table())
+    for column, dtype in EXPECTED_DTYPES.items():
+        assert df[column].dtype == dtype, column
+    assert pd.api.types.is_datetime64_any_dtype(df['date'])
+    assert pd.api.types.is_string_dtype(df['match_id']) and pd.api.types.is_string_dtype(df['league'])
+
+    # Missing values keep a float column
+    with_missing = training_table()
+    with_missing.loc[3, 'home_team_id'] = None
+    assert optimize_training_dtypes(with_missing)['home_team_id'].dtype == np.float32
+
+
+def test_round_trip_in_every_format():
+    """Parquet, Feather and CSV all load back with the canonical dtypes and values"""
+    expected = optimize_training_dtypes(training_table())
+
+    with tempfile.TemporaryDirectory() as directory:
+        for suffix in ('.parquet', '.feather', '.csv'):
+            path = save_training_data(training_table(), str(Path(directory) / f'goals{suffix}'))
+            df = load_training_data(path)
+            pd.testing.assert_frame_equal(df, expected, check_dtype=suffix != '.csv')
+            for column, dtype in EXPECTED_DTYPES.items():
+                assert df[column].dtype == dtype, (suffix, column)
+            assert pd.api.types.is_datetime64_any_dtype(df['date']), suffix
+
+            projected = load_training_data(path, columns=['y', 'odds_over25'])
+            assert list(projected.columns) == ['y', 'odds_over25']
+            pd.testing.assert_frame_equal(projected, expected[['y', 'odds_over25']])
+
+        mapped = load_training_data(str(Path(directory) / 'goals.feather'), memory_map=True)
+        pd.testing.assert_frame_equal(mapped, expected)
+
+
+def test_csv_export_and_fallback():
+    """A CSV export is written alongside; a missing columnar table is read from its CSV"""
+    expected = optimize_training_dtypes(training_table())
+
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = Path(directory) / 'export' / 'goals.csv'
+        save_training_data(training_table(), str(Path(directory) / 'goals.parquet'), csv_path=str(csv_path))
+        assert csv_path.exists()
+
+        # Tables built before the switch to Parquet exist only as CSV
+        legacy = Path(directory) / 'legacy.csv'
+        training_table().to_csv(legacy, index=False)
+        df = load_training_data(str(Path(directory) / 'legacy.parquet'))
+        pd.testing.assert_frame_equal(df, expected, check_dtype=False)
+        assert df['y'].dtype == np.int8 and df['home_goals_avg_5'].dtype == np.float32
+
+        try:
+            load_training_data(str(Path(directory) / 'missing.parquet'))
+            raise AssertionError('missing table loaded')
+        except FileNotFoundError:
+            pass
+
+
+if __name__ == "__main__":
+    test_optimize_training_dtypes()
+    test_round_trip_in_every_format()
+    test_csv_export_and_fallback()
+    print("✅ All training table IO tests passed")
@@ -0,0 +1,96 @@
+"""
+Hyperparameter Search Test
+Checks the successive-halving rung schedule and candidate promotion
+"""
+
+import sys
+import json
+import tempfile
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from training import tuning
+from training.config import SEARCH_CONFIG
+from training.utils import save_training_data
+
+
+def make_training_table(path: str, n_rows: int = 600, seed: int = 0) -> str:
+    """Small time-ordered training table with a learnable target"""
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_rows, 6))
+    df = pd.DataFrame(X, columns=[f'f{i}' for i in range(6)])
+    df.insert(0, 'match_id', [f'M{i:05d}' for i in range(n_rows)])
+    df.insert(1, 'date', pd.Timestamp('2020-01-01') + pd.to_timedelta(np.arange(n_rows), unit='D'))
+    df['league'] = 'Premier League'
+    df['home_team_id'] = 1
+    df['away_team_id'] = 2
+    df['y'] = (X[:, 0] + 0.5 * X[:, 1] + rng.normal(size=n_rows) > 0).astype(int)
+    return save_training_data(df, path)
+
+
+def test_rung_schedule():
+    """Rounds grow by eta up to the final budget"""
+    assert tuning.rung_schedule(50, 1350, 3) == [50, 150, 450, 1350]
+    assert tuning.rung_schedule(10, 100, 3) == [10, 30, 90]
+    assert tuning.rung_schedule(100, 400, 2) == [100, 200, 400]
+    assert tuning.rung_schedule(50, 40, 3) == [50]
+
+
+def test_sample_configurations_stay_in_space():
+    """Sampling is seeded, respects bounds and keeps integer parameters integral"""
+    space = SEARCH_CONFIG['search_space']['xgboost']
+    configs = tuning.sample_configurations('xgboost', 20, seed=7)
+
+    assert configs == tuning.sample_configurations('xgboost', 20, seed=7)
+    for params in configs:
+        assert params['max_depth'] in space['max_depth']
+        low, high, _ = space['learning_rate']
+        assert low <= params['learning_rate'] <= high
+        assert isinstance(params['min_child_weight'], int)
+
+
+def test_search_market_promotes_best_third():
+    """Each rung trains the best 1/eta of the previous one with eta times the rounds"""
+    overrides = {'n_trials': 9, 'min_rounds': 5, 'max_rounds': 45, 'eta': 3}
+    saved = {key: SEARCH_CONFIG[key] for key in overrides}
+    results_dir = tuning.SEARCH_RESULTS_DIR
+
+    with tempfile.TemporaryDirectory() as directory:
+        SEARCH_CONFIG.update(overrides)
+        tuning.SEARCH_RESULTS_DIR = Path(directory)
+        try:
+            data_path = make_training_table(str(Path(directory) / 'goals.parquet'))
+            summary = tuning.search_market('goals', 'xgboost', cpu_budget=1, data_path=data_path)
+            with open(summary['trial_log']) as f:
+                trials = [json.loads(line) for line in f]
+        finally:
+            SEARCH_CONFIG.update(saved)
+            tuning.SEARCH_RESULTS_DIR = results_dir
+
+    rungs = defaultdict(list)
+    for trial in trials:
+        rungs[trial['rung']].append(trial)
+
+    assert summary['rungs'] == [5, 15, 45]
+    assert [len(rungs[rung]) for rung in range(3)] == [9, 3, 1]
+    assert [{trial['rounds'] for trial in rungs[rung]} for rung in range(3)] == [{5}, {15}, {45}]
+
+    for rung in range(2):
+        ranked = sorted(rungs[rung], key=lambda trial: trial['metrics']['log_loss'])
+        promoted = {trial['trial_id'] for trial in rungs[rung + 1]}
+        assert promoted == {trial['trial_id'] for trial in ranked[:len(promoted)]}
+
+    assert summary['best_trial'] == rungs[2][0]['trial_id']
+    assert summary['trials_run'] == 13
+
+
+if __name__ == "__main__":
+    test_rung_schedule()
+    test_sample_configurations_stay_in_space()
+    test_search_market_promotes_best_third()
+    print("✅ All hyperparameter search tests passed")
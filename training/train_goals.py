@@ -5,6 +5,7 @@ Trains multiple models, creates ensemble, and applies calibration
 
 import sys
 from pathlib import Path
+from typing import Dict, Optional
 import pandas as pd
 import numpy as np
 from sklearn.linear_model import LogisticRegression
@@ -26,30 +27,33 @@ from training.config import (
 from training.utils import (
     fit_calibration_model, apply_calibration, calculate_metrics,
     ensemble_predictions, time_based_split, save_model_with_metadata,
-    get_feature_importance, print_training_summary
+    get_feature_importance, print_training_summary, load_training_data,
+    get_feature_columns
 )
 
 
+# Models whose fit is parallelized through an n_jobs parameter
+THREADED_MODELS = ['xgboost', 'lightgbm', 'random_forest']
+
+
 def prepare_data(data_path: str) -> tuple:
     """
     Load and prepare data for training
     
     Args:
-        data_path: Path to training CSV
+        data_path: Path to training data (.parquet, .feather or .csv)
         
     Returns:
         Tuple of (X_train, y_train, X_val, y_val, X_test, y_test, feature_columns)
     """
     print(f"📂 Loading data from {data_path}")
-    df = pd.read_csv(data_path)
+    df = load_training_data(data_path)
     
     # Remove rows with missing target
     df = df.dropna(subset=['y'])
     
-    # Define feature columns (exclude metadata and target)
-    exclude_cols = ['match_id', 'date', 'league', 'home_team_id', 'away_team_id', 
-                    'y', 'odds_over25']
-    feature_cols = [col for col in df.columns if col not in exclude_cols]
+    # Define feature columns (exclude metadata, target and odds)
+    feature_cols = get_feature_columns(df)
     
     # Split data
     if USE_TIME_BASED_SPLIT and 'date' in df.columns:
@@ -95,7 +99,8 @@ def train_single_model(
     X_train: pd.DataFrame,
     y_train: pd.Series,
     X_val: pd.DataFrame,
-    y_val: pd.Series
+    y_val: pd.Series,
+    n_threads: Optional[int] = None
 ) -> tuple:
     """
     Train a single model
@@ -104,6 +109,8 @@ def train_single_model(
         model_type: Type of model to train
         X_train, y_train: Training data
         X_val, y_val: Validation data
+        n_threads: Library thread count (n_jobs) for XGBoost, LightGBM and
+            Random Forest (None keeps MODEL_CONFIGS defaults)
         
     Returns:
         Tuple of (model, val_predictions, metrics)
@@ -112,6 +119,8 @@ def train_single_model(
     
     config = MODEL_CONFIGS[model_type]
     params = config['params'].copy()
+    if n_threads is not None and model_type in THREADED_MODELS:
+        params['n_jobs'] = n_threads
     
     # Initialize model
     if model_type == 'logistic':
@@ -126,13 +135,19 @@ def train_single_model(
         raise ValueError(f"Unknown model type: {model_type}")
     
     # Train
-    if model_type in ['xgboost', 'lightgbm']:
+    if model_type == 'xgboost':
         # Use early stopping for gradient boosting
         model.fit(
             X_train, y_train,
             eval_set=[(X_val, y_val)],
             verbose=False
         )
+    elif model_type == 'lightgbm':
+        # LightGBM 4.x takes verbosity from the constructor, not fit()
+        model.fit(
+            X_train, y_train,
+            eval_set=[(X_val, y_val)]
+        )
     else:
         model.fit(X_train, y_train)
     
@@ -194,9 +209,48 @@ def train_goals_model(data_path: Optional[str] = None) -> Dict:
         print("❌ No models were successfully trained!")
         return {}
     
+    return finalize_market_models(
+        'goals', models, val_predictions, all_metrics,
+        (X_train, y_train, X_val, y_val, X_test, y_test, feature_cols)
+    )
+
+
+def finalize_market_models(
+    market: str,
+    models: Dict,
+    val_predictions: Dict,
+    all_metrics: Dict,
+    data: tuple,
+    save: bool = True,
+    weights: Optional[Dict[str, float]] = None,
+    calibration_model=None,
+    test_predictions: Optional[Dict] = None
+) -> Dict:
+    """
+    Ensemble, calibrate, evaluate and save the trained base models of a market
+    
+    Args:
+        market: Market name (goals, btts, cards, corners)
+        models: Dictionary of model_type to fitted model
+        val_predictions: Dictionary of model_type to validation probabilities
+        all_metrics: Dictionary of model_type to validation metrics
+        data: Output of prepare_data()
+        save: Write models, ensemble metadata and calibration to MODELS_DIR
+        weights: Ensemble weights (defaults to ENSEMBLE_WEIGHTS)
+        calibration_model: Pre-fitted calibrator, e.g. from out-of-fold
+            predictions (defaults to fitting one on the validation split)
+        test_predictions: Dictionary of model_type to test probabilities
+            computed by the caller (the X entries of data may then be None)
+        
+    Returns:
+        Dictionary with training results
+    """
+    X_train, y_train, X_val, y_val, X_test, y_test, feature_cols = data
+    weights = weights or ENSEMBLE_WEIGHTS
+    
     # Create ensemble
     print("\n🔄 Creating ensemble...")
-    ensemble_proba = ensemble_predictions(val_predictions, ENSEMBLE_WEIGHTS)
+    ensemble_proba = ensemble_predictions(val_predictions, weights)
     ensemble_metrics = calculate_metrics(y_val, ensemble_proba)
     
     print(f"✅ Ensemble performance:")
@@ -207,9 +261,11 @@ def train_goals_model(data_path: Optional[str] = None) -> Dict:
     
     # Apply calibration
     print(f"\n🔄 Applying {CALIBRATION_METHOD} calibration...")
-    calibration_model = fit_calibration_model(
-        ensemble_proba, y_val.values, method=CALIBRATION_METHOD
-    )
+    calibration_source = 'out_of_fold' if calibration_model is not None else 'validation'
+    if calibration_model is None:
+        calibration_model = fit_calibration_model(
+            ensemble_proba, y_val.values, method=CALIBRATION_METHOD
+        )
     calibrated_proba = apply_calibration(
         calibration_model, ensemble_proba, method=CALIBRATION_METHOD
     )
@@ -223,11 +279,12 @@ def train_goals_model(data_path: Optional[str] = None) -> Dict:
     
     # Test set evaluation
     print("\n🔄 Evaluating on test set...")
-    test_predictions = {}
-    for model_type, model in models.items():
-        test_predictions[model_type] = model.predict_proba(X_test)[:, 1]
+    if test_predictions is None:
+        test_predictions = {}
+        for model_type, model in models.items():
+            test_predictions[model_type] = model.predict_proba(X_test)[:, 1]
     
-    test_ensemble = ensemble_predictions(test_predictions, ENSEMBLE_WEIGHTS)
+    test_ensemble = ensemble_predictions(test_predictions, weights)
     test_calibrated = apply_calibration(
         calibration_model, test_ensemble, method=CALIBRATION_METHOD
     )
@@ -239,53 +296,56 @@ def train_goals_model(data_path: Optional[str] = None) -> Dict:
     print(f"   Accuracy:    {test_metrics['accuracy']:.4f}")
     print(f"   AUC-ROC:     {test_metrics['auc_roc']:.4f}")
     
-    # Save models
-    print("\n💾 Saving models...")
-    for model_type, model in models.items():
-        save_model_with_metadata(
-            model=model,
-            market='goals',
-            metrics=all_metrics[model_type],
-            feature_columns=feature_cols,
-            model_type=model_type,
-            train_start_date=None,
-            train_end_date=None,
-            additional_info={
-                'training_samples': len(X_train),
-                'validation_samples': len(X_val),
-                'test_samples': len(X_test)
-            }
-        )
-    
-    # Save ensemble metadata
-    ensemble_info = {
-        'market': 'goals',
-        'model_type': 'ensemble',
-        'version': 'v1.0.0',
-        'base_models': list(models.keys()),
-        'weights': ENSEMBLE_WEIGHTS,
-        'calibration_method': CALIBRATION_METHOD,
-        'metrics': {
-            'validation': calibrated_metrics,
-            'test': test_metrics
-        },
-        'feature_columns': feature_cols
-    }
-    
-    import json
-    from training.config import MODELS_DIR
-    ensemble_path = MODELS_DIR / 'goals' / 'ensemble_metadata.json'
-    with open(ensemble_path, 'w') as f:
-        json.dump(ensemble_info, f, indent=2)
-    
-    # Save calibration model
-    import pickle
-    calib_path = MODELS_DIR / 'goals' / 'ensemble_calibration.pkl'
-    with open(calib_path, 'wb') as f:
-        pickle.dump(calibration_model, f)
-    
-    print(f"💾 Saved ensemble metadata to {ensemble_path}")
-    print(f"💾 Saved calibration model to {calib_path}")
+    if save:
+        # Save models
+        print("\n💾 Saving models...")
+        for model_type, model in models.items():
+            save_model_with_metadata(
+                model=model,
+                market=market,
+                metrics=all_metrics[model_type],
+                feature_columns=feature_cols,
+                model_type=model_type,
+                train_start_date=None,
+                train_end_date=None,
+                additional_info={
+                    'training_samples': len(y_train),
+                    'validation_samples': len(y_val),
+                    'test_samples': len(y_test)
+                }
+            )
+        
+        # Save ensemble metadata
+        ensemble_info = {
+            'market': market,
+            'model_type': 'ensemble',
+            'version': 'v1.0.0',
+            'base_models': list(models.keys()),
+            'weights': weights,
+            'calibration_method': CALIBRATION_METHOD,
+            'calibration_source': calibration_source,
+            'metrics': {
+                'validation': calibrated_metrics,
+                'test': test_metrics
+            },
+            'feature_columns': feature_cols
+        }
+        
+        import json
+        from training.config import MODELS_DIR
+        ensemble_path = MODELS_DIR / market / 'ensemble_metadata.json'
+        ensemble_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(ensemble_path, 'w') as f:
+            json.dump(ensemble_info, f, indent=2)
+        
+        # Save calibration model
+        import pickle
+        calib_path = MODELS_DIR / market / 'ensemble_calibration.pkl'
+        with open(calib_path, 'wb') as f:
+            pickle.dump(calibration_model, f)
+        
+        print(f"💾 Saved ensemble metadata to {ensemble_path}")
+        print(f"💾 Saved calibration model to {calib_path}")
     
     # Feature importance (for best tree-based model)
     best_tree_model = None
@@ -303,7 +363,7 @@ def train_goals_model(data_path: Optional[str] = None) -> Dict:
             print(f"   {row['feature']:30s}: {row['importance']:.4f}")
     
     print("\n" + "=" * 60)
-    print("✅ GOALS MODEL TRAINING COMPLETE")
+    print(f"✅ {market.upper()} MODEL TRAINING COMPLETE")
     print("=" * 60)
     
     return {
@@ -316,5 +376,4 @@ def train_goals_model(data_path: Optional[str] = None) -> Dict:
 
 
 if __name__ == "__main__":
-    from training.config import Optional
     train_goals_model()
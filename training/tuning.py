@@ -0,0 +1,338 @@
+"""
+Hyperparameter Search
+Successive halving over boosting rounds for the market models
+
+Configurations are sampled from SEARCH_CONFIG['search_space'] and trained
+on the time-ordered train split; each rung scores them on the validation
+split (later matches), keeps the best 1/eta and multiplies the boosting
+rounds by eta. Trials of a rung run in parallel under a CPU budget, and
+every trial is appended to a JSON-lines log so searches can be compared
+under a fixed compute budget. The test split is never touched.
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+try:
+    from threadpoolctl import threadpool_limits
+    THREADPOOLCTL_AVAILABLE = True
+except ImportError:
+    THREADPOOLCTL_AVAILABLE = False
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from training.config import MARKETS, MODEL_CONFIGS, SEARCH_CONFIG, SEARCH_RESULTS_DIR, TRAINING_DATA_PATHS
+from training.binned_matrix import SharedTrainingMatrix, PREBINNED_MODELS
+
+
+def sample_configurations(model_type: str, n_trials: int, seed: int = 42) -> List[Dict]:
+    """
+    Draw random configurations from the search space
+
+    Lists are sampled uniformly; (low, high, 'log' | 'uniform') tuples are
+    sampled on that scale (integers stay integers).
+
+    Args:
+        model_type: 'xgboost' or 'lightgbm'
+        n_trials: Number of configurations
+        seed: Random seed
+
+    Returns:
+        List of parameter dicts (overrides on top of MODEL_CONFIGS)
+    """
+    space = SEARCH_CONFIG['search_space'][model_type]
+    rng = np.random.default_rng(seed)
+
+    configs = []
+    for _ in range(n_trials):
+        params = {}
+        for name, spec in space.items():
+            if isinstance(spec, list):
+                value = spec[rng.integers(len(spec))]
+                params[name] = value.item() if hasattr(value, 'item') else value
+                continue
+
+            low, high, scale = spec
+            if scale == 'log':
+                value = float(np.exp(rng.uniform(np.log(low), np.log(high))))
+            else:
+                value = float(rng.uniform(low, high))
+            params[name] = int(round(value)) if isinstance(low, int) and isinstance(high, int) else value
+        configs.append(params)
+
+    return configs
+
+
+def rung_schedule(min_rounds: int, max_rounds: int, eta: int) -> List[int]:
+    """
+    Boosting rounds of each successive-halving rung
+
+    Args:
+        min_rounds: Rounds in the first rung
+        max_rounds: Rounds in the final rung
+        eta: Reduction factor
+
+    Returns:
+        List of round budgets, e.g. [50, 150, 450, 1350]
+    """
+    rungs = [min_rounds]
+    while rungs[-1] * eta <= max_rounds:
+        rungs.append(rungs[-1] * eta)
+    return rungs
+
+
+@lru_cache(maxsize=2)
+def _load_matrix(market: str, data_path: str) -> SharedTrainingMatrix:
+    """Single-market pre-binned matrix, built once per worker process"""
+    return SharedTrainingMatrix.from_training_tables([market], {market: data_path})
+
+
+def _run_trial(trial: Dict, market: str, data_path: str) -> Dict:
+    """Train and score one configuration inside a worker process"""
+    start = time.perf_counter()
+    limits = threadpool_limits(limits=trial['n_threads']) if THREADPOOLCTL_AVAILABLE else None
+
+    try:
+        matrix = _load_matrix(market, data_path)
+        fit_start = time.perf_counter()
+
+        params = MODEL_CONFIGS[trial['model_type']]['params'].copy()
+        params.update(trial['params'])
+        params['n_estimators'] = trial['rounds']
+        params['early_stopping_rounds'] = SEARCH_CONFIG['early_stopping_rounds']
+
+        model, _, metrics = matrix.fit(trial['model_type'], market, params=params, n_threads=trial['n_threads'])
+    finally:
+        if limits is not None:
+            limits.restore_original_limits()
+
+    return {
+        **trial,
+        'metrics': metrics,
+        'best_iteration': model.best_iteration,
+        'matrix_version': matrix.version,
+        'load_seconds': fit_start - start,
+        'seconds': time.perf_counter() - start,
+        'pid': os.getpid()
+    }
+
+
+def _log_trial(log_path: Path, result: Dict):
+    """Append one finished trial to the search log"""
+    record = {k: v for k, v in result.items() if k != 'pid'}
+    record['finished_at'] = datetime.now().isoformat()
+    with open(log_path, 'a') as f:
+        f.write(json.dumps(record, default=float) + '\n')
+
+
+def search_market(
+    market: str,
+    model_type: str = 'xgboost',
+    n_trials: Optional[int] = None,
+    cpu_budget: Optional[int] = None,
+    max_workers: Optional[int] = None,
+    time_budget: Optional[float] = None,
+    data_path: Optional[str] = None,
+    seed: Optional[int] = None
+) -> Dict:
+    """
+    Successive-halving search for one market and model
+
+    Args:
+        market: Market to tune
+        model_type: 'xgboost' or 'lightgbm'
+        n_trials: Configurations in the first rung (defaults to SEARCH_CONFIG)
+        cpu_budget: Total cores for the search (defaults to os.cpu_count())
+        max_workers: Cap on concurrent trials (defaults to the CPU budget)
+        time_budget: Seconds after which no further rung is started
+        data_path: Training data (defaults to TRAINING_DATA_PATHS[market])
+        seed: Sampling seed (defaults to SEARCH_CONFIG)
+
+    Returns:
+        Search summary with the best parameters, rungs and trial log path
+    """
+    if model_type not in PREBINNED_MODELS:
+        raise ValueError(f"Hyperparameter search supports {PREBINNED_MODELS}, got {model_type}")
+
+    n_trials = n_trials or SEARCH_CONFIG['n_trials']
+    cpu_budget = cpu_budget or os.cpu_count() or 1
+    data_path = str(data_path or TRAINING_DATA_PATHS[market])
+    seed = SEARCH_CONFIG['seed'] if seed is None else seed
+    eta = SEARCH_CONFIG['eta']
+    rungs = rung_schedule(SEARCH_CONFIG['min_rounds'], SEARCH_CONFIG['max_rounds'], eta)
+
+    workers = max(1, min(n_trials, cpu_budget, max_workers or cpu_budget))
+    threads = max(1, cpu_budget // workers)
+
+    SEARCH_RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    run_id = datetime.now().strftime('%Y%m%d_%H%M%S')
+    log_path = SEARCH_RESULTS_DIR / f"{market}_{model_type}_{run_id}_trials.jsonl"
+
+    print("\n" + "=" * 60)
+    print(f"HYPERPARAMETER SEARCH: {market.upper()} / {model_type.upper()}")
+    print("=" * 60)
+    print(f"{n_trials} configurations, rungs {rungs} rounds, eta={eta}")
+    print(f"{workers} workers x {threads} threads")
+
+    candidates = [
+        {'trial_id': i, 'params': params}
+        for i, params in enumerate(sample_configurations(model_type, n_trials, seed))
+    ]
+
+    start = time.perf_counter()
+    completed_rungs = []
+    results = []
+
+    # Spawned workers avoid forking a parent whose OpenMP runtime is already initialized
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        for rung, rounds in enumerate(rungs):
+            if time_budget is not None and time.perf_counter() - start > time_budget:
+                print(f"⏱️  Time budget of {time_budget:.0f}s reached, stopping before rung {rung}")
+                break
+
+            trials = [
+                {**candidate, 'model_type': model_type, 'rung': rung, 'rounds': rounds, 'n_threads': threads}
+                for candidate in candidates
+            ]
+            rung_results = []
+            futures = {pool.submit(_run_trial, trial, market, data_path): trial for trial in trials}
+            for future in as_completed(futures):
+                trial = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"❌ Trial {trial['trial_id']} (rung {rung}) failed: {e}")
+                    continue
+
+                _log_trial(log_path, result)
+                rung_results.append(result)
+
+            if not rung_results:
+                break
+
+            rung_results.sort(key=lambda r: r['metrics']['log_loss'])
+            results.extend(rung_results)
+            completed_rungs.append(rung)
+
+            best = rung_results[0]
+            print(f"📊 Rung {rung} ({rounds} rounds): {len(rung_results)} trials, "
+                  f"best log loss {best['metrics']['log_loss']:.4f} (trial {best['trial_id']}), "
+                  f"{sum(r['seconds'] for r in rung_results):.1f}s compute")
+
+            keep = max(1, math.floor(len(rung_results) / eta))
+            candidates = [{'trial_id': r['trial_id'], 'params': r['params']} for r in rung_results[:keep]]
+            if len(rung_results) == 1:
+                break
+
+    if not results:
+        raise RuntimeError(f"No trial finished for {market}/{model_type}")
+
+    # The best trial of the highest rung reached wins (lower rungs are not comparable)
+    final = [r for r in results if r['rung'] == completed_rungs[-1]]
+    best = min(final, key=lambda r: r['metrics']['log_loss'])
+
+    # XGBoost counts best_iteration from 0, LightGBM from 1
+    params = best['params'].copy()
+    if best['best_iteration'] is None:
+        params['n_estimators'] = best['rounds']
+    else:
+        params['n_estimators'] = best['best_iteration'] + (1 if model_type == 'xgboost' else 0)
+
+    summary = {
+        'market': market,
+        'model_type': model_type,
+        'run_id': run_id,
+        'matrix_version': best['matrix_version'],
+        'n_trials': n_trials,
+        'rungs': rungs[:len(completed_rungs)],
+        'eta': eta,
+        'cpu_budget': cpu_budget,
+        'workers': workers,
+        'best_trial': best['trial_id'],
+        'best_params': params,
+        'best_metrics': best['metrics'],
+        'trials_run': len(results),
+        'compute_seconds': sum(r['seconds'] for r in results),
+        'wall_seconds': time.perf_counter() - start,
+        'trial_log': str(log_path)
+    }
+
+    summary_path = SEARCH_RESULTS_DIR / f"{market}_{model_type}_best.json"
+    with open(summary_path, 'w') as f:
+        json.dump(summary, f, indent=2, default=float)
+
+    print(f"\n✅ Best trial {best['trial_id']}: log loss {best['metrics']['log_loss']:.4f}, "
+          f"{params['n_estimators']} rounds")
+    print(f"⏱️  {summary['trials_run']} trials, {summary['compute_seconds']:.1f}s compute, "
+          f"{summary['wall_seconds']:.1f}s wall")
+    print(f"💾 Saved trial log to {log_path}")
+    print(f"💾 Saved best parameters to {summary_path}")
+
+    return summary
+
+
+def load_best_params(market: str, model_type: str) -> Optional[Dict]:
+    """
+    Best parameters of the last search, merged onto MODEL_CONFIGS
+
+    Args:
+        market: Market name
+        model_type: Model type
+
+    Returns:
+        Full parameter dict, or None if the market/model was never searched
+    """
+    summary_path = SEARCH_RESULTS_DIR / f"{market}_{model_type}_best.json"
+    if not summary_path.exists():
+        return None
+
+    with open(summary_path, 'r') as f:
+        summary = json.load(f)
+
+    params = MODEL_CONFIGS[model_type]['params'].copy()
+    params.update(summary['best_params'])
+    return params
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Successive-halving hyperparameter search')
+    parser.add_argument('--markets', nargs='+', choices=list(MARKETS.keys()), default=list(MARKETS.keys()),
+                       help='Markets to tune (default: all)')
+    parser.add_argument('--models', nargs='+', choices=PREBINNED_MODELS, default=PREBINNED_MODELS,
+                       help='Models to tune (default: xgboost and lightgbm)')
+    parser.add_argument('--trials', type=int, default=None,
+                       help='Configurations in the first rung')
+    parser.add_argument('--cpu-budget', type=int, default=None,
+                       help='Total cores for the search (default: all cores)')
+    parser.add_argument('--workers', type=int, default=None,
+                       help='Maximum concurrent trials')
+    parser.add_argument('--time-budget', type=float, default=None,
+                       help='Seconds per search after which no further rung starts')
+
+    args = parser.parse_args()
+
+    for market in args.markets:
+        for model_type in args.models:
+            search_market(
+                market, model_type,
+                n_trials=args.trials,
+                cpu_budget=args.cpu_budget,
+                max_workers=args.workers,
+                time_budget=args.time_budget
+            )
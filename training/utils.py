@@ -17,7 +17,28 @@ from sklearn.metrics import log_loss, brier_score_loss, roc_auc_score, accuracy_
 import warnings
 warnings.filterwarnings('ignore')
 
-from training.config import MODELS_DIR, MODEL_VERSION_FORMAT, INITIAL_VERSION
+try:
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+from training.config import (
+    MODELS_DIR, MODEL_VERSION_FORMAT, INITIAL_VERSION, TRAINING_DTYPES, MARKETS, EXTERNAL_MEMORY_CONFIG
+)
+
+
+# Non-feature columns of the training tables
+TRAINING_TEXT_COLUMNS = ['match_id', 'league', 'season']
+TRAINING_ID_COLUMNS = ['home_team_id', 'away_team_id']
+TRAINING_DATE_COLUMN = 'date'
+TRAINING_TARGET_COLUMN = 'y'
+
+COLUMNAR_FORMATS = ('.parquet', '.feather')
+
+# Odds columns of every market (never used as model features)
+ODDS_COLUMNS = [market['odds_column'] for market in MARKETS.values()]
 
 
 def fit_calibration_model(
@@ -215,7 +236,8 @@ def save_model_with_metadata(
     version: Optional[str] = None,
     train_start_date: Optional[str] = None,
     train_end_date: Optional[str] = None,
-    additional_info: Optional[Dict] = None
+    additional_info: Optional[Dict] = None,
+    models_dir: Optional[Path] = None
 ) -> str:
     """
     Save model with comprehensive metadata
@@ -232,6 +254,7 @@ def save_model_with_metadata(
         train_start_date: Training data start date
         train_end_date: Training data end date
         additional_info: Additional metadata to store
+        models_dir: Root directory to save under (defaults to MODELS_DIR)
         
     Returns:
         Path to saved model
@@ -241,7 +264,7 @@ def save_model_with_metadata(
         version = INITIAL_VERSION
     
     # Create model directory
-    model_dir = MODELS_DIR / market
+    model_dir = Path(models_dir or MODELS_DIR) / market
     model_dir.mkdir(parents=True, exist_ok=True)
     
     # Save model
@@ -325,6 +348,150 @@ def load_model_with_metadata(
     return model, metadata, calibration_model
 
 
+def optimize_training_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Cast a training table to its canonical dtypes
+    
+    Features and odds become float32, the target int8, team IDs int32 and
+    the date column datetime64. Text columns are left untouched.
+    
+    Args:
+        df: Training DataFrame
+        
+    Returns:
+        DataFrame with explicit dtypes
+    """
+    df = df.copy()
+    
+    for col in df.columns:
+        if col in TRAINING_TEXT_COLUMNS:
+            continue
+        
+        if col == TRAINING_DATE_COLUMN:
+            df[col] = pd.to_datetime(df[col])
+            continue
+        
+        values = df[col]
+        if values.dtype == object:
+            try:
+                values = pd.to_numeric(values)
+            except (ValueError, TypeError):
+                continue
+        elif not (pd.api.types.is_numeric_dtype(values) or pd.api.types.is_bool_dtype(values)):
+            continue
+        
+        if col == TRAINING_TARGET_COLUMN and values.notna().all():
+            df[col] = values.astype(TRAINING_DTYPES['target'])
+        elif col in TRAINING_ID_COLUMNS and values.notna().all():
+            df[col] = values.astype(TRAINING_DTYPES['ids'])
+        else:
+            df[col] = values.astype(TRAINING_DTYPES['features'])
+    
+    return df
+
+
+def get_feature_columns(df: pd.DataFrame) -> List[str]:
+    """
+    Model feature columns of a training table
+    
+    Args:
+        df: Training DataFrame
+        
+    Returns:
+        Every column except match metadata, the target and market odds
+    """
+    excluded = set(TRAINING_TEXT_COLUMNS + TRAINING_ID_COLUMNS + ODDS_COLUMNS)
+    excluded.update([TRAINING_DATE_COLUMN, TRAINING_TARGET_COLUMN])
+    return [col for col in df.columns if col not in excluded]
+
+
+def save_training_data(
+    df: pd.DataFrame,
+    path: str,
+    csv_path: Optional[str] = None
+) -> str:
+    """
+    Save a training table in the format given by the path suffix
+    
+    Parquet is written with snappy compression in row groups of
+    EXTERNAL_MEMORY_CONFIG['row_group_rows'] (the unit chunked training
+    decodes at a time). Feather is written uncompressed so memory-mapped
+    reads can use the file buffers directly.
+    
+    Args:
+        df: Training DataFrame
+        path: Output path (.parquet, .feather or .csv)
+        csv_path: Optional additional CSV export
+        
+    Returns:
+        Path written
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    df = optimize_training_dtypes(df)
+    
+    if path.suffix in COLUMNAR_FORMATS and not PYARROW_AVAILABLE:
+        raise ImportError(f"pyarrow is required to write {path.suffix} files (pip install pyarrow)")
+    
+    if path.suffix == '.parquet':
+        df.to_parquet(
+            path, index=False, compression='snappy',
+            row_group_size=EXTERNAL_MEMORY_CONFIG['row_group_rows']
+        )
+    elif path.suffix == '.feather':
+        df.reset_index(drop=True).to_feather(path, compression='uncompressed')
+    else:
+        df.to_csv(path, index=False)
+    
+    if csv_path:
+        Path(csv_path).parent.mkdir(parents=True, exist_ok=True)
+        df.to_csv(csv_path, index=False)
+        print(f"📄 Exported CSV copy to {csv_path}")
+    
+    return str(path)
+
+
+def load_training_data(
+    path: str,
+    columns: Optional[List[str]] = None,
+    memory_map: bool = False
+) -> pd.DataFrame:
+    """
+    Load a training table with explicit dtypes
+    
+    Falls back to a CSV with the same name when the columnar file does
+    not exist yet (tables built before the switch to Parquet).
+    
+    Args:
+        path: Path to .parquet, .feather or .csv file
+        columns: Columns to load (None loads every column)
+        memory_map: Memory-map the file instead of reading it into buffers
+            (Parquet/Feather only)
+        
+    Returns:
+        Training DataFrame
+    """
+    path = Path(path)
+    if not path.exists():
+        csv_path = path.with_suffix('.csv')
+        if path.suffix in COLUMNAR_FORMATS and csv_path.exists():
+            print(f"⚠️  {path.name} not found, reading {csv_path.name}")
+            path = csv_path
+        else:
+            raise FileNotFoundError(f"Training data not found: {path}")
+    
+    if path.suffix in COLUMNAR_FORMATS:
+        if not PYARROW_AVAILABLE:
+            raise ImportError(f"pyarrow is required to read {path.suffix} files (pip install pyarrow)")
+        if path.suffix == '.parquet':
+            table = pq.read_table(path, columns=columns, memory_map=memory_map)
+        else:
+            table = feather.read_table(path, columns=columns, memory_map=memory_map)
+        return table.to_pandas()
+    
+    return optimize_training_dtypes(pd.read_csv(path, usecols=columns))
+
+
 def increment_version(current_version: str, increment_type: str = 'minor') -> str:
     """
     Increment model version number
@@ -3,11 +3,17 @@ Football Betting AI System - User API
 FastAPI application serving predictions and handling data ingestion
 """
 
+import base64
+import json
 import os
+from datetime import datetime, timezone
+from decimal import Decimal
 from typing import List, Dict, Optional
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, aliased
 from pydantic import BaseModel
 import sys
 from pathlib import Path
@@ -15,9 +21,15 @@ from pathlib import Path
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from data_ingestion.database import get_db_session, init_db
-from data_ingestion.schemas import BatchIngestRequest, IngestResponse
+from data_ingestion.database import (
+    SessionLocal, AsyncSessionLocal, get_db_session, get_async_db_session, init_db, pool_status,
+    async_engine, ASYNC_DB_AVAILABLE
+)
+from data_ingestion.schemas import BatchIngestRequest, IngestResponse, IngestJobAccepted, IngestJobStatus, StreamIngestResponse
 from data_ingestion.ingestion import DataIngestionService
+from data_ingestion.jobs import IngestionJobManager, JobQueueFullError
+from data_ingestion.streaming import StreamIngestor, STREAM_COMMIT_EVERY
+from data_ingestion.odds import get_latest_odds, odds_to_dict, replay_odds, line_movement, SELECTION_CODES
 
 # Import Smart Bets predictor
 try:
@@ -73,6 +85,9 @@ golden_predictor = None
 value_predictor = None
 custom_analyzer = None
 
+# Background ingestion jobs (bounded worker pool)
+ingestion_jobs = IngestionJobManager()
+
 
 @app.on_event("startup")
 async def startup_event():
@@ -85,6 +100,9 @@ async def startup_event():
     except Exception as e:
         print(f"❌ Database initialization failed: {e}")
     
+    if not ASYNC_DB_AVAILABLE:
+        print("⚠️  Async database driver not available (install asyncpg/aiosqlite); read endpoints will fail")
+    
     # Load Smart Bets models
     if SMART_BETS_AVAILABLE:
         try:
@@ -118,6 +136,14 @@ async def startup_event():
             print(f"⚠️  Could not load Custom Analysis: {e}")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Let running ingestion jobs finish their current work and close the async pool"""
+    ingestion_jobs.shutdown(wait=True)
+    if async_engine is not None:
+        await async_engine.dispose()
+
+
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -127,7 +153,10 @@ async def root():
         "status": "operational",
         "endpoints": {
             "health": "/health",
+            "db_pool": "/health/db-pool",
             "data_ingestion": "/api/v1/data/ingest",
+            "ingestion_jobs": "/api/v1/data/ingest/jobs",
+            "stream_ingestion": "/api/v1/data/ingest/stream",
             "smart_bets": "/api/v1/predictions/smart-bets",
             "golden_bets": "/api/v1/predictions/golden-bets",
             "value_bets": "/api/v1/predictions/value-bets",
@@ -151,6 +180,16 @@ async def health_check():
     }
 
 
+@app.get("/health/db-pool")
+async def db_pool_status():
+    """Connection pool metrics of the async (API reads) and sync (ingestion) engines"""
+    return {
+        "async_available": ASYNC_DB_AVAILABLE,
+        "async": pool_status('async'),
+        "sync": pool_status('sync')
+    }
+
+
 @app.post(
     "/api/v1/data/ingest",
     response_model=IngestResponse,
@@ -198,6 +237,112 @@ async def ingest_data(
         )
 
 
+@app.post(
+    "/api/v1/data/ingest/stream",
+    response_model=StreamIngestResponse,
+    status_code=status.HTTP_200_OK,
+    tags=["Data Ingestion"]
+)
+async def ingest_stream(
+    request: Request,
+    response: Response,
+    cursor: int = Query(0, ge=0),
+    commit_every: int = Query(STREAM_COMMIT_EVERY, ge=1, le=10000)
+):
+    """
+    Ingest newline-delimited JSON (one match per line) from the request body
+    
+    Records are validated as they arrive and committed every
+    `commit_every` valid records, so memory does not grow with the body.
+    Invalid lines are reported and skipped.
+    
+    Query parameters:
+    - cursor: Lines to skip, from the response of an interrupted call
+    - commit_every: Records per committed chunk
+    
+    Returns:
+    - Processing statistics and errors
+    - cursor: Lines fully handled; on a 503 resend the same body with it
+    """
+    ingestor = StreamIngestor(commit_every=commit_every)
+    result = await ingestor.ingest(request.stream(), cursor=cursor)
+    
+    if not result.complete:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    
+    return result
+
+
+@app.post(
+    "/api/v1/data/ingest/jobs",
+    response_model=IngestJobAccepted,
+    status_code=status.HTTP_202_ACCEPTED,
+    tags=["Data Ingestion"]
+)
+async def submit_ingestion_job(request: BatchIngestRequest):
+    """
+    Queue a batch for background ingestion
+    
+    Use for large historical backfills. The batch is validated, then
+    ingested by a background worker in committed chunks; the response
+    returns immediately with a job id.
+    
+    Returns:
+    - Job id and the URL to poll for progress
+    """
+    try:
+        job = ingestion_jobs.submit(request)
+    except JobQueueFullError as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e)
+        )
+    
+    return IngestJobAccepted(
+        job_id=job.job_id,
+        status=job.status,
+        total_matches=job.total_matches,
+        status_url=f"/api/v1/data/ingest/jobs/{job.job_id}"
+    )
+
+
+@app.get(
+    "/api/v1/data/ingest/jobs/{job_id}",
+    response_model=IngestJobStatus,
+    tags=["Data Ingestion"]
+)
+async def get_ingestion_job(job_id: str):
+    """
+    Progress of a background ingestion job
+    
+    Returns:
+    - Status (queued, running, completed, completed_with_errors, failed, cancelled)
+    - Processed/created/updated/error counts and throughput
+    """
+    job = ingestion_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Ingestion job {job_id} not found"
+        )
+    
+    return job.to_status()
+
+
+@app.get(
+    "/api/v1/data/ingest/jobs",
+    tags=["Data Ingestion"]
+)
+async def list_ingestion_jobs():
+    """List recent background ingestion jobs, newest first"""
+    jobs = ingestion_jobs.list()
+    return {
+        "total": len(jobs),
+        "pending": sum(1 for job in jobs if not job.finished),
+        "jobs": [job.to_status() for job in jobs]
+    }
+
+
 # Pydantic models for predictions
 class MatchInput(BaseModel):
     """Match data for prediction"""
@@ -219,8 +364,21 @@ class MatchInput(BaseModel):
 
 
 class MatchWithOdds(MatchInput):
-    """Match data with odds for value betting"""
-    odds: Dict[str, float]
+    """Match data with odds for value betting (current stored odds if omitted)"""
+    odds: Optional[Dict[str, float]] = None
+
+
+# Value Bets odds keys -> match_odds_latest columns
+VALUE_BETS_ODDS_COLUMNS = {
+    'goals_over_2_5': 'over_2_5_odds',
+    'goals_under_2_5': 'under_2_5_odds',
+    'cards_over_3_5': 'cards_over_3_5_odds',
+    'cards_under_3_5': 'cards_under_3_5_odds',
+    'corners_over_9_5': 'corners_over_9_5_odds',
+    'corners_under_9_5': 'corners_under_9_5_odds',
+    'btts_yes': 'btts_yes_odds',
+    'btts_no': 'btts_no_odds'
+}
 
 
 class PredictionRequest(BaseModel):
@@ -355,6 +513,9 @@ async def predict_value_bets(request: ValueBetsRequest):
     - corners_over_9_5, corners_under_9_5
     - btts_yes, btts_no
     
+    Matches sent without odds are priced from the current stored odds (the
+    database is only read when some match comes without odds).
+    
     Returns:
     - Top 3 Value Bets ranked by value score
     - AI probability vs implied probability
@@ -371,6 +532,28 @@ async def predict_value_bets(request: ValueBetsRequest):
         # Convert Pydantic models to dicts
         matches = [match.model_dump() for match in request.matches]
         
+        # Fill missing odds from the latest-odds table (primary-key lookups)
+        missing = [match['match_id'] for match in matches if not match['odds']]
+        if missing:
+            if AsyncSessionLocal is not None:
+                async with AsyncSessionLocal() as db:
+                    latest = await db.run_sync(get_latest_odds, missing)
+            else:
+                # No async driver installed: read through the sync engine
+                db = SessionLocal()
+                try:
+                    latest = get_latest_odds(db, missing)
+                finally:
+                    db.close()
+            for match in matches:
+                if not match['odds'] and match['match_id'] in latest:
+                    stored = odds_to_dict(latest[match['match_id']])
+                    match['odds'] = {
+                        key: stored[column]
+                        for key, column in VALUE_BETS_ODDS_COLUMNS.items()
+                        if column in stored
+                    }
+        
         # Get Value Bets predictions
         predictions = value_predictor.predict(matches)
         
@@ -450,58 +633,282 @@ async def analyze_custom_bet(request: CustomAnalysisRequest):
         )
 
 
+def _encode_cursor(*values) -> str:
+    """Opaque keyset cursor (URL-safe base64 of the last row's sort key)"""
+    return base64.urlsafe_b64encode(json.dumps(values).encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def _decode_cursor(cursor: str, size: int) -> list:
+    """Sort key of a cursor made by _encode_cursor (400 if it is malformed)"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except ValueError:
+        values = None
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    return values
+
+
 @app.get("/api/v1/matches", tags=["Matches"])
 async def get_matches(
-    limit: int = 10,
-    status: str = "scheduled",
-    db: Session = Depends(get_db_session)
+    limit: int = Query(10, ge=1, le=500),
+    status_filter: str = Query("scheduled", alias="status"),
+    league: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db_session)
 ):
     """
-    Get matches from database
+    Get matches from database, ordered by kickoff
     
     Query parameters:
     - limit: Number of matches to return (default: 10)
     - status: Match status filter (scheduled, completed, all)
+    - league: League filter
+    - date_from / date_to: Kickoff range (ISO 8601, inclusive)
+    - cursor: next_cursor of the previous page
+    
+    Pages are keyset-paginated on (match_datetime, match_id), so any page
+    is one index range scan.
     """
     from data_ingestion.models import Match, Team
     
-    query = db.query(Match).join(
-        Team, Match.home_team_id == Team.team_id
+    home = aliased(Team)
+    away = aliased(Team)
+    query = (
+        select(
+            Match.match_id,
+            home.team_name.label('home_team'),
+            away.team_name.label('away_team'),
+            Match.match_datetime,
+            Match.league,
+            Match.status
+        )
+        .join(home, Match.home_team_id == home.team_id)
+        .join(away, Match.away_team_id == away.team_id)
     )
     
-    if status != "all":
-        query = query.filter(Match.status == status)
+    if status_filter != "all":
+        query = query.where(Match.status == status_filter)
+    if league is not None:
+        query = query.where(Match.league == league)
+    if date_from is not None:
+        query = query.where(Match.match_datetime >= _utc(date_from))
+    if date_to is not None:
+        query = query.where(Match.match_datetime <= _utc(date_to))
+    if cursor is not None:
+        last_datetime, last_match_id = _decode_cursor(cursor, 2)
+        try:
+            last_datetime = datetime.fromisoformat(last_datetime)
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        query = query.where(tuple_(Match.match_datetime, Match.match_id) > tuple_(last_datetime, last_match_id))
     
-    matches = query.order_by(Match.match_datetime).limit(limit).all()
+    rows = (await db.execute(query.order_by(Match.match_datetime, Match.match_id).limit(limit + 1))).all()
+    page = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = _encode_cursor(page[-1].match_datetime.isoformat(), page[-1].match_id)
     
     return {
-        "total": len(matches),
+        "total": len(page),
+        "next_cursor": next_cursor,
         "matches": [
             {
                 "match_id": m.match_id,
-                "home_team": m.home_team.team_name,
-                "away_team": m.away_team.team_name,
+                "home_team": m.home_team,
+                "away_team": m.away_team,
                 "match_datetime": m.match_datetime.isoformat(),
                 "league": m.league,
                 "status": m.status
             }
-            for m in matches
+            for m in page
+        ]
+    }
+
+
+@app.get("/api/v1/matches/{match_id}/odds", tags=["Matches"])
+async def get_match_odds(
+    match_id: str,
+    db: AsyncSession = Depends(get_async_db_session)
+):
+    """Get the current odds of a match"""
+    from data_ingestion.models import LatestOdds
+    
+    latest = await db.get(LatestOdds, match_id)
+    if latest is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No odds for match {match_id}"
+        )
+    
+    return {
+        "match_id": latest.match_id,
+        "odds_timestamp": latest.odds_timestamp.isoformat() if latest.odds_timestamp else None,
+        "bookmaker": latest.bookmaker,
+        "odds": odds_to_dict(latest)
+    }
+
+
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Query datetime as naive UTC (how odds movements are stored)"""
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+@app.get("/api/v1/matches/{match_id}/odds/history", tags=["Matches"])
+async def get_match_odds_history(
+    match_id: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    selection: Optional[List[str]] = Query(None),
+    bookmaker: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db_session)
+):
+    """
+    Get the line movement of a match's odds
+    
+    Query parameters:
+    - start / end: Time range (ISO 8601, default: whole history)
+    - selection: Odds columns to include, repeatable (e.g. home_win_odds)
+    - bookmaker: Only this bookmaker
+    """
+    unknown = [name for name in selection or [] if name not in SELECTION_CODES]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown odds selections: {', '.join(unknown)}"
+        )
+    
+    series = await db.run_sync(
+        line_movement, match_id, start=_utc(start), end=_utc(end), selections=selection, bookmaker=bookmaker
+    )
+    
+    return {
+        "match_id": match_id,
+        "count": len(series),
+        "series": [
+            {
+                **entry,
+                "movements": [
+                    {**movement, "recorded_at": movement["recorded_at"].isoformat()}
+                    for movement in entry["movements"]
+                ]
+            }
+            for entry in series
+        ]
+    }
+
+
+@app.get("/api/v1/matches/{match_id}/odds/replay", tags=["Matches"])
+async def replay_match_odds(
+    match_id: str,
+    at: datetime,
+    bookmaker: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db_session)
+):
+    """Reconstruct the odds of a match as they were at time `at` (ISO 8601)"""
+    snapshot = await db.run_sync(replay_odds, match_id, _utc(at), bookmaker=bookmaker)
+    if not snapshot:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No odds for match {match_id} at {at.isoformat()}"
+        )
+    
+    return {
+        "match_id": match_id,
+        "at": at.isoformat(),
+        "bookmakers": snapshot
+    }
+
+
+@app.get("/api/v1/matches/{match_id}/predictions", tags=["Matches"])
+async def get_match_predictions(
+    match_id: str,
+    limit: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db_session)
+):
+    """Get the stored (pre-scored) predictions of a match, newest first"""
+    from data_ingestion.models import Prediction
+    
+    rows = (await db.execute(
+        select(
+            Prediction.prediction_id,
+            Prediction.model_version,
+            Prediction.prediction_timestamp,
+            Prediction.is_golden_bet,
+            Prediction.golden_bet_market,
+            Prediction.golden_bet_selection,
+            Prediction.golden_bet_probability,
+            Prediction.golden_bet_confidence,
+            Prediction.is_value_bet,
+            Prediction.value_bet_market,
+            Prediction.value_bet_selection,
+            Prediction.value_bet_ai_probability,
+            Prediction.value_bet_implied_probability,
+            Prediction.value_bet_value,
+            Prediction.smart_bet_market,
+            Prediction.smart_bet_selection,
+            Prediction.smart_bet_probability,
+            Prediction.all_probabilities,
+            Prediction.explanation
+        )
+        .where(Prediction.match_id == match_id)
+        .order_by(Prediction.prediction_timestamp.desc(), Prediction.prediction_id.desc())
+        .limit(limit)
+    )).all()
+    
+    return {
+        "match_id": match_id,
+        "total": len(rows),
+        "predictions": [
+            {
+                key: value.isoformat() if isinstance(value, datetime) else float(value) if isinstance(value, Decimal) else value
+                for key, value in row._mapping.items()
+            }
+            for row in rows
         ]
     }
 
 
 @app.get("/api/v1/teams", tags=["Teams"])
 async def get_teams(
-    limit: int = 20,
-    db: Session = Depends(get_db_session)
+    limit: int = Query(20, ge=1, le=500),
+    league: Optional[str] = None,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db_session)
 ):
-    """Get teams from database"""
+    """
+    Get teams from database, ordered by team_id
+    
+    Query parameters:
+    - limit: Number of teams to return (default: 20)
+    - league: League filter
+    - cursor: next_cursor of the previous page
+    """
     from data_ingestion.models import Team
     
-    teams = db.query(Team).limit(limit).all()
+    query = select(Team.team_id, Team.team_name, Team.league, Team.tier)
+    if league is not None:
+        query = query.where(Team.league == league)
+    if cursor is not None:
+        last_team_id, = _decode_cursor(cursor, 1)
+        if not isinstance(last_team_id, int):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        query = query.where(Team.team_id > last_team_id)
+    
+    rows = (await db.execute(query.order_by(Team.team_id).limit(limit + 1))).all()
+    page = rows[:limit]
+    next_cursor = _encode_cursor(page[-1].team_id) if len(rows) > limit else None
     
     return {
-        "total": len(teams),
+        "total": len(page),
+        "next_cursor": next_cursor,
         "teams": [
             {
                 "team_id": t.team_id,
@@ -509,7 +916,7 @@ async def get_teams(
                 "league": t.league,
                 "tier": t.tier
             }
-            for t in teams
+            for t in page
         ]
     }
 
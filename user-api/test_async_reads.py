@@ -0,0 +1,144 @@
+"""
+Tests for the async read paths of the API
+
+Run with: pytest user-api/test_async_reads.py
+"""
+
+import os
+import sys
+import asyncio
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Throwaway SQLite database (read by data_ingestion.database at import)
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'async_reads.db'))
+
+# Add project root and this directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+import httpx
+from fastapi.testclient import TestClient
+
+import main
+from data_ingestion.database import SessionLocal, init_db, pool_status, _async_url
+from data_ingestion.models import LatestOdds, Prediction
+
+init_db()
+client = TestClient(main.app)
+
+
+def test_async_url_uses_async_driver():
+    """DATABASE_URL is mapped to the async driver of its dialect"""
+    assert _async_url('postgresql://user:secret@db:5432/football') == 'postgresql+asyncpg://user:secret@db:5432/football'
+    assert _async_url('postgresql+psycopg2://user@db/football') == 'postgresql+asyncpg://user@db/football'
+    assert _async_url('sqlite:////data/app.db') == 'sqlite+aiosqlite:////data/app.db'
+    assert _async_url('mysql://user@db/football') == 'mysql://user@db/football'
+
+
+def test_reads_check_out_async_connections_only():
+    """Read endpoints use the async pool; the sync (ingestion) pool is untouched"""
+    assert main.ASYNC_DB_AVAILABLE
+    async_before = pool_status('async')['checkouts']
+    sync_before = pool_status('sync')['checkouts']
+    
+    for path in ('/api/v1/matches', '/api/v1/teams', '/api/v1/matches/NONE/predictions'):
+        assert client.get(path).status_code == 200
+    assert client.get('/api/v1/matches/NONE/odds').status_code == 404
+    
+    assert pool_status('async')['checkouts'] == async_before + 4
+    assert pool_status('sync')['checkouts'] == sync_before
+    
+    metrics = client.get('/health/db-pool').json()
+    assert metrics['async_available'] and metrics['async']['checkedout'] == 0
+
+
+def test_match_predictions_newest_first():
+    """Stored predictions of a match are returned newest first, up to limit"""
+    scored_at = datetime(2024, 1, 1, 12, 0)
+    db = SessionLocal()
+    for i in range(3):
+        db.add(Prediction(
+            match_id='ASYNC_M1', model_version=f'v{i}', prediction_timestamp=scored_at + timedelta(hours=i),
+            is_golden_bet=i == 2, golden_bet_probability=0.87, all_probabilities={'over_2_5': 0.6}
+        ))
+    db.commit()
+    db.close()
+    
+    body = client.get('/api/v1/matches/ASYNC_M1/predictions', params={'limit': 2}).json()
+    assert body['total'] == 2
+    assert [p['model_version'] for p in body['predictions']] == ['v2', 'v1']
+    assert body['predictions'][0]['golden_bet_probability'] == 0.87
+    assert body['predictions'][0]['all_probabilities'] == {'over_2_5': 0.6}
+
+
+def test_concurrent_reads_share_the_event_loop():
+    """Many reads in flight on one event loop all complete"""
+    async def read_all():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://test') as http:
+            return await asyncio.gather(*[
+                http.get('/api/v1/matches', params={'status': 'all', 'limit': 50}) for _ in range(20)
+            ])
+    
+    responses = asyncio.run(read_all())
+    assert [response.status_code for response in responses] == [200] * 20
+
+
+class RecordingValuePredictor:
+    """Stands in for ValueBetsPredictor and keeps the matches it was given"""
+    
+    def __init__(self):
+        self.matches = []
+    
+    def predict(self, matches):
+        self.matches = matches
+        return []
+
+
+def value_bets_match(match_id: str, odds=None) -> dict:
+    """Value Bets request entry with flat team stats"""
+    stats = {
+        f'{side}_{stat}': 1.0
+        for side in ('home', 'away')
+        for stat in ('goals_avg', 'goals_conceded_avg', 'corners_avg', 'cards_avg', 'btts_rate')
+    }
+    return {'match_id': match_id, 'home_team': 'Home', 'away_team': 'Away', 'odds': odds, **stats}
+
+
+def test_value_bets_without_async_driver():
+    """Value Bets read stored odds through the sync engine when the async one is missing"""
+    db = SessionLocal()
+    db.add(LatestOdds(match_id='ASYNC_V1', over_2_5_odds=1.9, btts_yes_odds=1.8))
+    db.commit()
+    db.close()
+    
+    saved = (main.value_predictor, main.AsyncSessionLocal)
+    main.value_predictor = RecordingValuePredictor()
+    main.AsyncSessionLocal = None
+    try:
+        # Matches carrying their own odds never touch the database
+        sync_before = pool_status('sync')['checkouts']
+        response = client.post('/api/v1/predictions/value-bets', json={
+            'matches': [value_bets_match('ASYNC_V0', odds={'goals_over_2_5': 2.1})]
+        })
+        assert response.status_code == 200
+        assert main.value_predictor.matches[0]['odds'] == {'goals_over_2_5': 2.1}
+        assert pool_status('sync')['checkouts'] == sync_before
+        
+        response = client.post('/api/v1/predictions/value-bets', json={'matches': [value_bets_match('ASYNC_V1')]})
+        assert response.status_code == 200
+        assert main.value_predictor.matches[0]['odds'] == {'goals_over_2_5': 1.9, 'btts_yes': 1.8}
+        assert pool_status('sync')['checkouts'] == sync_before + 1
+    finally:
+        main.value_predictor, main.AsyncSessionLocal = saved
+
+
+if __name__ == "__main__":
+    test_async_url_uses_async_driver()
+    test_reads_check_out_async_connections_only()
+    test_match_predictions_newest_first()
+    test_concurrent_reads_share_the_event_loop()
+    test_value_bets_without_async_driver()
+    print("✅ All async read path tests passed")
@@ -0,0 +1,125 @@
+"""
+Tests for keyset pagination of the read endpoints
+
+Run with: pytest user-api/test_pagination.py
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Throwaway SQLite database (read by data_ingestion.database at import)
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'pagination.db')
+
+# Add project root and this directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from fastapi.testclient import TestClient
+
+import main
+from data_ingestion.database import SessionLocal, init_db
+from data_ingestion.ingestion import DataIngestionService
+from data_ingestion.schemas import BatchIngestRequest
+from data_ingestion.team_index import TeamNameIndex
+from data_ingestion.testing import sample_matches
+
+LEAGUES = ['Premier League', 'La Liga', 'Serie A']
+
+
+def load_matches():
+    """Bundled fixtures with mixed leagues and statuses and shared kickoff times"""
+    matches = sample_matches(120)
+    
+    for i, match in enumerate(matches):
+        match['league'] = LEAGUES[i % 3]
+        if i % 4 == 0:
+            match['status'] = 'scheduled'
+            match.pop('result', None)
+        if i % 5 == 0 and i > 0:
+            # Kickoff ties are broken by match_id
+            match['match_datetime'] = matches[i - 1]['match_datetime']
+    
+    init_db()
+    db = SessionLocal()
+    response = DataIngestionService(db, team_index=TeamNameIndex()).ingest_batch(BatchIngestRequest(matches=matches))
+    db.close()
+    assert response.success, response.errors
+    return matches
+
+
+MATCHES = load_matches()
+client = TestClient(main.app)
+
+
+def walk(path: str, key: str, **params):
+    """Follow next_cursor until the last page; returns items and page count"""
+    items = []
+    pages = 0
+    cursor = None
+    while True:
+        query = {name: value for name, value in params.items() if value is not None}
+        if cursor:
+            query['cursor'] = cursor
+        response = client.get(path, params=query)
+        assert response.status_code == 200, response.text
+        body = response.json()
+        assert len(body[key]) <= params['limit']
+        items.extend(body[key])
+        pages += 1
+        assert pages <= len(MATCHES) + 1, 'cursor does not advance'
+        cursor = body['next_cursor']
+        if cursor is None:
+            return items, pages
+
+
+def expected_ids(status=None, league=None):
+    """Reference order of the matches endpoint"""
+    rows = [
+        match for match in MATCHES
+        if (status is None or match['status'] == status) and (league is None or match['league'] == league)
+    ]
+    return [match['match_id'] for match in sorted(rows, key=lambda m: (m['match_datetime'], m['match_id']))]
+
+
+def test_matches_pages_have_no_gaps_or_duplicates():
+    """Every page size returns each match exactly once, in kickoff order"""
+    for limit in (1, 7, 50, 500):
+        items, pages = walk('/api/v1/matches', 'matches', status='all', limit=limit)
+        assert [m['match_id'] for m in items] == expected_ids()
+        assert pages == max(1, -(-len(MATCHES) // limit))
+
+
+def test_matches_filters_combine_with_cursor():
+    """status and league filters apply on every page"""
+    for status in ('scheduled', 'completed', None):
+        for league in (*LEAGUES, None):
+            items, _ = walk('/api/v1/matches', 'matches', status=status or 'all', league=league, limit=6)
+            assert [m['match_id'] for m in items] == expected_ids(status, league)
+
+
+def test_teams_pages_follow_team_id():
+    """Teams are paged by team_id, optionally within one league"""
+    items, _ = walk('/api/v1/teams', 'teams', limit=4)
+    team_ids = [team['team_id'] for team in items]
+    assert team_ids == sorted(set(team_ids))
+    
+    for league in LEAGUES:
+        league_items, _ = walk('/api/v1/teams', 'teams', league=league, limit=3)
+        assert league_items == [team for team in items if team['league'] == league]
+
+
+def test_invalid_cursor_is_rejected():
+    """Cursors that do not decode to the expected key are a 400"""
+    assert client.get('/api/v1/matches', params={'cursor': 'not-a-cursor'}).status_code == 400
+    assert client.get('/api/v1/matches', params={'cursor': main._encode_cursor('x', 'y')}).status_code == 400
+    assert client.get('/api/v1/teams', params={'cursor': main._encode_cursor(1, 2)}).status_code == 400
+
+
+if __name__ == "__main__":
+    test_matches_pages_have_no_gaps_or_duplicates()
+    test_matches_filters_combine_with_cursor()
+    test_teams_pages_follow_team_id()
+    test_invalid_cursor_is_rejected()
+    print("✅ All pagination tests passed")